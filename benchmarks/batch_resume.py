@@ -0,0 +1,113 @@
+"""
+Directory batch mode: throughput against one CLI call per file, and resuming after a crash.
+
+Usage:
+    python -m benchmarks.batch_resume [--engine spacy] [--files 500] [--per-file 20]
+
+A directory of `--files` generated documents (see `benchmarks.corpus`) is
+processed by `labeling batch`, once uninterrupted and once killed with SIGKILL
+part way and rerun; the resumed run must process only the files that were not
+finished and produce the same outputs. `--per-file` files are also run through
+the single-file CLI, one process each, to show what the pipeline load costs.
+"""
+
+import argparse
+import json
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from labeling.batch import MANIFEST_NAME
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from tests.corpus import generate_document
+
+
+def _write_inputs(root: Path, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for index in range(count):
+        path = root / f"part{index % 10}" / f"doc{index:05d}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        style = rng.choice(["conversational", "legal"])
+        path.write_text(generate_document(style, rng.randrange(500, 5000), rng).text, encoding="utf-8")
+
+
+def _batch(in_dir: Path, out_dir: Path, options: list, **popen) -> subprocess.Popen:
+    command = [sys.executable, "-m", "labeling", "batch", str(in_dir), str(out_dir), "--quiet", *options]
+    return subprocess.Popen(command, **popen)
+
+
+def _finished(manifest: Path) -> int:
+    if not manifest.exists():
+        return 0
+    return sum(1 for line in manifest.read_text(encoding="utf-8").splitlines() if '"type": "file"' in line)
+
+
+def _outputs(root: Path) -> dict:
+    return {path.relative_to(root): path.read_bytes() for path in root.rglob("*.txt")}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--per-file", type=int, default=20, help="Files run through the single-file CLI.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    options = ["--engine", args.engine, "--model", args.model, "--workers", str(args.workers)]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        inputs = root / "in"
+        _write_inputs(inputs, args.files, args.seed)
+        print(f"files: {args.files}, engine: {args.engine}, workers: {args.workers}")
+
+        start = time.perf_counter()
+        _batch(inputs, root / "full", options).wait()
+        batch_seconds = time.perf_counter() - start
+        print(f"batch:        {batch_seconds:8.2f} s  ({args.files / batch_seconds:.1f} files/s)")
+
+        sample = sorted(inputs.rglob("*.txt"))[:args.per_file]
+        start = time.perf_counter()
+        for path in sample:
+            subprocess.run(
+                [sys.executable, "-m", "labeling", str(path), "-o", str(root / "single.txt"), "--quiet", *options],
+                check=True,
+            )
+        single_seconds = (time.perf_counter() - start) / max(1, len(sample))
+        print(f"per-file CLI: {single_seconds * args.files:8.2f} s  (extrapolated, {1 / single_seconds:.1f} files/s)")
+
+        # Crash part way: SIGKILL once a third of the files are in the manifest.
+        out_dir = root / "resumed"
+        manifest = out_dir / MANIFEST_NAME
+        process = _batch(inputs, out_dir, options)
+        while process.poll() is None and _finished(manifest) < args.files // 3:
+            time.sleep(0.01)
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+        before = _finished(manifest)
+
+        _batch(inputs, out_dir, options).wait()
+        summary = [json.loads(line) for line in manifest.read_text(encoding="utf-8").splitlines()][-1]
+        print(
+            f"resume:       killed after {before} files; rerun processed {summary['processed']}, "
+            f"skipped {summary['skipped']}"
+        )
+
+        failures = 0
+        if summary["processed"] + before != args.files or summary["skipped"] != before:
+            print("FAIL: resumed run redid finished files or missed some", file=sys.stderr)
+            failures += 1
+        if _outputs(out_dir) != _outputs(root / "full"):
+            print("FAIL: resumed outputs differ from the uninterrupted run", file=sys.stderr)
+            failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Batch validation of rule candidates: `validate_batch` against one validator call per span.
+
+Usage:
+    python -m benchmarks.batch_validators [--candidates 100000] [--repeat 5]
+
+Candidates mimic what the greedy `number_token OP +` patterns and the phone
+regex produce on number-dense text: valid and invalid PESELs, IBANs, card
+numbers and phones, OCR lookalikes ("O" for 0, "l" for 1), separators and
+random digit runs. Results must match the scalar validators exactly; timings
+are reported per candidate for several batch sizes.
+"""
+
+import argparse
+import random
+import time
+
+from labeling.pipes.rule_patterns import VALIDATORS
+from labeling.pipes.validators import validate_batch
+from tests.corpus import card, iban, pesel
+
+_NOISE = "0123456789" * 6 + "oOlIBSZqGb -()+"
+
+
+def _candidates(count: int, rng: random.Random):
+    generators = {"pesel": pesel, "bank-account": iban, "credit-card-number": card}
+    labels, texts = [], []
+    for _ in range(count):
+        label = rng.choice(list(VALIDATORS))
+        if label in generators and rng.random() < 0.5:
+            text = generators[label](rng)
+        else:
+            text = "".join(rng.choice(_NOISE) for _ in range(rng.randrange(6, 32)))
+        labels.append(label)
+        texts.append(text)
+    return labels, texts
+
+
+def _per_span(labels, texts):
+    return [VALIDATORS[label](text) for label, text in zip(labels, texts)]
+
+
+def _best(function, repeat, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    labels, texts = _candidates(args.candidates, random.Random(args.seed))
+    print(f"candidates: {len(labels):,}")
+    print(f"{'batch':>8} {'per-span ns':>12} {'batched ns':>11} {'speedup':>8} {'same':>5}")
+    failed = 0
+    for batch in (16, 64, 256, 4096, len(labels)):
+        def batched(labels, texts):
+            results = []
+            for start in range(0, len(labels), batch):
+                results.extend(validate_batch(labels[start:start + batch], texts[start:start + batch]))
+            return results
+
+        scalar_time, expected = _best(_per_span, args.repeat, labels, texts)
+        batch_time, got = _best(batched, args.repeat, labels, texts)
+        same = expected == got
+        failed += not same
+        print(
+            f"{batch:>8,} {scalar_time / len(labels) * 1e9:>12.0f} {batch_time / len(labels) * 1e9:>11.0f} "
+            f"{scalar_time / batch_time:>7.2f}x {str(same):>5}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
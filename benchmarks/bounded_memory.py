@@ -0,0 +1,86 @@
+"""
+Memory-ceiling mode on a huge single file: peak RSS with and without `--max-memory`.
+
+Usage:
+    python -m benchmarks.bounded_memory [--engine spacy] [--mb 200] [--max-memory 1G]
+
+A file of `--mb` megabytes is generated from `benchmarks.corpus` documents
+separated by blank lines and anonymized by the CLI twice, reading it whole and
+under `--max-memory`; the peak RSS of each child process is measured with
+`wait4`. Fails when the bounded run exceeds the ceiling. Outputs are compared
+line by line; they can differ only where an entity would have crossed a chunk
+cut.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from labeling.bounded import parse_size
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from tests.corpus import generate_document
+
+
+def _write_input(path: Path, megabytes: int, seed: int) -> None:
+    rng = random.Random(seed)
+    written = 0
+    with path.open("w", encoding="utf-8") as dst:
+        while written < megabytes * 2**20:
+            text = generate_document(rng.choice(["conversational", "legal"]), 4000, rng).text + "\n\n"
+            dst.write(text)
+            written += len(text.encode("utf-8"))
+
+
+def _run(command: list) -> tuple:
+    start = time.perf_counter()
+    process = subprocess.Popen(command)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise SystemExit(f"{' '.join(command)} failed with exit code {process.returncode}")
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return time.perf_counter() - start, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--mb", type=int, default=200, help="Size of the generated input.")
+    parser.add_argument("--max-memory", default="1G")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ceiling = parse_size(args.max_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "dump.txt"
+        _write_input(source, args.mb, args.seed)
+        base = [sys.executable, "-m", "labeling", str(source), "--engine", args.engine, "--model", args.model]
+        print(f"input: {source.stat().st_size / 2**20:.0f} MB, engine: {args.engine}")
+        print(f"{'mode':<22} {'seconds':>8} {'peak RSS MB':>12}")
+
+        full_seconds, full_peak = _run(base + ["-o", str(Path(tmp) / "full.txt"), "--quiet"])
+        print(f"{'whole file':<22} {full_seconds:>8.1f} {full_peak / 2**20:>12.0f}")
+        bounded_seconds, bounded_peak = _run(
+            base + ["-o", str(Path(tmp) / "bounded.txt"), "--max-memory", args.max_memory]
+        )
+        print(f"{'--max-memory ' + args.max_memory:<22} {bounded_seconds:>8.1f} {bounded_peak / 2**20:>12.0f}")
+
+        with open(Path(tmp) / "full.txt", encoding="utf-8") as full, \
+                open(Path(tmp) / "bounded.txt", encoding="utf-8") as bounded:
+            differing = sum(a != b for a, b in zip(full, bounded))
+        print(f"lines differing at chunk cuts: {differing}")
+
+    if bounded_peak > ceiling:
+        print(f"FAIL: peak RSS {bounded_peak / 2**20:.0f} MB above the {args.max_memory} ceiling", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
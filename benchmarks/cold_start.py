@@ -0,0 +1,78 @@
+"""
+Cold-start timings for the CLI and pipeline construction.
+
+Usage:
+    python -m benchmarks.cold_start [--model pl_core_news_md] [--repeat 3] [--blank]
+
+Every measurement runs in a fresh interpreter so import and model-load costs
+are included. The snapshot is (re)built in a temporary directory first.
+
+A snapshot loads the model the same way a rebuild does, and `pii_matcher`
+stores its rule groups as JSON and compiles them again on load (spaCy's
+matchers are only serialisable as their patterns), so the difference between
+the two is what assembling the rule groups costs. `--blank` measures the
+`tests.stand_in` pipeline instead of a model, which isolates that difference.
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from labeling.defaults import DEFAULT_MODEL
+
+BUILD = "from labeling.anonymizer import build_pipeline; build_pipeline({model!r}, use_snapshot={snapshot}, snapshot_dir={root!r})"
+BLANK_BUILD = "from tests.stand_in import stand_in_pipeline; stand_in_pipeline()"
+BLANK_LOAD = "import spacy, tests.stand_in; spacy.load({path!r})"
+
+
+def _best_of(cmd: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--blank", action="store_true", help="Time the tests.stand_in pipeline (no model needed).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        if args.blank:
+            from labeling.snapshot import save_snapshot
+            from tests.stand_in import stand_in_pipeline
+
+            path = Path(root) / "stand_in"
+            save_snapshot(stand_in_pipeline(), path, fingerprint="")
+            build = [sys.executable, "-c", BLANK_BUILD]
+            load = [sys.executable, "-c", BLANK_LOAD.format(path=str(path))]
+        else:
+            subprocess.run(
+                [sys.executable, "-m", "labeling", "build-snapshot", "--model", args.model, "--snapshot-dir", root],
+                check=True,
+                capture_output=True,
+            )
+            build = [sys.executable, "-c", BUILD.format(model=args.model, snapshot=False, root=root)]
+            load = [sys.executable, "-c", BUILD.format(model=args.model, snapshot=True, root=root)]
+        cases = {
+            "cli --help": [sys.executable, "-m", "labeling", "--help"],
+            "import spacy": [sys.executable, "-c", "import spacy"],
+            "build_pipeline (rebuild rulers)": build,
+            "build_pipeline (snapshot)": load,
+        }
+        for name, cmd in cases.items():
+            print(f"{name:<34} {_best_of(cmd, args.repeat):>7.2f} s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,35 @@
+"""
+Write the seeded synthetic corpora of `tests.corpus` to text files.
+
+Usage:
+    python -m benchmarks.corpus --write-dir /tmp/corpora [--seed 0] [--corpora legal-100kb small-docs]
+"""
+
+import argparse
+from pathlib import Path
+
+from tests.corpus import CORPORA, generate_corpus
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--write-dir", type=Path, required=True, help="Directory for `<corpus>.txt` files.")
+    parser.add_argument("--corpora", nargs="+", choices=sorted(CORPORA), default=list(CORPORA))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    args.write_dir.mkdir(parents=True, exist_ok=True)
+    for name in args.corpora:
+        docs = generate_corpus(CORPORA[name], args.seed)
+        path = args.write_dir / f"{name}.txt"
+        # One document per line for multi-document corpora, matching `--stream --split line`.
+        separator = "\n" if len(docs) > 1 else ""
+        path.write_text(separator.join(doc.text.replace("\n", " ") if separator else doc.text for doc in docs),
+                        encoding="utf-8")
+        print(f"{path}: {len(docs):,} docs, {sum(len(doc.text) for doc in docs):,} chars, "
+              f"{sum(len(doc.spans) for doc in docs):,} planted spans")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+"""
+Worker pools loading their own pipeline versus workers forked from a preloaded one.
+
+Usage:
+    python -m benchmarks.fork_pool [--input output_broclaw.txt] [--documents 300] [--model pl_core_news_md]
+                                   [--workers 4] [--engine spacy]
+
+Both pools (`ParallelPreprocessor` with `fork=False` and `fork=True`) are
+started in a fresh state, timed until the first batch comes back (startup:
+pipeline loads in the workers, or in the parent plus forking), and then run
+the input file (one document per line) and generated `benchmarks.corpus`
+documents. Memory is read from `/proc/<pid>/smaps_rollup` (Linux) after the
+run: per worker the resident set (RSS), the proportional share of shared
+pages (PSS) and the pages private to it (USS, what a worker really adds), and
+the parent's RSS. Results must be identical, otherwise the command fails with
+status 1.
+"""
+
+import argparse
+import multiprocessing
+import random
+import time
+from pathlib import Path
+from typing import Dict
+
+from labeling.defaults import DEFAULT_MAX_LEN, DEFAULT_MODEL, ENGINES
+from labeling.parallel import ParallelPreprocessor
+from tests.corpus import generate_document
+
+
+def _memory(pid: int | str) -> Dict[str, int]:
+    """RSS, PSS and USS of a process in bytes."""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) * 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _run(args, texts, fork: bool):
+    start = time.perf_counter()
+    preprocessor = ParallelPreprocessor(
+        args.workers, model=args.model, max_length=DEFAULT_MAX_LEN, full=False, engine=args.engine, fork=fork
+    )
+    # One batch per worker, so every worker has started (and loaded its pipeline) before the clock stops.
+    list(preprocessor.pipe(texts[:args.workers], batch_size=1))
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [(result.redacted_text, result.entities) for result in preprocessor.pipe(texts)]
+    seconds = time.perf_counter() - start
+
+    workers = [_memory(process.pid) for process in multiprocessing.active_children()]
+    parent = _memory("self")
+    preprocessor.close()
+    return startup, seconds, workers, parent, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--documents", type=int, default=300, help="Generated documents added to the input.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(args.seed)
+    texts += [generate_document(rng.choice(["conversational", "legal"]), 2000, rng).text for _ in range(args.documents)]
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    print(f"documents: {len(texts):,}, {megabytes:.1f} MB, workers: {args.workers}")
+
+    results = {}
+    mib = 2**20
+    print(f"{'pool':<15} {'startup s':>9} {'MB/s':>6} {'worker RSS':>10} {'PSS':>7} {'USS':>7} {'parent RSS':>10}")
+    for name, fork in (("load per worker", False), ("forked", True)):
+        startup, seconds, workers, parent, results[name] = _run(args, texts, fork)
+        count = max(len(workers), 1)
+        rss, pss, uss = (sum(worker[key] for worker in workers) / count / mib for key in ("rss", "pss", "uss"))
+        print(
+            f"{name:<15} {startup:>9.2f} {megabytes / seconds:>6.2f} {rss:>8.0f}Mi {pss:>5.0f}Mi {uss:>5.0f}Mi "
+            f"{parent['rss'] / mib:>8.0f}Mi"
+        )
+
+    differing = sum(a != b for a, b in zip(results["load per worker"], results["forked"]))
+    print(f"documents with differing results: {differing}")
+    return 1 if differing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+Incremental re-anonymization: latency of `update_result` against a full rerun after typical edits.
+
+Usage:
+    python -m benchmarks.incremental_edit [--input output_broclaw.txt] [--engine spacy] [--edits 20]
+
+A chain of seeded edits is applied to the document (each update starts from the
+previous incremental result, as an editor saving repeatedly would); every kind
+of edit is timed against a full run of the edited text, and both results must
+have the same entities and redacted text.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from labeling.incremental import update_result
+
+SNIPPETS = [
+    "Mój PESEL to 90010112345, proszę dzwonić pod 501 234 567.",
+    "Pismo przesłano na adres jan.kowalski@example.com dnia 12.03.2021 r.",
+    "Rachunek: PL61 1090 1014 0000 0712 1981 2874.",
+    "ul. ",
+    "hasło: Qwerty123!",
+    "\n\n",
+]
+
+
+def _edit(text: str, kind: str, rng: random.Random) -> str:
+    pos = rng.randrange(len(text) + 1)
+    if kind == "word":
+        end = text.find(" ", pos + 1)
+        return text[:pos] + rng.choice(["wniosek", "decyzja", "Kowalski"]) + text[end if end >= 0 else len(text):]
+    if kind == "insert":
+        return text[:pos] + rng.choice(SNIPPETS) + text[pos:]
+    if kind == "delete-line":
+        start = text.rfind("\n", 0, pos) + 1
+        end = text.find("\n", pos)
+        return text[:start] + text[end + 1 if end >= 0 else len(text):]
+    if kind == "scattered":
+        for _ in range(3):
+            text = _edit(text, "insert", rng)
+        return text
+    if kind == "paste-10kb":
+        start = rng.randrange(max(1, len(text) - 10_000))
+        return text[:pos] + text[start:start + 10_000] + text[pos:]
+    raise ValueError(kind)
+
+
+KINDS = ("word", "insert", "delete-line", "scattered", "paste-10kb")
+
+
+def _preprocessor(engine: str, model: str):
+    if engine == "regex":
+        from labeling.regex_engine import RegexPreprocessor
+
+        return RegexPreprocessor()
+
+    from labeling.anonymizer import build_pipeline
+    from labeling.preprocessor import SpacyPreprocessor
+
+    return SpacyPreprocessor(build_pipeline(model=model), redact_only=True)
+
+
+def _spans(result):
+    return [(ent.start_char, ent.end_char, ent.label, ent.text) for ent in result.entities]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--edits", type=int, default=20, help="Edits per kind.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    preprocessor = _preprocessor(args.engine, args.model)
+    text = args.input.read_text(encoding="utf-8")
+    result = preprocessor(text)
+    print(f"input: {args.input} ({len(text):,} chars), engine: {args.engine}")
+    print(f"{'edit':<12} {'incremental ms':>15} {'full ms':>9} {'reprocessed':>12} {'full runs':>10} {'mismatches':>11}")
+
+    failed = 0
+    for kind in KINDS:
+        incremental_ms, full_ms, reprocessed = [], [], []
+        full_runs = mismatches = 0
+        for _ in range(args.edits):
+            text = _edit(text, kind, rng)
+            start = time.perf_counter()
+            updated = update_result(preprocessor, result, text)
+            incremental_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            full = preprocessor(text)
+            full_ms.append((time.perf_counter() - start) * 1000)
+
+            stats = updated.meta["incremental"]
+            reprocessed.append(stats["reprocessed_chars"])
+            full_runs += stats["full_run"]
+            if _spans(updated) != _spans(full) or updated.redacted_text != full.redacted_text:
+                mismatches += 1
+            result = updated
+        failed += mismatches
+        print(
+            f"{kind:<12} {statistics.median(incremental_ms):>15.1f} {statistics.median(full_ms):>9.0f} "
+            f"{statistics.median(reprocessed):>12,.0f} {full_runs:>10} {mismatches:>11}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
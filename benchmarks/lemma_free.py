@@ -0,0 +1,91 @@
+"""
+The pipeline with the lemmatizer versus `--no-lemmatizer` (lemma rules on precomputed inflected forms).
+
+Usage:
+    python -m benchmarks.lemma_free [--input output_broclaw.txt] [--documents 300] [--model pl_core_news_md]
+                                    [--labels relative,religion,sex,age] [--repeat 3]
+
+The input file (one document per line) and generated `benchmarks.corpus`
+documents run through `build_pipeline` twice, with `lemmatizer=True` and
+`lemmatizer=False`; with `--labels` both are pruned to those labels, which
+also drops components only the lemmatizer needed. Reported: the enabled
+components and the best-of-`--repeat` throughput of each variant, and per
+label the entities (document, characters, label) of the lemmatizer run the
+lemmatizer-free run misses or adds, with the most frequent missed words. Any
+missed entity fails the command with status 1; added entities are inflected
+forms the lemmatizer got wrong (or words it resolved to another lemma) and
+are only reported.
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+from labeling.anonymizer import build_pipeline
+from labeling.defaults import DEFAULT_MODEL
+from tests.corpus import generate_document
+
+
+def _label_list(value: str) -> list:
+    return [label.strip() for label in value.split(",") if label.strip()]
+
+
+def _run(nlp, texts, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        docs = list(nlp.pipe(texts))
+        best = min(best, time.perf_counter() - start)
+    entities = {
+        (index, ent.start_char, ent.end_char, ent.label_): ent.text.lower()
+        for index, doc in enumerate(docs)
+        for ent in doc.ents
+    }
+    return best, entities
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--documents", type=int, default=300, help="Generated documents added to the input.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--labels", type=_label_list, default=None, help="Prune both pipelines to these labels.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(args.seed)
+    texts += [generate_document(rng.choice(["conversational", "legal"]), 2000, rng).text for _ in range(args.documents)]
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    print(f"documents: {len(texts):,}, {megabytes:.1f} MB")
+
+    results = {}
+    for name, lemmatizer in (("lemmatizer", True), ("no lemmatizer", False)):
+        nlp = build_pipeline(model=args.model, labels=args.labels, lemmatizer=lemmatizer)
+        seconds, results[name] = _run(nlp, texts, args.repeat)
+        print(f"{name:<14} {megabytes / seconds:>6.2f} MB/s  components: {', '.join(nlp.pipe_names)}")
+
+    expected, got = results["lemmatizer"], results["no lemmatizer"]
+    missed = {key: expected[key] for key in expected.keys() - got.keys()}
+    added = {key: got[key] for key in got.keys() - expected.keys()}
+    labels = sorted({key[3] for key in expected} | {key[3] for key in got})
+    print(f"{'label':<22} {'entities':>9} {'missed':>7} {'added':>6}")
+    for label in labels:
+        count = sum(key[3] == label for key in expected)
+        missed_count = sum(key[3] == label for key in missed)
+        added_count = sum(key[3] == label for key in added)
+        print(f"{label:<22} {count:>9,} {missed_count:>7,} {added_count:>6,}")
+    if missed:
+        words = Counter(missed.values()).most_common(20)
+        print("most frequent missed:", ", ".join(f"{word} ({count})" for word, count in words))
+    if added:
+        words = Counter(added.values()).most_common(20)
+        print("most frequent added:", ", ".join(f"{word} ({count})" for word, count in words))
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""
+Per-document cost and output parity of the rule stage: legacy EntityRuler chain versus `pii_matcher`.
+
+Usage:
+    python -m benchmarks.matcher_stage [--input labeling/test_data.txt] [--repeat 3] [--blank]
+
+Each line of the input is one document. Documents are parsed once by the
+statistical components; only the rule components are timed on copies of the
+parsed docs, so both variants see exactly the same annotations. With
+`--blank`, or when the model is not installed, the stand-ins of
+`tests.stand_in` replace the statistical components. Entities (start, end,
+label, whether the span comes from the rule patterns) are compared per document and the command exits with status 1 when
+any document differs.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import spacy
+from spacy.tokens import DocBin
+
+from labeling.defaults import DEFAULT_MODEL
+from labeling.pipes.matcher import add_pii_matcher
+from labeling.pipes.rule_patterns import RULE_SOURCE
+from tests.stand_in import blank_pipeline, legacy_pipeline
+
+
+def _pipelines(model: str, blank: bool):
+    """(statistical components only, the legacy chain, `pii_matcher`), on the model or the stand-ins."""
+    if not blank:
+        try:
+            return spacy.load(model), legacy_pipeline(spacy.load(model)), add_pii_matcher(spacy.load(model))
+        except OSError as exc:
+            print(f"model unavailable ({exc}); using a blank stand-in pipeline")
+    return blank_pipeline(), legacy_pipeline(), add_pii_matcher(blank_pipeline())
+
+
+def _rule_components(nlp: spacy.language.Language, model_names):
+    return [(name, proc) for name, proc in nlp.pipeline if name not in model_names]
+
+
+def _run(nlp, components, docs_bytes: bytes, repeat: int):
+    best = float("inf")
+    ents = []
+    for _ in range(repeat):
+        docs = list(DocBin().from_bytes(docs_bytes).get_docs(nlp.vocab))
+        start = time.perf_counter()
+        for doc in docs:
+            for _, proc in components:
+                doc = proc(doc)
+        best = min(best, time.perf_counter() - start)
+        # The chain left stale token ent_ids behind, so the source is read from either id field.
+        ents = [[(e.start, e.end, e.label_, RULE_SOURCE in (e.id_, e.kb_id_)) for e in doc.ents] for doc in docs]
+    return best, ents
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("labeling/test_data.txt"))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--blank", action="store_true", help="Use the stand-in pipeline instead of the model.")
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    base, legacy, consolidated = _pipelines(args.model, args.blank)
+    model_names = set(base.pipe_names)
+    docs_bytes = DocBin(docs=base.pipe(texts), store_user_data=False).to_bytes()
+    print(f"input: {args.input} ({len(texts):,} docs)")
+
+    variants = {
+        "legacy rulers": legacy,
+        "pii_matcher": consolidated,
+    }
+
+    outputs = {}
+    for name, nlp in variants.items():
+        components = _rule_components(nlp, model_names)
+        elapsed, outputs[name] = _run(nlp, components, docs_bytes, args.repeat)
+        per_doc = elapsed / max(len(texts), 1) * 1e6
+        print(f"{name:<16} {len(components):>2} components {elapsed * 1000:>9.1f} ms {per_doc:>9.1f} us/doc")
+
+    legacy_ents, new_ents = outputs.values()
+    mismatches = [i for i, (a, b) in enumerate(zip(legacy_ents, new_ents)) if sorted(a) != sorted(b)]
+    print(f"documents with differing entities: {len(mismatches)}")
+    for i in mismatches[:10]:
+        print(f"  doc {i}: legacy={legacy_ents[i]} pii_matcher={new_ents[i]}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+"""
+Throughput scaling of the process-pool mode (`anonymize(..., workers=N)`).
+
+Usage:
+    python -m benchmarks.parallel_scaling [--input labeling/test_data.txt] [--max-workers 8]
+
+Worker pools are warmed up (pipelines built) before timing, so the numbers
+reflect steady-state throughput rather than model load time.
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+from labeling.anonymizer import DEFAULT_MAX_LEN, DEFAULT_MODEL, build_pipeline
+from labeling.parallel import ParallelPreprocessor
+from labeling.preprocessor import SpacyPreprocessor
+
+
+def _worker_counts(max_workers: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def _time_call(preprocessor, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        preprocessor(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("labeling/test_data.txt"))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    text = args.input.read_text(encoding="utf-8")
+    print(f"input: {args.input} ({len(text):,} chars)")
+    print(f"{'workers':>7} {'seconds':>9} {'chars/s':>12} {'speedup':>8} {'efficiency':>10}")
+
+    baseline = None
+    for workers in _worker_counts(args.max_workers):
+        if workers == 1:
+            preprocessor = SpacyPreprocessor(build_pipeline(model=args.model, max_length=DEFAULT_MAX_LEN))
+            elapsed = _time_call(preprocessor, text, args.repeat)
+        else:
+            with ParallelPreprocessor(
+                workers, model=args.model, max_length=DEFAULT_MAX_LEN, full=False
+            ) as preprocessor:
+                # Warm-up: make every worker build its pipeline before timing.
+                list(preprocessor.pipe(["rozgrzewka"] * workers, batch_size=1))
+                elapsed = _time_call(preprocessor, text, args.repeat)
+
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(f"{workers:>7} {elapsed:>9.2f} {len(text) / elapsed:>12,.0f} {speedup:>8.2f} {speedup / workers:>10.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
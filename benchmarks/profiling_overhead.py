@@ -0,0 +1,70 @@
+"""
+Cost of per-stage profiling: the same documents with `profile=False` and `profile=True`.
+
+Usage:
+    python -m benchmarks.profiling_overhead [--input labeling/test_data.txt] [--engine spacy] [--repeat 3]
+
+Each line of the input is one document. Both variants are built up front and
+run alternately, so only the per-document cost of recording the profile is compared;
+outputs are checked to be identical and the aggregated profile is printed.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from labeling.defaults import DEFAULT_BATCH_SIZE, DEFAULT_MODEL, ENGINES
+from labeling.profiling import build_report, format_report, merge_profiles
+
+
+def _preprocessor(engine: str, model: str, profile: bool):
+    if engine == "regex":
+        from labeling.regex_engine import RegexPreprocessor
+
+        return RegexPreprocessor(profile=profile)
+
+    from labeling.anonymizer import build_pipeline
+    from labeling.preprocessor import SpacyPreprocessor
+
+    return SpacyPreprocessor(build_pipeline(model=model), redact_only=True, profile=profile)
+
+
+def _timed(preprocessor, texts):
+    start = time.perf_counter()
+    results = list(preprocessor.pipe(texts, batch_size=DEFAULT_BATCH_SIZE))
+    return time.perf_counter() - start, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("labeling/test_data.txt"))
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    print(f"input: {args.input} ({len(texts):,} docs), engine: {args.engine}")
+
+    plain_preprocessor = _preprocessor(args.engine, args.model, False)
+    profiled_preprocessor = _preprocessor(args.engine, args.model, True)
+    plain_time = profiled_time = float("inf")
+    # Alternate the two variants so drift in machine load affects both alike.
+    for _ in range(args.repeat):
+        elapsed, plain = _timed(plain_preprocessor, texts)
+        plain_time = min(plain_time, elapsed)
+        elapsed, profiled = _timed(profiled_preprocessor, texts)
+        profiled_time = min(profiled_time, elapsed)
+    print(f"profile off: {plain_time:.3f} s")
+    print(f"profile on:  {profiled_time:.3f} s ({profiled_time / plain_time - 1:+.1%})")
+
+    profile = merge_profiles(result.meta["profile"] for result in profiled)
+    print(format_report(build_report(profile, documents=len(profiled))))
+
+    same = [a.redacted_text for a in plain] == [b.redacted_text for b in profiled]
+    print(f"identical output: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""
+JSONL record streaming: throughput and peak memory as the export grows.
+
+Usage:
+    python -m benchmarks.record_stream [--engine spacy] [--rows 2000] [--scales 1,4,16]
+
+A JSONL export of dialogue turns (`benchmarks.corpus` conversational text plus
+id/speaker columns) is written at every scale and anonymized from file to file
+with `anonymize_records`. Peak traced memory should stay flat while the row
+count grows; the untouched columns are checked to come out unchanged.
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from labeling.anonymizer import anonymize_records
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from labeling.records import RecordWriter, read_records
+from tests.corpus import generate_document
+
+
+def _write_export(path: Path, rows: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8") as dst:
+        for index in range(rows):
+            turn = generate_document("conversational", rng.randrange(80, 400), rng).text
+            row = {"id": index, "speaker": rng.choice(["agent", "client"]), "text": turn, "score": rng.random()}
+            dst.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--scales", default="1,4,16")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"engine: {args.engine}")
+    print(f"{'rows':>8} {'MB':>7} {'seconds':>8} {'rows/s':>8} {'peak MB':>8} {'same columns':>13}")
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in map(int, args.scales.split(",")):
+            rows = args.rows * scale
+            source, target = Path(tmp) / "in.jsonl", Path(tmp) / "out.jsonl"
+            _write_export(source, rows, args.seed)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            with source.open(encoding="utf-8") as src, target.open("w", encoding="utf-8") as dst:
+                _, records = read_records(src, "jsonl")
+                writer = RecordWriter(dst, "jsonl")
+                for record in anonymize_records(records, fields=["text"], engine=args.engine, model=args.model):
+                    writer.write(record)
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            same = True
+            with source.open(encoding="utf-8") as src, target.open(encoding="utf-8") as dst:
+                for before, after in zip(map(json.loads, src), map(json.loads, dst)):
+                    before.pop("text"), after.pop("text")
+                    same = same and before == after
+            failed += not same
+            print(
+                f"{rows:>8,} {source.stat().st_size / 2**20:>7.1f} {seconds:>8.2f} {rows / seconds:>8,.0f} "
+                f"{peak / 2**20:>8.1f} {str(same):>13}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
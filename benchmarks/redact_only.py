@@ -0,0 +1,62 @@
+"""
+Post-processing cost of full results versus the redact-only fast path.
+
+Usage:
+    python -m benchmarks.redact_only [--input labeling/test_data.txt] [--blank]
+
+The document is parsed once; only `SpacyPreprocessor._process_doc` is measured,
+so the numbers isolate what the preprocessor allocates on top of the spaCy Doc.
+"Full (materialised)" forces the lazy token/sentence views, which is what every
+call paid before the fast path existed. With `--blank`, or when the model is not
+installed, the Doc comes from the stand-in of `tests.stand_in`: its tokens
+have lemmas and POS tags but no parse.
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.stand_in import load_pipeline
+from labeling.defaults import DEFAULT_MODEL
+from labeling.preprocessor import SpacyPreprocessor
+
+
+def _measure(preprocessor: SpacyPreprocessor, doc, materialize: bool) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = preprocessor._process_doc(doc)
+    if materialize:
+        len(result.tokens)
+        len(result.sentences)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("labeling/test_data.txt"))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--blank", action="store_true", help="Use the blank stand-in pipeline (no model).")
+    args = parser.parse_args()
+
+    nlp = load_pipeline(args.model, args.blank)
+    doc = nlp(args.input.read_text(encoding="utf-8"))
+    print(f"input: {args.input} ({len(doc.text):,} chars, {len(doc):,} tokens)")
+
+    cases = {
+        "full (materialised)": (SpacyPreprocessor(nlp), True),
+        "full (lazy, untouched)": (SpacyPreprocessor(nlp), False),
+        "redact-only": (SpacyPreprocessor(nlp, redact_only=True), False),
+    }
+    for name, (preprocessor, materialize) in cases.items():
+        elapsed, peak = _measure(preprocessor, doc, materialize)
+        print(f"{name:<24} {elapsed * 1000:>9.1f} ms {peak / 2**20:>9.1f} MiB peak")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""
+Redacted-text output versus redaction deltas: size and round-trip check.
+
+Usage:
+    python -m benchmarks.redaction_delta [--input output_broclaw.txt] [--documents 300] [--engine regex]
+                                         [--model pl_core_news_md] [--chunk-size 4096]
+
+Every document (the input file, one per line, plus generated
+`benchmarks.corpus` documents) and all of them joined into one large text go
+through the preprocessor once; `redaction_delta` turns the entities of each
+result into its delta, as `anonymize(delta=True)` does. Each delta is written in
+both formats, read back and applied with `apply_delta` to the original cut
+into `--chunk-size` character chunks (so edits straddle chunk boundaries).
+Reported: the bytes of the redacted texts and of the deltas, and the
+encode/decode + apply throughput. Any applied delta that differs from the
+redacted text `redact_text` produced fails the command with status 1. The
+regex engine is the default so the check runs without a spaCy model.
+"""
+
+import argparse
+import io
+import random
+import time
+from pathlib import Path
+
+from labeling.anonymizer import build_pipeline
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from labeling.delta import DELTA_FORMATS, apply_delta, read_delta, redaction_delta, write_delta
+from tests.corpus import generate_document
+
+
+def _chunks(text: str, size: int):
+    return (text[start:start + size] for start in range(0, len(text), size))
+
+
+def _preprocessor(engine: str, model: str):
+    if engine == "regex":
+        from labeling.regex_engine import RegexPreprocessor
+
+        return RegexPreprocessor()
+    from labeling.preprocessor import SpacyPreprocessor
+
+    return SpacyPreprocessor(build_pipeline(model=model), redact_only=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--documents", type=int, default=300, help="Generated documents added to the input.")
+    parser.add_argument("--engine", choices=ENGINES, default="regex")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Characters per chunk given to apply_delta.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(args.seed)
+    texts += [generate_document(rng.choice(["conversational", "legal"]), 2000, rng).text for _ in range(args.documents)]
+    texts.append("\n".join(texts))
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    print(f"documents: {len(texts):,} (the last one joins all others), {megabytes:.1f} MB")
+
+    preprocessor = _preprocessor(args.engine, args.model)
+    results = [preprocessor(text) for text in texts]
+    redacted_bytes = sum(len(result.redacted_text.encode("utf-8")) for result in results)
+    edits = [redaction_delta(result.entities) for result in results]
+    print(f"edits: {sum(map(len, edits)):,}")
+    print(f"{'output':<14} {'bytes':>12} {'of text':>8} {'MB/s':>7}")
+    print(f"{'redacted text':<14} {redacted_bytes:>12,} {1:>8.1%} {'':>7}")
+
+    failures = 0
+    for fmt in DELTA_FORMATS:
+        size = 0
+        start = time.perf_counter()
+        for text, result, doc_edits in zip(texts, results, edits):
+            buffer = io.BytesIO()
+            size += write_delta(buffer, doc_edits, len(text), fmt)
+            buffer.seek(0)
+            length, decoded = read_delta(buffer)
+            applied = "".join(apply_delta(_chunks(text, args.chunk_size), decoded, length))
+            if applied != result.redacted_text:
+                failures += 1
+        seconds = time.perf_counter() - start
+        print(f"{'delta ' + fmt:<14} {size:>12,} {size / redacted_bytes:>8.1%} {megabytes / seconds:>7.1f}")
+
+    print(f"documents whose applied delta differs from the redacted text: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+"""
+Startup time, throughput and output parity of the model-free regex engine.
+
+Usage:
+    python -m benchmarks.regex_engine [--input labeling/test_data.txt] [--repeat 3] [--blank] [--no-compare]
+
+Each line of the input is one document. The regex engine is timed on its own
+(construction and processing); then the spaCy pipeline restricted to the labels
+the regex engine supports is run on the same documents and entities (start,
+end, label) and redacted text are compared. With `--blank`, or when the model is
+not installed, the reference is a blank `pl` pipeline with only the rule stage,
+which needs spaCy but no model. Token edges limit the parity (see
+`labeling.regex_engine`), so differing documents are listed, not treated as a
+failure.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from labeling.defaults import DEFAULT_MODEL
+from labeling.regex_engine import REGEX_LABELS, RegexPreprocessor
+
+
+def _timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _blank_pipeline():
+    """A blank `pl` pipeline running only the rule stage, restricted to the regex engine's labels."""
+    import spacy
+
+    from labeling.pipes.matcher import MATCHER_NAME, default_rule_groups
+
+    nlp = spacy.blank("pl")
+    matcher = nlp.add_pipe(MATCHER_NAME)
+    matcher.set_groups(default_rule_groups())
+    matcher.restrict_labels(REGEX_LABELS)
+    return nlp
+
+
+def _compare(texts, regex_results, model: str, blank: bool) -> int:
+    try:
+        from labeling.anonymizer import build_pipeline
+        from labeling.preprocessor import SpacyPreprocessor
+    except ImportError as exc:
+        print(f"spaCy pipeline unavailable ({exc}); skipping parity check")
+        return 0
+
+    nlp = None
+    if not blank:
+        try:
+            nlp = build_pipeline(model=model, labels=REGEX_LABELS)
+        except OSError as exc:
+            print(f"model unavailable ({exc}); comparing with a blank pipeline")
+    if nlp is None:
+        nlp = _blank_pipeline()
+    preprocessor = SpacyPreprocessor(nlp, redact_only=True, labels=REGEX_LABELS)
+    mismatches = []
+    for i, (text, ours) in enumerate(zip(texts, regex_results)):
+        theirs = preprocessor(text)
+        if ours.redacted_text != theirs.redacted_text or _ents(ours) != _ents(theirs):
+            mismatches.append((i, _ents(theirs), _ents(ours)))
+
+    print(f"documents with differing output: {len(mismatches)} of {len(texts):,}")
+    for i, theirs, ours in mismatches[:10]:
+        print(f"  doc {i}: spacy={theirs} regex={ours}")
+    return 0
+
+
+def _ents(result):
+    return sorted((e.start_char, e.end_char, e.label) for e in result.entities)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("labeling/test_data.txt"))
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="spaCy model for the parity check.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--blank", action="store_true", help="Compare with a blank `pl` pipeline (no model).")
+    parser.add_argument("--no-compare", action="store_true", help="Only time the regex engine.")
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    size_mb = sum(len(text.encode("utf-8")) for text in texts) / 1e6
+    print(f"input: {args.input} ({len(texts):,} docs, {size_mb:.2f} MB)")
+
+    startup, preprocessor = _timed(RegexPreprocessor, 1)
+    elapsed, results = _timed(lambda: list(preprocessor.pipe(texts)), args.repeat)
+    entities = sum(len(result.entities) for result in results)
+    print(f"startup: {startup * 1000:.1f} ms")
+    print(f"processing: {elapsed:.2f} s, {size_mb / elapsed * 60:.1f} MB/min, {entities:,} entities")
+
+    if args.no_compare:
+        return 0
+    return _compare(texts, results, args.model, args.blank)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""
+Rule matching with token REGEX predicates as lexeme flags versus spaCy's per-token REGEX evaluation.
+
+Usage:
+    python -m benchmarks.regex_flags [--input output_broclaw.txt] [--documents 500] [--repeat 3]
+
+Only a tokenizer and the rule-based group (where the REGEX predicates are) are
+used, in a blank Polish pipeline, so no model is needed. Three variants of
+`tests.stand_in` run on the input file (one document per line) plus
+`--documents` generated `tests.corpus` documents: the EntityRuler chain of
+`add_rule_entity_ruler` (the baseline), and `pii_matcher` with REGEX predicates
+evaluated per token or as lexeme flags. Building a variant (blank pipeline
+included) is timed as compilation; tokenization is timed on the first pass,
+which creates the lexemes and so computes their flags; matching is timed as
+the best of `--repeat` passes.
+
+Entities (start, end, label, whether they come from the rule patterns) are
+compared per document with the baseline, including extents where several
+EntityRuler patterns matched the same tokens (see `tests/test_rule_ties.py`).
+The command exits with status 1 when any document differs.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+
+from labeling.pipes.rule_patterns import RULE_SOURCE
+from tests.corpus import generate_document
+from tests.stand_in import legacy_rules_pipeline, rules_pipeline
+
+BASELINE = "entity ruler"
+VARIANTS = (("REGEX", False), ("lexeme flags", True))
+
+# (start char, end char, label, from the rule patterns)
+Entity = Tuple[int, int, str, bool]
+
+
+def _timed(build):
+    start = time.perf_counter()
+    nlp = build()
+    return nlp, time.perf_counter() - start
+
+
+def _entities(doc) -> Set[Entity]:
+    return {(ent.start_char, ent.end_char, ent.label_, RULE_SOURCE in (ent.id_, ent.kb_id_)) for ent in doc.ents}
+
+
+def differences(texts: List[str]) -> List[Tuple[int, Set[Entity]]]:
+    """`(document index, entities only one side has)` where a `pii_matcher` variant differs."""
+    baseline = legacy_rules_pipeline()
+    regex, flags = (rules_pipeline(regex_flags) for _, regex_flags in VARIANTS)
+    differing = []
+    for index, (ruler_doc, regex_doc, flags_doc) in enumerate(zip(
+            baseline.pipe(texts), regex.pipe(texts), flags.pipe(texts))):
+        expected = _entities(ruler_doc)
+        diff = (expected ^ _entities(regex_doc)) | (expected ^ _entities(flags_doc))
+        if diff:
+            differing.append((index, diff))
+    return differing
+
+
+def _run(nlp, texts, repeat: int):
+    # Flags are computed when a lexeme is created, so tokenization is timed too: the first pass
+    # starts from a vocabulary without the corpus' lexemes, later ones find them cached.
+    tokenize = []
+    match = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        docs = [nlp.make_doc(text) for text in texts]
+        tokenize.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for doc in docs:
+            for _, proc in nlp.pipeline:
+                doc = proc(doc)
+        match.append(time.perf_counter() - start)
+    return tokenize[0], min(match), sum(len(doc) for doc in docs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--documents", type=int, default=500, help="Generated documents added to the input.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(args.seed)
+    texts += [generate_document(rng.choice(["conversational", "legal"]), 2000, rng).text for _ in range(args.documents)]
+
+    print(f"{'variant':<14} {'compile s':>10} {'tokenize s':>11} {'match s':>8} {'tokens/s':>12}")
+    variants = [(BASELINE, legacy_rules_pipeline)] + [
+        (name, lambda flags=flags: rules_pipeline(flags)) for name, flags in VARIANTS
+    ]
+    for name, build in variants:
+        nlp, compile_seconds = _timed(build)
+        tokenize, match, tokens = _run(nlp, texts, args.repeat)
+        print(f"{name:<14} {compile_seconds:>10.2f} {tokenize:>11.2f} {match:>8.2f} {tokens / match:>12,.0f}")
+
+    differing = differences(texts)
+    print(f"documents: {len(texts):,}, differing from the {BASELINE}: {len(differing)}")
+    for index, ents in differing[:10]:
+        print(f"  doc {index}: {sorted(ents)}")
+    return 1 if differing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+"""
+Effect of the result cache on resubmitted documents: cold run, warm run and an uncached baseline.
+
+Usage:
+    python -m benchmarks.result_cache [--engine spacy] [--corpus small-docs] [--repeat 3]
+
+The corpus (see `benchmarks.corpus`) is submitted `--repeat` times in one stream,
+so even the cold run hits the cache for the resubmissions; the warm run then
+finds every document. The cache lives in a temporary directory and outputs are
+checked to be identical to the uncached run.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from labeling.anonymizer import anonymize_stream
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from tests.corpus import CORPORA, generate_corpus
+
+
+def _timed(texts, **kwargs):
+    start = time.perf_counter()
+    results = list(anonymize_stream(texts, **kwargs))
+    return time.perf_counter() - start, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--corpus", choices=sorted(CORPORA), default="small-docs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [doc.text for doc in generate_corpus(CORPORA[args.corpus], args.seed)] * args.repeat
+    options = {"engine": args.engine, "model": args.model}
+    print(f"corpus: {args.corpus} x{args.repeat} ({len(texts):,} docs), engine: {args.engine}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "results.sqlite"
+        uncached_time, uncached = _timed(texts, **options)
+        cold_time, cold = _timed(texts, cache=cache, verbose=True, **options)
+        warm_time, warm = _timed(texts, cache=cache, verbose=True, **options)
+        size = cache.stat().st_size
+
+    print(f"uncached: {uncached_time:.3f} s")
+    print(f"cold:     {cold_time:.3f} s ({uncached_time / cold_time:.2f}x)")
+    print(f"warm:     {warm_time:.3f} s ({uncached_time / warm_time:.2f}x)")
+    print(f"database: {size / 1e6:.1f} MB")
+    same = uncached == cold == warm
+    print(f"identical output: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
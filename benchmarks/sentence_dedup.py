@@ -0,0 +1,90 @@
+"""
+Sentence dedup on repetitive documents: time with and without `dedup=True` and the share of text skipped.
+
+Usage:
+    python -m benchmarks.sentence_dedup [--input output_broclaw.txt] [--engine spacy] [--notices 200] [--blank]
+
+Two documents are measured: `--input` as it is, and a synthetic bundle of
+`--notices` short legal notices (see `benchmarks.corpus`), each followed by the
+same instruction block, the pattern of court and administrative letters. Outputs
+of both modes are compared; with the spaCy engine they may differ slightly,
+because sentences are tagged without their neighbours and because digit runs
+matched by several rules with the same extent (card, phone, account) are decided
+by token position, as in the EntityRuler chain `pii_matcher` reproduces. With `--blank`, or when
+the model is not installed, the spacy engine runs the stand-in of
+`tests.stand_in`, which has no tok2vec/NER and so understates the gain.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from tests.corpus import generate_document
+
+INSTRUCTIONS = (
+    "POUCZENIE\n"
+    "Od niniejszej decyzji przysługuje odwołanie do organu wyższego stopnia za pośrednictwem organu, "
+    "który wydał decyzję, w terminie 14 dni od dnia jej doręczenia. W trakcie biegu terminu do wniesienia "
+    "odwołania strona może zrzec się prawa do wniesienia odwołania wobec organu, który wydał decyzję. "
+    "Z dniem doręczenia organowi oświadczenia o zrzeczeniu się prawa do wniesienia odwołania przez ostatnią "
+    "ze stron postępowania decyzja staje się ostateczna i prawomocna. Inwestor jest obowiązany zawiadomić "
+    "o zamierzonym terminie rozpoczęcia robót budowlanych właściwy organ nadzoru budowlanego."
+)
+
+
+def _notices(count: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "\n\n".join(f"{generate_document('legal', 600, rng).text}\n\n{INSTRUCTIONS}" for _ in range(count))
+
+
+def _preprocessor(engine: str, model: str, blank: bool):
+    if engine == "regex":
+        from labeling.regex_engine import RegexPreprocessor
+
+        return RegexPreprocessor()
+
+    from benchmarks.stand_in import load_pipeline
+    from labeling.preprocessor import SpacyPreprocessor
+
+    return SpacyPreprocessor(load_pipeline(model, blank), redact_only=True)
+
+
+def _timed(preprocessor, text):
+    start = time.perf_counter()
+    result = preprocessor(text)
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--notices", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blank", action="store_true", help="Use the blank stand-in pipeline (no model).")
+    args = parser.parse_args()
+
+    from labeling.dedup import DedupPreprocessor
+
+    plain = _preprocessor(args.engine, args.model, args.blank)
+    dedup = DedupPreprocessor(plain)
+    documents = {args.input.name: args.input.read_text(encoding="utf-8"), "notices": _notices(args.notices, args.seed)}
+    print(f"engine: {args.engine}")
+    print(f"{'document':<20} {'chars':>10} {'plain s':>9} {'dedup s':>9} {'speedup':>8} {'skipped':>8} {'same':>5}")
+    for name, text in documents.items():
+        plain_time, plain_result = _timed(plain, text)
+        dedup_time, dedup_result = _timed(dedup, text)
+        stats = dedup_result.meta["dedup"]
+        same = plain_result.redacted_text == dedup_result.redacted_text
+        print(
+            f"{name:<20} {len(text):>10,} {plain_time:>9.3f} {dedup_time:>9.3f} {plain_time / dedup_time:>7.2f}x "
+            f"{stats['ratio']:>8.1%} {str(same):>5}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""
+Digit-sequence rules: Matcher candidates versus `labeling.pipes.sequences`.
+
+Usage:
+    python -m benchmarks.sequence_candidates [--input output_broclaw.txt] [--documents 300] [--repeat 3]
+
+The input file (one document per line), generated `benchmarks.corpus`
+documents and number-dense legal text (tables of amounts, dates, IBANs,
+cards, phones and case numbers) run through `pii_matcher` with the rule-based
+group twice, with `sequence_rules` off and on. Reported per MB of text: the
+candidates the rule group hands to the longest-first selection (all Matcher
+matches, versus the remaining Matcher matches plus generated sequence
+candidates), and the time. Two checks fail the command with status 1: the
+`[first, last]` ranges must expand to exactly the Matcher's matches of every
+sequence pattern, and the entities (start, end, label, id) of every document
+must be identical.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+import spacy
+from spacy.matcher import Matcher
+
+from labeling.pipes.matcher import MATCHER_NAME, RULES_GROUP, default_rule_groups
+from labeling.pipes.sequences import SequenceRules, sequence_kind
+from tests.corpus import generate_document, number_dense
+
+def _texts(args) -> list:
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(args.seed)
+    texts += [generate_document(rng.choice(["conversational", "legal"]), 2000, rng).text for _ in range(args.documents)]
+    texts += [number_dense(rng, 40) for _ in range(args.documents)]
+    return texts
+
+
+def _pipeline(sequence_rules: bool):
+    nlp = spacy.blank("pl")
+    matcher = nlp.add_pipe(MATCHER_NAME, config={"sequence_rules": sequence_rules})
+    matcher.set_groups({RULES_GROUP: default_rule_groups()[RULES_GROUP]})
+    return nlp, matcher
+
+
+def _matcher_candidates(matcher, docs) -> int:
+    """Matcher matches the rule group's selection sees (without the sequence candidates)."""
+    if not len(matcher.matcher):
+        return 0
+    return sum(len({m for m in matcher.matcher(doc) if m[1] != m[2]}) for doc in docs)
+
+
+def _run(matcher, docs, repeat: int):
+    best = float("inf")
+    generated_before = sum(s.generated for s in matcher._sequences if s is not None)
+    for _ in range(repeat):
+        for doc in docs:
+            doc.ents = ()
+        start = time.perf_counter()
+        for doc in docs:
+            matcher(doc)
+        best = min(best, time.perf_counter() - start)
+    generated = sum(s.generated for s in matcher._sequences if s is not None) - generated_before
+    ents = [[(e.start, e.end, e.label_, e.ent_id_) for e in doc.ents] for doc in docs]
+    return best, ents, generated // repeat
+
+
+def _range_parity(nlp, docs) -> int:
+    """Documents where a sequence pattern's Matcher matches differ from the expanded ranges."""
+    sequences = SequenceRules(nlp.vocab)
+    matchers = []
+    for entry in default_rule_groups()[RULES_GROUP]:
+        kind = sequence_kind(entry["pattern"])
+        if kind is not None:
+            sequences.add(kind, entry["label"], entry["id"])
+            single = Matcher(nlp.vocab)
+            single.add(kind, [entry["pattern"]])
+            matchers.append(single)
+    differing = 0
+    for doc in docs:
+        for single, rule in zip(matchers, sequences.candidates(doc)):
+            expected = {(start, end) for _, start, end in single(doc)}
+            got = {
+                (start, end)
+                for start in rule.valid.nonzero()[0].tolist()
+                for end in range(int(rule.first[start]), int(rule.last[start]) + 1)
+            }
+            if expected != got:
+                differing += 1
+                break
+    return differing
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--documents", type=int, default=300, help="Generated documents of each kind.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = _texts(args)
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    print(f"documents: {len(texts):,}, {megabytes:.1f} MB")
+
+    results = {}
+    print(f"{'variant':<18} {'candidates/MB':>14} {'seconds':>8} {'MB/s':>6}")
+    for name, sequence_rules in (("Matcher", False), ("sequence rules", True)):
+        nlp, matcher = _pipeline(sequence_rules)
+        docs = [nlp.make_doc(text) for text in texts]
+        seconds, ents, generated = _run(matcher, docs, args.repeat)
+        candidates = _matcher_candidates(matcher, docs) + generated
+        results[name] = ents
+        print(f"{name:<18} {candidates / megabytes:>14,.0f} {seconds:>8.2f} {megabytes / seconds:>6.2f}")
+
+    range_differing = _range_parity(nlp, docs)
+    differing = sum(a != b for a, b in zip(results["Matcher"], results["sequence rules"]))
+    print(f"documents with differing match ranges: {range_differing}, with differing entities: {differing}")
+    return 1 if differing or range_differing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,201 @@
+"""
+Load test of `labeling serve`: throughput and latency under concurrency, with and without micro-batching.
+
+Usage:
+    python -m benchmarks.service_load [--engine spacy] [--concurrency 1 8 32] [--requests 400]
+                                      [--max-batch 1 64] [--max-wait-ms 2] [--url http://host:port] [--blank]
+
+For every `--max-batch` value a server is started in a separate process (unless
+`--url` points at a running one) and warmed up; then for every concurrency level
+`--requests` single-document requests are sent from that many client threads,
+each keeping its own connection open; rejected (503) and failed requests are
+counted instead of timed. Documents are the `small-docs` corpus of
+`benchmarks.corpus`. `--max-batch 1` disables coalescing, so the rows compare
+batched against one-request-at-a-time serving; the mean batch size comes from
+the server's /health counters.
+
+With `--blank`, or when the model is not installed, the spacy engine serves the
+stand-in of `tests.stand_in` (tokenizer, stub tagger and the rule stage, no
+statistical components), so the batching gain measured is that of `nlp.pipe`
+without the tok2vec/NER share it has with the trained model.
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from labeling.defaults import DEFAULT_MODEL, ENGINES
+from labeling.service import serve
+from tests.corpus import CORPORA, generate_corpus
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(
+        conn: http.client.HTTPConnection, method: str, path: str, body: Optional[dict] = None
+) -> Tuple[int, dict]:
+    payload = json.dumps(body).encode("utf-8") if body is not None else None
+    conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def _wait_ready(host: str, port: int, timeout: float, server: subprocess.Popen) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}")
+        try:
+            _request(http.client.HTTPConnection(host, port, timeout=1), "GET", "/health")
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server not ready after {timeout:.0f} s")
+
+
+def _load(host: str, port: int, texts: List[str], requests: int, concurrency: int) -> Tuple[float, List[float], int]:
+    """Return (elapsed seconds, latencies of successful requests, number of failed or rejected requests)."""
+    latencies: List[float] = []
+    failed = 0
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client() -> None:
+        nonlocal failed
+        conn = http.client.HTTPConnection(host, port, timeout=120)
+        for i in counter:  # Shared iterator: threads take the next request index.
+            start = time.perf_counter()
+            try:
+                status, _ = _request(conn, "POST", "/anonymize", {"text": texts[i % len(texts)]})
+            except OSError:
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=120)
+                status = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    failed += 1
+        conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, failed
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def _serve_stand_in(args: argparse.Namespace) -> int:
+    from benchmarks.stand_in import load_pipeline
+    from labeling.preprocessor import SpacyPreprocessor
+
+    preprocessor = SpacyPreprocessor(load_pipeline(args.model, args.blank), redact_only=True)
+    host, port = args.serve.rsplit(":", 1)
+    serve(
+        preprocessor,
+        host=host,
+        port=int(port),
+        max_batch=args.max_batch[0],
+        max_wait=args.max_wait_ms / 1000,
+        engine="spacy",
+    )
+    return 0
+
+
+def _model_installed(model: str) -> bool:
+    import spacy
+
+    return spacy.util.is_package(model)
+
+
+def _server_command(args: argparse.Namespace, host: str, port: int, max_batch: int) -> List[str]:
+    if args.engine == "spacy" and (args.blank or not _model_installed(args.model)):
+        return [
+            sys.executable, "-m", "benchmarks.service_load", "--serve", f"{host}:{port}", "--blank",
+            "--model", args.model, "--max-batch", str(max_batch), "--max-wait-ms", str(args.max_wait_ms),
+        ]
+    return [
+        sys.executable, "-m", "labeling", "serve", "--host", host, "--port", str(port),
+        "--engine", args.engine, "--model", args.model,
+        "--max-batch", str(max_batch), "--max-wait-ms", str(args.max_wait_ms),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engine", choices=ENGINES, default="spacy")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--max-batch", type=int, nargs="+", default=[1, 64])
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--url", default=None, help="Use a running server instead of starting one.")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blank", action="store_true", help="Serve the blank stand-in pipeline (no model).")
+    parser.add_argument("--serve", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return _serve_stand_in(args)
+
+    texts = [doc.text for doc in generate_corpus(CORPORA["small-docs"], args.seed)]
+    configs = [None] if args.url else args.max_batch
+    print(f"{'max batch':>9} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'failed':>8} {'mean batch':>10}")
+
+    for max_batch in configs:
+        server = None
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname, parts.port
+        else:
+            host, port = "127.0.0.1", _free_port()
+            server = subprocess.Popen(_server_command(args, host, port, max_batch), stderr=subprocess.DEVNULL)
+        try:
+            if server is not None:
+                _wait_ready(host, port, args.startup_timeout, server)
+            _load(host, port, texts, 20, 1)  # warm-up
+            for concurrency in args.concurrency:
+                conn = http.client.HTTPConnection(host, port)
+                before = _request(conn, "GET", "/health")[1]
+                elapsed, latencies, failed = _load(host, port, texts, args.requests, concurrency)
+                after = _request(conn, "GET", "/health")[1]
+                batches = after["batches"] - before["batches"]
+                mean_batch = (after["texts"] - before["texts"]) / batches if batches else 0.0
+                p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+                p99 = _percentile(latencies, 0.99) * 1000 if latencies else float("nan")
+                label = max_batch if max_batch is not None else after["max_batch"]
+                print(
+                    f"{label:>9} {concurrency:>7} {len(latencies) / elapsed:>9.1f} {p50:>8.1f} {p99:>8.1f} "
+                    f"{failed:>8} {mean_batch:>10.1f}",
+                    flush=True,
+                )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark of span arbitration on entity-dense synthetic text.
+
+Usage:
+    python -m benchmarks.span_arbitration [--entities 1000 4000 10000] [--repeat 3] [--seed 0]
+
+Compares the former pairwise overlap handling (contact regex pass) and the
+separate merge/redaction sorts against the sweep-based helpers in
+`labeling.spans`, and checks that both produce the same output. Needs no spaCy
+model: entities are generated directly as `EntityHint`s.
+"""
+
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from labeling.results import EntityHint
+from labeling.spans import remove_overlapping, select_non_overlapping, sort_spans
+
+LABELS = ("phone", "pesel", "date", "name", "city", "bank-account")
+
+
+def _synthetic(count: int, rng: random.Random) -> Tuple[List[EntityHint], List[EntityHint]]:
+    """Return (existing entities, regex hits) scattered over a numbers-heavy document."""
+    entities = []
+    pos = 0
+    for _ in range(count):
+        pos += rng.randint(1, 12)
+        length = rng.randint(2, 14)
+        entities.append(EntityHint(text="", label=rng.choice(LABELS), start_char=pos, end_char=pos + length))
+    hits = [
+        EntityHint(text="", label="phone", start_char=start, end_char=start + rng.randint(7, 12))
+        for start in sorted(rng.sample(range(pos), max(count // 4, 1)))
+    ]
+    return entities, hits
+
+
+def _legacy_contact(existing: List[EntityHint], hits: List[EntityHint]) -> List[EntityHint]:
+    spans: List[EntityHint] = []
+
+    def _overlaps(span):
+        return [e for e in existing if span.start_char < e.end_char and e.start_char < span.end_char] + \
+               [e for e in spans if span.start_char < e.end_char and e.start_char < span.end_char]
+
+    for span in hits:
+        overlaps = _overlaps(span)
+        if overlaps:
+            existing = [e for e in existing if e not in overlaps]
+        spans.append(span)
+    return existing
+
+
+def _legacy_merge_redact(hints: List[EntityHint]) -> List[EntityHint]:
+    seen = set()
+    merged = []
+    for ent in sorted(hints, key=lambda e: (e.start_char, -(e.end_char - e.start_char))):
+        key = (ent.start_char, ent.end_char, ent.label)
+        if key not in seen:
+            merged.append(ent)
+            seen.add(key)
+    kept = []
+    last_end = 0
+    for ent in sorted(merged, key=lambda e: (e.start_char, -(e.end_char - e.start_char))):
+        if ent.start_char < last_end:
+            continue
+        kept.append(ent)
+        last_end = ent.end_char
+    return kept
+
+
+def _sweep_merge_redact(hints: List[EntityHint]) -> List[EntityHint]:
+    seen = set()
+    merged = []
+    for ent in sort_spans(hints):
+        key = (ent.start_char, ent.end_char, ent.label)
+        if key not in seen:
+            merged.append(ent)
+            seen.add(key)
+    return select_non_overlapping(merged, presorted=True)
+
+
+def _timed(fn, args, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 4000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failed = False
+    print(f"{'entities':>9} {'stage':<14} {'legacy ms':>10} {'sweep ms':>10} {'speed-up':>9}")
+    for count in args.entities:
+        entities, hits = _synthetic(count, rng)
+        stages = {
+            "contact": (_legacy_contact, lambda e, h: remove_overlapping(e, h), (entities, hits)),
+            "merge+redact": (_legacy_merge_redact, _sweep_merge_redact, (entities + hits,)),
+        }
+        for stage, (legacy, sweep, stage_args) in stages.items():
+            legacy_time, legacy_out = _timed(legacy, stage_args, args.repeat)
+            sweep_time, sweep_out = _timed(sweep, stage_args, args.repeat)
+            # Ties between equal extents are now broken by label priority, so compare as sets.
+            same = {(e.start_char, e.end_char) for e in legacy_out} == {(e.start_char, e.end_char) for e in sweep_out}
+            failed |= not same
+            print(
+                f"{count:>9} {stage:<14} {legacy_time * 1000:>10.1f} {sweep_time * 1000:>10.1f} "
+                f"{legacy_time / max(sweep_time, 1e-9):>8.1f}x{'' if same else '  MISMATCH'}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,347 @@
+"""
+Reproducible throughput, latency and memory benchmarks with baseline regression checks.
+
+Usage:
+    python -m benchmarks.suite [--engines spacy regex] [--corpora legal-100kb small-docs] [--cases 'regex/*']
+                               [--output bench_results.json] [--baseline benchmarks/baseline.json]
+                               [--save-baseline benchmarks/baseline.json] [--tolerance 0.15] [--blank]
+
+Corpora come from `benchmarks.corpus` (seeded, with planted PII). Every case
+runs in a fresh interpreter so peak RSS is its own:
+
+- `build/<engine>[-snapshot]`: constructing the pipeline (`build_pipeline`, from
+  a snapshot in a temporary directory, or `RegexPreprocessor`).
+- `<engine>/<corpus>/redact`: `anonymize(text)` per document.
+- `<engine>/<corpus>/full`: `anonymize(text, return_full=True)` per document,
+  including recall of the planted spans with labels the engine supports.
+- `<engine>/<multi-doc corpus>/stream`: `anonymize_stream` over all documents.
+
+With `--blank`, or when the model is not installed, the spacy cases run the
+stand-in of `tests.stand_in` (tokenizer, stub tagger and the rule stage, no
+tok2vec/NER). Its timings and recall are not comparable with the model's, so
+the results record `"stand_in": true` and are only compared with a baseline
+recorded the same way.
+
+Per-document passes repeat until `--repeat` passes and 20 latency samples are
+collected or `--budget` seconds have passed. Results (docs/s, chars/s,
+p50/p99 latency, peak RSS, recall) are written as JSON. With `--baseline`, every
+metric shared with the baseline is compared; a throughput, latency or memory
+change worse than `--tolerance` (relative; twice that for p99), or a recall drop above 0.01, is a
+regression and the command exits with status 1.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from importlib import metadata, util
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from labeling.defaults import DEFAULT_BATCH_SIZE, DEFAULT_MODEL, ENGINES
+from tests.corpus import CORPORA, generate_corpus
+
+MIN_SAMPLES = 20
+RECALL_TOLERANCE = 0.01
+
+# Metric name -> (+1 when higher is better / -1 when lower is better, multiple of --tolerance allowed).
+# Tail latency of short runs is noisy, so p99 gets twice the tolerance.
+METRICS = {
+    "seconds": (-1, 1),
+    "docs_per_sec": (1, 1),
+    "chars_per_sec": (1, 1),
+    "p50_ms": (-1, 1),
+    "p99_ms": (-1, 2),
+    "peak_rss_mb": (-1, 1),
+    "recall": (1, 1),
+}
+
+
+def case_ids(engines: List[str], corpora: List[str]) -> List[str]:
+    ids = []
+    for engine in engines:
+        ids.append(f"build/{engine}")
+        if engine == "spacy":
+            ids.append("build/spacy-snapshot")
+    for engine in engines:
+        for corpus in corpora:
+            modes = ["redact", "full"] + (["stream"] if CORPORA[corpus].docs > 1 else [])
+            ids.extend(f"{engine}/{corpus}/{mode}" for mode in modes)
+    return ids
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def _recall(results, docs, labels) -> float:
+    """Share of planted spans with `labels` overlapped by a detected entity of the same label."""
+    found = planted = 0
+    for result, doc in zip(results, docs):
+        entities = [(e.start_char, e.end_char, e.label) for e in result.entities]
+        for start, end, label in doc.spans:
+            if label not in labels:
+                continue
+            planted += 1
+            found += any(e_label == label and e_start < end and start < e_end for e_start, e_end, e_label in entities)
+    return found / planted if planted else 1.0
+
+
+def _stand_in(args: argparse.Namespace) -> bool:
+    import spacy
+
+    return args.blank or not spacy.util.is_package(args.model)
+
+
+def _build_case(engine: str, args: argparse.Namespace) -> dict:
+    if engine == "regex":
+        start = time.perf_counter()
+        from labeling.regex_engine import RegexPreprocessor
+
+        RegexPreprocessor()
+        return {"seconds": time.perf_counter() - start}
+
+    if _stand_in(args):
+        import spacy
+
+        from labeling.snapshot import save_snapshot
+        from tests.stand_in import stand_in_pipeline
+
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            start = time.perf_counter()
+            nlp = stand_in_pipeline()
+            if engine.endswith("-snapshot"):
+                save_snapshot(nlp, Path(snapshot_dir) / "stand_in", fingerprint="")
+                start = time.perf_counter()
+                spacy.load(Path(snapshot_dir) / "stand_in")
+            return {"seconds": time.perf_counter() - start}
+
+    from labeling.anonymizer import build_pipeline, build_snapshot
+
+    model = args.model
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        snapshot = engine.endswith("-snapshot")
+        if snapshot:
+            build_snapshot(model=model, snapshot_dir=Path(snapshot_dir))
+        start = time.perf_counter()
+        build_pipeline(model=model, use_snapshot=snapshot, snapshot_dir=Path(snapshot_dir))
+        return {"seconds": time.perf_counter() - start}
+
+
+def _run_case(case: str, args: argparse.Namespace) -> dict:
+    """Measure one case in the current process (see `_spawn`)."""
+    kind, _, rest = case.partition("/")
+    if kind == "build":
+        return {**_build_case(rest, args), "peak_rss_mb": _peak_rss_mb()}
+
+    engine = kind
+    corpus, mode = rest.split("/")
+    docs = generate_corpus(CORPORA[corpus], args.seed)
+    texts = [doc.text for doc in docs]
+    chars = sum(len(text) for text in texts)
+
+    from labeling.anonymizer import anonymize, anonymize_stream
+
+    options = {"engine": engine}
+    if engine == "spacy":
+        from benchmarks.stand_in import load_pipeline
+
+        options["nlp"] = load_pipeline(args.model, _stand_in(args))
+        # The 2 MB corpus is a few characters over the default limit.
+        options["nlp"].max_length = max(options["nlp"].max_length, max(map(len, texts)))
+    setup_rss = _peak_rss_mb()
+    anonymize(texts[0], verbose=False, **options)  # warm-up
+
+    latencies: List[float] = []
+    results = []
+    passes = 0
+    started = time.perf_counter()
+    while True:
+        if mode == "stream":
+            start = time.perf_counter()
+            results = list(anonymize_stream(texts, batch_size=DEFAULT_BATCH_SIZE, return_full=True, **options))
+            latencies.append(time.perf_counter() - start)
+        else:
+            results = []
+            for text in texts:
+                start = time.perf_counter()
+                results.append(anonymize(text, verbose=False, return_full=mode == "full", **options))
+                latencies.append(time.perf_counter() - start)
+        passes += 1
+        elapsed = time.perf_counter() - started
+        enough = passes >= args.repeat and (mode == "stream" or len(latencies) >= MIN_SAMPLES)
+        if enough or elapsed >= args.budget:
+            break
+
+    metrics = {
+        "docs": len(docs),
+        "chars": chars,
+        "passes": passes,
+        "docs_per_sec": len(docs) * passes / elapsed,
+        "chars_per_sec": chars * passes / elapsed,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if mode != "stream":
+        # A stream is timed as a whole, so it has no per-document latency.
+        metrics["p50_ms"] = statistics.median(latencies) * 1000
+        metrics["p99_ms"] = _percentile(latencies, 0.99) * 1000
+    if mode != "redact":
+        if engine == "regex":
+            from labeling.regex_engine import REGEX_LABELS as labels
+        else:
+            from labeling.results import ALLOWED_LABELS as labels
+        metrics["recall"] = _recall(results, docs, labels)
+    return metrics
+
+
+def _spawn(case: str, args: argparse.Namespace) -> dict:
+    cmd = [
+        sys.executable, "-m", "benchmarks.suite", "--run-case", case,
+        "--model", args.model, "--seed", str(args.seed),
+        "--repeat", str(args.repeat), "--budget", str(args.budget),
+    ] + (["--blank"] if args.blank else [])
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit status {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _environment(args: argparse.Namespace) -> dict:
+    env = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "model": args.model,
+        "seed": args.seed,
+        "stand_in": _stand_in(args),
+    }
+    for package in ("spacy", args.model):
+        try:
+            env[f"{package}_version"] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            pass
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        env["commit"] = commit.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return env
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Return one message per metric that regressed against `baseline`."""
+    regressions = []
+    for case, metrics in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        for metric, (direction, scale) in METRICS.items():
+            old, new = reference.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            if metric == "recall":
+                worse = old - new > RECALL_TOLERANCE
+            else:
+                change = (new - old) / old if old else 0.0
+                worse = change * direction < -tolerance * scale
+            if worse:
+                regressions.append(f"{case}: {metric} {old:.4g} -> {new:.4g}")
+    return regressions
+
+
+def _format(case: str, metrics: dict) -> str:
+    if "error" in metrics:
+        return f"{case:<40} ERROR: {metrics['error']}"
+    if "seconds" in metrics:
+        return f"{case:<40} {metrics['seconds']:>9.3f} s {'':>40} {metrics['peak_rss_mb'] or 0:>8.0f} MB"
+    p50 = f"{metrics['p50_ms']:>8.1f}" if "p50_ms" in metrics else f"{'-':>8}"
+    p99 = f"{metrics['p99_ms']:>8.1f}" if "p99_ms" in metrics else f"{'-':>8}"
+    recall = f"{metrics['recall']:>6.1%}" if "recall" in metrics else f"{'-':>6}"
+    return (
+        f"{case:<40} {metrics['docs_per_sec']:>9.1f} {metrics['chars_per_sec']:>12,.0f} "
+        f"{p50} {p99} {recall} {metrics['peak_rss_mb'] or 0:>8.0f} MB"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--corpora", nargs="+", choices=sorted(CORPORA), default=list(CORPORA))
+    parser.add_argument("--cases", nargs="+", default=["*"], help="Glob patterns over case ids.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Minimum number of passes over a corpus.")
+    parser.add_argument("--budget", type=float, default=60.0, help="Stop repeating passes after this many seconds.")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, default=None, help="Results file to compare against.")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Also write the results here.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown/growth.")
+    parser.add_argument("--blank", action="store_true", help="Run the spacy cases on the stand-in pipeline.")
+    parser.add_argument("--run-case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(_run_case(args.run_case, args)))
+        return 0
+
+    engines = list(args.engines)
+    if "spacy" in engines and util.find_spec("spacy") is None:
+        print("spaCy is not installed; skipping the spacy engine", file=sys.stderr)
+        engines.remove("spacy")
+    elif "spacy" in engines and _stand_in(args):
+        print(f"running the spacy cases on the tests.stand_in pipeline, not {args.model}", file=sys.stderr)
+    cases = [case for case in case_ids(engines, args.corpora) if any(fnmatch(case, p) for p in args.cases)]
+
+    print(f"{'case':<40} {'docs/s':>9} {'chars/s':>12} {'p50 ms':>8} {'p99 ms':>8} {'recall':>6} {'peak RSS':>11}")
+    results: Dict[str, dict] = {}
+    for case in cases:
+        results[case] = _spawn(case, args)
+        print(_format(case, results[case]), flush=True)
+
+    report = {"environment": _environment(args), "cases": results}
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results written to {args.output}")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"baseline written to {args.save_baseline}")
+
+    failed = any("error" in metrics for metrics in results.values())
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["environment"].get("machine") != report["environment"]["machine"]:
+            print("warning: baseline was recorded on a different machine type", file=sys.stderr)
+        reference = baseline["cases"]
+        if baseline["environment"].get("stand_in", False) != report["environment"]["stand_in"]:
+            print("warning: baseline spacy cases ran another pipeline; comparing the regex cases only", file=sys.stderr)
+            reference = {case: metrics for case, metrics in reference.items() if "spacy" not in case}
+        regressions = compare(results, reference, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        print(f"{len(regressions)} regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+        failed |= bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
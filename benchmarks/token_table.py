@@ -0,0 +1,60 @@
+"""
+Memory and serialisation size of the columnar TokenTable versus per-token objects.
+
+Usage:
+    python -m benchmarks.token_table [--input labeling/test_data.txt] [--blank]
+
+Both representations are built from the same parsed Doc; memory is the
+tracemalloc delta of building them, so strings interned elsewhere are excluded.
+With `--blank`, or when the model is not installed, the Doc comes from the
+stand-in of `tests.stand_in`, whose tokens have lemmas and POS tags but no
+fine-grained tags or dependencies.
+"""
+
+import argparse
+import pickle
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.stand_in import load_pipeline
+from labeling.defaults import DEFAULT_MODEL
+from labeling.token_table import TokenTable
+
+
+def _measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("labeling/test_data.txt"))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--blank", action="store_true", help="Use the blank stand-in pipeline (no model).")
+    args = parser.parse_args()
+
+    doc = load_pipeline(args.model, args.blank)(args.input.read_text(encoding="utf-8"))
+    print(f"input: {args.input} ({len(doc):,} tokens)")
+
+    text = doc.text  # held by the result either way
+    table, table_mem, table_time = _measure(lambda: TokenTable.from_doc(doc, text))
+    infos, infos_mem, infos_time = _measure(lambda: [row.to_info() for row in table])
+
+    rows = {
+        "list[TokenInfo]": (infos_mem, infos_time, len(pickle.dumps(infos))),
+        "TokenTable": (table_mem, table_time, len(table.to_bytes())),
+    }
+    for name, (mem, elapsed, blob) in rows.items():
+        print(f"{name:<16} {mem / 2**20:>8.1f} MiB {elapsed * 1000:>9.1f} ms {blob / 2**20:>8.1f} MiB serialised")
+    print(f"memory reduction: {infos_mem / max(table_mem, 1):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""
+The full pipeline versus `--windowed-ner` (statistical components on candidate windows only).
+
+Usage:
+    python -m benchmarks.windowed_ner [--input output_broclaw.txt] [--documents 300] [--model pl_core_news_md]
+                                      [--context 24] [--repeat 3]
+
+The input file (one document per line) and generated `benchmarks.corpus`
+documents run through `build_pipeline` twice, without and with `windowed`.
+Reported: the enabled components and best-of-`--repeat` throughput of each
+variant, the number of windows and the share of the text the windowed run
+sends through the statistical components, and per label the entities
+(document, characters, label) of the full run, the windowed run's recall of
+them and the entities it adds, with the most frequent missed words.
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from pathlib import Path
+
+from labeling.anonymizer import build_pipeline
+from labeling.defaults import DEFAULT_MODEL
+from labeling.pipes.windowed import WINDOW_STATS_KEY, WINDOWED_NAME
+from tests.corpus import generate_document
+
+
+def _run(nlp, texts, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        docs = list(nlp.pipe(texts))
+        best = min(best, time.perf_counter() - start)
+    entities = {
+        (index, ent.start_char, ent.end_char, ent.label_): ent.text.lower()
+        for index, doc in enumerate(docs)
+        for ent in doc.ents
+    }
+    return best, docs, entities
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", type=Path, default=Path("output_broclaw.txt"))
+    parser.add_argument("--documents", type=int, default=300, help="Generated documents added to the input.")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--context", type=int, default=None, help="Tokens of context around every cue.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [line for line in args.input.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(args.seed)
+    texts += [generate_document(rng.choice(["conversational", "legal"]), 2000, rng).text for _ in range(args.documents)]
+    megabytes = sum(len(text.encode("utf-8")) for text in texts) / 2**20
+    print(f"documents: {len(texts):,}, {megabytes:.1f} MB")
+
+    results = {}
+    for name, windowed in (("full", False), ("windowed", True)):
+        nlp = build_pipeline(model=args.model, windowed=windowed)
+        if windowed and args.context is not None and WINDOWED_NAME in nlp.pipe_names:
+            nlp.get_pipe(WINDOWED_NAME).context = args.context
+        seconds, docs, results[name] = _run(nlp, texts, args.repeat)
+        print(f"{name:<9} {megabytes / seconds:>6.2f} MB/s  components: {', '.join(nlp.pipe_names)}")
+
+    stats = [doc.user_data[WINDOW_STATS_KEY] for doc in docs if WINDOW_STATS_KEY in doc.user_data]
+    chars = sum(item["chars"] for item in stats)
+    model_chars = sum(item["model_chars"] for item in stats)
+    print(
+        f"windows: {sum(item['windows'] for item in stats):,}, "
+        f"text through the model: {model_chars / chars if chars else 0.0:.1%}"
+    )
+
+    expected, got = results["full"], results["windowed"]
+    missed = {key: expected[key] for key in expected.keys() - got.keys()}
+    added = {key: got[key] for key in got.keys() - expected.keys()}
+    labels = sorted({key[3] for key in expected} | {key[3] for key in got})
+    print(f"{'label':<22} {'entities':>9} {'recall':>7} {'missed':>7} {'added':>6}")
+    for label in labels:
+        count = sum(key[3] == label for key in expected)
+        missed_count = sum(key[3] == label for key in missed)
+        added_count = sum(key[3] == label for key in added)
+        recall = 1 - missed_count / count if count else 1.0
+        print(f"{label:<22} {count:>9,} {recall:>7.1%} {missed_count:>7,} {added_count:>6,}")
+    if missed:
+        words = Counter(missed.values()).most_common(20)
+        print("most frequent missed:", ", ".join(f"{word} ({count})" for word, count in words))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,24 @@
-from labeling.anonymizer import anonymize, build_pipeline
-from labeling.preprocessor import SpacyPreprocessor
+from importlib import import_module
 
-__all__ = ["anonymize", "build_pipeline", "SpacyPreprocessor"]
+# Public names are resolved lazily so that importing `labeling` (e.g. for `--help`)
+# does not pay for importing spaCy.
+_EXPORTS = {
+    "anonymize": "labeling.anonymizer",
+    "anonymize_stream": "labeling.anonymizer",
+    "reanonymize": "labeling.anonymizer",
+    "anonymize_file": "labeling.anonymizer",
+    "anonymize_records": "labeling.anonymizer",
+    "anonymize_directory": "labeling.anonymizer",
+    "build_pipeline": "labeling.anonymizer",
+    "build_snapshot": "labeling.anonymizer",
+    "SpacyPreprocessor": "labeling.preprocessor",
+    "RegexPreprocessor": "labeling.regex_engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
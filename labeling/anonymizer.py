@@ -1,66 +1,548 @@
+import sys
 import time
-from typing import Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, TextIO
 
-import spacy
+from labeling.batch import DEFAULT_GLOB, BatchSummary, run_batch
+from labeling.bounded import run_bounded
+from labeling.cache import CachedPreprocessor, ResultCache, result_fingerprint
+from labeling.dedup import DedupPreprocessor
+from labeling.delta import Edit, redaction_delta
+from labeling.defaults import DEFAULT_BATCH_SIZE, DEFAULT_MAX_LEN, DEFAULT_MODEL, ENGINES
+from labeling.incremental import DEFAULT_MARGIN, update_result
+from labeling.options import PipelineOptions, pipeline_options
+from labeling.parallel import ParallelPreprocessor
+from labeling.profiling import Profile, add_profile, build_report, format_report, write_report
+from labeling.records import Record, redact_records
+from labeling.results import PreprocessResult
+from labeling.snapshot import pipeline_fingerprint, read_fingerprint, save_snapshot, snapshot_path
 
-from labeling.pipes.age import add_age_entity_ruler
-from labeling.pipes.keywords import add_keyword_entity_ruler
-from labeling.pipes.relative import add_relative_entity_ruler
-from labeling.pipes.religion import add_religion_entity_ruler
-from labeling.pipes.rule_entities import add_rule_entity_ruler
-from labeling.pipes.sex import add_sex_entity_ruler
-from labeling.preprocessor import PreprocessResult, SpacyPreprocessor
+# spaCy and everything built on it is imported where it is used, so `engine="regex"`
+# works with the standard library only.
+if TYPE_CHECKING:
+    import spacy
 
-DEFAULT_MODEL = "pl_core_news_md"
-DEFAULT_MAX_LEN = 2_000_000
+    from labeling.preprocessor import SpacyPreprocessor
+    from labeling.regex_engine import RegexPreprocessor
 
 
-def build_pipeline(model: str = DEFAULT_MODEL, max_length: int = DEFAULT_MAX_LEN) -> spacy.language.Language:
+def _add_rule_components(nlp: "spacy.language.Language") -> "spacy.language.Language":
+    from labeling.pipes.matcher import add_pii_matcher
+
+    # All rule groups (formerly one EntityRuler each, plus validation and shrinking) run as one stage.
+    return add_pii_matcher(nlp)
+
+
+def build_pipeline(
+    model: str = DEFAULT_MODEL,
+    max_length: int = DEFAULT_MAX_LEN,
+    use_snapshot: bool = True,
+    snapshot_dir: Optional[Path] = None,
+    labels: Optional[Iterable[str]] = None,
+    lemmatizer: bool = True,
+    windowed: bool = False,
+) -> "spacy.language.Language":
     """
-    Build and configure the spaCy pipeline with rule-based entity rulers.
+    Build and configure the spaCy pipeline with the rule-based matching stage.
+
+    When a snapshot written by `build_snapshot` exists and its fingerprint still matches
+    the pattern sources and model, it is loaded instead of recompiling the rule patterns. A stale
+    snapshot is rebuilt and rewritten.
+
+    With `labels`, components that cannot contribute to those labels (statistical
+    components included) are disabled; the chosen plan is available via `get_plan(nlp)`.
+
+    Without the lemmatizer, the lemma-based rules match the inflected forms of their lemmas
+    (`labeling.pipes.inflections`) and the lemmatizer components are disabled, unless the
+    relative rules run: they keep matching lemmas (`labeling.pipes.matcher.LEMMATIZED_GROUPS`).
+
+    Windowed, the statistical components run only on windows around cheap cues
+    (`labeling.pipes.windowed`); the parser and sentence recognizer are disabled.
+
+    Args:
+        model: spaCy model name or path to load.
+        max_length: Max document length override for spaCy.
+        use_snapshot: Whether to load/refresh the pipeline snapshot.
+        snapshot_dir: Snapshot root directory (defaults to `default_snapshot_dir()`).
+        labels: Only run what is needed for these labels (default: everything).
+        lemmatizer: Run the lemmatizer (default); False matches precomputed inflected forms instead.
+        windowed: Run the statistical components only around candidate regions.
     """
-    nlp = spacy.load(model)
-    nlp.max_length = max(nlp.max_length, max_length)
+    import spacy
 
-    # Rule-based patterns first to capture regex-like matches via EntityRuler
-    nlp = add_rule_entity_ruler(nlp)
-    nlp = add_keyword_entity_ruler(nlp)
-    nlp = add_sex_entity_ruler(nlp)
-    nlp = add_religion_entity_ruler(nlp)
-    nlp = add_relative_entity_ruler(nlp)
-    nlp = add_age_entity_ruler(nlp)
+    import labeling.pipes.matcher  # registers the `pii_matcher` factory needed to load snapshots
+    from labeling.plan import apply_plan, disable_lemmatizer, plan_pipeline
 
+    path = snapshot_path(model, snapshot_dir)
+    fingerprint = pipeline_fingerprint(model) if use_snapshot else None
+    stored = read_fingerprint(path) if use_snapshot else None
+
+    if stored is not None and stored == fingerprint:
+        nlp = spacy.load(path)
+    else:
+        nlp = _add_rule_components(spacy.load(model))
+        if stored is not None:
+            # Pattern sources or the model changed since the snapshot was taken.
+            try:
+                save_snapshot(nlp, path, fingerprint)
+            except OSError:
+                pass  # A read-only cache must not break the pipeline.
+
+    nlp.max_length = max(nlp.max_length, max_length)
+    if not lemmatizer:
+        disable_lemmatizer(nlp)
+    if labels is not None:
+        nlp = apply_plan(nlp, plan_pipeline(nlp, labels))
+    if windowed:
+        from labeling.pipes.windowed import add_windowed_model
+
+        add_windowed_model(nlp)
     return nlp
 
 
+def build_snapshot(model: str = DEFAULT_MODEL, snapshot_dir: Optional[Path] = None) -> Path:
+    """
+    Serialise the fully configured pipeline for `model` so `build_pipeline` can load it directly.
+    """
+    import spacy
+
+    path = snapshot_path(model, snapshot_dir)
+    nlp = _add_rule_components(spacy.load(model))
+    save_snapshot(nlp, path, pipeline_fingerprint(model))
+    return path
+
+
+def _make_preprocessor(
+    options: PipelineOptions,
+    *,
+    nlp: Optional["spacy.language.Language"],
+    return_full: bool,
+    verbose: bool,
+) -> "SpacyPreprocessor | RegexPreprocessor | ParallelPreprocessor | DedupPreprocessor | CachedPreprocessor":
+    engine = options.engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of: {', '.join(ENGINES)}")
+    if engine != "spacy" and nlp is not None:
+        raise ValueError(f"A preloaded `nlp` cannot be used with engine={engine!r}.")
+    if not options.lemmatizer and nlp is not None:
+        raise ValueError("A preloaded `nlp` is used as built; pass build_pipeline(lemmatizer=False) instead.")
+    if options.windowed and nlp is not None:
+        raise ValueError("A preloaded `nlp` is used as built; pass build_pipeline(windowed=True) instead.")
+    if options.cache is not None and return_full and engine == "spacy":
+        raise ValueError("The result cache stores no token/sentence views; it cannot be combined with return_full.")
+    if options.dedup and return_full and engine == "spacy":
+        raise ValueError("Sentence dedup produces no token/sentence views; it cannot be combined with return_full.")
+    if options.windowed and return_full and engine == "spacy":
+        raise ValueError("Windowed NER annotates tokens only inside windows; it cannot be combined with return_full.")
+
+    preprocessor = _make_uncached_preprocessor(options, nlp=nlp, return_full=return_full, verbose=verbose)
+    if options.dedup:
+        preprocessor = DedupPreprocessor(preprocessor)
+    if options.cache is None:
+        return preprocessor
+    fingerprint = result_fingerprint(
+        engine=engine,
+        model=options.model,
+        labels=options.labels,
+        use_ner_hints=options.use_ner_hints,
+        dedup=options.dedup,
+        lemmatizer=options.lemmatizer,
+        windowed=options.windowed,
+        nlp=nlp,
+    )
+    return CachedPreprocessor(preprocessor, ResultCache(options.cache, fingerprint, max_bytes=options.cache_size))
+
+
+def _make_uncached_preprocessor(
+    options: PipelineOptions,
+    *,
+    nlp: Optional["spacy.language.Language"],
+    return_full: bool,
+    verbose: bool,
+) -> "SpacyPreprocessor | RegexPreprocessor | ParallelPreprocessor":
+    if options.workers > 1:
+        if nlp is not None and not options.fork_workers:
+            raise ValueError(
+                "A preloaded `nlp` cannot be shared with worker processes; omit it when workers > 1 "
+                "or fork the workers from it (fork_workers=True)."
+            )
+        return ParallelPreprocessor(
+            options.workers,
+            model=options.model,
+            max_length=options.max_length,
+            use_ner_hints=options.use_ner_hints,
+            full=return_full,
+            labels=options.labels,
+            engine=options.engine,
+            profile=options.profiled,
+            lemmatizer=options.lemmatizer,
+            windowed=options.windowed,
+            fork=options.fork_workers,
+            nlp=nlp,
+        )
+
+    if options.engine == "regex":
+        from labeling.regex_engine import RegexPreprocessor
+
+        return RegexPreprocessor(labels=options.labels, profile=options.profiled)
+
+    from labeling.plan import get_plan
+    from labeling.preprocessor import SpacyPreprocessor
+
+    pipeline = nlp or build_pipeline(
+        model=options.model,
+        max_length=options.max_length,
+        labels=options.labels,
+        lemmatizer=options.lemmatizer,
+        windowed=options.windowed,
+    )
+    plan = get_plan(pipeline)
+    if verbose and plan is not None:
+        print(plan.describe(), file=sys.stderr)
+    return SpacyPreprocessor(
+        pipeline,
+        use_ner_hints=options.use_ner_hints,
+        redact_only=not return_full,
+        labels=options.labels,
+        profile=options.profiled,
+    )
+
+
+def _close(preprocessor) -> None:
+    if isinstance(preprocessor, (ParallelPreprocessor, DedupPreprocessor, CachedPreprocessor)):
+        preprocessor.close()
+
+
+def _report_cache(preprocessor, verbose: bool) -> None:
+    if verbose and isinstance(preprocessor, CachedPreprocessor):
+        print(preprocessor.cache.summary(), file=sys.stderr)
+
+
+def _report_profile(
+    profile: Profile,
+    options: PipelineOptions,
+    *,
+    documents: int,
+    wall_seconds: float,
+    verbose: bool,
+) -> None:
+    report = build_report(
+        profile, documents=documents, wall_seconds=wall_seconds, engine=options.engine, workers=options.workers
+    )
+    if verbose:
+        print(format_report(report), file=sys.stderr)
+    if options.profile_output is not None:
+        write_report(report, options.profile_output)
+
+
 def anonymize(
     text: str,
     *,
-    model: str = DEFAULT_MODEL,
-    max_length: int = DEFAULT_MAX_LEN,
-    use_ner_hints: bool = True,
+    options: Optional[PipelineOptions] = None,
     verbose: bool = True,
     return_full: bool = False,
-    nlp: Optional[spacy.language.Language] = None,
-) -> str | PreprocessResult:
+    nlp: Optional["spacy.language.Language"] = None,
+    delta: bool = False,
+    **overrides,
+) -> str | PreprocessResult | List[Edit]:
     """
     Run the anonymization pipeline on a raw text string.
 
     Args:
         text: Raw text to anonymize.
-        model: spaCy model name to load (ignored if `nlp` is provided).
-        max_length: Max document length override for spaCy.
-        use_ner_hints: Whether to use spaCy NER hints in preprocessing.
+        options: Pipeline options (`labeling.options.PipelineOptions`); keyword arguments named
+            after its fields (`model=`, `labels=`, `workers=`, ...) override single ones.
         verbose: Print timing information when True.
         return_full: When True, return the full PreprocessResult; otherwise return the redacted text.
         nlp: Optional preloaded spaCy pipeline to reuse.
+        delta: Return the redaction delta instead of the redacted text: the sorted, non-overlapping
+            `(start, end, label)` edits it was made with (see `labeling.delta`).
     """
-    pipeline = nlp or build_pipeline(model=model, max_length=max_length)
-    preprocessor = SpacyPreprocessor(pipeline, use_ner_hints=use_ner_hints)
+    options = pipeline_options(options, overrides)
+    if delta and return_full:
+        raise ValueError("`delta` and `return_full` select different results; pass only one.")
+    preprocessor = _make_preprocessor(options, nlp=nlp, return_full=return_full, verbose=verbose)
 
     start_time = time.time()
-    result = preprocessor(text)
-    if verbose:
-        print(f"--- Anonymization took {time.time() - start_time:.2f} seconds ---")
+    try:
+        result = preprocessor(text)
+        elapsed = time.time() - start_time
+        if verbose:
+            print(f"--- Anonymization took {elapsed:.2f} seconds ---")
+            if "dedup" in result.meta:
+                stats = result.meta["dedup"]
+                print(
+                    f"--- Dedup: {stats['unique_sentences']}/{stats['sentences']} distinct sentences, "
+                    f"{stats['ratio']:.1%} of the text skipped, ~{stats['saved_seconds']:.2f} seconds saved ---"
+                )
+            if "windowed" in result.meta:
+                stats = result.meta["windowed"]
+                share = stats["model_chars"] / stats["chars"] if stats["chars"] else 0.0
+                print(f"--- Windowed NER: {stats['windows']} windows, {share:.1%} of the text through the model ---")
+        _report_cache(preprocessor, verbose)
+    finally:
+        _close(preprocessor)
+    if "profile" in result.meta:
+        _report_profile(result.meta["profile"], options, documents=1, wall_seconds=elapsed, verbose=verbose)
 
+    if delta:
+        return redaction_delta(result.entities)
     return result if return_full else result.redacted_text
+
+
+def anonymize_file(
+    path: Path,
+    dst: TextIO,
+    *,
+    max_memory: int,
+    options: Optional[PipelineOptions] = None,
+    verbose: bool = True,
+    **overrides,
+) -> dict:
+    """
+    Anonymize a (huge) file into `dst` while keeping the resident set under `max_memory` bytes.
+
+    The file is memory-mapped and processed in whitespace-aligned chunks sized to what the
+    ceiling leaves after loading the pipeline; every redacted chunk is written before the
+    next is read. See `labeling.bounded`.
+
+    Args:
+        path: UTF-8 input file (stdin cannot be memory-mapped).
+        dst: Open text stream for the redacted output.
+        max_memory: RSS ceiling in bytes for the whole process, pipeline included.
+        options: Pipeline options (`labeling.options.PipelineOptions`), overridden by keyword
+            arguments named after its fields; a single process runs, so without workers.
+        verbose: Print the chunking and peak memory to stderr.
+
+    Returns:
+        Statistics of the run, including `peak_rss` and, when profiled, the summed `profile`.
+    """
+    options = pipeline_options(options, overrides, unsupported=("workers", "fork_workers"))
+    preprocessor = _make_preprocessor(options, nlp=None, return_full=False, verbose=verbose)
+
+    start_time = time.time()
+    try:
+        stats = run_bounded(preprocessor, path, dst, max_memory=max_memory, engine=options.engine)
+        elapsed = time.time() - start_time
+        if verbose:
+            print(
+                f"--- Anonymized {stats['chars']:,} characters in {stats['chunks']} chunks of up to "
+                f"{stats['chunk_chars']:,} in {elapsed:.2f} seconds; peak RSS "
+                f"{stats['peak_rss'] / 2**20:.0f} MB of {max_memory / 2**20:.0f} MB ---",
+                file=sys.stderr,
+            )
+        _report_cache(preprocessor, verbose)
+    finally:
+        _close(preprocessor)
+    if options.profiled:
+        _report_profile(
+            stats.get("profile", {}), options, documents=stats["chunks"], wall_seconds=elapsed, verbose=verbose
+        )
+    return stats
+
+
+def reanonymize(
+    previous: PreprocessResult,
+    text: str,
+    *,
+    options: Optional[PipelineOptions] = None,
+    verbose: bool = False,
+    nlp: Optional["spacy.language.Language"] = None,
+    margin: int = DEFAULT_MARGIN,
+    **overrides,
+) -> PreprocessResult:
+    """
+    Re-anonymize an edited document, reprocessing only the changed regions of `previous.raw_text`.
+
+    The options must match the run that produced `previous`; pass a preloaded `nlp` so
+    that each update does not rebuild the pipeline. See `labeling.incremental`.
+
+    Args:
+        previous: Result of the previous run on the unedited text (from `anonymize(..., return_full=True)`
+            or an earlier `reanonymize`).
+        text: The edited document.
+        options: Pipeline options (`labeling.options.PipelineOptions`), overridden by keyword
+            arguments named after its fields; the changed regions run in this process, uncached,
+            without dedup or profiling.
+        verbose: Print how much of the document was reprocessed.
+        nlp: Optional preloaded spaCy pipeline to reuse.
+        margin: Initial context in characters reprocessed around every change.
+    """
+    options = pipeline_options(
+        options,
+        overrides,
+        unsupported=("workers", "fork_workers", "cache", "cache_size", "dedup", "profile", "profile_output"),
+    )
+    preprocessor = _make_preprocessor(options, nlp=nlp, return_full=False, verbose=verbose)
+
+    start_time = time.time()
+    result = update_result(preprocessor, previous, text, margin=margin)
+    if verbose:
+        stats = result.meta["incremental"]
+        print(
+            f"--- Reprocessed {stats['reprocessed_chars']:,} of {stats['chars']:,} characters "
+            f"in {stats['windows']} window(s) in {time.time() - start_time:.2f} seconds ---",
+            file=sys.stderr,
+        )
+    return result
+
+
+def anonymize_records(
+    records: Iterable[Record],
+    *,
+    fields: Optional[Iterable[str]] = None,
+    with_entities: bool = False,
+    options: Optional[PipelineOptions] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    verbose: bool = False,
+    **overrides,
+) -> Iterator[Record]:
+    """
+    Lazily anonymize selected fields of a stream of records (rows of a JSONL or CSV export).
+
+    Every selected field value is a separate document in the `nlp.pipe` batches; the
+    other fields are passed through untouched. See `labeling.records`.
+
+    Args:
+        records: Iterable of dicts (e.g. the rows from `labeling.records.read_records`).
+        fields: Fields to anonymize, dotted for nested JSON values (default: every string field).
+        with_entities: Add an `entities` field with the offsets and labels found in each field.
+        options: Pipeline options (`labeling.options.PipelineOptions`), overridden by keyword
+            arguments named after its fields; a profile covers every field value.
+        batch_size: Number of field values handed to `nlp.pipe` per batch.
+        verbose: Print a timing summary to stderr once the stream is exhausted.
+    """
+    options = pipeline_options(options, overrides)
+    preprocessor = _make_preprocessor(options, nlp=None, return_full=False, verbose=verbose)
+
+    start_time = time.time()
+    count = 0
+    total_profile: Profile = {}
+    try:
+        for record in redact_records(
+                preprocessor,
+                records,
+                None if fields is None else list(fields),
+                batch_size=batch_size,
+                with_entities=with_entities,
+                profile=total_profile,
+        ):
+            count += 1
+            yield record
+        elapsed = time.time() - start_time
+        if verbose:
+            print(f"--- Anonymized {count} records in {elapsed:.2f} seconds ---", file=sys.stderr)
+        _report_cache(preprocessor, verbose)
+    finally:
+        _close(preprocessor)
+
+    if options.profiled:
+        _report_profile(total_profile, options, documents=count, wall_seconds=elapsed, verbose=verbose)
+
+
+def anonymize_directory(
+    in_dir: Path,
+    out_dir: Path,
+    *,
+    pattern: str = DEFAULT_GLOB,
+    manifest: Optional[Path] = None,
+    options: Optional[PipelineOptions] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    verbose: bool = False,
+    force: bool = False,
+    **overrides,
+) -> BatchSummary:
+    """
+    Anonymize every file matching `pattern` under `in_dir` into the same relative path under `out_dir`.
+
+    The pipeline is built once for all files. Finished files are recorded in a manifest
+    with their content hash, so rerunning after an interruption only processes what is
+    missing or changed; see `labeling.batch`.
+
+    Args:
+        in_dir: Input directory.
+        out_dir: Output directory (created if missing).
+        pattern: Glob relative to `in_dir` (default: every `.txt` file, recursively).
+        manifest: Manifest file (default: `.labeling-manifest.jsonl` in `out_dir`).
+        options: Pipeline options (`labeling.options.PipelineOptions`), overridden by keyword
+            arguments named after its fields; without profiling.
+        batch_size: Number of files handed to `nlp.pipe` per batch.
+        verbose: Print progress with an ETA and a throughput summary to stderr.
+        force: Process every file, ignoring the manifest.
+    """
+    options = pipeline_options(options, overrides, unsupported=("profile", "profile_output"))
+    preprocessor = _make_preprocessor(options, nlp=None, return_full=False, verbose=verbose)
+    # Files finished under other rules, another model or other options are redone.
+    fingerprint = result_fingerprint(
+        engine=options.engine,
+        model=options.model,
+        labels=options.labels,
+        use_ner_hints=options.use_ner_hints,
+        dedup=options.dedup,
+        lemmatizer=options.lemmatizer,
+        windowed=options.windowed,
+    )
+    try:
+        summary = run_batch(
+            preprocessor,
+            in_dir,
+            out_dir,
+            pattern=pattern,
+            manifest=manifest,
+            fingerprint=fingerprint,
+            batch_size=batch_size,
+            force=force,
+            verbose=verbose,
+        )
+        _report_cache(preprocessor, verbose)
+    finally:
+        _close(preprocessor)
+    return summary
+
+
+def anonymize_stream(
+    texts: Iterable[str],
+    *,
+    options: Optional[PipelineOptions] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    verbose: bool = False,
+    return_full: bool = False,
+    nlp: Optional["spacy.language.Language"] = None,
+    **overrides,
+) -> Iterator[str | PreprocessResult]:
+    """
+    Lazily anonymize a stream of texts, batching them through `nlp.pipe`.
+
+    Results are yielded in input order as soon as their batch is processed, so memory
+    stays bounded by `batch_size` documents regardless of the stream length.
+
+    Args:
+        texts: Iterable of raw texts (e.g. lines or paragraphs of a larger input).
+        options: Pipeline options (`labeling.options.PipelineOptions`); keyword arguments named
+            after its fields (`model=`, `labels=`, `workers=`, ...) override single ones.
+        batch_size: Number of texts handed to `nlp.pipe` per batch.
+        verbose: Print a timing summary to stderr once the stream is exhausted.
+        return_full: When True, yield full PreprocessResults; otherwise yield redacted texts.
+        nlp: Optional preloaded spaCy pipeline to reuse.
+    """
+    options = pipeline_options(options, overrides)
+    preprocessor = _make_preprocessor(options, nlp=nlp, return_full=return_full, verbose=verbose)
+
+    start_time = time.time()
+    count = 0
+    total_profile: Profile = {}
+    try:
+        for result in preprocessor.pipe(texts, batch_size=batch_size):
+            count += 1
+            if "profile" in result.meta:
+                add_profile(total_profile, result.meta["profile"])
+            yield result if return_full else result.redacted_text
+        elapsed = time.time() - start_time
+        if verbose:
+            print(f"--- Anonymized {count} texts in {elapsed:.2f} seconds ---", file=sys.stderr)
+        _report_cache(preprocessor, verbose)
+    finally:
+        _close(preprocessor)
+
+    if options.profiled:
+        _report_profile(total_profile, options, documents=count, wall_seconds=elapsed, verbose=verbose)
@@ -0,0 +1,243 @@
+"""
+Directory batch mode with a resumable job manifest.
+
+`run_batch` anonymizes every file under an input directory that matches a
+glob into the same relative path under an output directory, building the
+pipeline once and streaming the files through its `pipe` (one document per
+file, optionally over worker processes).
+
+Every finished file is appended to a JSONL manifest (by default
+`<out_dir>/.labeling-manifest.jsonl`) with the SHA-256 of its content and the
+fingerprint of the pipeline configuration. A rerun skips files whose manifest
+entry still matches, so an interrupted or crashed run resumes where it
+stopped; edited inputs and changed rules or models are processed again.
+Outputs are written to a temporary file and renamed, so a file listed in the
+manifest is always complete.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, TextIO, Tuple
+
+MANIFEST_NAME = ".labeling-manifest.jsonl"
+DEFAULT_GLOB = "**/*.txt"
+# Seconds between progress updates.
+PROGRESS_INTERVAL = 0.5
+
+
+@dataclass
+class BatchSummary:
+    files: int = 0
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    chars: int = 0
+    entities: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.processed / self.seconds if self.seconds else 0.0
+
+    @property
+    def chars_per_second(self) -> float:
+        return self.chars / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "files_per_second": self.files_per_second,
+            "chars_per_second": self.chars_per_second,
+        }
+
+    def describe(self) -> str:
+        return (
+            f"--- Batch: {self.processed} processed, {self.skipped} skipped, {self.failed} failed of "
+            f"{self.files} files; {self.chars / 1e6:.1f} M chars, {self.entities} entities in "
+            f"{self.seconds:.1f} seconds ({self.files_per_second:.1f} files/s, "
+            f"{self.chars_per_second * 60 / 1e6:.1f} M chars/min) ---"
+        )
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_manifest(path: Path) -> Dict[str, dict]:
+    """Return the latest manifest entry per relative input path (a torn last line is ignored)."""
+    entries: Dict[str, dict] = {}
+    try:
+        with path.open("r", encoding="utf-8") as manifest:
+            for line in manifest:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("type") == "file":
+                    entries[entry["path"]] = entry
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as dst:
+            dst.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class _Progress:
+    """One status line on stderr (rewritten in place on a terminal), throttled to PROGRESS_INTERVAL."""
+
+    def __init__(self, total_files: int, total_bytes: int, stream: TextIO = sys.stderr) -> None:
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.stream = stream
+        self.inline = stream.isatty()
+        self.start = time.monotonic()
+        self._last = 0.0
+
+    def update(self, files: int, done_bytes: int, force: bool = False) -> None:
+        now = time.monotonic()
+        interval = PROGRESS_INTERVAL if self.inline else 10 * PROGRESS_INTERVAL
+        if not force and now - self._last < interval:
+            return
+        self._last = now
+        elapsed = now - self.start
+        rate = done_bytes / elapsed if elapsed else 0.0
+        eta = _format_duration((self.total_bytes - done_bytes) / rate) if rate else "?"
+        share = done_bytes / self.total_bytes if self.total_bytes else 1.0
+        line = (
+            f"[{files}/{self.total_files}] {share:.1%} {files / elapsed if elapsed else 0:.1f} files/s "
+            f"{rate * 60 / 2**20:.1f} MB/min, ETA {eta}"
+        )
+        if self.inline:
+            self.stream.write(f"\r{line:<79}")
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.inline:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def find_inputs(in_dir: Path, pattern: str = DEFAULT_GLOB) -> List[Path]:
+    return sorted(path for path in in_dir.glob(pattern) if path.is_file())
+
+
+def run_batch(
+        preprocessor,
+        in_dir: Path,
+        out_dir: Path,
+        *,
+        pattern: str = DEFAULT_GLOB,
+        manifest: Optional[Path] = None,
+        fingerprint: str = "",
+        batch_size: int = 64,
+        force: bool = False,
+        verbose: bool = True,
+) -> BatchSummary:
+    """
+    Anonymize every file matching `pattern` under `in_dir` into the same relative path under `out_dir`.
+
+    Args:
+        preprocessor: Any preprocessor with `pipe` (built once for the whole batch).
+        in_dir: Input directory.
+        out_dir: Output directory (created if missing).
+        pattern: Glob relative to `in_dir`.
+        manifest: JSONL manifest of finished files (default: `out_dir / MANIFEST_NAME`).
+        fingerprint: Configuration fingerprint; manifest entries with another one are redone.
+        batch_size: Files handed to `preprocessor.pipe` per batch.
+        force: Ignore the manifest and process every file.
+        verbose: Show a progress/ETA line and the final summary on stderr.
+
+    The summary is also appended to the manifest (a `"type": "summary"` record), including
+    for a run that was interrupted.
+    """
+    start_time = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = manifest or out_dir / MANIFEST_NAME
+    done = {} if force else read_manifest(manifest)
+
+    inputs = find_inputs(in_dir, pattern)
+    summary = BatchSummary(files=len(inputs))
+    pending: List[Tuple[Path, str, int]] = []
+    for path in inputs:
+        relative = path.relative_to(in_dir).as_posix()
+        entry = done.get(relative)
+        if entry is not None and entry.get("fingerprint") == fingerprint and (out_dir / relative).exists():
+            # Hashing costs a read; the size check rules out most changed files first.
+            if entry.get("bytes") == path.stat().st_size and entry.get("sha256") == file_hash(path.read_bytes()):
+                summary.skipped += 1
+                continue
+        pending.append((path, relative, path.stat().st_size))
+
+    tracker = _Progress(len(pending), sum(size for _, _, size in pending)) if verbose and pending else None
+    queue: Deque[Tuple[str, str, int]] = deque()
+    read_bytes = 0
+
+    def texts() -> Iterator[str]:
+        nonlocal read_bytes
+        for path, relative, size in pending:
+            data = path.read_bytes()
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError as exc:
+                summary.failed += 1
+                print(f"Skipping {relative}: {exc}", file=sys.stderr)
+                continue
+            queue.append((relative, file_hash(data), len(data)))
+            yield text
+
+    with manifest.open("a", encoding="utf-8") as log:
+        try:
+            for result in preprocessor.pipe(texts(), batch_size=batch_size):
+                relative, digest, size = queue.popleft()
+                _write_atomic(out_dir / relative, result.redacted_text)
+                entry = {
+                    "type": "file",
+                    "path": relative,
+                    "sha256": digest,
+                    "bytes": size,
+                    "fingerprint": fingerprint,
+                    "entities": len(result.entities),
+                    "finished": time.time(),
+                }
+                log.write(json.dumps(entry) + "\n")
+                log.flush()
+                summary.processed += 1
+                summary.chars += len(result.raw_text)
+                summary.entities += len(result.entities)
+                read_bytes += size
+                if tracker is not None:
+                    tracker.update(summary.processed, read_bytes)
+        finally:
+            summary.seconds = time.perf_counter() - start_time
+            if tracker is not None:
+                tracker.update(summary.processed, read_bytes, force=True)
+                tracker.close()
+            log.write(json.dumps({"type": "summary", "finished": time.time(), **summary.to_dict()}) + "\n")
+            if verbose:
+                print(summary.describe(), file=sys.stderr)
+    return summary
@@ -0,0 +1,179 @@
+"""
+Memory-bounded processing of single files larger than RAM comfortably allows.
+
+`anonymize_file` in `labeling.anonymizer` uses this when given a memory
+ceiling. Instead of reading the whole file, building one Doc and holding the
+redacted copy as well, the input is memory-mapped and cut into chunks at
+whitespace, preferring blank lines and then line breaks. The chunks
+go through the pipeline one at a time, and each redacted chunk is written out
+before the next one is read.
+
+The chunk size is derived from the budget left after the pipeline is loaded
+and an estimate of the per-character cost of the engine. Consumed pages of the
+mapping are released, and the chunk size is halved whenever the resident set
+comes close to the ceiling. An entity can never span a cut, as with sharding,
+so cuts prefer blank lines, then line breaks.
+"""
+
+import mmap
+import resource
+import sys
+from pathlib import Path
+from typing import Iterator, Optional, TextIO, Tuple
+
+from labeling.profiling import Profile, add_profile
+
+# Rough peak bytes of working memory per character of a chunk: the text and its redacted
+# copy as `str`, plus, for spaCy, the Doc with its token structs and tok2vec tensor.
+BYTES_PER_CHAR = {"spacy": 400, "regex": 40}
+# Start shrinking chunks once the resident set reaches this share of the ceiling.
+HEADROOM = 0.85
+MIN_CHUNK_CHARS = 10_000
+# Bytes a chunk may extend past its target to reach whitespace before the cut is forced.
+_MAX_TOKEN_BYTES = 1 << 16
+_SEPARATORS = (b"\n\n", b"\n", b" ", b"\t")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * mmap.PAGESIZE
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def parse_size(value: str) -> int:
+    """Parse "512M", "2G", "800000K" or a plain byte count."""
+    units = {"K": 2**10, "M": 2**20, "G": 2**30}
+    value = value.strip().upper().removesuffix("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def chunk_chars_for(max_memory: int, baseline: int, engine: str) -> int:
+    """Chunk size in characters that keeps one chunk in flight under `max_memory`."""
+    available = max_memory * HEADROOM - baseline
+    chars = int(available // BYTES_PER_CHAR[engine])
+    if chars < MIN_CHUNK_CHARS:
+        raise ValueError(
+            f"A memory ceiling of {max_memory / 2**20:.0f} MB leaves no room for chunks: the loaded "
+            f"pipeline already takes {baseline / 2**20:.0f} MB."
+        )
+    return chars
+
+
+def _find_cut(data: mmap.mmap, start: int, end: int) -> int:
+    """A cut in (start, end] just after an ASCII whitespace byte, which never splits a UTF-8 character."""
+    for separator in _SEPARATORS:
+        pos = data.rfind(separator, start, end)
+        if pos > start:
+            return pos + len(separator)
+    # No whitespace inside the window: extend to the next one instead of splitting a token.
+    for separator in _SEPARATORS[1:]:
+        pos = data.find(separator, end, end + _MAX_TOKEN_BYTES)
+        if pos >= 0:
+            return pos + 1
+    # A single "token" longer than that is cut at a UTF-8 character boundary.
+    end = min(end, len(data))
+    while end < len(data) and data[end] & 0xC0 == 0x80:
+        end += 1
+    return end
+
+
+class MappedChunks:
+    """
+    Iterate over whitespace-aligned chunks of a memory-mapped UTF-8 file.
+
+    `chunk_chars` may be changed between chunks; pages before the current chunk are
+    released from the mapping as it advances.
+    """
+
+    def __init__(self, path: Path, chunk_chars: int) -> None:
+        self.path = path
+        self.chunk_chars = chunk_chars
+        self.chunks = 0
+        self._file = path.open("rb")
+        size = path.stat().st_size
+        self._data: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __iter__(self) -> Iterator[str]:
+        data = self._data
+        if data is None:
+            return
+        if hasattr(data, "madvise"):
+            data.madvise(mmap.MADV_SEQUENTIAL)
+        start = 0
+        released = 0
+        while start < len(data):
+            # UTF-8 takes 1-2 bytes per character of Polish text; a byte target keeps the cut cheap.
+            end = start + self.chunk_chars
+            end = _find_cut(data, start, end) if end < len(data) else len(data)
+            text = data[start:end].decode("utf-8")
+            if hasattr(data, "madvise"):
+                boundary = start - start % mmap.ALLOCATIONGRANULARITY
+                if boundary > released:
+                    data.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                    released = boundary
+            self.chunks += 1
+            start = end
+            yield text
+
+    def close(self) -> None:
+        if self._data is not None:
+            self._data.close()
+        self._file.close()
+
+
+def run_bounded(
+        preprocessor,
+        path: Path,
+        dst: TextIO,
+        *,
+        max_memory: int,
+        engine: str,
+) -> dict:
+    """
+    Anonymize the file at `path` into `dst` chunk by chunk under a `max_memory` RSS ceiling.
+
+    Returns statistics: characters, chunks, entities, initial and final chunk size,
+    baseline RSS after loading the pipeline and peak RSS, plus the chunk profiles summed
+    under `profile` when the preprocessor records them.
+    """
+    baseline = current_rss()
+    initial = chunk_chars_for(max_memory, baseline, engine)
+    chunks = MappedChunks(path, initial)
+    chars = entities = 0
+    profile: Profile = {}
+    try:
+        # One chunk per batch: the window in flight is a single Doc and its redacted text.
+        for result in preprocessor.pipe(chunks, batch_size=1):
+            dst.write(result.redacted_text)
+            chars += len(result.raw_text)
+            entities += len(result.entities)
+            if "profile" in result.meta:
+                add_profile(profile, result.meta["profile"])
+            if current_rss() > max_memory * HEADROOM and chunks.chunk_chars > MIN_CHUNK_CHARS:
+                chunks.chunk_chars = max(MIN_CHUNK_CHARS, chunks.chunk_chars // 2)
+    finally:
+        chunks.close()
+    stats = {
+        "chars": chars,
+        "chunks": chunks.chunks,
+        "entities": entities,
+        "chunk_chars": initial,
+        "final_chunk_chars": chunks.chunk_chars,
+        "baseline_rss": baseline,
+        "peak_rss": peak_rss(),
+        "max_memory": max_memory,
+    }
+    if profile:
+        stats["profile"] = profile
+    return stats
@@ -0,0 +1,272 @@
+"""
+Persistent, content-addressed cache of anonymization results.
+
+Results are stored in a SQLite database keyed by the SHA-256 of the document
+text and a fingerprint of everything the output depends on: the engine and its
+options, the sources in `labeling/pipes` and the post-processing code, and for
+the spaCy engine the model (via `pipeline_fingerprint`). Editing a rule list or
+upgrading the model therefore changes every key; stale entries simply stop
+matching and are dropped by eviction.
+
+Only what redaction needs is stored (entity offsets, redacted text and meta);
+token and sentence views are never cached. The database is bounded in size:
+once it grows past `max_bytes` the least recently used entries are evicted.
+
+This module only uses the standard library.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from labeling.results import EntityHint, PreprocessResult
+from labeling.snapshot import _source_files, pipeline_fingerprint
+
+CACHE_DIR_ENV = "LABELING_CACHE_DIR"
+CACHE_FILE = "results.sqlite"
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# Eviction trims the database to this fraction of `max_bytes`, so it does not run on every insert.
+EVICT_TO = 0.9
+# SQLite limits the number of bound parameters per statement.
+_MAX_PARAMS = 500
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+_RESULT_SOURCES = (
+    _PACKAGE_DIR / "pipes",
+    _PACKAGE_DIR / "dedup.py",
+    _PACKAGE_DIR / "preprocessor.py",
+    _PACKAGE_DIR / "regex_engine.py",
+    _PACKAGE_DIR / "spans.py",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+def default_cache_path() -> Path:
+    env = os.environ.get(CACHE_DIR_ENV)
+    root = Path(env) if env else Path.home() / ".cache" / "labeling"
+    return root / CACHE_FILE
+
+
+def result_fingerprint(
+        *,
+        engine: str,
+        model: str,
+        labels: Optional[Iterable[str]],
+        use_ner_hints: bool,
+        dedup: bool = False,
+        lemmatizer: bool = True,
+        windowed: bool = False,
+        nlp=None,
+) -> str:
+    """
+    Hash the engine options, rule and post-processing sources and (for spaCy) the model.
+
+    With a preloaded `nlp` its name, version and components stand in for the model package.
+    """
+    digest = hashlib.sha256()
+    options = {
+        "engine": engine,
+        "labels": sorted(labels) if labels is not None else None,
+        "use_ner_hints": use_ner_hints,
+        "dedup": dedup,
+        "lemmatizer": lemmatizer,
+        "windowed": windowed,
+    }
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    for path in _source_files(_RESULT_SOURCES):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    if engine == "spacy":
+        if nlp is not None:
+            model = json.dumps([nlp.meta.get("name"), nlp.meta.get("version"), nlp.pipe_names])
+        digest.update(pipeline_fingerprint(model).encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _encode(result: PreprocessResult) -> bytes:
+    meta = {key: value for key, value in result.meta.items() if key not in ("profile", "cached")}
+    entities = [(ent.start_char, ent.end_char, ent.label) for ent in result.entities]
+    data = {"redacted_text": result.redacted_text, "entities": entities, "meta": meta}
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(text: str, value: bytes) -> PreprocessResult:
+    data = json.loads(value)
+    entities = [
+        EntityHint(text=text[start:end], label=label, start_char=start, end_char=end)
+        for start, end, label in data["entities"]
+    ]
+    return PreprocessResult(
+        raw_text=text,
+        tokens=[],
+        sentences=[],
+        entities=entities,
+        redacted_text=data["redacted_text"],
+        meta={**data["meta"], "cached": True},
+    )
+
+
+class ResultCache:
+    """
+    SQLite-backed store of `PreprocessResult`s for one pipeline configuration.
+
+    Args:
+        path: Database file (created with its directory if missing); shared safely
+            between processes and configurations.
+        fingerprint: Configuration fingerprint (see `result_fingerprint`), part of every key.
+        max_bytes: Size bound; least recently used entries are evicted beyond it.
+    """
+
+    def __init__(self, path: Path, fingerprint: str, max_bytes: int = DEFAULT_CACHE_SIZE) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._prefix = fingerprint.encode("utf-8") + b"\0"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The HTTP service creates the cache in the main thread and uses it from the batching thread.
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(self._prefix + text.encode("utf-8", "surrogatepass")).digest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[PreprocessResult]]:
+        """Cached results for `texts` (None where missing); hits count as a use for LRU."""
+        keys = [self.key(text) for text in texts]
+        found: Dict[bytes, bytes] = {}
+        for start in range(0, len(keys), _MAX_PARAMS):
+            chunk = list(set(keys[start:start + _MAX_PARAMS]))
+            rows = self._db.execute(
+                f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        if found:
+            now = time.time()
+            with self._db:
+                self._db.executemany("UPDATE results SET used = ? WHERE key = ?", [(now, key) for key in found])
+
+        results = [_decode(text, found[key]) if key in found else None for text, key in zip(texts, keys)]
+        self.stats.hits += len(texts) - results.count(None)
+        self.stats.misses += results.count(None)
+        return results
+
+    def put_many(self, items: Iterable[Tuple[str, PreprocessResult]]) -> None:
+        now = time.time()
+        rows = []
+        for text, result in items:
+            value = _encode(result)
+            size = len(value) + 32
+            if size <= self.max_bytes:
+                rows.append((self.key(text), value, size, now))
+        if not rows:
+            return
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+        self.stats.stored += len(rows)
+        if self.size_bytes() > self.max_bytes:
+            self.evict(int(self.max_bytes * EVICT_TO))
+
+    def evict(self, target_bytes: int) -> int:
+        """Delete least recently used entries until the database holds at most `target_bytes`."""
+        excess = self.size_bytes() - target_bytes
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY used"):
+            if excess <= 0:
+                break
+            doomed.append((key,))
+            excess -= size
+        with self._db:
+            self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self.stats.evicted += len(doomed)
+        return len(doomed)
+
+    def size_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM results")
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (
+            f"--- Cache: {stats.hits} hits, {stats.misses} misses ({stats.hit_rate:.1%} hit rate), "
+            f"{stats.evicted} evicted; {len(self)} entries, {self.size_bytes() / 1e6:.1f} MB in {self.path} ---"
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class CachedPreprocessor:
+    """
+    Serve results from a `ResultCache` and run only the misses through `preprocessor`.
+
+    Has the call/pipe interface of the preprocessors it wraps; results of cache hits
+    carry `meta["cached"] = True` and no profile.
+    """
+
+    def __init__(self, preprocessor, cache: ResultCache) -> None:
+        self.preprocessor = preprocessor
+        self.cache = cache
+
+    def __call__(self, text: str) -> PreprocessResult:
+        cached = self.cache.get_many([text])[0]
+        if cached is not None:
+            return cached
+        result = self.preprocessor(text)
+        self.cache.put_many([(text, result)])
+        return result
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64) -> Iterator[PreprocessResult]:
+        # Look up enough texts at once for every worker of a ParallelPreprocessor to get a batch of misses.
+        window = batch_size * getattr(self.preprocessor, "workers", 1)
+        iterator = iter(texts)
+        while chunk := list(islice(iterator, window)):
+            results = self.cache.get_many(chunk)
+            misses = [text for text, result in zip(chunk, results) if result is None]
+            if misses:
+                computed = list(self.preprocessor.pipe(misses, batch_size=batch_size))
+                self.cache.put_many(zip(misses, computed))
+                fresh = iter(computed)
+                results = [result if result is not None else next(fresh) for result in results]
+            yield from results
+
+    def close(self) -> None:
+        if hasattr(self.preprocessor, "close"):
+            self.preprocessor.close()
+        self.cache.close()
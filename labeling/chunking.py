@@ -0,0 +1,204 @@
+"""
+Helpers for cutting a document into independently processable pieces and
+stitching the per-piece results back into one document-level result.
+"""
+
+import re
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from labeling.profiling import merge_profiles
+from labeling.results import EntityHint, LazySequence, PreprocessResult, SentenceInfo
+from labeling.token_table import TokenTable
+
+# A sentence ends at a blank line, or at final punctuation followed by whitespace and an
+# upper-case letter or digit; the whitespace in between belongs to neither sentence. Single
+# line breaks count as spaces, so differently wrapped copies of a sentence still match.
+_BOUNDARY_RE = re.compile(r"(?:([.!?…]+)[\"”»)]*\s+(?=[\"„«(]?[A-ZĄĆĘŁŃÓŚŹŻ\d])|\n[^\S\n]*\n)\s*")
+_BLANK_LINE_RE = re.compile(r"\n[^\S\n]*\n")
+# A period after a short lower-case word ("ul.", "art.", "godz."), an initial or a day/month
+# number ("12. 03.") abbreviates rather than ends a sentence; cutting there would split
+# addresses and dates.
+_MAX_ABBREVIATION = 4
+# Characters before a shard's target end searched for its cut first.
+_CUT_LOOKBACK = 1024
+
+
+def _word_before(text: str, pos: int) -> str:
+    """The word ending at `pos`, cut to `_MAX_ABBREVIATION + 1` characters (longer words never abbreviate)."""
+    start = pos
+    while start > 0 and pos - start <= _MAX_ABBREVIATION and text[start - 1].isalnum():
+        start -= 1
+    return text[start:pos]
+
+
+def _is_abbreviation(word: str) -> bool:
+    return (
+        (word.isdigit() and len(word) <= 2)
+        or (len(word) <= _MAX_ABBREVIATION and word.islower())
+        or (len(word) == 1 and word.isupper())
+    )
+
+
+def _append_stripped(spans: List[Tuple[int, int]], text: str, start: int, end: int) -> None:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        spans.append((start, end))
+
+
+def _boundaries(text: str, start: int, end: int) -> Iterator[re.Match]:
+    """The sentence boundaries in `text[start:end]`; a boundary ends where the next sentence starts."""
+    for match in _BOUNDARY_RE.finditer(text, start, end):
+        if (
+                match.group(1) == "."
+                and _is_abbreviation(_word_before(text, match.start()))
+                and not _BLANK_LINE_RE.search(match.group())
+        ):
+            continue
+        yield match
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Return `(start, end)` character spans of the sentences of `text`, without surrounding whitespace."""
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    for match in _boundaries(text, 0, len(text)):
+        _append_stripped(spans, text, start, match.start() + len(match.group().rstrip()))
+        start = match.end()
+    _append_stripped(spans, text, start, len(text))
+    return spans
+
+
+def _find_cut(text: str, start: int, end: int) -> int:
+    """Return a cut position after `start` at the last sentence boundary or blank line before `end`."""
+    # Look at the end of the window first, widening the search only when it has no boundary.
+    lookback = _CUT_LOOKBACK
+    while True:
+        low = max(start, end - lookback)
+        cut = low
+        for match in _boundaries(text, low, end):
+            cut = match.end()
+        if cut > low:
+            return cut
+        if low == start:
+            break
+        lookback *= 8
+    # No boundary inside the window: extend to the next one instead of cutting a sentence.
+    match = next(_boundaries(text, end, len(text)), None)
+    return match.end() if match else len(text)
+
+
+def split_text(text: str, max_chars: int) -> List[Tuple[int, str]]:
+    """
+    Split `text` into `(offset, chunk)` pieces of roughly `max_chars` characters.
+
+    Cuts fall only at sentence boundaries and blank lines (`split_sentences`), so the
+    concatenation of all chunks is exactly `text` and no entity (a phone number, an
+    address, a name) is split in two. A piece grows past `max_chars` until its sentence ends.
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+
+    chunks: List[Tuple[int, str]] = []
+    start = 0
+    while start < len(text):
+        end = start + max_chars
+        if end < len(text):
+            end = _find_cut(text, start, end)
+        else:
+            end = len(text)
+        chunks.append((start, text[start:end]))
+        start = end
+    return chunks
+
+
+def _as_table(tokens: Sequence) -> TokenTable:
+    return tokens.materialize() if isinstance(tokens, LazySequence) else tokens
+
+
+def _shift_sentences(
+        sentences: Sequence[SentenceInfo],
+        char_offset: int,
+        token_offset: int,
+        sent_offset: int,
+) -> List[SentenceInfo]:
+    shifted: List[SentenceInfo] = []
+    for sent in sentences:
+        indices = sent.token_indices
+        shifted.append(
+            SentenceInfo(
+                sent_id=sent.sent_id + sent_offset,
+                text=sent.text,
+                start_char=sent.start_char + char_offset,
+                end_char=sent.end_char + char_offset,
+                token_indices=range(indices[0] + token_offset, indices[-1] + token_offset + 1) if indices else range(0),
+            )
+        )
+    return shifted
+
+
+def shift_entities(entities: Sequence[EntityHint], char_offset: int) -> List[EntityHint]:
+    return [
+        EntityHint(
+            text=ent.text,
+            label=ent.label,
+            start_char=ent.start_char + char_offset,
+            end_char=ent.end_char + char_offset,
+        )
+        for ent in entities
+    ]
+
+
+def merge_window_stats(results: Iterable[PreprocessResult]) -> dict:
+    """Sum the `meta["windowed"]` counters (see `labeling.pipes.windowed`) of `results`."""
+    stats = {"windows": 0, "chars": 0, "model_chars": 0}
+    for result in results:
+        for key, value in result.meta["windowed"].items():
+            stats[key] += value
+    return stats
+
+
+def merge_results(text: str, parts: Sequence[Tuple[int, PreprocessResult]]) -> PreprocessResult:
+    """
+    Combine results computed on consecutive chunks of `text` into a single result.
+
+    Args:
+        text: The full original document.
+        parts: `(char_offset, result)` pairs in document order, as produced from `split_text`.
+    """
+    tables: List[Tuple[int, TokenTable]] = []
+    sentences: List[SentenceInfo] = []
+    entities: List[EntityHint] = []
+    num_tokens = 0
+
+    for char_offset, result in parts:
+        sentences.extend(_shift_sentences(result.sentences, char_offset, num_tokens, len(sentences)))
+        if len(result.tokens):
+            tables.append((char_offset, _as_table(result.tokens)))
+        entities.extend(shift_entities(result.entities, char_offset))
+        num_tokens += result.meta.get("num_tokens", 0)
+
+    meta = dict(parts[0][1].meta) if parts else {}
+    meta.update({
+        "num_entities": len(entities),
+        "num_chunks": len(parts),
+    })
+    if "num_tokens" in meta:  # the regex engine does not tokenize
+        meta["num_tokens"] = num_tokens
+    if "num_sentences" in meta:
+        meta["num_sentences"] = sum(result.meta["num_sentences"] for _, result in parts)
+    if "profile" in meta:
+        meta["profile"] = merge_profiles(result.meta["profile"] for _, result in parts)
+    if "windowed" in meta:
+        meta["windowed"] = merge_window_stats(result for _, result in parts)
+
+    return PreprocessResult(
+        raw_text=text,
+        tokens=TokenTable.concat(text, tables) if tables else [],
+        sentences=sentences,
+        entities=entities,
+        redacted_text="".join(result.redacted_text for _, result in parts),
+        meta=meta,
+    )
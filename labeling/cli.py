@@ -1,14 +1,54 @@
 import argparse
+import sys
+import time
+from collections import deque
+from functools import partial
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, Sequence, Tuple
 
-from labeling.anonymizer import anonymize, DEFAULT_MODEL, DEFAULT_MAX_LEN
+from labeling.cache import CACHE_DIR_ENV, DEFAULT_CACHE_SIZE, default_cache_path
+from labeling.delta import DEFAULT_CHUNK_CHARS, DELTA_FORMATS
+from labeling.defaults import DEFAULT_BATCH_SIZE, DEFAULT_ENGINE, DEFAULT_MODEL, DEFAULT_MAX_LEN, ENGINES
+from labeling.records import ENTITIES_FIELD, FORMATS, RECORD_FORMATS, detect_format, parse_fields
+from labeling.results import validate_labels
+from labeling.snapshot import SNAPSHOT_DIR_ENV, default_snapshot_dir
+from labeling.streams import SPLIT_MODES, STDIO_PATH, iter_records, open_input, open_output
+
+if TYPE_CHECKING:
+    from labeling.options import PipelineOptions
+
+
+def _label_list(value: str) -> list[str]:
+    labels = [label.strip() for label in value.split(",") if label.strip()]
+    try:
+        validate_labels(labels)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    return labels
+
+
+def _size(value: str) -> int:
+    from labeling.bounded import parse_size
+
+    try:
+        return parse_size(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}") from exc
 
 
 def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Anonymize a plaintext file using spaCy + rule-based detectors.")
-    parser.add_argument("input", type=Path, help="Path to the input text file.")
-    parser.add_argument("-o", "--output", required=True, type=Path, help="Where to write the anonymized text.")
+    parser = argparse.ArgumentParser(
+        description="Anonymize a plaintext file using spaCy + rule-based detectors.",
+        epilog=f"Other commands: {', '.join(COMMANDS)} (run `labeling <command> --help`).",
+    )
+    parser.add_argument("input", type=Path, help="Path to the input text file ('-' for stdin).")
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        type=Path,
+        help="Where to write the anonymized text ('-' for stdout).",
+    )
     parser.add_argument(
         "--model",
         default=DEFAULT_MODEL,
@@ -25,6 +65,130 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="Disable spaCy NER hints (only rule-based entity rulers).",
     )
+    parser.add_argument(
+        "--no-lemmatizer",
+        action="store_true",
+        help="Skip the lemmatizer: religion/sex/age rules match precomputed inflected forms "
+             "(faster, same words; see labeling/pipes/inflections.py). Relative rules still need it.",
+    )
+    parser.add_argument(
+        "--windowed-ner",
+        action="store_true",
+        help="Run the tagger/NER only on windows around capitalised words and gazetteer cues "
+             "(faster on sparse text; see labeling/pipes/windowed.py).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process the input record by record via nlp.pipe and write output incrementally.",
+    )
+    parser.add_argument(
+        "--split",
+        choices=SPLIT_MODES,
+        default="line",
+        help="Record boundaries used by --stream (default: line).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=None,
+        help="Input format; 'jsonl' and 'csv' are streamed row by row and written back in the same "
+             "format (default: from the input extension, .jsonl/.ndjson/.csv, else text).",
+    )
+    parser.add_argument(
+        "--fields",
+        type=parse_fields,
+        default=None,
+        help="Comma-separated fields (CSV columns, dotted paths for nested JSON) to anonymize in "
+             "jsonl/csv input; other fields are copied unchanged (default: every string field).",
+    )
+    parser.add_argument(
+        "--entities",
+        action="store_true",
+        help=f"Add an '{ENTITIES_FIELD}' field with the offsets and labels of what was found (jsonl/csv).",
+    )
+    parser.add_argument(
+        "--delta",
+        choices=DELTA_FORMATS,
+        default=None,
+        help="Write a compact redaction delta (sorted start/end/label edits in characters of the input) "
+             "instead of the anonymized text; `labeling apply-delta` restores the text from it.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Number of records per nlp.pipe batch in --stream and jsonl/csv mode (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own pipeline (default: 1).",
+    )
+    parser.add_argument(
+        "--fork-workers",
+        action="store_true",
+        help="Build the pipeline once and fork the --workers from it (POSIX), sharing the loaded model "
+             "copy-on-write instead of loading it in every worker.",
+    )
+    parser.add_argument(
+        "--labels",
+        type=_label_list,
+        default=None,
+        help="Comma-separated labels to detect (e.g. email,phone,pesel); components they "
+             "do not need are disabled and the chosen pipeline plan is printed.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help="'regex' detects only rule-based labels (PESEL, email, phone, accounts, cards, documents, "
+             f"secrets, ...) without loading spaCy (default: {DEFAULT_ENGINE}).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every pipeline component and post-processing phase and print a per-stage summary to stderr.",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help="Write the per-stage profile as a JSON report to this file (implies --profile).",
+    )
+    parser.add_argument(
+        "--dedup-sentences",
+        action="store_true",
+        help="Run the pipeline once per distinct sentence of each document and reuse the entities "
+             "for repeated sentences (boilerplate-heavy legal texts).",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=_size,
+        default=None,
+        metavar="SIZE",
+        help="Keep the process under this resident memory (e.g. 1G, 800M): the input file is "
+             "memory-mapped and processed and written chunk by chunk, sized to the budget.",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        type=Path,
+        const=default_cache_path(),
+        default=None,
+        metavar="PATH",
+        help="Reuse results for texts seen before from a SQLite cache, invalidated when the rules or model "
+             f"change (default path: ${CACHE_DIR_ENV}/{default_cache_path().name} or {default_cache_path()}).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE // 2**20,
+        metavar="MB",
+        help="Evict least recently used cache entries beyond this size "
+             f"(default: {DEFAULT_CACHE_SIZE // 2**20} MB).",
+    )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -33,22 +197,498 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 
+def _pipeline_options(args: argparse.Namespace) -> "PipelineOptions":
+    """The pipeline options of a command's arguments; commands without --profile are not profiled."""
+    from labeling.options import PipelineOptions
+
+    return PipelineOptions(
+        model=args.model,
+        max_length=args.max_length,
+        use_ner_hints=not args.no_ner_hints,
+        labels=args.labels,
+        engine=args.engine,
+        workers=args.workers,
+        fork_workers=args.fork_workers,
+        cache=args.cache,
+        cache_size=args.cache_size * 2**20,
+        dedup=args.dedup_sentences,
+        lemmatizer=not args.no_lemmatizer,
+        windowed=args.windowed_ner,
+        profile=getattr(args, "profile", False),
+        profile_output=getattr(args, "profile_output", None),
+    )
+
+
+def _stream(args: argparse.Namespace) -> int:
+    from labeling.anonymizer import anonymize_stream
+
+    separators: Deque[str] = deque()
+
+    def texts(records: Iterable[Tuple[str, str]]) -> Iterator[str]:
+        for text, separator in records:
+            separators.append(separator)
+            yield text
+
+    count = 0
+    with open_input(args.input) as src, open_output(args.output) as dst:
+        results = anonymize_stream(
+            texts(iter_records(src, args.split)),
+            options=_pipeline_options(args),
+            batch_size=args.batch_size,
+            verbose=not args.quiet,
+        )
+        for redacted in results:
+            dst.write(redacted)
+            dst.write(separators.popleft())
+            count += 1
+            if count % args.batch_size == 0:
+                dst.flush()
+
+    return 0
+
+
+def _records(args: argparse.Namespace, fmt: str) -> int:
+    from labeling.anonymizer import anonymize_records
+    from labeling.records import RecordWriter, read_records
+
+    count = 0
+    with open_input(args.input) as src, open_output(args.output) as dst:
+        fieldnames, records = read_records(src, fmt)
+        if fieldnames is not None and args.entities and ENTITIES_FIELD not in fieldnames:
+            fieldnames.append(ENTITIES_FIELD)
+        writer = RecordWriter(dst, fmt, fieldnames)
+        results = anonymize_records(
+            records,
+            fields=args.fields,
+            with_entities=args.entities,
+            options=_pipeline_options(args),
+            batch_size=args.batch_size,
+            verbose=not args.quiet,
+        )
+        for record in results:
+            writer.write(record)
+            count += 1
+            if count % args.batch_size == 0:
+                dst.flush()
+
+    return 0
+
+
+def _bounded(args: argparse.Namespace) -> int:
+    from labeling.anonymizer import anonymize_file
+
+    if str(args.input) == STDIO_PATH:
+        raise ValueError("--max-memory needs an input file; stdin cannot be memory-mapped.")
+    if args.workers > 1 or args.fork_workers:
+        raise ValueError("--max-memory bounds a single process; it cannot be combined with --workers.")
+    with open_output(args.output) as dst:
+        anonymize_file(
+            args.input,
+            dst,
+            max_memory=args.max_memory,
+            options=_pipeline_options(args),
+            verbose=not args.quiet,
+        )
+    return 0
+
+
+def _delta(args: argparse.Namespace, fmt: str) -> int:
+    from labeling.anonymizer import anonymize
+    from labeling.delta import open_delta_output, write_delta
+
+    if fmt in RECORD_FORMATS or args.stream or args.max_memory is not None:
+        raise ValueError("--delta describes one text document; it cannot be combined with --stream, "
+                         "--max-memory or jsonl/csv input.")
+    to_stdout = str(args.output) == STDIO_PATH
+    with open_input(args.input) as src:
+        text = src.read()
+    edits = anonymize(
+        text,
+        options=_pipeline_options(args),
+        verbose=not args.quiet and not to_stdout,
+        delta=True,
+    )
+    with open_delta_output(args.output) as dst:
+        size = write_delta(dst, edits, len(text), args.delta)
+    if not args.quiet and not to_stdout:
+        print(f"Redaction delta ({len(edits)} edits, {size:,} bytes) written to {args.output}")
+    return 0
+
+
+def apply_delta_main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="labeling apply-delta",
+        description="Write the anonymized text for an original text and its redaction delta (from --delta), "
+                    "reading both incrementally.",
+    )
+    parser.add_argument("input", type=Path, help="Path to the original text file ('-' for stdin).")
+    parser.add_argument("delta", type=Path, help="Path to the delta, binary or jsonl (detected from its header).")
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        type=Path,
+        help="Where to write the anonymized text ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_CHARS,
+        help=f"Characters of the original read at a time (default: {DEFAULT_CHUNK_CHARS}).",
+    )
+    args = parser.parse_args(argv)
+
+    from labeling.delta import apply_delta, open_delta_input, read_delta
+
+    if str(args.input) == STDIO_PATH and str(args.delta) == STDIO_PATH:
+        raise ValueError("Only one of the original text and the delta can be read from stdin.")
+    with open_input(args.input) as src, open_delta_input(args.delta) as delta, open_output(args.output) as dst:
+        length, edits = read_delta(delta)
+        chunks = iter(partial(src.read, args.chunk_size), "")
+        for part in apply_delta(chunks, edits, length):
+            dst.write(part)
+    return 0
+
+
+def build_snapshot_main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="labeling build-snapshot",
+        description="Serialise the fully configured pipeline so later runs can skip rebuilding it.",
+    )
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        help=f"spaCy model to snapshot (default: {DEFAULT_MODEL}).",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        default=None,
+        help=f"Snapshot root directory (default: ${SNAPSHOT_DIR_ENV} or {default_snapshot_dir()}).",
+    )
+    args = parser.parse_args(argv)
+
+    from labeling.anonymizer import build_snapshot
+
+    start_time = time.time()
+    path = build_snapshot(model=args.model, snapshot_dir=args.snapshot_dir)
+    print(f"Snapshot written to {path} in {time.time() - start_time:.2f} seconds")
+    return 0
+
+
+def serve_main(argv: Sequence[str]) -> int:
+    from labeling.service import DEFAULT_HOST, DEFAULT_MAX_QUEUE, DEFAULT_MAX_WAIT, DEFAULT_PORT
+
+    parser = argparse.ArgumentParser(
+        prog="labeling serve",
+        description="Serve anonymization over HTTP with the pipeline kept in memory and concurrent "
+                    "requests coalesced into batches (POST /anonymize, GET /health).",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to bind (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to bind (default: {DEFAULT_PORT}).")
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        help=f"spaCy model to load (default: {DEFAULT_MODEL}).",
+    )
+    parser.add_argument(
+        "--max-length",
+        type=int,
+        default=DEFAULT_MAX_LEN,
+        help=f"Override spaCy max_length (default: {DEFAULT_MAX_LEN}).",
+    )
+    parser.add_argument(
+        "--no-ner-hints",
+        action="store_true",
+        help="Disable spaCy NER hints (only rule-based entity rulers).",
+    )
+    parser.add_argument(
+        "--no-lemmatizer",
+        action="store_true",
+        help="Skip the lemmatizer: religion/sex/age rules match precomputed inflected forms "
+             "(faster, same words; see labeling/pipes/inflections.py). Relative rules still need it.",
+    )
+    parser.add_argument(
+        "--windowed-ner",
+        action="store_true",
+        help="Run the tagger/NER only on windows around capitalised words and gazetteer cues "
+             "(faster on sparse text; see labeling/pipes/windowed.py).",
+    )
+    parser.add_argument(
+        "--labels",
+        type=_label_list,
+        default=None,
+        help="Comma-separated labels to detect; components they do not need are disabled.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Detection engine (default: {DEFAULT_ENGINE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes the batches are distributed over (default: 1).",
+    )
+    parser.add_argument(
+        "--fork-workers",
+        action="store_true",
+        help="Build the pipeline once and fork the --workers from it (POSIX), sharing the loaded model "
+             "copy-on-write instead of loading it in every worker.",
+    )
+    parser.add_argument(
+        "--dedup-sentences",
+        action="store_true",
+        help="Run the pipeline once per distinct sentence of each text and reuse the entities "
+             "for repeated sentences.",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Maximum number of texts per pipeline batch (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT * 1000,
+        help="How long to wait for more requests before running a batch "
+             f"(default: {DEFAULT_MAX_WAIT * 1000:g} ms).",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help=f"Requests allowed to wait before new ones get 503 (default: {DEFAULT_MAX_QUEUE}).",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        type=Path,
+        const=default_cache_path(),
+        default=None,
+        metavar="PATH",
+        help="Reuse results for texts seen before from a SQLite cache, invalidated when the rules or model "
+             f"change (default path: ${CACHE_DIR_ENV}/{default_cache_path().name} or {default_cache_path()}).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE // 2**20,
+        metavar="MB",
+        help="Evict least recently used cache entries beyond this size "
+             f"(default: {DEFAULT_CACHE_SIZE // 2**20} MB).",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args(argv)
+
+    from labeling.anonymizer import _make_preprocessor
+    from labeling.service import serve
+
+    preprocessor = _make_preprocessor(_pipeline_options(args), nlp=None, return_full=False, verbose=True)
+    try:
+        serve(
+            preprocessor,
+            host=args.host,
+            port=args.port,
+            max_batch=args.max_batch,
+            max_wait=args.max_wait_ms / 1000,
+            max_queue=args.max_queue,
+            engine=args.engine,
+            verbose=args.verbose,
+        )
+    finally:
+        if hasattr(preprocessor, "close"):
+            preprocessor.close()
+    return 0
+
+
+def batch_main(argv: Sequence[str]) -> int:
+    from labeling.batch import DEFAULT_GLOB, MANIFEST_NAME
+
+    parser = argparse.ArgumentParser(
+        prog="labeling batch",
+        description="Anonymize every matching file of a directory tree with one pipeline load; "
+                    "a manifest of finished files lets an interrupted run resume.",
+    )
+    parser.add_argument("in_dir", type=Path, help="Directory with the input files.")
+    parser.add_argument("out_dir", type=Path, help="Directory for the anonymized files (same relative paths).")
+    parser.add_argument(
+        "--glob",
+        default=DEFAULT_GLOB,
+        help=f"Files to process, relative to in_dir (default: {DEFAULT_GLOB}).",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help=f"Manifest of finished files (default: out_dir/{MANIFEST_NAME}).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Process every file again, ignoring the manifest.",
+    )
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        help=f"spaCy model to load (default: {DEFAULT_MODEL}).",
+    )
+    parser.add_argument(
+        "--max-length",
+        type=int,
+        default=DEFAULT_MAX_LEN,
+        help=f"Override spaCy max_length (default: {DEFAULT_MAX_LEN}).",
+    )
+    parser.add_argument(
+        "--no-ner-hints",
+        action="store_true",
+        help="Disable spaCy NER hints (only rule-based entity rulers).",
+    )
+    parser.add_argument(
+        "--no-lemmatizer",
+        action="store_true",
+        help="Skip the lemmatizer: religion/sex/age rules match precomputed inflected forms "
+             "(faster, same words; see labeling/pipes/inflections.py). Relative rules still need it.",
+    )
+    parser.add_argument(
+        "--windowed-ner",
+        action="store_true",
+        help="Run the tagger/NER only on windows around capitalised words and gazetteer cues "
+             "(faster on sparse text; see labeling/pipes/windowed.py).",
+    )
+    parser.add_argument(
+        "--labels",
+        type=_label_list,
+        default=None,
+        help="Comma-separated labels to detect; components they do not need are disabled.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Detection engine (default: {DEFAULT_ENGINE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, each with its own pipeline (default: 1).",
+    )
+    parser.add_argument(
+        "--fork-workers",
+        action="store_true",
+        help="Build the pipeline once and fork the --workers from it (POSIX), sharing the loaded model "
+             "copy-on-write instead of loading it in every worker.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Number of files per nlp.pipe batch (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--dedup-sentences",
+        action="store_true",
+        help="Run the pipeline once per distinct sentence of each file.",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        type=Path,
+        const=default_cache_path(),
+        default=None,
+        metavar="PATH",
+        help=f"Reuse results for texts seen before from a SQLite cache (default path: {default_cache_path()}).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE // 2**20,
+        metavar="MB",
+        help=f"Evict least recently used cache entries beyond this size (default: {DEFAULT_CACHE_SIZE // 2**20} MB).",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Suppress progress and summary output.")
+    args = parser.parse_args(argv)
+
+    if not args.in_dir.is_dir():
+        raise FileNotFoundError(f"Input directory not found: {args.in_dir}")
+
+    from labeling.anonymizer import anonymize_directory
+
+    try:
+        summary = anonymize_directory(
+            args.in_dir,
+            args.out_dir,
+            pattern=args.glob,
+            manifest=args.manifest,
+            model=args.model,
+            max_length=args.max_length,
+            use_ner_hints=not args.no_ner_hints,
+            batch_size=args.batch_size,
+            verbose=not args.quiet,
+            workers=args.workers,
+            labels=args.labels,
+            engine=args.engine,
+            cache=args.cache,
+            cache_size=args.cache_size * 2**20,
+            dedup=args.dedup_sentences,
+            force=args.force,
+            lemmatizer=not args.no_lemmatizer,
+            windowed=args.windowed_ner,
+            fork_workers=args.fork_workers,
+        )
+    except KeyboardInterrupt:
+        # Finished files are in the manifest; rerunning the same command resumes.
+        print("Interrupted; rerun the same command to resume.", file=sys.stderr)
+        return 130
+    return 1 if summary.failed else 0
+
+
+COMMANDS = {
+    "apply-delta": apply_delta_main,
+    "batch": batch_main,
+    "build-snapshot": build_snapshot_main,
+    "serve": serve_main,
+}
+
+
 def main(argv: Sequence[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in COMMANDS:
+        return COMMANDS[argv[0]](argv[1:])
+
     args = parse_args(argv)
 
-    if not args.input.exists():
+    if str(args.input) != STDIO_PATH and not args.input.exists():
         raise FileNotFoundError(f"Input file not found: {args.input}")
 
-    text = args.input.read_text(encoding="utf-8")
+    fmt = args.format or detect_format(args.input)
+    if args.delta is not None:
+        return _delta(args, fmt)
+    if fmt in RECORD_FORMATS:
+        return _records(args, fmt)
+    if args.max_memory is not None:
+        return _bounded(args)
+    if args.stream:
+        return _stream(args)
+
+    from labeling.anonymizer import anonymize
+
+    # Keep stdout clean for the anonymized text when it is the output target.
+    to_stdout = str(args.output) == STDIO_PATH
+    with open_input(args.input) as src:
+        text = src.read()
     redacted = anonymize(
         text,
-        model=args.model,
-        max_length=args.max_length,
-        use_ner_hints=not args.no_ner_hints,
-        verbose=not args.quiet,
+        options=_pipeline_options(args),
+        verbose=not args.quiet and not to_stdout,
     )
-    args.output.write_text(redacted, encoding="utf-8")
-    if not args.quiet:
+    with open_output(args.output) as dst:
+        dst.write(redacted)
+    if not args.quiet and not to_stdout:
         print(f"Anonymized text written to {args.output}")
     return 0
 
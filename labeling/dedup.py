@@ -0,0 +1,235 @@
+"""
+Sentence-level memoisation inside a document.
+
+Legal and administrative texts repeat whole sentences (instructions,
+POUCZENIE blocks, closing formulas) many times. `DedupPreprocessor` cuts a
+document into sentences with a cheap regex (`labeling.chunking.split_sentences`),
+keys every sentence by its whitespace-normalised text and runs the wrapped
+preprocessor only once per distinct sentence. The entities found there are mapped onto every occurrence
+and its redacted text is rebuilt from its own characters, so line wrapping or
+double spaces inside a repeat do not prevent a match.
+
+Sentences are processed without their neighbours, so the statistical NER sees
+less context than on the whole document (as with sharding in
+`labeling.parallel`), and results carry no token or sentence views.
+"""
+
+import re
+import time
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from labeling.chunking import merge_window_stats, shift_entities, split_sentences
+from labeling.defaults import DEFAULT_BATCH_SIZE
+from labeling.profiling import Profile, merge_profiles, record
+from labeling.results import EntityHint, PreprocessResult
+from labeling.spans import redact_text
+
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+# Shorter repeats ("PS.", "Dziękuję!") are cheaper to process again than to cut the text around.
+MIN_REPEAT_CHARS = 80
+
+
+def normalize_sentence(sentence: str) -> str:
+    return _WHITESPACE_RUN_RE.sub(" ", sentence)
+
+
+class _WhitespaceMap:
+    """Offsets between a sentence and its `normalize_sentence` form."""
+
+    __slots__ = ("_original", "_normalized", "_shifts")
+
+    def __init__(self, sentence: str) -> None:
+        # Breakpoints after every whitespace run that normalisation changes, with the shift there.
+        self._original, self._normalized, self._shifts = [0], [0], [0]
+        shift = 0
+        for match in _WHITESPACE_RUN_RE.finditer(sentence):
+            if match.group() != " ":
+                shift += len(match.group()) - 1
+                self._original.append(match.end())
+                self._normalized.append(match.end() - shift)
+                self._shifts.append(shift)
+
+    def to_original(self, pos: int) -> int:
+        return pos + self._shifts[bisect_right(self._normalized, pos) - 1]
+
+    def to_normalized(self, pos: int) -> int:
+        return pos - self._shifts[bisect_right(self._original, pos) - 1]
+
+
+# Entities of a distinct sentence, as (start, end, label) in its normalised text.
+_Memo = List[Tuple[int, int, str]]
+
+
+def _memoize(sentence: str, entities: List[EntityHint], offset: int) -> _Memo:
+    mapping = _WhitespaceMap(sentence)
+    return [
+        (
+            mapping.to_normalized(ent.start_char - offset),
+            mapping.to_normalized(ent.end_char - offset - 1) + 1,
+            ent.label,
+        )
+        for ent in entities
+    ]
+
+
+def _recall(sentence: str, memo: _Memo) -> List[EntityHint]:
+    mapping = _WhitespaceMap(sentence)
+    entities = []
+    for start, end, label in memo:
+        start, end = mapping.to_original(start), mapping.to_original(end - 1) + 1
+        entities.append(EntityHint(text=sentence[start:end], label=label, start_char=start, end_char=end))
+    return entities
+
+
+class DedupPreprocessor:
+    """
+    Run `preprocessor` once per distinct sentence of a document and splice the results back.
+
+    Only repeats of at least `MIN_REPEAT_CHARS` characters are reused; everything between
+    them is processed as one slice of the original text, so only the repeats lose their
+    context. A repeat whose first occurrence had an entity crossing the sentence boundary
+    is processed on its own instead.
+
+    Has the call/pipe interface of the preprocessors it wraps; every result carries
+    `meta["dedup"]` with the sentence counts, the share of characters that were
+    skipped as repeats and an estimate of the time this saved.
+
+    Args:
+        preprocessor: Redact-only preprocessor (`SpacyPreprocessor`, `RegexPreprocessor`, ...).
+        batch_size: Number of slices handed to `preprocessor.pipe` per batch.
+    """
+
+    def __init__(self, preprocessor, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.preprocessor = preprocessor
+        self.batch_size = batch_size
+
+    @property
+    def workers(self) -> int:
+        return getattr(self.preprocessor, "workers", 1)
+
+    def __call__(self, text: str) -> PreprocessResult:
+        start_time = time.perf_counter()
+        spans = split_sentences(text)
+        keys = [normalize_sentence(text[start:end]) for start, end in spans]
+        first: Dict[str, int] = {}
+        for position, key in enumerate(keys):
+            first.setdefault(key, position)
+        repeats = [
+            first[key] != position and len(key) >= MIN_REPEAT_CHARS for position, key in enumerate(keys)
+        ]
+        if not any(repeats):
+            return self.preprocessor(text)
+        repeated = {keys[position] for position, repeat in enumerate(repeats) if repeat}
+
+        # Maximal runs [i, j) of sentences that are not reused repeats.
+        runs: List[Tuple[int, int]] = []
+        position = 0
+        while position < len(spans):
+            end = position
+            while end < len(spans) and not repeats[end]:
+                end += 1
+            if end > position:
+                runs.append((position, end))
+            position = max(end, position + 1)
+        segment_seconds = time.perf_counter() - start_time
+
+        pipeline_start = time.perf_counter()
+        slices = [text[spans[i][0]:spans[j - 1][1]] for i, j in runs]
+        results = list(self.preprocessor.pipe(slices, batch_size=self.batch_size))
+
+        memos: Dict[str, _Memo] = {}
+        starts = [start for start, _ in spans]
+        for (i, j), result in zip(runs, results):
+            offset = spans[i][0]
+            grouped: Dict[int, List[EntityHint]] = {position: [] for position in range(i, j)}
+            crossing = set()
+            for ent in result.entities:
+                position = bisect_right(starts, ent.start_char + offset) - 1
+                if ent.end_char + offset > spans[position][1]:
+                    crossing.add(position)
+                else:
+                    grouped[position].append(ent)
+            for position, entities in grouped.items():
+                if position not in crossing and keys[position] in repeated and keys[position] not in memos:
+                    start, end = spans[position]
+                    memos[keys[position]] = _memoize(text[start:end], entities, start - offset)
+
+        # Repeats of sentences that could not be memoised are processed on their own.
+        leftovers = [position for position, key in enumerate(keys) if repeats[position] and key not in memos]
+        leftover_results = dict(zip(
+            leftovers,
+            self.preprocessor.pipe([text[spans[p][0]:spans[p][1]] for p in leftovers], batch_size=self.batch_size),
+        ))
+        pipeline_seconds = time.perf_counter() - pipeline_start
+
+        splice_start = time.perf_counter()
+        run_at = {i: (j, result) for (i, j), result in zip(runs, results)}
+        entities: List[EntityHint] = []
+        parts: List[str] = []
+        cursor = 0
+        position = 0
+        while position < len(spans):
+            start = spans[position][0]
+            parts.append(text[cursor:start])
+            if position in run_at:
+                position, result = run_at[position]
+                entities.extend(shift_entities(result.entities, start))
+                parts.append(result.redacted_text)
+                cursor = spans[position - 1][1]
+                continue
+            end = spans[position][1]
+            if position in leftover_results:
+                result = leftover_results[position]
+                entities.extend(shift_entities(result.entities, start))
+                parts.append(result.redacted_text)
+            else:
+                sentence = text[start:end]
+                recalled = _recall(sentence, memos[keys[position]])
+                entities.extend(shift_entities(recalled, start))
+                parts.append(redact_text(sentence, recalled))
+            cursor = end
+            position += 1
+        parts.append(text[cursor:])
+
+        total_chars = len(text)
+        processed_chars = sum(map(len, slices)) + sum(spans[p][1] - spans[p][0] for p in leftovers)
+        meta = {key: value for key, value in results[0].meta.items() if key not in ("profile", "cached")}
+        meta.pop("num_tokens", None)  # repeats are never tokenized
+        meta["num_entities"] = len(entities)
+        meta["dedup"] = {
+            "sentences": len(spans),
+            "unique_sentences": len(first),
+            "chars": total_chars,
+            "processed_chars": processed_chars,
+            "ratio": 1 - processed_chars / total_chars,
+            "pipeline_seconds": pipeline_seconds,
+            # What the repeats would have cost at the pipeline's measured per-character rate.
+            "saved_seconds": pipeline_seconds * (total_chars - processed_chars) / processed_chars,
+        }
+        all_results = results + list(leftover_results.values())
+        if "windowed" in results[0].meta:
+            meta["windowed"] = merge_window_stats(all_results)
+        if "profile" in results[0].meta:
+            profile: Profile = merge_profiles(result.meta["profile"] for result in all_results)
+            record(profile, "dedup.segment", segment_seconds, ents_out=len(spans))
+            record(profile, "dedup.splice", time.perf_counter() - splice_start, ents_out=len(entities))
+            meta["profile"] = profile
+
+        return PreprocessResult(
+            raw_text=text,
+            tokens=[],
+            sentences=[],
+            entities=entities,
+            redacted_text="".join(parts),
+            meta=meta,
+        )
+
+    def pipe(self, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[PreprocessResult]:
+        """Deduplicate every text on its own; repeats across texts are the result cache's job."""
+        for text in texts:
+            yield self(text)
+
+    def close(self) -> None:
+        if hasattr(self.preprocessor, "close"):
+            self.preprocessor.close()
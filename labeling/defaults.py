@@ -0,0 +1,9 @@
+# Lightweight constants shared by the CLI and the pipeline; importing this module must not pull in spaCy.
+
+DEFAULT_MODEL = "pl_core_news_md"
+DEFAULT_MAX_LEN = 2_000_000
+DEFAULT_BATCH_SIZE = 64
+
+# "spacy" runs the full pipeline; "regex" detects only rule-based labels and never loads a model.
+ENGINES = ("spacy", "regex")
+DEFAULT_ENGINE = "spacy"
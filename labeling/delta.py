@@ -0,0 +1,182 @@
+"""
+Redaction deltas: what was redacted and where, without a copy of the text.
+
+A delta is the sorted list of `(start, end, label)` edits `redact_text` applies
+to a document (character offsets into the original, non-overlapping), plus
+the length of the original so a delta cannot silently be applied to another
+text. `apply_delta` turns the original and its delta back into the redacted
+text lazily, chunk by chunk, so neither has to be read whole.
+
+Two encodings are written by `write_delta` and recognised by `read_delta`:
+- "jsonl": a header line `{"delta": 1, "length": N}`, then one
+  `[start, end, "label"]` line per edit;
+- "binary": `BINARY_MAGIC`, the length, then per edit the gap since the
+  previous edit's end, the edit's length and a label code, all as unsigned
+  LEB128 varints. A code equal to the number of labels seen so far introduces
+  a new label, followed by its UTF-8 byte length and bytes.
+"""
+
+import json
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import BinaryIO, ContextManager, Dict, Iterable, Iterator, List, Tuple
+
+from labeling.results import EntityHint
+from labeling.spans import select_non_overlapping
+from labeling.streams import STDIO_PATH
+
+DELTA_FORMATS = ("jsonl", "binary")
+DELTA_VERSION = 1
+BINARY_MAGIC = b"LDELTA1\n"
+# Characters of the original `labeling apply-delta` reads at a time.
+DEFAULT_CHUNK_CHARS = 1 << 20
+
+Edit = Tuple[int, int, str]
+
+
+def redaction_delta(entities: Iterable[EntityHint]) -> List[Edit]:
+    """The edits `redact_text` makes for `entities` (in any order)."""
+    return [(ent.start_char, ent.end_char, ent.label) for ent in select_non_overlapping(entities)]
+
+
+def apply_delta(chunks: Iterable[str], edits: Iterable[Edit], length: int | None = None) -> Iterator[str]:
+    """
+    Yield the redacted text for the original text given as consecutive `chunks`.
+
+    Edits may span chunk boundaries. Raises ValueError when the edits are not sorted and
+    non-overlapping, reach past the text, or the text does not have `length` characters.
+    """
+    edits = iter(edits)
+    pending = next(edits, None)
+    position = 0  # offset of the current chunk in the original
+    cursor = 0  # the original is copied or replaced up to here
+
+    for chunk in chunks:
+        limit = position + len(chunk)
+        while pending is not None and pending[0] < limit:
+            start, end, label = pending
+            if start < cursor or end < start:
+                raise ValueError(f"Delta edits are not sorted and non-overlapping at offset {start}.")
+            if cursor < start:
+                yield chunk[cursor - position:start - position]
+            yield f"[{label}]"
+            cursor = end
+            pending = next(edits, None)
+        if cursor < limit:
+            yield chunk[cursor - position:]
+            cursor = limit
+        position = limit
+
+    if pending is not None or cursor > position:
+        raise ValueError(f"Delta edits reach past the end of the text ({position} characters).")
+    if length is not None and position != length:
+        raise ValueError(f"The delta was made for a text of {length} characters, got {position}.")
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _encode_binary(edits: Iterable[Edit], length: int) -> Iterator[bytes]:
+    yield BINARY_MAGIC + _varint(length)
+    codes: Dict[str, int] = {}
+    cursor = 0
+    for start, end, label in edits:
+        code = codes.get(label)
+        record = _varint(start - cursor) + _varint(end - start)
+        if code is None:
+            name = label.encode("utf-8")
+            record += _varint(len(codes)) + _varint(len(name)) + name
+            codes[label] = len(codes)
+        else:
+            record += _varint(code)
+        cursor = end
+        yield record
+
+
+def _encode_jsonl(edits: Iterable[Edit], length: int) -> Iterator[bytes]:
+    yield json.dumps({"delta": DELTA_VERSION, "length": length}).encode("utf-8") + b"\n"
+    for edit in edits:
+        yield json.dumps(list(edit), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def write_delta(dst: BinaryIO, edits: Iterable[Edit], length: int, fmt: str = "binary") -> int:
+    """Write the delta of a `length`-character text to `dst`; returns the bytes written."""
+    if fmt not in DELTA_FORMATS:
+        raise ValueError(f"Unknown delta format {fmt!r}; expected one of: {', '.join(DELTA_FORMATS)}")
+    encode = _encode_binary if fmt == "binary" else _encode_jsonl
+    written = 0
+    for data in encode(edits, length):
+        written += dst.write(data)
+    return written
+
+
+def _read_varint(src: BinaryIO) -> int | None:
+    value = shift = 0
+    while True:
+        byte = src.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("Truncated binary delta.")
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+def _require(value: int | None) -> int:
+    if value is None:
+        raise ValueError("Truncated binary delta.")
+    return value
+
+
+def _decode_binary(src: BinaryIO) -> Iterator[Edit]:
+    labels: List[str] = []
+    cursor = 0
+    while (gap := _read_varint(src)) is not None:
+        start = cursor + gap
+        cursor = start + _require(_read_varint(src))
+        code = _require(_read_varint(src))
+        if code == len(labels):
+            size = _require(_read_varint(src))
+            labels.append(src.read(size).decode("utf-8"))
+        elif code > len(labels):
+            raise ValueError(f"Unknown label code {code} in binary delta.")
+        yield start, cursor, labels[code]
+
+
+def _decode_jsonl(src: BinaryIO) -> Iterator[Edit]:
+    for line in src:
+        if line.strip():
+            start, end, label = json.loads(line)
+            yield start, end, label
+
+
+def read_delta(src: BinaryIO) -> Tuple[int, Iterator[Edit]]:
+    """Return the original text length and a lazy iterator over the edits of a delta in either format."""
+    head = src.read(len(BINARY_MAGIC))
+    if head == BINARY_MAGIC:
+        return _require(_read_varint(src)), _decode_binary(src)
+    header = json.loads(head + src.readline())
+    if not isinstance(header, dict) or header.get("delta") != DELTA_VERSION:
+        raise ValueError("Not a redaction delta (expected a binary or JSONL delta header).")
+    return header["length"], _decode_jsonl(src)
+
+
+def open_delta_input(path: Path) -> ContextManager[BinaryIO]:
+    if str(path) == STDIO_PATH:
+        return nullcontext(sys.stdin.buffer)
+    return path.open("rb")
+
+
+def open_delta_output(path: Path) -> ContextManager[BinaryIO]:
+    if str(path) == STDIO_PATH:
+        return nullcontext(sys.stdout.buffer)
+    return path.open("wb")
@@ -0,0 +1,291 @@
+"""
+Incremental re-anonymization of edited documents.
+
+`update_result` takes the result of a previous run and the edited text, finds
+the changed regions with a line diff (narrowed to the characters that differ),
+reprocesses every change together with a margin of unchanged context and only
+shifts the entities everywhere else.
+
+Windows are cut at whitespace and widened until no previous entity crosses
+their edges. In the outer half of the margins the new result must agree with
+the previous one, otherwise the edit influences more than the window (e.g. it
+completes a rule prefix) and the margin is doubled. Once the windows would cover half of
+the document a full run is cheaper and is done instead. The pipeline work
+therefore scales with the size of the edit; the diff and the final redaction
+are linear passes over the text.
+
+For the rule-based labels this reproduces a full run exactly. The statistical
+NER only sees the window, which is checked at its margins but not inside it.
+Results carry no token or sentence views.
+"""
+
+from bisect import bisect_left, bisect_right
+from difflib import SequenceMatcher
+from itertools import accumulate
+from typing import Iterable, List, Tuple
+
+from labeling.chunking import merge_window_stats, shift_entities
+from labeling.results import EntityHint, PreprocessResult
+from labeling.spans import redact_text
+
+DEFAULT_MARGIN = 256
+# Above this share of the document covered by windows, rerun the whole document instead.
+MAX_WINDOW_SHARE = 0.5
+_BLOCK = 4096
+
+# (old_start, old_end, new_start, new_end) of a region that differs between the texts.
+Change = Tuple[int, int, int, int]
+Window = Tuple[int, int]
+
+
+def _common_prefix(a: str, b: str) -> int:
+    # Compare blocks, then bisect inside the first differing one; both keep the character loop in C.
+    limit = min(len(a), len(b))
+    pos = 0
+    while pos < limit and a[pos:pos + _BLOCK] == b[pos:pos + _BLOCK]:
+        pos += _BLOCK
+    lo, hi = pos, min(pos + _BLOCK, limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[pos:mid] == b[pos:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return min(lo, limit)
+
+
+def _common_suffix(a: str, b: str) -> int:
+    limit = min(len(a), len(b))
+    pos = 0
+    while pos < limit:
+        block = min(_BLOCK, limit - pos)
+        if a[len(a) - pos - block:len(a) - pos] != b[len(b) - pos - block:len(b) - pos]:
+            break
+        pos += block
+    lo, hi = pos, min(pos + _BLOCK, limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - pos] == b[len(b) - mid:len(b) - pos]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return min(lo, limit)
+
+
+def diff_regions(old: str, new: str) -> List[Change]:
+    """Return the regions where `old` and `new` differ, in document order."""
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old[prefix:], new[prefix:])
+    old_lines = old[prefix:len(old) - suffix].splitlines(keepends=True)
+    new_lines = new[prefix:len(new) - suffix].splitlines(keepends=True)
+    old_offsets = list(accumulate(map(len, old_lines), initial=prefix))
+    new_offsets = list(accumulate(map(len, new_lines), initial=prefix))
+
+    changes: List[Change] = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        old_start, old_end, new_start, new_end = old_offsets[i1], old_offsets[i2], new_offsets[j1], new_offsets[j2]
+        # Narrow the changed lines to the characters that actually differ.
+        head = _common_prefix(old[old_start:old_end], new[new_start:new_end])
+        old_start, new_start = old_start + head, new_start + head
+        tail = _common_suffix(old[old_start:old_end], new[new_start:new_end])
+        changes.append((old_start, old_end - tail, new_start, new_end - tail))
+    return changes
+
+
+def _old_to_new(changes: List[Change], old_ends: List[int], pos: int, before: bool) -> int:
+    """Map an old offset to the new text; offsets inside a change go to its start (`before`) or end."""
+    i = bisect_right(old_ends, pos) - 1
+    if i + 1 < len(changes) and changes[i + 1][0] < pos:
+        old_start, _, new_start, new_end = changes[i + 1]
+        return new_start if before else new_end
+    if i < 0:
+        return pos
+    _, old_end, _, new_end = changes[i]
+    return pos - old_end + new_end
+
+
+def _touches_change(changes: List[Change], old_ends: List[int], start: int, end: int) -> bool:
+    """Whether the old span [start, end) overlaps or borders a change."""
+    i = bisect_left(old_ends, start)
+    return i < len(changes) and changes[i][0] <= end
+
+
+def _snap_back(text: str, pos: int) -> int:
+    pos = max(0, pos)
+    while pos > 0 and not text[pos - 1].isspace():
+        pos -= 1
+    return pos
+
+
+def _snap_forward(text: str, pos: int) -> int:
+    pos = min(len(text), pos)
+    while pos < len(text) and not text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _union(spans: Iterable[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in sorted(spans):
+        if starts and start < ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def _windows(text: str, changes: List[Change], margin: int, blocked: Tuple[List[int], List[int]]) -> List[Window]:
+    """Windows around `changes` (new coordinates), cut at whitespace outside every `blocked` span."""
+    starts, ends = blocked
+
+    def inside(pos: int) -> int:
+        i = bisect_right(starts, pos) - 1
+        return i if i >= 0 and starts[i] < pos < ends[i] else -1
+
+    windows: List[Window] = []
+    for _, _, new_start, new_end in changes:
+        start, end = new_start - margin, new_end + margin
+        while True:
+            start = _snap_back(text, start)
+            i = inside(start)
+            if i < 0:
+                break
+            start = starts[i]
+        while True:
+            end = _snap_forward(text, end)
+            i = inside(end)
+            if i < 0:
+                break
+            end = ends[i]
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(end, windows[-1][1]))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def _key(ent: EntityHint) -> Tuple[int, int, str]:
+    return ent.start_char, ent.end_char, ent.label
+
+
+def update_result(
+        preprocessor,
+        previous: PreprocessResult,
+        text: str,
+        margin: int = DEFAULT_MARGIN,
+) -> PreprocessResult:
+    """
+    Re-anonymize `text`, an edited version of `previous.raw_text`, reprocessing only what changed.
+
+    Args:
+        preprocessor: The preprocessor `previous` came from (same engine, labels and options).
+        previous: Result of the previous run (its entities and raw text are used).
+        text: The edited document.
+        margin: Initial context in characters reprocessed on both sides of every change.
+
+    `meta["incremental"]` reports the windows, the reprocessed characters, the margin
+    that was needed and whether the document was rerun in full.
+    """
+    old = previous.raw_text
+    changes = diff_regions(old, text)
+    stats = {"chars": len(text), "changes": len(changes), "windows": 0, "reprocessed_chars": 0, "full_run": False}
+    if not changes:
+        meta = {**previous.meta, "incremental": {**stats, "margin": 0}}
+        return PreprocessResult(
+            raw_text=text, tokens=[], sentences=[], entities=list(previous.entities),
+            redacted_text=previous.redacted_text, meta=meta,
+        )
+
+    old_ends = [change[1] for change in changes]
+    # Previous entities in new coordinates; those overlapping a change end up inside its window.
+    mapped = [
+        EntityHint(
+            text=ent.text,
+            label=ent.label,
+            start_char=_old_to_new(changes, old_ends, ent.start_char, before=True),
+            end_char=_old_to_new(changes, old_ends, ent.end_char, before=False),
+        )
+        for ent in previous.entities
+    ]
+    blocked = _union((ent.start_char, ent.end_char) for ent in mapped)
+    new_starts = [change[2] for change in changes]
+    # Previous entities clear of every change, which a window's margins must reproduce.
+    unchanged = [
+        _key(new) for old_ent, new in zip(previous.entities, mapped)
+        if not _touches_change(changes, old_ends, old_ent.start_char, old_ent.end_char)
+    ]
+    unchanged_starts = [span[0] for span in unchanged]
+
+    while True:
+        windows = _windows(text, changes, margin, blocked)
+        reprocessed = sum(end - start for start, end in windows)
+        if reprocessed > len(text) * MAX_WINDOW_SHARE:
+            result = preprocessor(text)
+            stats.update(windows=1, reprocessed_chars=len(text), full_run=True)
+            result.meta["incremental"] = {**stats, "margin": margin}
+            return result
+
+        results = list(preprocessor.pipe([text[start:end] for start, end in windows]))
+        stable = True
+        for (start, end), result in zip(windows, results):
+            # Unchanged context inside the window: before its first change and after its last.
+            first = bisect_left(new_starts, start)
+            last = bisect_left(new_starts, end) - 1
+            context = ((start, changes[first][2]), (changes[last][3], end))
+            # Next to a change arbitration may legitimately differ (a shadowing entity is gone);
+            # the outer halves of the context, near the window edges, must agree.
+            left, right = context
+            outer = ((start, (left[0] + left[1]) // 2), ((right[0] + right[1]) // 2, end))
+            fresh = [(ent.start_char + start, ent.end_char + start, ent.label) for ent in result.entities]
+            for zone_start, zone_end in outer:
+                ours = {span for span in fresh if zone_start <= span[0] and span[1] <= zone_end}
+                candidates = unchanged[
+                    bisect_left(unchanged_starts, zone_start):bisect_left(unchanged_starts, zone_end)
+                ]
+                theirs = {span for span in candidates if span[1] <= zone_end}
+                if ours != theirs:
+                    stable = False
+            # An entity reaching the window edge from the changed part may continue beyond it.
+            if any(
+                    (span[0] == start > 0 and span[1] > context[0][1])
+                    or (span[1] == end < len(text) and span[0] < context[1][0])
+                    for span in fresh
+            ):
+                stable = False
+        if stable:
+            break
+        margin *= 2
+
+    # Previous entities stay in arbitration order under the monotonic offset mapping and none
+    # crosses a window edge, so one sweep interleaves them with the windows' entities.
+    entities: List[EntityHint] = []
+    cursor = 0
+    for (start, end), result in zip(windows, results):
+        while cursor < len(mapped) and mapped[cursor].start_char < start:
+            entities.append(mapped[cursor])
+            cursor += 1
+        while cursor < len(mapped) and mapped[cursor].start_char < end:
+            cursor += 1
+        entities.extend(shift_entities(result.entities, start))
+    entities.extend(mapped[cursor:])
+
+    meta = {key: value for key, value in results[0].meta.items() if key not in ("profile", "cached")}
+    meta.pop("num_tokens", None)
+    meta["num_entities"] = len(entities)
+    stats.update(windows=len(windows), reprocessed_chars=reprocessed)
+    meta["incremental"] = {**stats, "margin": margin}
+    if "windowed" in meta:
+        meta["windowed"] = merge_window_stats(results)
+    return PreprocessResult(
+        raw_text=text,
+        tokens=[],
+        sentences=[],
+        entities=entities,
+        redacted_text=redact_text(text, entities),
+        meta=meta,
+    )
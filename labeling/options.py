@@ -0,0 +1,97 @@
+"""
+Options shared by every entry point that builds a preprocessor.
+
+`anonymize`, `anonymize_stream`, `anonymize_file`, `anonymize_records`,
+`anonymize_directory` and `reanonymize` (and the CLI commands built on them)
+take these as keyword arguments or as one `PipelineOptions`; they are
+documented here once. Importing this module must not pull in spaCy.
+"""
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from labeling.cache import DEFAULT_CACHE_SIZE
+from labeling.defaults import DEFAULT_ENGINE, DEFAULT_MAX_LEN, DEFAULT_MODEL
+
+
+@dataclass
+class PipelineOptions:
+    """
+    How to build and run the preprocessor.
+
+    Attributes:
+        model: spaCy model name to load (ignored if a preloaded `nlp` is provided).
+        max_length: Max document length override for spaCy.
+        use_ner_hints: Whether to use spaCy NER hints in preprocessing.
+        labels: Only detect these labels; the pipeline is pruned to what they need.
+        engine: "spacy" (default) or "regex" for the model-free engine, which only knows the
+            rule-based labels and returns results without tokens/sentences.
+        workers: Number of worker processes; values > 1 shard texts (or distribute batches) over
+            a process pool where every worker builds its own pipeline (cannot be combined with a
+            preloaded `nlp` unless forked).
+        fork_workers: With `workers` > 1, build the pipeline once in this process and fork the
+            workers from it (POSIX only), sharing the loaded model copy-on-write instead of loading
+            it in every worker; a preloaded `nlp` can then be used as well.
+        cache: SQLite result cache (see `labeling.cache`); previously seen texts are returned
+            from it without running the pipeline. Not available with `return_full` for spaCy.
+        cache_size: Size bound of the cache in bytes; least recently used entries are evicted.
+        dedup: Run the pipeline once per distinct sentence of each text and reuse its entities
+            for the repeats (see `labeling.dedup`); statistics go to `meta["dedup"]`.
+        lemmatizer: Run the lemmatizer; with False the religion, sex and age rules match
+            precomputed inflected forms instead, and the lemmatizer only runs for relative.
+        windowed: Run the statistical components only on windows around capitalised words and
+            gazetteer cues (see `labeling.pipes.windowed`); statistics go to `meta["windowed"]`.
+        profile: Record per-stage timings, call counts, token throughput and entity counts
+            (in `meta["profile"]` of every result) and print a summary when verbose.
+        profile_output: Write the aggregated profile as a JSON report here (implies `profile`).
+    """
+
+    model: str = DEFAULT_MODEL
+    max_length: int = DEFAULT_MAX_LEN
+    use_ner_hints: bool = True
+    labels: Optional[List[str]] = None
+    engine: str = DEFAULT_ENGINE
+    workers: int = 1
+    fork_workers: bool = False
+    cache: Optional[Path] = None
+    cache_size: int = DEFAULT_CACHE_SIZE
+    dedup: bool = False
+    lemmatizer: bool = True
+    windowed: bool = False
+    profile: bool = False
+    profile_output: Optional[Path] = None
+
+    def __post_init__(self) -> None:
+        if self.labels is not None:
+            self.labels = list(self.labels)
+
+    @property
+    def profiled(self) -> bool:
+        return self.profile or self.profile_output is not None
+
+
+def pipeline_options(
+        options: Optional[PipelineOptions],
+        overrides: dict,
+        *,
+        unsupported: Iterable[str] = (),
+) -> PipelineOptions:
+    """
+    `options` (default: all defaults) with the fields in `overrides` replaced.
+
+    Raises:
+        TypeError: For a name that is not an option, or one in `unsupported` that is set.
+    """
+    names = {field.name for field in fields(PipelineOptions)}
+    unknown = sorted(set(overrides) - names)
+    if unknown:
+        raise TypeError(f"Unknown pipeline options: {', '.join(unknown)}")
+    values = {name: getattr(options, name) for name in names} if options is not None else {}
+    values.update(overrides)
+    merged = PipelineOptions(**values)
+    default = PipelineOptions()
+    rejected = sorted(name for name in unsupported if getattr(merged, name) != getattr(default, name))
+    if rejected:
+        raise TypeError(f"Not supported here: {', '.join(rejected)}")
+    return merged
@@ -0,0 +1,203 @@
+"""
+Multi-process execution of the anonymization pipeline.
+
+Every worker process builds its own pipeline once (via `build_pipeline`) in the
+pool initializer and then serves batches of texts. Results always come back in
+input order; a single large document is sharded at sentence boundaries and blank
+lines (`labeling.chunking.split_text`), so no entity spans two shards, and the
+per-shard results are remapped to the original character/token offsets.
+
+With `fork=True` (POSIX only) the pipeline is built once in the parent instead,
+and the workers are forked from it: model weights, vocab and compiled matchers
+are shared copy-on-write rather than loaded again per worker. The parent's
+objects are moved to the garbage collector's permanent generation
+(`gc.freeze`) before forking, so collections in the workers do not write to
+(and thereby copy) the shared pages. Freezing is process-wide, so every forked
+pool freezes when it opens but only the last one to close unfreezes.
+
+The workers are forked when the pool gets its first task, from the thread that
+submits it, while other threads of the parent (the pool's own manager thread,
+a server's request threads) may be running. A lock one of them holds at that
+moment stays locked in the children, so forked pools should be opened and
+given work before the parent starts threads of its own.
+"""
+
+import gc
+import math
+import multiprocessing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from itertools import count, islice
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from labeling.chunking import merge_results, split_text
+from labeling.defaults import DEFAULT_ENGINE
+from labeling.results import PreprocessResult
+
+SHARDS_PER_WORKER = 4
+MIN_SHARD_CHARS = 20_000
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# SpacyPreprocessor or RegexPreprocessor, depending on the engine.
+_worker_preprocessor = None
+# Preprocessors built in this process for forked pools, by pool; forked workers look theirs up here.
+_fork_preprocessors: Dict[int, object] = {}
+# Pool keys: unlike `id()`, never reused while an earlier pool's workers may still look theirs up.
+_fork_keys = count()
+
+
+def _build_preprocessor(
+        model: str,
+        max_length: int,
+        use_ner_hints: bool,
+        full: bool,
+        labels: Optional[List[str]],
+        engine: str,
+        profile: bool,
+        lemmatizer: bool = True,
+        windowed: bool = False,
+        nlp=None,
+):
+    if engine == "regex":
+        from labeling.regex_engine import RegexPreprocessor
+
+        return RegexPreprocessor(labels=labels, profile=profile)
+
+    # Imported here to avoid a circular import (anonymizer -> parallel -> anonymizer)
+    # and so regex-engine workers never import spaCy.
+    from labeling.anonymizer import build_pipeline
+    from labeling.preprocessor import SpacyPreprocessor
+
+    if nlp is None:
+        nlp = build_pipeline(
+            model=model, max_length=max_length, labels=labels, lemmatizer=lemmatizer, windowed=windowed
+        )
+    return SpacyPreprocessor(nlp, use_ner_hints=use_ner_hints, redact_only=not full, labels=labels, profile=profile)
+
+
+def _init_worker(*args) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = _build_preprocessor(*args)
+
+
+def _init_forked_worker(key: int) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = _fork_preprocessors[key]
+
+
+def _process_batch(texts: List[str], batch_size: int) -> List[PreprocessResult]:
+    return list(_worker_preprocessor.pipe(texts, batch_size=batch_size))
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def imap_ordered(
+        executor: Executor,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        max_in_flight: int,
+) -> Iterator[R]:
+    """
+    Like `executor.map`, but consumes `items` lazily and keeps at most `max_in_flight` tasks queued.
+    """
+    pending: Deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class ParallelPreprocessor:
+    """
+    Process-pool counterpart of `SpacyPreprocessor`/`RegexPreprocessor` with the same call/pipe interface.
+    """
+
+    def __init__(
+            self,
+            workers: int,
+            *,
+            model: str,
+            max_length: int,
+            use_ner_hints: bool = True,
+            full: bool = True,
+            labels: Optional[Iterable[str]] = None,
+            engine: str = DEFAULT_ENGINE,
+            profile: bool = False,
+            lemmatizer: bool = True,
+            windowed: bool = False,
+            fork: bool = False,
+            nlp=None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if nlp is not None and not fork:
+            raise ValueError("A preloaded `nlp` can only be shared with forked workers; pass fork=True.")
+        if fork and "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Forked workers need the 'fork' start method, which this platform does not have.")
+        self.workers = workers
+        self.full = full
+        self.use_ner_hints = use_ner_hints
+        self._fork_key: Optional[int] = None
+        args = (
+            model,
+            max_length,
+            use_ner_hints,
+            full,
+            list(labels) if labels is not None else None,
+            engine,
+            profile,
+            lemmatizer,
+            windowed,
+        )
+        if not fork:
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=args)
+            return
+
+        self._fork_key = next(_fork_keys)
+        _fork_preprocessors[self._fork_key] = _build_preprocessor(*args, nlp=nlp)
+        # Freezing adds to what earlier pools froze; only the last pool to close unfreezes.
+        gc.collect()
+        gc.freeze()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_forked_worker,
+            initargs=(self._fork_key,),
+        )
+
+    def __call__(self, text: str) -> PreprocessResult:
+        shard_chars = max(MIN_SHARD_CHARS, math.ceil(len(text) / (self.workers * SHARDS_PER_WORKER)))
+        shards = split_text(text, shard_chars)
+        task = partial(_process_batch, batch_size=1)
+        results = imap_ordered(self._executor, task, ([chunk] for _, chunk in shards), self.workers * 2)
+        merged = merge_results(text, [(offset, batch[0]) for (offset, _), batch in zip(shards, results)])
+        merged.meta["workers"] = self.workers
+        return merged
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64) -> Iterator[PreprocessResult]:
+        task = partial(_process_batch, batch_size=batch_size)
+        for batch in imap_ordered(self._executor, task, _batched(texts, batch_size), self.workers * 2):
+            yield from batch
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        if self._fork_key is not None:
+            _fork_preprocessors.pop(self._fork_key, None)
+            self._fork_key = None
+            if not _fork_preprocessors:
+                gc.unfreeze()
+
+    def __enter__(self) -> "ParallelPreprocessor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
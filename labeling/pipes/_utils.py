@@ -1,18 +1,24 @@
+from typing import List
+
 import spacy
 
 from spacy.tokens import Span
 
 
-def shrink_spans(doc: spacy.language.Doc, label: str) -> spacy.language.Doc:
+def shrink_ents(doc: spacy.language.Doc, ents: List[Span], label: str) -> List[Span]:
+    """Reduce every `label` span to its last token; other spans are kept as they are."""
     new_ents = []
-    for ent in doc.ents:
+    for ent in ents:
         if ent.label_ == label:
             start = ent.end - 1
             end = ent.end
             new_ents.append(Span(doc, start, end, label=ent.label))
         else:
             new_ents.append(ent)
+    return new_ents
 
-    doc.ents = tuple(new_ents)
+
+def shrink_spans(doc: spacy.language.Doc, label: str) -> spacy.language.Doc:
+    doc.ents = tuple(shrink_ents(doc, list(doc.ents), label))
 
     return doc
@@ -1,13 +1,16 @@
+from typing import List
+
 import spacy
 from spacy import Language
 from spacy.tokens import Span
 
 AGE_LABEL = "age"
 
-@Language.component("shrink_age_spans")
-def shrink_age_spans(doc):
+
+def shrink_age_ents(doc: spacy.language.Doc, ents: List[Span]) -> List[Span]:
+    """Reduce every age span to its first numeral; age spans without one are dropped."""
     new_ents = []
-    for ent in doc.ents:
+    for ent in ents:
         if ent.label_ == AGE_LABEL:
             for token in ent:
                 if token.pos_ == "NUM":
@@ -16,19 +19,17 @@ def shrink_age_spans(doc):
                     break
         else:
             new_ents.append(ent)
-    doc.ents = tuple(new_ents)
-    return doc
+    return new_ents
 
 
-def add_age_entity_ruler(nlp: spacy.Language):
-    ruler = nlp.add_pipe(
-        "entity_ruler",
-        name="age_ruler",
-        after="ner",
-        config={"overwrite_ents": True},
-    )
+@Language.component("shrink_age_spans", requires=["token.pos"])
+def shrink_age_spans(doc):
+    doc.ents = tuple(shrink_age_ents(doc, list(doc.ents)))
+    return doc
+
 
-    ruler.add_patterns([
+def _age_patterns():
+    return [
         {
             "label": AGE_LABEL,
             "pattern": [
@@ -50,7 +51,18 @@ def add_age_entity_ruler(nlp: spacy.Language):
                 {"LOWER": "r"},
             ],
         },
-    ])
+    ]
+
+
+def add_age_entity_ruler(nlp: spacy.Language):
+    ruler = nlp.add_pipe(
+        "entity_ruler",
+        name="age_ruler",
+        after="ner",
+        config={"overwrite_ents": True},
+    )
+
+    ruler.add_patterns(_age_patterns())
 
     nlp.add_pipe("shrink_age_spans", last=True)
 
@@ -0,0 +1,242 @@
+"""Inflected forms of the rule lemmas; generated by `python -m labeling.pipes.inflections`, do not edit."""
+
+from typing import Dict, FrozenSet
+
+FORMS: Dict[str, FrozenSet[str]] = {
+    "babcia": frozenset({
+        "babci", "babcia", "babciach", "babciami", "babcie", "babciom", "babciu", "babcią", "babcię",
+        "babć",
+    }),
+    "brat": frozenset({
+        "braci", "bracia", "braciach", "bracie", "braciom", "brat", "brata", "bratem", "bratu",
+        "braćmi",
+    }),
+    "bratanek": frozenset({
+        "bratanek", "bratanka", "bratankach", "bratankami", "bratankiem", "bratankom", "bratankowi",
+        "bratankowie", "bratanku", "bratanków",
+    }),
+    "bratanica": frozenset({
+        "bratanic", "bratanica", "bratanicach", "bratanicami", "bratanice", "bratanico",
+        "bratanicom", "bratanicy", "bratanicą", "bratanicę",
+    }),
+    "buddysta": frozenset({
+        "buddysta", "buddystach", "buddystami", "buddysto", "buddystom", "buddysty", "buddystów",
+        "buddystą", "buddystę", "buddyści", "buddyście",
+    }),
+    "być": frozenset({
+        "byli", "byliby", "bylibyście", "bylibyśmy", "byliście", "byliśmy", "być", "był", "była",
+        "byłaby", "byłabym", "byłabyś", "byłam", "byłaś", "byłby", "byłbym", "byłbyś", "byłem",
+        "byłeś", "było", "byłoby", "były", "byłyby", "byłybyście", "byłybyśmy", "byłyście",
+        "byłyśmy", "bądź", "bądźcie", "bądźmy", "będzie", "będziecie", "będziemy", "będziesz",
+        "będą", "będąc", "będę", "jest", "jestem", "jesteś", "jesteście", "jesteśmy", "są",
+    }),
+    "ciocia": frozenset({
+        "cioci", "ciocia", "ciociach", "ciociami", "ciocie", "ciociom", "ciociu", "ciocią", "ciocię",
+        "cioć",
+    }),
+    "córka": frozenset({
+        "córce", "córek", "córka", "córkach", "córkami", "córki", "córko", "córkom", "córką",
+        "córkę",
+    }),
+    "dziadek": frozenset({
+        "dziadek", "dziadka", "dziadkach", "dziadkami", "dziadkiem", "dziadkom", "dziadkowi",
+        "dziadkowie", "dziadku", "dziadków",
+    }),
+    "dzieci": frozenset({
+        "dzieci", "dzieciach", "dzieciom", "dziećmi",
+    }),
+    "dziecko": frozenset({
+        "dzieci", "dzieciach", "dzieciom", "dziecka", "dzieckiem", "dziecko", "dziecku", "dziećmi",
+    }),
+    "katoliczka": frozenset({
+        "katoliczce", "katoliczek", "katoliczka", "katoliczkach", "katoliczkami", "katoliczki",
+        "katoliczko", "katoliczkom", "katoliczką", "katoliczkę",
+    }),
+    "katolik": frozenset({
+        "katolicy", "katolik", "katolika", "katolikach", "katolikami", "katolikiem", "katolikom",
+        "katolikowi", "katoliku", "katolików",
+    }),
+    "kobieta": frozenset({
+        "kobiecie", "kobiet", "kobieta", "kobietach", "kobietami", "kobieto", "kobietom", "kobiety",
+        "kobietą", "kobietę",
+    }),
+    "krewna": frozenset({
+        "krewna", "krewne", "krewnej", "krewnych", "krewnym", "krewnymi", "krewną",
+    }),
+    "krewny": frozenset({
+        "krewna", "krewne", "krewnego", "krewnej", "krewnemu", "krewni", "krewny", "krewnych",
+        "krewnym", "krewnymi", "krewną",
+    }),
+    "kuzyn": frozenset({
+        "kuzyn", "kuzyna", "kuzynach", "kuzynami", "kuzynem", "kuzyni", "kuzynie", "kuzynom",
+        "kuzynowi", "kuzynów",
+    }),
+    "kuzynka": frozenset({
+        "kuzynce", "kuzynek", "kuzynka", "kuzynkach", "kuzynkami", "kuzynki", "kuzynko", "kuzynkom",
+        "kuzynką", "kuzynkę",
+    }),
+    "macocha": frozenset({
+        "macoch", "macocha", "macochach", "macochami", "macocho", "macochom", "macochy", "macochą",
+        "macochę", "macosze",
+    }),
+    "mama": frozenset({
+        "mama", "mamach", "mamami", "mamie", "mamo", "mamom", "mamą", "mamę",
+    }),
+    "matka": frozenset({
+        "matce", "matek", "matka", "matkach", "matkami", "matki", "matko", "matkom", "matką",
+        "matkę",
+    }),
+    "małżonek": frozenset({
+        "małżonek", "małżonka", "małżonkach", "małżonkami", "małżonkiem", "małżonkom", "małżonkowi",
+        "małżonkowie", "małżonku", "małżonków",
+    }),
+    "małżonka": frozenset({
+        "małżonce", "małżonek", "małżonka", "małżonkach", "małżonkami", "małżonki", "małżonko",
+        "małżonkom", "małżonką", "małżonkę",
+    }),
+    "muzułmanin": frozenset({
+        "muzułmanach", "muzułmanami", "muzułmanie", "muzułmanin", "muzułmanina", "muzułmaninem",
+        "muzułmaninie", "muzułmaninowi", "muzułmanom", "muzułmanów",
+    }),
+    "muzułmanka": frozenset({
+        "muzułmance", "muzułmanek", "muzułmanka", "muzułmankach", "muzułmankami", "muzułmanki",
+        "muzułmanko", "muzułmankom", "muzułmanką", "muzułmankę",
+    }),
+    "mąż": frozenset({
+        "mąż", "męża", "mężach", "mężami", "mężem", "mężom", "mężowi", "mężowie", "mężu", "mężów",
+    }),
+    "mężczyzna": frozenset({
+        "mężczyzn", "mężczyzna", "mężczyznach", "mężczyznami", "mężczyzno", "mężczyznom",
+        "mężczyzny", "mężczyzną", "mężczyznę", "mężczyźni", "mężczyźnie",
+    }),
+    "ojciec": frozenset({
+        "ojca", "ojcach", "ojcami", "ojcem", "ojciec", "ojcom", "ojcowie", "ojcu", "ojcze", "ojców",
+    }),
+    "ojczym": frozenset({
+        "ojczym", "ojczyma", "ojczymach", "ojczymami", "ojczymem", "ojczymie", "ojczymom",
+        "ojczymowi", "ojczymowie", "ojczymów",
+    }),
+    "pasierb": frozenset({
+        "pasierb", "pasierba", "pasierbach", "pasierbami", "pasierbem", "pasierbie", "pasierbom",
+        "pasierbowi", "pasierbowie", "pasierbów",
+    }),
+    "pasierbica": frozenset({
+        "pasierbic", "pasierbica", "pasierbicach", "pasierbicami", "pasierbice", "pasierbico",
+        "pasierbicom", "pasierbicy", "pasierbicą", "pasierbicę",
+    }),
+    "powinowata": frozenset({
+        "powinowata", "powinowate", "powinowatej", "powinowatych", "powinowatym", "powinowatymi",
+        "powinowatą",
+    }),
+    "powinowaty": frozenset({
+        "powinowaci", "powinowata", "powinowate", "powinowatego", "powinowatej", "powinowatemu",
+        "powinowaty", "powinowatych", "powinowatym", "powinowatymi", "powinowatą",
+    }),
+    "prababcia": frozenset({
+        "prababci", "prababcia", "prababciach", "prababciami", "prababcie", "prababciom",
+        "prababciu", "prababcią", "prababcię", "prababć",
+    }),
+    "pradziadek": frozenset({
+        "pradziadek", "pradziadka", "pradziadkach", "pradziadkami", "pradziadkiem", "pradziadkom",
+        "pradziadkowi", "pradziadkowie", "pradziadku", "pradziadków",
+    }),
+    "prawnuczka": frozenset({
+        "prawnuczce", "prawnuczek", "prawnuczka", "prawnuczkach", "prawnuczkami", "prawnuczki",
+        "prawnuczko", "prawnuczkom", "prawnuczką", "prawnuczkę",
+    }),
+    "prawnuk": frozenset({
+        "prawnuk", "prawnuka", "prawnukach", "prawnukami", "prawnuki", "prawnukiem", "prawnukom",
+        "prawnukowi", "prawnukowie", "prawnuku", "prawnuków",
+    }),
+    "prawosławna": frozenset({
+        "prawosławna", "prawosławne", "prawosławnej", "prawosławnych", "prawosławnym",
+        "prawosławnymi", "prawosławną",
+    }),
+    "prawosławny": frozenset({
+        "prawosławna", "prawosławne", "prawosławnego", "prawosławnej", "prawosławnemu",
+        "prawosławni", "prawosławny", "prawosławnych", "prawosławnym", "prawosławnymi",
+        "prawosławną",
+    }),
+    "protestant": frozenset({
+        "protestanci", "protestancie", "protestant", "protestanta", "protestantach", "protestantami",
+        "protestantem", "protestantom", "protestantowi", "protestantów",
+    }),
+    "rodzeństwo": frozenset({
+        "rodzeństw", "rodzeństwa", "rodzeństwach", "rodzeństwami", "rodzeństwem", "rodzeństwie",
+        "rodzeństwo", "rodzeństwom", "rodzeństwu",
+    }),
+    "rodzic": frozenset({
+        "rodzic", "rodzica", "rodzicach", "rodzicami", "rodzice", "rodzicem", "rodzicom",
+        "rodzicowi", "rodzicu", "rodziców",
+    }),
+    "rodzice": frozenset({
+        "rodzicach", "rodzicami", "rodzice", "rodzicom", "rodziców",
+    }),
+    "rok": frozenset({
+        "rok", "rokach", "rokami", "roki", "rokiem", "rokom", "rokowi", "roku", "roków",
+    }),
+    "ród": frozenset({
+        "rodach", "rodami", "rodem", "rodom", "rodowi", "rodu", "rody", "rodzie", "rodów", "ród",
+    }),
+    "siostra": frozenset({
+        "siostra", "siostrach", "siostrami", "siostro", "siostrom", "siostry", "siostrze", "siostrą",
+        "siostrę", "sióstr",
+    }),
+    "siostrzenica": frozenset({
+        "siostrzenic", "siostrzenica", "siostrzenicach", "siostrzenicami", "siostrzenice",
+        "siostrzenico", "siostrzenicom", "siostrzenicy", "siostrzenicą", "siostrzenicę",
+    }),
+    "siostrzeniec": frozenset({
+        "siostrzeniec", "siostrzeńca", "siostrzeńcach", "siostrzeńcami", "siostrzeńcem",
+        "siostrzeńcom", "siostrzeńcowi", "siostrzeńcu", "siostrzeńcy", "siostrzeńcze",
+        "siostrzeńców",
+    }),
+    "syn": frozenset({
+        "syn", "syna", "synach", "synami", "synem", "synom", "synowi", "synowie", "synu", "synów",
+    }),
+    "synowa": frozenset({
+        "synowa", "synowe", "synowej", "synowo", "synowych", "synowym", "synowymi", "synową",
+    }),
+    "szwagier": frozenset({
+        "szwagier", "szwagra", "szwagrach", "szwagrami", "szwagrem", "szwagrom", "szwagrowi",
+        "szwagrowie", "szwagrze", "szwagrów",
+    }),
+    "szwagierka": frozenset({
+        "szwagierce", "szwagierek", "szwagierka", "szwagierkach", "szwagierkami", "szwagierki",
+        "szwagierko", "szwagierkom", "szwagierką", "szwagierkę",
+    }),
+    "tata": frozenset({
+        "tacie", "tata", "tatach", "tatami", "tato", "tatom", "tatowie", "taty", "tatów", "tatą",
+        "tatę",
+    }),
+    "teściowa": frozenset({
+        "teściowa", "teściowe", "teściowej", "teściowo", "teściowych", "teściowym", "teściowymi",
+        "teściową",
+    }),
+    "teść": frozenset({
+        "teścia", "teściach", "teściami", "teściem", "teściom", "teściowi", "teściowie", "teściu",
+        "teściów", "teść",
+    }),
+    "wnuczka": frozenset({
+        "wnuczce", "wnuczek", "wnuczka", "wnuczkach", "wnuczkami", "wnuczki", "wnuczko", "wnuczkom",
+        "wnuczką", "wnuczkę",
+    }),
+    "wnuk": frozenset({
+        "wnuk", "wnuka", "wnukach", "wnukami", "wnuki", "wnukiem", "wnukom", "wnukowi", "wnukowie",
+        "wnuku", "wnuków",
+    }),
+    "wujek": frozenset({
+        "wujek", "wujka", "wujkach", "wujkami", "wujkiem", "wujkom", "wujkowi", "wujkowie", "wujku",
+        "wujków",
+    }),
+    "zięć": frozenset({
+        "zięcia", "zięciach", "zięciami", "zięciem", "zięciom", "zięciowi", "zięciowie", "zięciu",
+        "zięciów", "zięć",
+    }),
+    "żona": frozenset({
+        "żon", "żona", "żonach", "żonami", "żonie", "żono", "żonom", "żony", "żoną", "żonę",
+    }),
+    "żyd": frozenset({
+        "żyd", "żyda", "żydach", "żydami", "żydem", "żydom", "żydowi", "żydzi", "żydzie", "żydów",
+    }),
+}
@@ -0,0 +1,340 @@
+"""
+Inflected surface forms of the lemmas the rule patterns match on.
+
+The relative, religion and sex rules match on LEMMA, so the lemmatizer (and the
+POS tags its lookup tables are keyed by) has to run on every token to catch a
+few dozen words. Without a lemmatizer (`build_pipeline(lemmatizer=False)`,
+`--no-lemmatizer`) `lemma_free_pattern` rewrites every LEMMA predicate into a
+LOWER predicate over all inflected forms of its lemmas, which the matcher then
+checks as a single-word phrase list or as a lexeme flag. The relative rules
+keep their LEMMA predicates (`matcher.LEMMATIZED_GROUPS`); their forms are
+still listed for the cue words of `labeling.pipes.windowed`.
+
+The forms are generated ahead of time into `inflection_lexicon` by
+
+    python -m labeling.pipes.inflections
+
+which collects every LEMMA value of the default rule groups and declines it:
+regular Polish declension chosen by the lemma's ending, with the stems and
+plurals that do not follow from it in `_MASCULINE`, single irregular forms in
+`_OVERRIDES`/`_EXTRA` and whole paradigms (verbs, plurals-only) in `_FORMS`.
+Forms far more common as another word ("mamy", "we have") are left out, since
+nothing tells the two apart without the lemmatizer.
+
+Kept free of spaCy imports, like `rule_patterns`; only the build step loads
+the rule groups.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple, Union
+
+LEXICON_PATH = Path(__file__).resolve().with_name("inflection_lexicon.py")
+_LINE_WIDTH = 100
+
+# Masculine nouns: oblique stem and nominative plural (or all five plural forms).
+_MASCULINE: Dict[str, Tuple[str, Union[str, Tuple[str, ...]]]] = {
+    "ojciec": ("ojc", "ojcowie"),
+    "syn": ("syn", "synowie"),
+    "brat": ("brat", ("bracia", "braci", "braciom", "braćmi", "braciach")),
+    "dziadek": ("dziadk", "dziadkowie"),
+    "pradziadek": ("pradziadk", "pradziadkowie"),
+    "wnuk": ("wnuk", "wnukowie"),
+    "prawnuk": ("prawnuk", "prawnukowie"),
+    "wujek": ("wujk", "wujkowie"),
+    "kuzyn": ("kuzyn", "kuzyni"),
+    "teść": ("teści", "teściowie"),
+    "zięć": ("zięci", "zięciowie"),
+    "szwagier": ("szwagr", "szwagrowie"),
+    "siostrzeniec": ("siostrzeńc", "siostrzeńcy"),
+    "bratanek": ("bratank", "bratankowie"),
+    "ojczym": ("ojczym", "ojczymowie"),
+    "pasierb": ("pasierb", "pasierbowie"),
+    "małżonek": ("małżonk", "małżonkowie"),
+    "mąż": ("męż", "mężowie"),
+    "rodzic": ("rodzic", "rodzice"),
+    "ród": ("rod", "rody"),
+    "rok": ("rok", "roki"),
+    "katolik": ("katolik", "katolicy"),
+    "protestant": ("protestant", "protestanci"),
+    "żyd": ("żyd", "żydzi"),
+    "muzułmanin": (
+        "muzułmanin",
+        ("muzułmanie", "muzułmanów", "muzułmanom", "muzułmanami", "muzułmanach"),
+    ),
+}
+
+# Feminine-looking nouns declined as adjectives ("teściowa" -> "teściowej").
+_ADJECTIVAL = frozenset({"teściowa", "synowa", "krewna", "powinowata", "prawosławna"})
+
+# Forms the regular paradigm gets wrong, by slot.
+_OVERRIDES: Dict[str, Dict[str, str]] = {
+    "ojciec": {"dat": "ojcu", "voc": "ojcze"},
+    "brat": {"dat": "bratu"},
+    "syn": {"loc": "synu", "voc": "synu"},
+    "ród": {"gen": "rodu"},
+    "rok": {"gen": "roku"},
+    "siostrzeniec": {"voc": "siostrzeńcze"},
+    "siostra": {"gen_pl": "sióstr"},
+    "tata": {"nom_pl": "tatowie", "gen_pl": "tatów"},
+    "mężczyzna": {"nom_pl": "mężczyźni", "gen_pl": "mężczyzn"},
+    "buddysta": {"nom_pl": "buddyści", "gen_pl": "buddystów"},
+}
+
+# Colloquial variants next to the regular forms.
+_EXTRA: Dict[str, Tuple[str, ...]] = {
+    "wnuk": ("wnuki",),
+    "prawnuk": ("prawnuki",),
+}
+
+# Lemmas listed with all their forms.
+_FORMS: Dict[str, Tuple[str, ...]] = {
+    "dziecko": (
+        "dziecko", "dziecka", "dziecku", "dzieckiem", "dzieci", "dzieciom", "dziećmi", "dzieciach",
+    ),
+    "dzieci": ("dzieci", "dzieciom", "dziećmi", "dzieciach"),
+    "rodzice": ("rodzice", "rodziców", "rodzicom", "rodzicami", "rodzicach"),
+    "być": (
+        "być", "jestem", "jesteś", "jest", "jesteśmy", "jesteście", "są",
+        "byłem", "byłam", "byłeś", "byłaś", "był", "była", "było",
+        "byliśmy", "byłyśmy", "byliście", "byłyście", "byli", "były",
+        "będę", "będziesz", "będzie", "będziemy", "będziecie", "będą",
+        "byłbym", "byłabym", "byłbyś", "byłabyś", "byłby", "byłaby", "byłoby",
+        "bylibyśmy", "byłybyśmy", "bylibyście", "byłybyście", "byliby", "byłyby",
+        "bądź", "bądźmy", "bądźcie", "będąc",
+    ),
+}
+
+# Forms that are far more often another word: "mam"/"mamy" are "I/we have" far more often than "mums'"/"mum's".
+_EXCLUDED = frozenset({"mam", "mamy"})
+
+_VELAR = ("k", "g", "ch")
+# Stem endings taking "-u" in the locative (velar, soft and hardened consonants).
+_U_LOCATIVE = _VELAR + ("ć", "ś", "ź", "ń", "i", "c", "cz", "sz", "rz", "ż", "dz", "j", "l")
+_HARDENED = ("c", "cz", "sz", "rz", "ż", "dz")
+# Stem-final consonant alternations before the "-e" locative/dative ending, longest first.
+_SOFTENED = (
+    ("st", "ście"), ("zd", "ździe"), ("sł", "śle"), ("zn", "źnie"), ("sn", "śnie"),
+    ("ch", "sze"), ("t", "cie"), ("d", "dzie"), ("r", "rze"), ("ł", "le"), ("k", "ce"), ("g", "dze"),
+    ("n", "nie"), ("m", "mie"), ("b", "bie"), ("p", "pie"), ("w", "wie"), ("f", "fie"),
+    ("s", "sie"), ("z", "zie"),
+)
+# The same before the "-i/-y" of masculine personal plural adjectives.
+_VIRILE = (
+    ("st", "ści"), ("zn", "źni"), ("sn", "śni"), ("ch", "si"), ("t", "ci"), ("d", "dzi"),
+    ("r", "rzy"), ("ł", "li"), ("k", "cy"), ("g", "dzy"), ("n", "ni"), ("w", "wi"),
+)
+_SOFT_FINAL = {"c": "ć", "s": "ś", "z": "ź", "n": "ń"}
+_VOWELS = "aąeęioóuy"
+
+
+def _alternate(stem: str, table) -> str:
+    for ending, replacement in table:
+        if stem.endswith(ending):
+            return stem[:-len(ending)] + replacement
+    raise ValueError(f"No alternation for stem {stem!r}")
+
+
+def _plural(stem: str, nominative: str, genitive: str) -> Dict[str, str]:
+    return {
+        "nom_pl": nominative,
+        "gen_pl": genitive,
+        "dat_pl": stem + "om",
+        "inst_pl": stem + "ami",
+        "loc_pl": stem + "ach",
+    }
+
+
+def _masculine(lemma: str) -> Dict[str, str]:
+    stem, plural = _MASCULINE[lemma]
+    locative = stem + "u" if stem.endswith(_U_LOCATIVE) else _alternate(stem, _SOFTENED)
+    forms = {
+        "nom": lemma,
+        "gen": stem + "a",
+        "dat": stem + "owi",
+        "inst": stem + ("iem" if stem.endswith(("k", "g")) else "em"),
+        "loc": locative,
+        "voc": locative,
+    }
+    if isinstance(plural, tuple):
+        forms.update(zip(("nom_pl", "gen_pl", "dat_pl", "inst_pl", "loc_pl"), plural))
+    else:
+        forms.update(_plural(stem, plural, stem + "ów"))
+    return forms
+
+
+def _feminine(lemma: str) -> Dict[str, str]:
+    """Nouns in "-a" (masculine ones like "tata" take their plural from `_OVERRIDES`)."""
+    stem = lemma[:-1]
+    if stem.endswith("i"):  # babcia: babci, babcię, babciu, babcie, babć
+        genitive = dative = stem
+        vocative = stem + "u"
+        nominative_plural = stem + "e"
+        genitive_plural = stem[:-2] + _SOFT_FINAL[stem[-2]]
+    elif stem.endswith(_HARDENED):  # siostrzenica: siostrzenicy, siostrzenico, siostrzenice, siostrzenic
+        genitive = dative = stem + "y"
+        vocative = stem + "o"
+        nominative_plural = stem + "e"
+        genitive_plural = stem
+    else:  # matka: matki, matce, matko, matki, matek
+        genitive = nominative_plural = stem + ("i" if stem.endswith(("k", "g")) else "y")
+        dative = _alternate(stem, _SOFTENED)
+        vocative = stem + "o"
+        genitive_plural = stem
+        if stem.endswith("k") and stem[-2] not in _VOWELS:
+            genitive_plural = stem[:-1] + "ek"
+    forms = {
+        "nom": lemma,
+        "gen": genitive,
+        "dat": dative,
+        "acc": stem + "ę",
+        "inst": stem + "ą",
+        "voc": vocative,
+    }
+    forms.update(_plural(stem, nominative_plural, genitive_plural))
+    return forms
+
+
+def _neuter(lemma: str) -> Dict[str, str]:
+    """Nouns in "-o" ("rodzeństwo")."""
+    stem = lemma[:-1]
+    forms = {
+        "nom": lemma,
+        "gen": stem + "a",
+        "dat": stem + "u",
+        "inst": stem + ("iem" if stem.endswith(("k", "g")) else "em"),
+        "loc": stem + "u" if stem.endswith(_U_LOCATIVE) else _alternate(stem, _SOFTENED),
+    }
+    forms.update(_plural(stem, stem + "a", stem))
+    return forms
+
+
+def _adjective(lemma: str) -> Dict[str, str]:
+    """Adjectives and adjectival nouns; a masculine lemma covers all genders, like its lemmatized forms."""
+    stem = lemma[:-1]
+    forms = {
+        "nom_f": stem + "a",
+        "gen_f": stem + "ej",
+        "acc_f": stem + "ą",
+        "nom_pl": stem + "e",
+        "gen_pl": stem + "ych",
+        "dat_pl": stem + "ym",
+        "inst_pl": stem + "ymi",
+    }
+    if lemma.endswith("a"):
+        if lemma.endswith("owa"):
+            forms["voc_f"] = stem + "o"  # teściowo
+        return forms
+    forms.update({
+        "nom": lemma,
+        "gen": stem + "ego",
+        "dat": stem + "emu",
+        "inst": stem + "ym",
+        "nom_pl_virile": _alternate(stem, _VIRILE),
+    })
+    return forms
+
+
+def inflect(lemma: str) -> FrozenSet[str]:
+    """Return every surface form of `lemma` (lower-cased, the lemma itself included)."""
+    if lemma in _FORMS:
+        forms: Set[str] = set(_FORMS[lemma])
+    else:
+        if lemma in _MASCULINE:
+            paradigm = _masculine(lemma)
+        elif lemma in _ADJECTIVAL or lemma.endswith("y"):
+            paradigm = _adjective(lemma)
+        elif lemma.endswith("a"):
+            paradigm = _feminine(lemma)
+        elif lemma.endswith("o"):
+            paradigm = _neuter(lemma)
+        else:
+            raise ValueError(f"No paradigm for lemma {lemma!r}; add it to _MASCULINE or _FORMS.")
+        paradigm.update(_OVERRIDES.get(lemma, {}))
+        forms = set(paradigm.values()) | set(_EXTRA.get(lemma, ()))
+    forms.add(lemma)
+    return frozenset(form.lower() for form in forms) - _EXCLUDED
+
+
+def _lemmas(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict) and list(value) == ["IN"]:
+        return list(value["IN"])
+    raise ValueError(f"Only exact and IN LEMMA predicates can be matched without a lemmatizer, got {value!r}")
+
+
+def _lexicon() -> Dict[str, FrozenSet[str]]:
+    from .inflection_lexicon import FORMS
+
+    return FORMS
+
+
+def lemma_free_pattern(pattern: List[dict]) -> List[dict]:
+    """Return `pattern` with every LEMMA predicate replaced by LOWER over the lemmas' inflected forms."""
+    if not any("LEMMA" in token_spec for token_spec in pattern):
+        return pattern
+    lexicon = _lexicon()
+    rewritten = []
+    for token_spec in pattern:
+        if "LEMMA" in token_spec:
+            token_spec = dict(token_spec)
+            forms: Set[str] = set()
+            for lemma in _lemmas(token_spec.pop("LEMMA")):
+                if lemma not in lexicon:
+                    raise ValueError(
+                        f"Lemma {lemma!r} is not in the inflection lexicon; run `python -m labeling.pipes.inflections`."
+                    )
+                forms |= lexicon[lemma]
+            token_spec["LOWER"] = {"IN": sorted(forms)}
+        rewritten.append(token_spec)
+    return rewritten
+
+
+def pattern_lemmas(groups: Dict[str, List[dict]]) -> List[str]:
+    """Every LEMMA value the patterns of `groups` use, in first-seen order."""
+    lemmas: Dict[str, None] = {}
+    for entries in groups.values():
+        for entry in entries:
+            for token_spec in entry["pattern"]:
+                if "LEMMA" in token_spec:
+                    lemmas.update(dict.fromkeys(_lemmas(token_spec["LEMMA"])))
+    return list(lemmas)
+
+
+def render_lexicon(lemmas: Iterable[str]) -> str:
+    """Source of the `inflection_lexicon` module for `lemmas`."""
+    lines = [
+        '"""Inflected forms of the rule lemmas; generated by `python -m labeling.pipes.inflections`, do not edit."""',
+        "",
+        "from typing import Dict, FrozenSet",
+        "",
+        "FORMS: Dict[str, FrozenSet[str]] = {",
+    ]
+    for lemma in sorted(set(lemmas)):
+        lines.append(f"    {json.dumps(lemma, ensure_ascii=False)}: frozenset({{")
+        line = ""
+        for form in sorted(inflect(lemma)):
+            item = json.dumps(form, ensure_ascii=False) + ","
+            if line and len(line) + len(item) > _LINE_WIDTH:
+                lines.append(line)
+                line = ""
+            line = f"{line} {item}" if line else f"        {item}"
+        lines.append(line)
+        lines.append("    }),")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    from .matcher import default_rule_groups
+
+    lemmas = pattern_lemmas(default_rule_groups())
+    LEXICON_PATH.write_text(render_lexicon(lemmas), encoding="utf-8")
+    print(f"{len(lemmas)} lemmas, {sum(len(inflect(lemma)) for lemma in lemmas)} forms written to {LEXICON_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Token-text predicates compiled into lexeme flags.
+
+spaCy evaluates `{"TEXT": {"REGEX": ...}}` with Python's `re.search`, and set
+predicates such as `{"LOWER": {"IN": [...]}}` with a Python call, on every
+token, for every pattern using them, in every document. These predicates only
+look at the token text, which is a property of the lexeme, so each distinct
+one is registered once as a boolean flag on the vocabulary (`Vocab.add_flag`):
+it is computed once per lexeme, when the lexeme is created or the flag is
+added, and the Matcher then checks a bit in C. The flags keep the exact
+semantics of the predicates they replace (`re.search` on the text, membership
+of the text or its lower-cased form).
+
+A vocabulary has a limited number of free flag bits; predicates that no longer
+get one are left as they were.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Pattern keys compared against the token text, i.e. against the lexeme's ORTH.
+_TEXT_KEYS = ("TEXT", "ORTH")
+_LOWER_KEY = "LOWER"
+
+
+class RegexFlag:
+    """Lexeme attribute getter: whether `pattern` is found in the lexeme text."""
+
+    def __init__(self, pattern: str) -> None:
+        self.pattern = pattern
+        self.key = ("REGEX", pattern)
+        self._search = re.compile(pattern).search
+
+    def __call__(self, text: str) -> bool:
+        return self._search(text) is not None
+
+    def __reduce__(self):
+        return RegexFlag, (self.pattern,)
+
+
+class WordSetFlag:
+    """Lexeme attribute getter: whether the lexeme text (lower-cased with `lower`) is one of `words`."""
+
+    def __init__(self, words, lower: bool = False) -> None:
+        self.words = frozenset(words)
+        self.lower = lower
+        self.key = ("IN", lower, self.words)
+
+    def __call__(self, text: str) -> bool:
+        return (text.lower() if self.lower else text) in self.words
+
+    def __reduce__(self):
+        return WordSetFlag, (sorted(self.words), self.lower)
+
+
+def flag_for(vocab, getter) -> Optional[int]:
+    """Return the id of the vocabulary flag computed by `getter`, registering it if needed (None when out of bits)."""
+    for flag_id, existing in vocab.lex_attr_getters.items():
+        if getattr(existing, "key", None) == getter.key and type(existing) is type(getter):
+            return flag_id
+    try:
+        return vocab.add_flag(getter)
+    except ValueError:
+        return None
+
+
+def _getter(key: str, value):
+    """Flag getter equivalent to the predicate `{key: value}`, or None if it is not a lexeme predicate."""
+    if not isinstance(value, dict) or len(value) != 1:
+        return None
+    operator, argument = next(iter(value.items()))
+    if operator == "REGEX" and key in _TEXT_KEYS and isinstance(argument, str):
+        return RegexFlag(argument)
+    if operator == "IN" and key in (*_TEXT_KEYS, _LOWER_KEY) and isinstance(argument, list) \
+            and all(isinstance(word, str) for word in argument):
+        return WordSetFlag(argument, lower=key == _LOWER_KEY)
+    return None
+
+
+def compile_flags(vocab, pattern: List[dict]) -> List[dict]:
+    """Return `pattern` with its lexeme-level REGEX and IN predicates replaced by flag checks."""
+    compiled = []
+    for token_spec in pattern:
+        spec: Dict = {}
+        for key, value in token_spec.items():
+            getter = _getter(key, value)
+            flag_id = flag_for(vocab, getter) if getter is not None else None
+            if flag_id is None:
+                spec[key] = value
+            else:
+                spec[flag_id] = True
+        compiled.append(spec)
+    return compiled
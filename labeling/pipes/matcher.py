@@ -0,0 +1,393 @@
+"""
+Single-pass rule matching stage.
+
+`pii_matcher` replaces the per-group EntityRulers (age, relative, religion, sex,
+keywords, rule-based) together with the contact regex, validation and span
+shrinking components. All patterns are compiled into one `Matcher` plus two
+`PhraseMatcher`s (single-word LOWER and LEMMA lists), so every document is
+scanned once and `doc.ents` is assigned once.
+
+The former components ran as a chain in which each ruler overwrote what the
+previous ones produced. To keep the output identical, matches are grouped by
+the ruler they used to belong to and applied group by group with the same
+EntityRuler semantics (longest match first, overlapping existing entities are
+replaced). Where several patterns of one group match exactly the same tokens,
+the EntityRuler kept the match its set of `(match_id, start, end)` tuples
+yielded first, which depends on the hashes of "label" or "label||id" and on
+every other match of the ruler. So on the first such tie in a document the
+group is matched once more with a Matcher built like the ruler's, and that set
+is iterated to find the chain's winner.
+
+Token-text REGEX and IN predicates are compiled into lexeme flags
+(`labeling.pipes.lexeme_flags`), so each of them runs once per distinct token
+text instead of once per token and pattern. The digit-sequence patterns (cards,
+bank accounts, phones) do not go through the Matcher at all: their candidates
+come from `labeling.pipes.sequences`, which only produces the ones that can
+win the longest-first selection.
+
+Without a lemmatizer (`lemmatizer=False`), LEMMA predicates are matched against
+the precomputed inflected forms of their lemmas (`labeling.pipes.inflections`),
+except in `LEMMATIZED_GROUPS`: the relative rules need "mama", whose genitive
+"mamy" is "we have" far more often, and no context rule tells the two apart.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import spacy
+import srsly
+from spacy.language import Language
+from spacy.errors import MatchPatternError
+from spacy.matcher import Matcher, PhraseMatcher
+from spacy.schemas import validate_token_pattern
+from spacy.tokens import Doc, Span
+from spacy.util import ensure_path
+
+from labeling.spans import remove_overlapping, span_bounds
+
+from ._utils import shrink_ents
+from .age import AGE_LABEL, _age_patterns, shrink_age_ents
+from .inflections import lemma_free_pattern
+from .keywords import _keyword_patterns
+from .lexeme_flags import compile_flags
+from .relative import RELATIVE_LABEL, _relative_patterns
+from .religion import RELIGION_LABEL, _religion_patterns
+from .rule_entities import VALIDATORS, _patterns, contact_entities, filter_rule_ents
+from .sequences import Match, SequenceRules, TieBreak, select_longest, sequence_kind
+from .sex import SEX_LABEL, _sex_patterns
+
+MATCHER_NAME = "pii_matcher"
+
+# Groups in the order their EntityRulers used to run; later groups overwrite earlier ones.
+RULE_GROUPS = ("age", "relative", "religion", "sex", "keywords", "rules")
+RULES_GROUP = "rules"
+# Groups matching LEMMA predicates on lemmas even with `lemmatizer=False`.
+LEMMATIZED_GROUPS = frozenset({"relative"})
+
+CONTACT_LABELS = frozenset({"email", "phone"})
+# Labels whose spans are shrunk after matching, in the order the shrink components ran.
+SHRINK_ORDER = (SEX_LABEL, RELIGION_LABEL, RELATIVE_LABEL, AGE_LABEL)
+
+# Matcher pattern keys and the token attributes a component must have assigned for them.
+PATTERN_ATTRS = {
+    "LEMMA": "token.lemma",
+    "POS": "token.pos",
+    "TAG": "token.tag",
+    "MORPH": "token.morph",
+    "DEP": "token.dep",
+    "SENT_START": "token.is_sent_start",
+    "IS_SENT_START": "token.is_sent_start",
+}
+_PHRASE_ATTRS = ("LOWER", "LEMMA")
+# EntityRuler's default `ent_id_sep`.
+_ENT_ID_SEP = "||"
+
+
+def default_rule_groups() -> Dict[str, List[dict]]:
+    return {
+        "age": _age_patterns(),
+        "relative": _relative_patterns(),
+        "religion": _religion_patterns(),
+        "sex": _sex_patterns(),
+        "keywords": _keyword_patterns(),
+        RULES_GROUP: _patterns(),
+    }
+
+
+def _as_phrases(pattern) -> Optional[Tuple[str, List[str]]]:
+    """Return `(attr, words)` if `pattern` is a single-token exact-match list the PhraseMatcher can take."""
+    if len(pattern) != 1 or len(pattern[0]) != 1:
+        return None
+    attr, value = next(iter(pattern[0].items()))
+    if attr not in _PHRASE_ATTRS:
+        return None
+    if isinstance(value, str):
+        words = [value]
+    elif isinstance(value, dict) and list(value) == ["IN"]:
+        words = list(value["IN"])
+    else:
+        return None
+    # Pattern docs are lower-cased by the LOWER PhraseMatcher; mixed-case values would never match.
+    if attr == "LOWER" and any(word != word.lower() for word in words):
+        return None
+    if any(not word or " " in word for word in words):
+        return None
+    return attr, words
+
+
+def _ruler_key(entry: dict) -> str:
+    """The match key an EntityRuler gives the pattern `entry`."""
+    return f"{entry['label']}{_ENT_ID_SEP}{entry['id']}" if "id" in entry else entry["label"]
+
+
+def _apply_group(
+        doc: Doc,
+        ents: List[Span],
+        matches: List[Match],
+        tie_break: TieBreak,
+        sequences: Optional[SequenceRules] = None,
+) -> List[Span]:
+    """Overwrite `ents` with one group's matches exactly like an EntityRuler with `overwrite_ents`."""
+    if not matches and sequences is None:
+        return ents
+    new_ents: List[Span] = []
+    for start, end, label, ent_id in select_longest(doc, matches, tie_break, sequences):
+        if ent_id:
+            new_ents.append(Span(doc, start, end, label=label, span_id=ent_id))
+        else:
+            new_ents.append(Span(doc, start, end, label=label))
+    return remove_overlapping(ents, new_ents, bounds=span_bounds) + new_ents
+
+
+class PIIMatcher:
+    """
+    Pipeline component running all rule groups in a single matching pass.
+
+    Args:
+        vocab: Shared vocabulary of the pipeline.
+        name: Component name.
+        regex_flags: Evaluate token-text REGEX and IN predicates as lexeme flags (same matches).
+        sequence_rules: Generate the digit-sequence candidates outside the Matcher (same output).
+        lemmatizer: Match LEMMA predicates on token lemmas; with False on the inflected forms
+            of their lemmas, so only `LEMMATIZED_GROUPS` need a lemmatizer.
+    """
+
+    def __init__(
+            self,
+            vocab,
+            name: str = MATCHER_NAME,
+            regex_flags: bool = True,
+            sequence_rules: bool = True,
+            lemmatizer: bool = True,
+    ) -> None:
+        self.vocab = vocab
+        self.name = name
+        self.regex_flags = regex_flags
+        self.sequence_rules = sequence_rules
+        self.lemmatizer = lemmatizer
+        self.groups: Dict[str, List[dict]] = {}
+        self.active_labels: Optional[FrozenSet[str]] = None
+        self._compile()
+
+    def set_groups(self, groups: Dict[str, List[dict]]) -> None:
+        unknown = set(groups) - set(RULE_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown rule groups: {', '.join(sorted(unknown))}")
+        self.groups = {group: list(groups[group]) for group in RULE_GROUPS if group in groups}
+        self._compile()
+
+    def add_patterns(self, group: str, patterns: Iterable[dict]) -> None:
+        groups = dict(self.groups)
+        groups[group] = groups.get(group, []) + list(patterns)
+        self.set_groups(groups)
+
+    def group_labels(self, group: str) -> FrozenSet[str]:
+        labels = {entry["label"] for entry in self.groups.get(group, ())}
+        if group == RULES_GROUP:
+            labels |= CONTACT_LABELS | set(VALIDATORS)
+        return frozenset(labels)
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        """The labels the groups that run can produce (spaCy lists them in `nlp.meta`)."""
+        return tuple(sorted(set().union(*(self.group_labels(group) for group in self._active))))
+
+    def _active_groups(self) -> List[str]:
+        if self.active_labels is None:
+            return list(self.groups)
+        return self._deciding_groups(self.active_labels)
+
+    def _deciding_groups(self, labels: FrozenSet[str]) -> List[str]:
+        """
+        The groups that decide the entities with `labels`: the first group producing one of
+        them and every later group, whose overlapping matches overwrite it. Labels no group
+        produces come from the components before this stage (the NER), so every group decides
+        them. Groups are kept whole so their matches still shadow each other as before.
+        """
+        groups = list(self.groups)
+        if labels - set().union(*(self.group_labels(group) for group in groups)):
+            return groups
+        for index, group in enumerate(groups):
+            if self.group_labels(group) & labels:
+                return groups[index:]
+        return []
+
+    def requirements(self, labels: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Return (labels this stage produces or overwrites, token attributes it reads) for `labels`."""
+        labels = frozenset(labels)
+        groups = self._deciding_groups(labels)
+        if not groups:
+            return set(), set()
+        produced = set(labels)
+        attrs: Set[str] = set()
+        for group in groups:
+            for entry in self.groups[group]:
+                for token_spec in self._pattern(group, entry):
+                    attrs.update(PATTERN_ATTRS[key] for key in token_spec if key in PATTERN_ATTRS)
+        if AGE_LABEL in produced:
+            attrs.add("token.pos")  # age spans are shrunk to their numeral
+        return produced, attrs
+
+    def restrict_labels(self, labels: Optional[Iterable[str]]) -> None:
+        """Only run the groups that decide `labels` (None runs everything)."""
+        self.active_labels = frozenset(labels) if labels is not None else None
+        self._compile()
+
+    def use_lemmatizer(self, lemmatizer: bool) -> None:
+        """Match LEMMA predicates on lemmas (True) or, outside `LEMMATIZED_GROUPS`, on inflected forms (False)."""
+        self.lemmatizer = lemmatizer
+        self._compile()
+
+    def _pattern(self, group: str, entry: dict) -> List[dict]:
+        if self.lemmatizer or group in LEMMATIZED_GROUPS:
+            return entry["pattern"]
+        return lemma_free_pattern(entry["pattern"])
+
+    def _compile(self) -> None:
+        # Patterns are validated here, before flag ids (which the schema rejects) replace REGEX values.
+        self.matcher = Matcher(self.vocab, validate=False)
+        self.phrase_matchers = {attr: PhraseMatcher(self.vocab, attr=attr) for attr in _PHRASE_ATTRS}
+        self._keys: Dict[int, Tuple[int, str, str]] = {}
+        self._active = self._active_groups()
+        self._sequences: List[Optional[SequenceRules]] = []
+        # EntityRuler match ids per (group index, label, ent_id), and the rulers' Matchers, built on the first tie.
+        self._ruler_ids: Dict[Tuple[int, str, str], int] = {}
+        self._ruler_matchers: Dict[int, Matcher] = {}
+
+        for group_index, group in enumerate(self._active):
+            sequences = None
+            for entry in self.groups[group]:
+                label = entry["label"]
+                ent_id = entry.get("id", "")
+                pattern = self._pattern(group, entry)
+                key = f"{group}|{label}|{ent_id}"
+                self._keys[self.vocab.strings.add(key)] = (group_index, label, ent_id)
+                self._ruler_ids[group_index, label, ent_id] = self.vocab.strings.add(_ruler_key(entry))
+
+                kind = sequence_kind(pattern) if self.sequence_rules else None
+                if kind is not None and sequences is None:
+                    sequences = SequenceRules(self.vocab)
+                if kind is not None and sequences.available:
+                    sequences.add(kind, label, ent_id)
+                    continue
+
+                phrases = _as_phrases(pattern)
+                if phrases is None:
+                    self.matcher.add(key, [self._token_pattern(key, pattern)])
+                    continue
+                attr, words = phrases
+                if attr == "LEMMA":
+                    docs = [Doc(self.vocab, words=[word], lemmas=[word]) for word in words]
+                else:
+                    docs = [Doc(self.vocab, words=[word]) for word in words]
+                self.phrase_matchers[attr].add(key, docs)
+            self._sequences.append(sequences if sequences else None)
+
+    def _token_pattern(self, key: str, pattern: List[dict]) -> List[dict]:
+        errors = validate_token_pattern(pattern)
+        if errors:
+            raise MatchPatternError(key, {0: errors})
+        return compile_flags(self.vocab, pattern) if self.regex_flags else pattern
+
+    def _ruler_matcher(self, group_index: int) -> Matcher:
+        """A Matcher with the group's patterns added the way its EntityRuler added them."""
+        matcher = self._ruler_matchers.get(group_index)
+        if matcher is None:
+            matcher = self._ruler_matchers[group_index] = Matcher(self.vocab, validate=False)
+            group = self._active[group_index]
+            for entry in self.groups[group]:
+                key = _ruler_key(entry)
+                matcher.add(key, [self._token_pattern(key, self._pattern(group, entry))])
+        return matcher
+
+    def _tie_break(self, doc: Doc, group_index: int) -> TieBreak:
+        """Pick the match the group's EntityRuler would have taken among matches with the same extent."""
+        order: Dict[Tuple[int, int, int], int] = {}
+
+        def tie_break(tied: Sequence[Match]) -> int:
+            if not order:
+                # EntityRuler.match: a set of the matches, sorted (stably) longest first, then earliest.
+                matches = list(self._ruler_matcher(group_index)(doc))
+                final_matches = set([(m_id, start, end) for m_id, start, end in matches if start != end])
+                order.update((match, position) for position, match in enumerate(final_matches))
+            positions = [
+                order.get((self._ruler_ids[group_index, label, ent_id], start, end), len(order))
+                for start, end, label, ent_id in tied
+            ]
+            return positions.index(min(positions))
+
+        return tie_break
+
+    def _matches(self, doc: Doc) -> List[List[Match]]:
+        found = list(self.matcher(doc)) if len(self.matcher) else []
+        for phrase_matcher in self.phrase_matchers.values():
+            if len(phrase_matcher):
+                found.extend(phrase_matcher(doc))
+
+        by_group: List[List[Match]] = [[] for _ in self._active]
+        for match_id, start, end in set(found):
+            if start == end:
+                continue
+            group_index, label, ent_id = self._keys[match_id]
+            by_group[group_index].append((start, end, label, ent_id))
+        return by_group
+
+    def __call__(self, doc: Doc) -> Doc:
+        ents = list(doc.ents)
+        for group_index, (group, matches) in enumerate(zip(self._active, self._matches(doc))):
+            ents = _apply_group(doc, ents, matches, self._tie_break(doc, group_index), self._sequences[group_index])
+            if group == RULES_GROUP:
+                ents = filter_rule_ents(contact_entities(doc, ents))
+
+        for label in SHRINK_ORDER:
+            if label == AGE_LABEL:
+                ents = shrink_age_ents(doc, ents)
+            else:
+                ents = shrink_ents(doc, ents, label)
+
+        doc.ents = tuple(ents)
+        return doc
+
+    def to_bytes(self, *, exclude=tuple()) -> bytes:
+        return srsly.json_dumps({"groups": self.groups}).encode("utf-8")
+
+    def from_bytes(self, data: bytes, *, exclude=tuple()) -> "PIIMatcher":
+        self.set_groups(srsly.json_loads(data)["groups"])
+        return self
+
+    def to_disk(self, path, *, exclude=tuple()) -> None:
+        path = ensure_path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        srsly.write_json(path / "patterns.json", {"groups": self.groups})
+
+    def from_disk(self, path, *, exclude=tuple()) -> "PIIMatcher":
+        self.set_groups(srsly.read_json(ensure_path(path) / "patterns.json")["groups"])
+        return self
+
+
+@Language.factory(MATCHER_NAME, assigns=["doc.ents"])
+def make_pii_matcher(
+        nlp: spacy.Language,
+        name: str,
+        regex_flags: bool = True,
+        sequence_rules: bool = True,
+        lemmatizer: bool = True,
+) -> PIIMatcher:
+    return PIIMatcher(
+        nlp.vocab, name=name, regex_flags=regex_flags, sequence_rules=sequence_rules, lemmatizer=lemmatizer
+    )
+
+
+def add_pii_matcher(
+        nlp: spacy.Language,
+        groups: Optional[Dict[str, List[dict]]] = None,
+        regex_flags: bool = True,
+        sequence_rules: bool = True,
+        lemmatizer: bool = True,
+):
+    matcher = nlp.add_pipe(
+        MATCHER_NAME,
+        after="ner",
+        config={"regex_flags": regex_flags, "sequence_rules": sequence_rules, "lemmatizer": lemmatizer},
+    )
+    matcher.set_groups(default_rule_groups() if groups is None else groups)
+    return nlp
@@ -37,24 +37,14 @@ def shrink_relative_spans(doc):
     return shrink_spans(doc, RELATIVE_LABEL)
 
 
-def add_relative_entity_ruler(nlp: spacy.Language):
-    ruler = nlp.add_pipe(
-        "entity_ruler",
-        name="relative_ruler",
-        after="ner",
-        config={"overwrite_ents": True},
-    )
-
-    ruler.add_patterns([
+def _relative_patterns():
+    return [
         {
             "label": RELATIVE_LABEL,
             "pattern": [
                 {"LEMMA": {"IN": RELATIVE_WORDS}}
             ],
-        }
-    ])
-
-    ruler.add_patterns([
+        },
         {
             "label": RELATIVE_LABEL,
             "pattern": [
@@ -72,7 +62,18 @@ def add_relative_entity_ruler(nlp: spacy.Language):
                 {"LEMMA": {"IN": RELATIVE_WORDS}},
             ],
         },
-    ])
+    ]
+
+
+def add_relative_entity_ruler(nlp: spacy.Language):
+    ruler = nlp.add_pipe(
+        "entity_ruler",
+        name="relative_ruler",
+        after="ner",
+        config={"overwrite_ents": True},
+    )
+
+    ruler.add_patterns(_relative_patterns())
 
     nlp.add_pipe("shrink_relative_spans", last=True)
 
@@ -22,24 +22,14 @@ def shrink_religion_spans(doc):
     return shrink_spans(doc, RELIGION_LABEL)
 
 
-def add_religion_entity_ruler(nlp: spacy.Language):
-    ruler = nlp.add_pipe(
-        "entity_ruler",
-        name="religion_ruler",
-        after="ner",
-        config={"overwrite_ents": True},
-    )
-
-    ruler.add_patterns([
+def _religion_patterns():
+    return [
         {
             "label": RELIGION_LABEL,
             "pattern": [
                 {"LEMMA": {"IN": RELIGION_WORDS}}
             ],
-        }
-    ])
-
-    ruler.add_patterns([
+        },
         {
             "label": RELIGION_LABEL,
             "pattern": [
@@ -57,7 +47,18 @@ def add_religion_entity_ruler(nlp: spacy.Language):
                 {"LEMMA": {"IN": RELIGION_WORDS}},
             ],
         },
-    ])
+    ]
+
+
+def add_religion_entity_ruler(nlp: spacy.Language):
+    ruler = nlp.add_pipe(
+        "entity_ruler",
+        name="religion_ruler",
+        after="ner",
+        config={"overwrite_ents": True},
+    )
+
+    ruler.add_patterns(_religion_patterns())
 
     nlp.add_pipe("shrink_religion_spans", last=True)
 
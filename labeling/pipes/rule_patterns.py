@@ -0,0 +1,324 @@
+"""
+Token patterns, contact regexes and validators of the rule-based detectors.
+
+Kept free of spaCy imports so the same definitions drive both the pipeline
+component (`labeling.pipes.rule_entities`) and the model-free regex engine
+(`labeling.regex_engine`).
+"""
+
+import re
+
+RULE_SOURCE = "rule-based"
+
+
+# --- Normalization helpers -------------------------------------------------
+
+# Common OCR/typo characters read as digits.
+DIGIT_LOOKALIKES = str.maketrans({
+    "o": "0", "O": "0",
+    "l": "1", "I": "1",
+    "B": "8", "S": "5", "Z": "2",
+    "q": "9", "G": "6", "b": "6",
+})
+_NON_DIGIT_RE = re.compile(r"\D")
+_BANK_PREFIX_RE = re.compile(r"(?i)^pl")
+PESEL_WEIGHTS = (1, 3, 7, 9, 1, 3, 7, 9, 1, 3)
+
+
+def _normalize_digits(value: str) -> str:
+    """Convert common OCR/typo characters to digits and strip non-digits."""
+    return _NON_DIGIT_RE.sub("", value.translate(DIGIT_LOOKALIKES))
+
+
+# --- Validators -------------------------------------------------------------
+
+def check_pesel(pesel: str) -> bool:
+    digits = _normalize_digits(pesel)
+    if not re.fullmatch(r"\d{11}", digits):
+        return False
+
+    checksum = sum(w * int(d) for w, d in zip(PESEL_WEIGHTS, digits))
+    control_digit = (10 - (checksum % 10)) % 10
+    return control_digit == int(digits[-1])
+
+
+def luhn_check(number: str) -> bool:
+    """Validate number using the Luhn algorithm."""
+    cleaned = _normalize_digits(number)
+    if not cleaned.isdigit() or len(cleaned) < 13:
+        return False
+
+    total = 0
+    reverse_digits = cleaned[::-1]
+    for i, d in enumerate(reverse_digits):
+        n = int(d)
+        if i % 2 == 1:
+            n *= 2
+            if n > 9:
+                n -= 9
+        total += n
+
+    return total % 10 == 0
+
+
+def is_valid_phone(raw: str) -> bool:
+    digits = _normalize_digits(raw)
+    # Accept global phone lengths (after stripping country code/separators).
+    return 7 <= len(digits) <= 9
+
+
+def _strip_bank_prefix(raw: str) -> str:
+    return _BANK_PREFIX_RE.sub("", raw.replace(" ", "").replace("-", ""))
+
+
+def is_valid_bank_account(raw: str) -> bool:
+    digits = _normalize_digits(_strip_bank_prefix(raw))
+    return len(digits) == 26
+
+
+VALIDATORS = {
+    "pesel": check_pesel,
+    "credit-card-number": luhn_check,
+    "bank-account": is_valid_bank_account,
+    "phone": is_valid_phone,
+}
+
+
+# --- Pattern helpers -------------------------------------------------------
+
+ADDRESS_PREFIXES = ["ul.", "ul", "ulica", "al.", "al", "aleja", "pl.", "pl", "plac", "os.", "osiedle", "pi.", "pi"]
+MONTHS = [
+    "stycznia", "lutego", "marca", "kwietnia", "maja", "czerwca",
+    "lipca", "sierpnia", "września", "października", "listopada", "grudnia",
+]
+
+NUMBER_TOKEN = {"TEXT": {"REGEX": r"[0-9oOIlBGSq\-]{2,}"}}
+BANK_PREFIX_TOKEN = {"TEXT": {"REGEX": r"(?i)pl"}}
+PHONE_TOKEN = {"LIKE_NUM": True}
+PHONE_HYBRID_TOKEN = {"TEXT": {"REGEX": r"\+?\d[\d\-()]{2,}"}}
+PHONE_CODE_TOKEN = {"TEXT": {"REGEX": r"\\+?\\d{1,3}"}}
+PUNCT_TOKEN = {"IS_PUNCT": True}
+
+
+# Digit-sequence patterns. `labeling.pipes.sequences` generates their candidates
+# without the Matcher, recognising them by these exact shapes.
+
+def number_run_pattern():
+    return [{**NUMBER_TOKEN, "OP": "+"}]
+
+
+def prefixed_number_run_pattern():
+    return [{**BANK_PREFIX_TOKEN, "OP": "?"}, {**NUMBER_TOKEN, "OP": "+"}]
+
+
+def phone_pattern():
+    return [
+        {**PUNCT_TOKEN, "OP": "*"},
+        {**PHONE_CODE_TOKEN, "OP": "?"},
+        {**PUNCT_TOKEN, "OP": "*"},
+        {**PHONE_TOKEN, "OP": "+"},
+        {**PUNCT_TOKEN, "OP": "*"},
+        {**PHONE_HYBRID_TOKEN, "OP": "*"},
+    ]
+
+
+def phone_hybrid_pattern():
+    return [{**PUNCT_TOKEN, "OP": "*"}, dict(PHONE_HYBRID_TOKEN), {**PUNCT_TOKEN, "OP": "*"}]
+
+
+def _patterns():
+    patterns = []
+
+    # PESEL
+    patterns.append({
+        "label": "pesel",
+        "id": RULE_SOURCE,
+        "pattern": [{"TEXT": {"REGEX": r"\d{11}"}}],
+    })
+
+    # Credit cards and bank accounts (validated later)
+    patterns.append({
+        "label": "credit-card-number",
+        "id": RULE_SOURCE,
+        "pattern": number_run_pattern(),
+    })
+    patterns.append({
+        "label": "bank-account",
+        "id": RULE_SOURCE,
+        "pattern": prefixed_number_run_pattern(),
+    })
+
+    # Document numbers (two forms)
+    patterns.append({
+        "label": "document-number",
+        "id": RULE_SOURCE,
+        "pattern": [{"TEXT": {"REGEX": r"[A-Z]{2,3}\d{4,9}"}}],
+    })
+    patterns.append({
+        "label": "document-number",
+        "id": RULE_SOURCE,
+        "pattern": [{"TEXT": {"REGEX": r"\d{4}-\d{4}-\d{4}(?:-\d{4})?"}}],
+    })
+
+    # Email (case-insensitive, supports + and multiple subdomains)
+    patterns.append({
+        "label": "email",
+        "id": RULE_SOURCE,
+        "pattern": [{"TEXT": {"REGEX": r"(?i)[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}"}}],
+    })
+
+    # Phone: allow global formats with separators/parentheses and country codes
+    patterns.append({
+        "label": "phone",
+        "id": RULE_SOURCE,
+        "pattern": phone_pattern(),
+    })
+    patterns.append({
+        "label": "phone",
+        "id": RULE_SOURCE,
+        "pattern": phone_hybrid_pattern(),
+    })
+
+    # Date of birth phrases
+    patterns.append({
+        "label": "date-of-birth",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": {"IN": ["urodzony", "urodzona", "ur.", "ur", "data"]}},
+            {"LOWER": "urodzenia", "OP": "?"},
+            {"IS_PUNCT": True, "OP": "*"},
+            {"TEXT": {"REGEX": r"[0-3]?\d[./-][01]?\d[./-](?:\d{2}|\d{4})"}},
+        ],
+    })
+    patterns.append({
+        "label": "date-of-birth",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": {"IN": ["urodzony", "urodzona", "ur.", "ur", "data"]}},
+            {"LOWER": "urodzenia", "OP": "?"},
+            {"IS_PUNCT": True, "OP": "*"},
+            {"TEXT": {"REGEX": r"\d{4}-\d{2}-\d{2}"}},
+        ],
+    })
+
+    # Generic date formats (numeric)
+    patterns.append({
+        "label": "date",
+        "id": RULE_SOURCE,
+        "pattern": [{"TEXT": {"REGEX": r"[0-3]?\d[./-][01]?\d[./-](?:\d{2}|\d{4})"}}],
+    })
+
+    # Generic date formats (word month)
+    patterns.append({
+        "label": "date",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"TEXT": {"REGEX": r"[0-3]?\d"}},
+            {"LOWER": {"IN": MONTHS}},
+            {"TEXT": {"REGEX": r"\d{2,4}"}},
+            {"LOWER": "r", "OP": "?"},
+        ],
+    })
+
+    # Address
+    patterns.append({
+        "label": "address",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": {"IN": ADDRESS_PREFIXES}},
+            {"IS_TITLE": True, "OP": "+"},
+            {"TEXT": {"REGEX": r"\d[\w/]*"}},
+            {"TEXT": {"REGEX": r"\d{2}-\d{3}"}, "OP": "?"},
+            {"IS_TITLE": True, "OP": "*"},
+        ],
+    })
+
+    # School name
+    patterns.append({
+        "label": "school-name",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": {"IN": ["szkoła", "liceum", "technikum", "uniwersytet", "akademia", "politechnika"]}},
+            {"IS_PUNCT": True, "OP": "*"},
+            {"IS_TITLE": True, "OP": "+"},
+        ],
+    })
+
+    # Username/login
+    patterns.append({
+        "label": "username",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": {"IN": ["login", "username", "użytkownik"]}},
+            {"IS_PUNCT": True, "OP": "*"},
+            {"TEXT": {"REGEX": r"[\w.@+-]{3,}"}},
+        ],
+    })
+
+    # Secrets / sensitive keys
+    patterns.append({
+        "label": "secret",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": {"IN": ["hasło", "password", "token", "sekret"]}},
+            {"IS_PUNCT": True, "OP": "*"},
+            {"TEXT": {"REGEX": r"[\w!@#$%^&*()\\-_=+]{4,}"}},
+        ],
+    })
+    patterns.append({
+        "label": "secret",
+        "id": RULE_SOURCE,
+        "pattern": [
+            {"LOWER": "api"},
+            {"LOWER": "key", "OP": "?"},
+            {"IS_PUNCT": True, "OP": "*"},
+            {"TEXT": {"REGEX": r"[\w!@#$%^&*()\\-_=+]{4,}"}},
+        ],
+    })
+
+    return patterns
+
+
+# Single words the keyword ruler labels (`labeling.pipes.keywords`).
+
+KEYWORD_MAP = {
+    "political-view": [
+        "liberał", "liberalny", "konserwatysta", "konserwatywny",
+        "socjalista", "lewicowiec", "prawicowiec", "centrowy",
+        "anarchista", "narodowiec",
+    ],
+    "ethnicity": [
+        "polak", "polka", "ukrainiec", "ukrainka", "niemiec", "niemka",
+        "rosjanin", "rosjanka", "żyd", "rom", "romka", "białorusin",
+    ],
+    "sexual-orientation": [
+        "gej", "lesbijka", "biseksualny", "biseksualna",
+        "heteroseksualny", "heteroseksualna", "panseksualny",
+        "panseksualna", "queer",
+    ],
+    "health": [
+        "choroba", "chora", "chory", "depresja", "gorączka", "ból",
+        "infekcja", "astma", "rak", "grypa", "schorzenie",
+    ],
+    "job-title": [
+        "kierownik", "dyrektor", "prezes", "szef", "nauczyciel",
+        "nauczycielka", "psycholog", "lekarz", "prawnik", "magazynier",
+        "student", "profesor", "inżynier", "doktor",
+    ],
+    "school-name": [
+        "szkoła", "szkole", "szkolny", "liceum", "technikum",
+        "uniwersytet", "akademia", "politechnika",
+    ],
+}
+
+
+def _keyword_patterns():
+    patterns = []
+    for label, keywords in KEYWORD_MAP.items():
+        for kw in keywords:
+            patterns.append({"label": label, "pattern": [{"LOWER": kw}]})
+    return patterns
+
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", re.IGNORECASE)
+PHONE_RE = re.compile(r"\+?\d[\d\s\-()]{6,}\d")
@@ -0,0 +1,283 @@
+"""
+Candidate generation for the digit-sequence rules.
+
+The card and bank-account patterns (`NUMBER_TOKEN` "+") and the two phone
+patterns of `rule_patterns` match every sub-run of a run of number-like
+tokens: for a run of n tokens the Matcher returns O(n²) overlapping
+candidates, and nearly all of them lose the longest-first selection of the
+rule group. For these four shapes the matches starting at token s are
+exactly the spans [s, e) with `first[s] <= e <= last[s]`. The token classes
+involved (punctuation, LIKE_NUM, the phone code and hybrid regexes) are
+disjoint, so leading optional tokens are consumed in one way only, and every
+state after the first accepting one accepts. `first` and `last` come from a
+few NumPy passes over the class columns of the Doc.
+
+`select_longest` then resolves the group lazily. For every segment (maximal
+overlapping group of one rule's matches), a heap shared with the Matcher's
+other matches holds only the longest candidate inside the segment's free
+stretches. A segment is recomputed only when a selected span cuts into it.
+The selection is the one sorting all matches longest first would give.
+
+Matches with the same extent are decided by the caller (`tie_break`): the
+matcher reproduces the order in which the EntityRuler chain iterated its set
+of matches, see `labeling.pipes.matcher`.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from spacy.attrs import IS_PUNCT, LIKE_NUM
+from spacy.tokens import Doc
+
+from .lexeme_flags import RegexFlag, flag_for
+from .rule_patterns import (
+    BANK_PREFIX_TOKEN,
+    NUMBER_TOKEN,
+    PHONE_CODE_TOKEN,
+    PHONE_HYBRID_TOKEN,
+    number_run_pattern,
+    phone_hybrid_pattern,
+    phone_pattern,
+    prefixed_number_run_pattern,
+)
+
+Match = Tuple[int, int, str, str]
+# Index of the winner among matches with the same extent.
+TieBreak = Callable[[Sequence[Match]], int]
+
+NUMBER_RUN = "number-run"
+PREFIXED_NUMBER_RUN = "prefixed-number-run"
+PHONE = "phone"
+PHONE_HYBRID = "phone-hybrid"
+
+_SHAPES = {
+    NUMBER_RUN: number_run_pattern,
+    PREFIXED_NUMBER_RUN: prefixed_number_run_pattern,
+    PHONE: phone_pattern,
+    PHONE_HYBRID: phone_hybrid_pattern,
+}
+# Token-text regexes read as lexeme flags, in column order after IS_PUNCT and LIKE_NUM.
+_REGEX_TOKENS = (NUMBER_TOKEN, BANK_PREFIX_TOKEN, PHONE_HYBRID_TOKEN, PHONE_CODE_TOKEN)
+
+
+def sequence_kind(pattern: List[dict]) -> Optional[str]:
+    """Return the digit-sequence shape `pattern` has, or None for patterns left to the Matcher."""
+    for kind, shape in _SHAPES.items():
+        if pattern == shape():
+            return kind
+    return None
+
+
+def _run_ends(numpy, column):
+    """For every position, where the run of True values starting there ends (the position itself if False)."""
+    positions = numpy.arange(len(column))
+    ends = numpy.where(column, len(column) - 1, positions)
+    return numpy.minimum.accumulate(ends[::-1])[::-1]
+
+
+class _Candidates:
+    """Matches of one sequence rule in one Doc, as `[s, e)` for `first[s] <= e <= last[s]`."""
+
+    def __init__(self, numpy, label: str, ent_id: str, valid, first, last) -> None:
+        self.numpy = numpy
+        self.label = label
+        self.ent_id = ent_id
+        self.first = first
+        self.last = last
+        self.valid = valid
+        starts = numpy.flatnonzero(valid)
+        ends = last[starts]
+        # Segments: starts at which no earlier match reaches.
+        breaks = numpy.ones(len(starts), dtype=bool)
+        breaks[1:] = starts[1:] >= numpy.maximum.accumulate(ends)[:-1]
+        offsets = numpy.flatnonzero(breaks)
+        self.segment_starts: List[int] = starts[offsets].tolist()
+        self.segment_ends: List[int] = numpy.maximum.reduceat(ends, offsets).tolist() if len(offsets) else []
+        self.versions = [0] * len(self.segment_starts)
+        # Longest match of every segment, earliest first: the initial heap entries.
+        size = len(valid) + 2
+        keys = (ends - starts) * size + (size - 1 - starts)
+        best = numpy.maximum.reduceat(keys, offsets) if len(offsets) else keys[:0]
+        best_starts = size - 1 - best % size
+        self.initial: List[Tuple[int, int]] = list(zip(best_starts.tolist(), (best_starts + best // size).tolist()))
+
+    def longest(self, lo: int, hi: int) -> Optional[Tuple[int, int]]:
+        """The longest match inside [lo, hi), earliest on ties."""
+        numpy = self.numpy
+        lengths = numpy.minimum(self.last[lo:hi], hi) - numpy.arange(lo, hi)
+        lengths[~self.valid[lo:hi] | (self.first[lo:hi] > hi)] = 0
+        best = int(lengths.argmax())
+        if lengths[best] <= 0:
+            return None
+        return lo + best, lo + best + int(lengths[best])
+
+
+class SequenceRules:
+    """
+    Candidate generator for the digit-sequence rules of one matcher group.
+
+    The regexes of the token classes are read as lexeme flags (see `lexeme_flags`);
+    `available` is False when the vocabulary has no free flag bits left for them.
+
+    Args:
+        vocab: Shared vocabulary of the pipeline.
+    """
+
+    def __init__(self, vocab) -> None:
+        self.rules: List[Tuple[str, str, str]] = []
+        # Candidates handed to the selection so far (for benchmarks).
+        self.generated = 0
+        flags = [flag_for(vocab, RegexFlag(token["TEXT"]["REGEX"])) for token in _REGEX_TOKENS]
+        self._attrs = None if None in flags else [IS_PUNCT, LIKE_NUM, *flags]
+
+    @property
+    def available(self) -> bool:
+        return self._attrs is not None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add(self, kind: str, label: str, ent_id: str) -> None:
+        self.rules.append((kind, label, ent_id))
+
+    def candidates(self, doc: Doc) -> List[_Candidates]:
+        import numpy
+
+        n = len(doc)
+        # Two padding rows of no class keep every `+ 1` lookup in bounds.
+        columns = numpy.zeros((n + 2, len(self._attrs)), dtype=bool)
+        if n:
+            columns[:n] = doc.to_array(self._attrs) != 0
+        punct, like_num, number, prefix, hybrid, code = columns.T
+        punct_end, number_end = _run_ends(numpy, punct), _run_ends(numpy, number)
+        starts = numpy.arange(n)
+
+        result = []
+        for kind, label, ent_id in self.rules:
+            if kind == NUMBER_RUN:
+                valid, first, last = number[:n], starts + 1, number_end[:n]
+            elif kind == PREFIXED_NUMBER_RUN:
+                prefixed = ~number[:n] & prefix[:n] & number[1:n + 1]
+                valid = number[:n] | prefixed
+                first = starts + 1 + prefixed
+                last = numpy.where(prefixed, number_end[1:n + 1], number_end[:n])
+            elif kind == PHONE:
+                # Punctuation, an optional code, punctuation; then LIKE_NUM, punctuation and hybrid runs.
+                after_punct = punct_end[:n]
+                number_start = numpy.where(code[after_punct], punct_end[after_punct + 1], after_punct)
+                valid = like_num[number_start]
+                first = number_start + 1
+                last = _run_ends(numpy, hybrid)[punct_end[_run_ends(numpy, like_num)[number_start]]]
+            else:
+                hybrid_at = punct_end[:n]
+                valid, first, last = hybrid[hybrid_at], hybrid_at + 1, punct_end[hybrid_at + 1]
+            result.append(_Candidates(numpy, label, ent_id, valid, first, last))
+        return result
+
+
+def select_longest(
+        doc: Doc,
+        matches: List[Match],
+        tie_break: TieBreak,
+        sequences: Optional[SequenceRules] = None,
+) -> List[Match]:
+    """
+    Select non-overlapping matches the way an EntityRuler does: longest first, then earliest.
+
+    `sequences` adds the candidates of the digit-sequence rules. Among matches with the
+    same extent `tie_break` picks the winner (it is only called for such ties). The result
+    is in selection order.
+    """
+    if sequences is None:
+        ordered = sorted(matches, key=lambda m: (m[1] - m[0], -m[0]), reverse=True)
+        selected: List[Match] = []
+        seen_tokens = set()
+        for first in range(len(ordered)):
+            start, end = ordered[first][:2]
+            if start in seen_tokens or end - 1 in seen_tokens:
+                continue
+            last = first + 1
+            while last < len(ordered) and ordered[last][:2] == (start, end):
+                last += 1
+            winner = ordered[first]
+            if last - first > 1:
+                winner = ordered[first + tie_break(ordered[first:last])]
+            selected.append(winner)
+            seen_tokens.update(range(start, end))
+        return selected
+
+    rules = sequences.candidates(doc)
+    # Heap entries: (-length, start, order, end, label, ent_id, rule, segment, version); rule -1 for Matcher matches.
+    heap = [
+        (start - end, start, p, end, label, ent_id, -1, 0, 0)
+        for p, (start, end, label, ent_id) in enumerate(matches)
+    ]
+    order = len(matches)
+    for index, rule in enumerate(rules):
+        for segment, (start, end) in enumerate(rule.initial):
+            heap.append((start - end, start, order, end, rule.label, rule.ent_id, index, segment, 0))
+            order += 1
+    sequences.generated += order - len(matches)
+    heapq.heapify(heap)
+
+    starts: List[int] = []
+    ends: List[int] = []
+
+    def live(entry) -> bool:
+        _, start, _, end, _, _, index, segment, version = entry
+        if index >= 0:
+            # Any selection overlapping the segment replaced its candidate.
+            return rules[index].versions[segment] == version
+        i = bisect_right(starts, start)
+        return not ((i > 0 and ends[i - 1] > start) or (i < len(starts) and starts[i] < end))
+
+    selected = []
+    while heap:
+        entry = heapq.heappop(heap)
+        if not live(entry):
+            continue
+        tied = [entry]
+        while heap and heap[0][:2] == entry[:2]:  # same length and start: same extent
+            other = heapq.heappop(heap)
+            if live(other):
+                tied.append(other)
+        if len(tied) > 1:
+            entry = tied[tie_break([(e[1], e[3], e[4], e[5]) for e in tied])]
+        _, start, _, end, label, ent_id, _, _, _ = entry
+        i = bisect_left(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+        selected.append((start, end, label, ent_id))
+
+        # Recompute the longest candidate of every segment the selected span cuts into.
+        for index, rule in enumerate(rules):
+            segment = bisect_right(rule.segment_ends, start)
+            while segment < len(rule.segment_starts) and rule.segment_starts[segment] < end:
+                rule.versions[segment] += 1
+                best = _longest_free(rule, segment, starts, ends)
+                if best is not None:
+                    heapq.heappush(heap, (best[0] - best[1], best[0], order, best[1], rule.label, rule.ent_id,
+                                          index, segment, rule.versions[segment]))
+                    order += 1
+                    sequences.generated += 1
+                segment += 1
+    return selected
+
+
+def _longest_free(rule: _Candidates, segment: int, starts: List[int], ends: List[int]) -> Optional[Tuple[int, int]]:
+    """The longest match of `segment` not overlapping any selected span, earliest on ties."""
+    lo, stop = rule.segment_starts[segment], rule.segment_ends[segment]
+    best = None
+    i = bisect_right(ends, lo)
+    while lo < stop:
+        hi = min(starts[i], stop) if i < len(starts) else stop
+        if hi > lo:
+            found = rule.longest(lo, hi)
+            if found is not None and (best is None or found[1] - found[0] > best[1] - best[0]):
+                best = found
+        if i >= len(starts) or starts[i] >= stop:
+            break
+        lo = max(lo, ends[i])
+        i += 1
+    return best
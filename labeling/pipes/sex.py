@@ -15,24 +15,14 @@ def shrink_sex_spans(doc):
     return shrink_spans(doc, SEX_LABEL)
 
 
-def add_sex_entity_ruler(nlp: spacy.Language):
-    ruler = nlp.add_pipe(
-        "entity_ruler",
-        name="sex_ruler",
-        after="ner",
-        config={"overwrite_ents": True},
-    )
-
-    ruler.add_patterns([
+def _sex_patterns():
+    return [
         {
             "label": SEX_LABEL,
             "pattern": [
                 {"LEMMA": {"IN": SEX_WORDS}}
             ],
-        }
-    ])
-
-    ruler.add_patterns([
+        },
         {
             "label": SEX_LABEL,
             "pattern": [
@@ -41,7 +31,18 @@ def add_sex_entity_ruler(nlp: spacy.Language):
                 {"LEMMA": {"IN": SEX_WORDS}},
             ],
         },
-    ])
+    ]
+
+
+def add_sex_entity_ruler(nlp: spacy.Language):
+    ruler = nlp.add_pipe(
+        "entity_ruler",
+        name="sex_ruler",
+        after="ner",
+        config={"overwrite_ents": True},
+    )
+
+    ruler.add_patterns(_sex_patterns())
 
     nlp.add_pipe("shrink_sex_spans", last=True)
 
@@ -0,0 +1,125 @@
+"""
+Batch validation of rule-based candidates.
+
+`validate_batch` checks many `(label, text)` candidates at once with the
+semantics of `rule_patterns.VALIDATORS`. From `VECTOR_MIN` candidates on, all
+texts are joined into one byte buffer and checked in a few NumPy passes: a
+lookup table maps OCR lookalikes to digits and marks everything else, a
+cumulative sum gives every candidate's digit count, PESEL digits are gathered
+into an (n, 11) matrix for the weighted sum and Luhn sums are segment
+reductions. Smaller batches, candidates with non-ASCII characters (`\\d` also
+matches non-ASCII digits) and installs without NumPy use the scalar
+validators; the results are the same either way.
+
+Kept free of spaCy imports, like `rule_patterns`.
+"""
+
+from typing import List, Optional, Sequence
+
+from .rule_patterns import DIGIT_LOOKALIKES, PESEL_WEIGHTS, VALIDATORS, _strip_bank_prefix
+
+# Below this many candidates the fixed cost of the NumPy calls outweighs the scalar loop.
+VECTOR_MIN = 32
+
+_LUHN_MIN_DIGITS = 13
+_PESEL_DIGITS = 11
+_BANK_DIGITS = 26
+_PHONE_DIGITS = (7, 9)
+# Labels with a vectorised check.
+_CHECKS = ("pesel", "credit-card-number", "bank-account", "phone")
+_CODES = {label: code for code, label in enumerate(_CHECKS)}
+
+
+def _numpy():
+    # Optional: the regex engine runs with the standard library only.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _digit_lookup(numpy):
+    """Byte -> digit value, with the OCR lookalikes mapped and 255 for everything else."""
+    lookup = numpy.full(256, 255, dtype=numpy.uint8)
+    lookup[0x30:0x3A] = numpy.arange(10)
+    for char, digit in DIGIT_LOOKALIKES.items():
+        lookup[char] = int(digit)
+    return lookup
+
+
+def _vectorized(numpy, codes: Sequence[int], texts: Sequence[str]) -> List[bool]:
+    """Checks for ASCII-only candidates with labels `_CHECKS[code]`."""
+    count = len(texts)
+    codes = numpy.fromiter(codes, dtype=numpy.int8, count=count)
+    lengths = numpy.fromiter(map(len, texts), dtype=numpy.int64, count=count)
+    values = _digit_lookup(numpy)[numpy.frombuffer("".join(texts).encode("ascii"), dtype=numpy.uint8)]
+    is_digit = values != 255
+    digits = values[is_digit]
+    # Digits before every candidate boundary give each candidate's digit count and first digit.
+    seen = numpy.zeros(len(values) + 1, dtype=numpy.int64)
+    numpy.cumsum(is_digit, out=seen[1:])
+    ends = numpy.cumsum(lengths)
+    first = seen[ends - lengths]
+    counts = seen[ends] - first
+
+    ok = numpy.zeros(count, dtype=bool)
+    phone = codes == _CHECKS.index("phone")
+    ok[phone] = (counts[phone] >= _PHONE_DIGITS[0]) & (counts[phone] <= _PHONE_DIGITS[1])
+    bank = codes == _CHECKS.index("bank-account")
+    ok[bank] = counts[bank] == _BANK_DIGITS
+
+    # PESEL: a dense (n, 11) matrix of the digits; ten are weighted, the last is the control digit.
+    pesel = numpy.flatnonzero((codes == _CHECKS.index("pesel")) & (counts == _PESEL_DIGITS))
+    if len(pesel):
+        matrix = digits[first[pesel, None] + numpy.arange(_PESEL_DIGITS)].astype(numpy.int64)
+        checksum = matrix[:, :-1] @ numpy.array(PESEL_WEIGHTS, dtype=numpy.int64)
+        ok[pesel] = (10 - checksum % 10) % 10 == matrix[:, -1]
+
+    # Luhn: every second digit from the right doubled, minus 9 above 9, summed per candidate.
+    cards = numpy.flatnonzero((codes == _CHECKS.index("credit-card-number")) & (counts >= _LUHN_MIN_DIGITS))
+    if len(cards):
+        sizes = counts[cards]
+        offsets = numpy.cumsum(sizes) - sizes
+        position = numpy.arange(sizes.sum()) - numpy.repeat(offsets, sizes)
+        card_digits = digits[numpy.repeat(first[cards], sizes) + position].astype(numpy.int64)
+        card_digits <<= (numpy.repeat(sizes, sizes) - 1 - position) % 2
+        card_digits -= 9 * (card_digits > 9)
+        ok[cards] = numpy.add.reduceat(card_digits, offsets) % 10 == 0
+    return ok.tolist()
+
+
+def validate_batch(labels: Sequence[str], texts: Sequence[str], vector_min: Optional[int] = None) -> List[bool]:
+    """
+    Return, for every candidate, whether its label's validator accepts its text (True without one).
+
+    Args:
+        labels: Label of every candidate.
+        texts: Text of every candidate.
+        vector_min: Smallest batch checked with NumPy (default: `VECTOR_MIN`).
+    """
+    results = [True] * len(labels)
+    checked = [position for position, label in enumerate(labels) if label in VALIDATORS]
+    numpy = _numpy() if len(checked) >= (VECTOR_MIN if vector_min is None else vector_min) else None
+    if numpy is None:
+        for position in checked:
+            results[position] = VALIDATORS[labels[position]](texts[position])
+        return results
+
+    prepared = [texts[position] for position in checked]
+    if not "".join(prepared).isascii():
+        # `\d` also matches non-ASCII digits; the rare candidates with any take the scalar path.
+        for position, text in zip(checked, prepared):
+            if not text.isascii():
+                results[position] = VALIDATORS[labels[position]](text)
+        kept = [(position, text) for position, text in zip(checked, prepared) if text.isascii()]
+        checked, prepared = [position for position, _ in kept], [text for _, text in kept]
+    for index, position in enumerate(checked):
+        if labels[position] == "bank-account" and prepared[index].lstrip(" -")[:1] in ("p", "P"):
+            # A leading "PL" is dropped before the lookalike mapping ("l" would become "1").
+            prepared[index] = _strip_bank_prefix(prepared[index])
+    if checked:
+        codes = [_CODES[labels[position]] for position in checked]
+        for position, ok in zip(checked, _vectorized(numpy, codes, prepared)):
+            results[position] = ok
+    return results
@@ -0,0 +1,202 @@
+"""
+Statistical components run only around candidate regions.
+
+Names, places and organisations come from the statistical NER, but most of a
+document contains none of them. `windowed_model` replaces the statistical
+components of a pipeline: a cheap pass over the tokens marks cues, every cue
+gets `context` tokens on either side, overlapping or nearby windows are
+merged, and only those windows go through the statistical components (in
+their pipeline order, batched across the windows of all documents in a
+batch). Their entities and token attributes (POS, tag, morphology, lemma) are
+copied back at the original token offsets; the rule stage then runs on the
+whole document as before.
+
+Cues are:
+- capitalised words (and upper-case ones longer than a letter) that are not
+  stop words, i.e. proper-name candidates wherever they stand in a sentence;
+- `GAZETTEER` words that introduce names in running text even when the name
+  itself is written in lower case ("pan", "ul.", "firma", "szkoła", ...);
+- the words the rule patterns reading POS or LEMMA end on (relative, religion,
+  sex and age words in all their forms, from `labeling.pipes.inflections`), so
+  those rules still see tagged and lemmatized tokens around their matches.
+
+Outside the windows tokens get POS `X` and their lower-cased text as lemma.
+Parser and sentence recognizer are not run: dependencies and sentence
+boundaries are not available in this mode. Window statistics are stored per
+document in `doc.user_data[WINDOW_STATS_KEY]`.
+"""
+
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import numpy
+import spacy
+from spacy.attrs import LEMMA, LOWER, MORPH, POS, TAG
+from spacy.language import Language
+from spacy.parts_of_speech import IDS as POS_IDS
+from spacy.tokens import Doc, Span
+from spacy.util import minibatch
+
+from labeling.preprocessor import ORG_SCHOOL_KEYWORDS
+
+from .inflections import lemma_free_pattern
+from .matcher import MATCHER_NAME, PATTERN_ATTRS
+
+WINDOWED_NAME = "windowed_model"
+WINDOW_STATS_KEY = "windowed"
+DEFAULT_CONTEXT = 24
+# Components whose output (dependencies, sentence starts) is not copied back; they are disabled.
+PARSER_FACTORIES = frozenset({"parser", "beam_parser", "senter"})
+# Windows closer than this many tokens are merged; running one window is cheaper than two.
+_MERGE_GAP = 8
+
+GAZETTEER = frozenset({
+    # People: forms of address and titles.
+    "pan", "pana", "panu", "panem", "panie", "pani", "panią", "państwo", "państwa",
+    "dr", "mgr", "prof", "inż", "adw", "mec",
+    # Places.
+    "ul", "ulica", "ulicy", "ulicę", "al", "aleja", "alei", "os", "osiedle", "osiedlu", "pl", "plac",
+    "miasto", "miasta", "mieście", "gmina", "gminy", "gminie", "wieś", "wsi", "powiat", "powiatu",
+    "województwo", "województwa",
+    # Organisations.
+    "firma", "firmy", "firmie", "spółka", "spółki", "spółce", "sp", "fundacja", "fundacji",
+    "stowarzyszenie", "urząd", "urzędu", "sąd", "sądu", "bank", "banku",
+}) | frozenset(ORG_SCHOOL_KEYWORDS)
+
+_COPIED_ATTRS = [POS, TAG, MORPH, LEMMA]
+_OTHER_POS = POS_IDS["X"]
+
+
+def _reads_model(token_spec: dict) -> bool:
+    return any(key in PATTERN_ATTRS for key in token_spec)
+
+
+def rule_anchors(groups: Dict[str, List[dict]]) -> FrozenSet[str]:
+    """Lower-cased words that patterns reading POS/LEMMA (or other model attributes) end on."""
+    words = set()
+    for entries in groups.values():
+        for entry in entries:
+            pattern = entry["pattern"]
+            if not any(_reads_model(token_spec) for token_spec in pattern):
+                continue
+            last = lemma_free_pattern(pattern[-1:])[0]
+            value = last.get("LOWER", last.get("ORTH", last.get("TEXT")))
+            if isinstance(value, str):
+                words.add(value.lower())
+            elif isinstance(value, dict) and "IN" in value:
+                words.update(word.lower() for word in value["IN"])
+    return frozenset(words)
+
+
+def is_cue(token, anchors: FrozenSet[str]) -> bool:
+    lower = token.lower_.rstrip(".")
+    if lower in GAZETTEER or lower in anchors:
+        return True
+    text = token.text
+    return token.is_alpha and not token.is_stop and (text.istitle() or (text.isupper() and len(text) > 1))
+
+
+def candidate_windows(doc: Doc, anchors: FrozenSet[str], context: int = DEFAULT_CONTEXT) -> List[Tuple[int, int]]:
+    """Token ranges `[start, end)` around every cue of `doc`, merged when they overlap or nearly touch."""
+    windows: List[Tuple[int, int]] = []
+    for token in doc:
+        if not is_cue(token, anchors):
+            continue
+        start, end = max(0, token.i - context), min(len(doc), token.i + context + 1)
+        if windows and start <= windows[-1][1] + _MERGE_GAP:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+class WindowedModel:
+    """
+    Pipeline component running the statistical components on candidate windows only.
+
+    Args:
+        nlp: The pipeline; its matcher provides the rule anchors.
+        name: Component name.
+        context: Tokens of context on either side of every cue.
+    """
+
+    def __init__(self, nlp: spacy.Language, name: str = WINDOWED_NAME, context: int = DEFAULT_CONTEXT) -> None:
+        self.name = name
+        self.context = context
+        self.components: List[Tuple[str, object]] = []
+        self.anchors: FrozenSet[str] = frozenset()
+        if MATCHER_NAME in nlp.component_names:
+            self.anchors = rule_anchors(nlp.get_pipe(MATCHER_NAME).groups)
+
+    def set_components(self, components: Iterable[Tuple[str, object]]) -> None:
+        self.components = list(components)
+
+    def _run_components(self, docs: List[Doc], batch_size: int) -> List[Doc]:
+        for _, proc in self.components:
+            if hasattr(proc, "pipe"):
+                docs = list(proc.pipe(docs, batch_size=batch_size))
+            else:
+                docs = [proc(doc) for doc in docs]
+        return docs
+
+    def _process(self, docs: List[Doc], batch_size: int) -> List[Doc]:
+        windows = [candidate_windows(doc, self.anchors, self.context) for doc in docs]
+        parts = [doc[start:end].as_doc() for doc, doc_windows in zip(docs, windows) for start, end in doc_windows]
+        parts = iter(self._run_components(parts, batch_size) if parts else [])
+
+        for doc, doc_windows in zip(docs, windows):
+            values = numpy.zeros((len(doc), len(_COPIED_ATTRS)), dtype="uint64")
+            values[:, 0] = _OTHER_POS
+            ents: List[Span] = []
+            model_chars = 0
+            for start, end in doc_windows:
+                part = next(parts)
+                values[start:end] = part.to_array(_COPIED_ATTRS)
+                ents.extend(Span(doc, start + ent.start, start + ent.end, label=ent.label) for ent in part.ents)
+                model_chars += doc[end - 1].idx + len(doc[end - 1]) - doc[start].idx
+            # Components without a lemmatizer leave lemmas unset inside the windows too.
+            unset = values[:, 3] == 0
+            values[unset, 3] = doc.to_array([LOWER]).reshape(-1)[unset]
+            doc.from_array(_COPIED_ATTRS, values)
+            doc.ents = ents
+            doc.user_data[WINDOW_STATS_KEY] = {
+                "windows": len(doc_windows),
+                "chars": doc[-1].idx + len(doc[-1].text_with_ws) if len(doc) else 0,
+                "model_chars": model_chars,
+            }
+        return docs
+
+    def __call__(self, doc: Doc) -> Doc:
+        return self._process([doc], batch_size=1)[0]
+
+    def pipe(self, stream: Iterable[Doc], *, batch_size: int = 128) -> Iterator[Doc]:
+        for docs in minibatch(stream, size=batch_size):
+            yield from self._process(list(docs), batch_size)
+
+
+@Language.factory(WINDOWED_NAME, assigns=["doc.ents", "token.pos", "token.tag", "token.morph", "token.lemma"])
+def make_windowed_model(nlp: spacy.Language, name: str, context: int = DEFAULT_CONTEXT) -> WindowedModel:
+    return WindowedModel(nlp, name=name, context=context)
+
+
+def add_windowed_model(nlp: spacy.Language, context: int = DEFAULT_CONTEXT) -> Optional[WindowedModel]:
+    """
+    Move the enabled statistical components of `nlp` behind a `windowed_model` component.
+
+    Parsers and sentence recognizers are disabled. Returns the component, or None when
+    no statistical component is enabled (e.g. pruned away by labels).
+    """
+    components = []
+    for name in list(nlp.pipe_names):
+        if name == MATCHER_NAME:
+            break
+        if nlp.get_pipe_meta(name).factory in PARSER_FACTORIES:
+            nlp.disable_pipe(name)
+            continue
+        components.append((name, nlp.get_pipe(name)))
+    if not components:
+        return None
+    for name, _ in components:
+        nlp.disable_pipe(name)
+    windowed = nlp.add_pipe(WINDOWED_NAME, before=MATCHER_NAME, config={"context": context})
+    windowed.set_components(components)
+    return windowed
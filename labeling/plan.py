@@ -0,0 +1,199 @@
+"""
+Label-driven pruning of the spaCy pipeline.
+
+Given the labels a job actually needs, work out which rule components can
+produce them, which token attributes those rules read (e.g. LEMMA, POS), and
+which statistical components assign those attributes. Everything else is
+disabled so it never runs.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+import spacy
+
+from labeling.pipes.age import AGE_LABEL
+from labeling.pipes.matcher import MATCHER_NAME, PATTERN_ATTRS
+from labeling.pipes.relative import RELATIVE_LABEL
+from labeling.pipes.religion import RELIGION_LABEL
+from labeling.pipes.rule_entities import VALIDATORS
+from labeling.pipes.sex import SEX_LABEL
+from labeling.preprocessor import NER_LABELS, PLAN_META_KEY, validate_labels
+
+# Labels produced (or post-processed) by the custom function components.
+COMPONENT_LABELS: Dict[str, FrozenSet[str]] = {
+    "regex_contact_entities": frozenset({"email", "phone"}),
+    "filter_rule_spans": frozenset(VALIDATORS),
+    "shrink_sex_spans": frozenset({SEX_LABEL}),
+    "shrink_religion_spans": frozenset({RELIGION_LABEL}),
+    "shrink_relative_spans": frozenset({RELATIVE_LABEL}),
+    "shrink_age_spans": frozenset({AGE_LABEL}),
+}
+
+NER_FACTORIES = frozenset({"ner", "beam_ner"})
+LEMMATIZER_FACTORIES = frozenset({"lemmatizer", "trainable_lemmatizer"})
+# Requirements spaCy does not declare in factory metadata: the rule/lookup lemmatizers need POS.
+IMPLICIT_REQUIRES = {"lemmatizer": frozenset({"token.pos"})}
+
+
+@dataclass
+class PipelinePlan:
+    labels: FrozenSet[str]
+    enabled: List[str]
+    disabled: List[str]
+    reasons: Dict[str, str] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        lines = [f"Pipeline plan for labels: {', '.join(sorted(self.labels))}"]
+        for name in self.enabled:
+            lines.append(f"  + {name}: {self.reasons.get(name, 'required')}")
+        for name in self.disabled:
+            lines.append(f"  - {name}")
+        return "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "labels": sorted(self.labels),
+            "enabled": self.enabled,
+            "disabled": self.disabled,
+            "reasons": self.reasons,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "PipelinePlan":
+        return cls(
+            labels=frozenset(data["labels"]),
+            enabled=list(data["enabled"]),
+            disabled=list(data["disabled"]),
+            reasons=dict(data["reasons"]),
+        )
+
+
+def _pattern_attrs(pattern) -> Set[str]:
+    attrs: Set[str] = set()
+    if isinstance(pattern, str):  # phrase pattern: matched on the tokenizer output only
+        return attrs
+    for token_spec in pattern:
+        attrs.update(PATTERN_ATTRS[key] for key in token_spec if key in PATTERN_ATTRS)
+    return attrs
+
+
+def _ruler_needs(ruler, labels: FrozenSet[str]) -> tuple[Set[str], Set[str]]:
+    """Return (labels this ruler contributes, attributes its relevant patterns read)."""
+    produced: Set[str] = set()
+    attrs: Set[str] = set()
+    for entry in ruler.patterns:
+        if entry["label"] in labels:
+            produced.add(entry["label"])
+            attrs |= _pattern_attrs(entry["pattern"])
+    return produced, attrs
+
+
+def plan_pipeline(nlp: spacy.language.Language, labels: Iterable[str]) -> PipelinePlan:
+    """
+    Decide which components of `nlp` are needed to produce `labels`.
+    """
+    requested = validate_labels(labels)
+    reasons: Dict[str, str] = {}
+    required_attrs: Set[str] = set()
+    model_components: List[str] = []
+
+    for name in nlp.pipe_names:
+        meta = nlp.get_pipe_meta(name)
+        if meta.factory == "entity_ruler":
+            produced, attrs = _ruler_needs(nlp.get_pipe(name), requested)
+            if produced:
+                reasons[name] = f"patterns for {', '.join(sorted(produced))}"
+                required_attrs |= attrs
+        elif meta.factory == MATCHER_NAME:
+            produced, attrs = nlp.get_pipe(name).requirements(requested)
+            if produced:
+                reasons[name] = f"rule groups for {', '.join(sorted(produced))}"
+                required_attrs |= attrs
+        elif name in COMPONENT_LABELS:
+            produced = COMPONENT_LABELS[name] & requested
+            if produced:
+                reasons[name] = f"post-processes {', '.join(sorted(produced))}"
+                required_attrs |= set(meta.requires)
+        else:
+            model_components.append(name)
+
+    if requested & NER_LABELS:
+        for name in model_components:
+            if nlp.get_pipe_meta(name).factory in NER_FACTORIES:
+                reasons[name] = f"entities for {', '.join(sorted(requested & NER_LABELS))}"
+
+    # Pull in statistical components assigning the attributes that kept components read,
+    # until their own requirements are satisfied as well.
+    while True:
+        for name in model_components:
+            if name in reasons:
+                continue
+            assigns = set(nlp.get_pipe_meta(name).assigns) & required_attrs
+            if assigns:
+                reasons[name] = f"assigns {', '.join(sorted(assigns))}"
+        before = len(required_attrs)
+        for name in model_components:
+            if name in reasons:
+                meta = nlp.get_pipe_meta(name)
+                required_attrs |= set(meta.requires) | IMPLICIT_REQUIRES.get(meta.factory, frozenset())
+        if len(required_attrs) == before:
+            break
+
+    kept_models = [name for name in model_components if name in reasons]
+    for name in model_components:
+        if name in reasons:
+            continue
+        proc = nlp.get_pipe(name)
+        listeners = set(getattr(proc, "listening_components", ())) & set(kept_models)
+        if listeners:
+            reasons[name] = f"shared embeddings for {', '.join(sorted(listeners))}"
+        elif kept_models and not nlp.get_pipe_meta(name).assigns:
+            # Nothing to reason about (e.g. attribute_ruler); keep it alongside the statistical components.
+            reasons[name] = "undeclared outputs, kept with the statistical components"
+
+    enabled = [name for name in nlp.pipe_names if name in reasons]
+    disabled = [name for name in nlp.pipe_names if name not in reasons]
+    return PipelinePlan(labels=requested, enabled=enabled, disabled=disabled, reasons=reasons)
+
+
+def apply_plan(nlp: spacy.language.Language, plan: PipelinePlan) -> spacy.language.Language:
+    for name in plan.disabled:
+        nlp.disable_pipe(name)
+    for name in plan.enabled:
+        if nlp.get_pipe_meta(name).factory == MATCHER_NAME:
+            # One stage serves every label; it skips the rule groups that are not needed instead.
+            nlp.get_pipe(name).restrict_labels(plan.labels)
+    nlp.meta[PLAN_META_KEY] = plan.as_dict()
+    return nlp
+
+
+def disable_lemmatizer(nlp: spacy.language.Language) -> List[str]:
+    """
+    Match the rule stage's lemma patterns on inflected forms and disable the lemmatizers.
+
+    The lemmatizers stay enabled while a rule group that still reads lemmas (the relative
+    rules, see `LEMMATIZED_GROUPS`) runs; `plan_pipeline` drops them when no requested label
+    depends on that group, along with components the lemmatizer alone needed (e.g. the tagger).
+    Returns the names of the disabled components.
+    """
+    lemmas_read = False
+    for name in nlp.pipe_names:
+        if nlp.get_pipe_meta(name).factory == MATCHER_NAME:
+            matcher = nlp.get_pipe(name)
+            matcher.use_lemmatizer(False)
+            lemmas_read |= "token.lemma" in matcher.requirements(matcher.labels)[1]
+    if lemmas_read:
+        return []
+    disabled = []
+    for name in list(nlp.pipe_names):
+        if nlp.get_pipe_meta(name).factory in LEMMATIZER_FACTORIES:
+            nlp.disable_pipe(name)
+            disabled.append(name)
+    return disabled
+
+
+def get_plan(nlp: spacy.language.Language) -> Optional[PipelinePlan]:
+    """Return the plan applied to `nlp` by `build_pipeline(labels=...)`, if any."""
+    data = nlp.meta.get(PLAN_META_KEY)
+    return PipelinePlan.from_dict(data) if data else None
@@ -1,78 +1,27 @@
-from dataclasses import dataclass
-from typing import Any, Dict, List
+from collections.abc import Sequence
+from functools import partial
+from typing import Iterable, Iterator, List, Optional
 
 import spacy
 
-@dataclass
-class TokenInfo:
-    idx: int  # token index in doc
-    text: str
-    lemma: str
-    pos: str  # coarse POS tag
-    tag: str  # detailed tag
-    dep: str  # dependency relation
-    head: int  # index of head token
-    is_stop: bool
-    is_punct: bool
-    whitespace: str  # trailing whitespace
-
-
-@dataclass
-class SentenceInfo:
-    sent_id: int
-    text: str
-    start_char: int
-    end_char: int
-    token_indices: List[int]  # indices of tokens belonging to this sentence
-
-
-@dataclass
-class EntityHint:
-    text: str
-    label: str
-    start_char: int
-    end_char: int
-    def __hash__(self):
-        return hash((self.text, self.label, self.start_char, self.end_char))
-
-
-@dataclass
-class PreprocessResult:
-    raw_text: str
-    tokens: List[TokenInfo]
-    sentences: List[SentenceInfo]
-    entities: List[EntityHint]
-    redacted_text: str
-    meta: Dict[str, Any]
-
-
-ALLOWED_LABELS = {
-    "name",
-    "surname",
-    "age",
-    "date-of-birth",
-    "date",
-    "sex",
-    "religion",
-    "political-view",
-    "ethnicity",
-    "sexual-orientation",
-    "health",
-    "relative",
-    "city",
-    "address",
-    "email",
-    "phone",
-    "pesel",
-    "document-number",
-    "company",
-    "school-name",
-    "job-title",
-    "bank-account",
-    "credit-card-number",
-    "username",
-    "secret",
-}
+from labeling.results import (
+    ALLOWED_LABELS,
+    EntityHint,
+    LazySequence,
+    PreprocessResult,
+    SentenceInfo,
+    TokenInfo,
+    validate_labels,
+)
+from labeling.profiling import Profile, StageClock, profile_pipeline
+from labeling.spans import merge_hints, redact_text
+from labeling.token_table import TokenTable
+
+# Key under which `build_pipeline(labels=...)` records the applied pipeline plan in `nlp.meta`.
+PLAN_META_KEY = "labeling_plan"
+
+# Labels that can only come from the statistical NER component (see `_map_spacy_entity`).
+NER_LABELS = frozenset({"name", "surname", "city", "company", "school-name"})
 
 ORG_SCHOOL_KEYWORDS = (
     "szkoła",
@@ -89,40 +38,43 @@ class SpacyPreprocessor:
             self,
             nlp: spacy.Language,
             use_ner_hints: bool = True,
+            redact_only: bool = False,
+            labels: Optional[Iterable[str]] = None,
+            profile: bool = False,
     ) -> None:
+        """
+        Args:
+            nlp: Configured spaCy pipeline (see `build_pipeline`).
+            use_ner_hints: Whether to turn `doc.ents` into entity hints at all.
+            redact_only: Skip token/sentence views entirely; results then carry only
+                entities, redacted text and meta (`tokens` and `sentences` are empty).
+            labels: Restrict output to these labels (default: all of ALLOWED_LABELS).
+            profile: Time every pipe and post-processing phase per document and store
+                the counters in `meta["profile"]` (see `labeling.profiling`).
+        """
         self.nlp = nlp
         self.use_ner_hints = use_ner_hints
+        self.redact_only = redact_only
+        self.labels = validate_labels(labels) if labels is not None else frozenset(ALLOWED_LABELS)
+        self.profile = profile
 
-    def _tokens_to_info(self, doc: spacy.language.Doc) -> List[TokenInfo]:
-        tokens_info: List[TokenInfo] = []
-        for i, token in enumerate(doc):
-            tokens_info.append(
-                TokenInfo(
-                    idx=i,
-                    text=token.text,
-                    lemma=token.lemma_,
-                    pos=token.pos_,
-                    tag=token.tag_,
-                    dep=token.dep_,
-                    head=token.head.i,
-                    is_stop=token.is_stop,
-                    is_punct=token.is_punct,
-                    whitespace=token.whitespace_,
-                )
-            )
-        return tokens_info
+    def _tokens_to_info(self, doc: spacy.language.Doc, text: str) -> TokenTable:
+        return TokenTable.from_doc(doc, text)
+
+    def _sents(self, doc: spacy.language.Doc) -> Iterable[spacy.tokens.Span]:
+        # Pipelines pruned by label may run without a parser; treat the doc as one sentence then.
+        return doc.sents if doc.has_annotation("SENT_START") else [doc[:]]
 
     def _sentences_to_info(self, doc: spacy.language.Doc) -> List[SentenceInfo]:
         sentences_info: List[SentenceInfo] = []
-        for sent_id, sent in enumerate(doc.sents):
-            token_indices = list(range(sent.start, sent.end))
+        for sent_id, sent in enumerate(self._sents(doc)):
             sentences_info.append(
                 SentenceInfo(
                     sent_id=sent_id,
                     text=sent.text,
                     start_char=sent.start_char,
                     end_char=sent.end_char,
-                    token_indices=token_indices,
+                    token_indices=range(sent.start, sent.end),
                 )
             )
         return sentences_info
@@ -172,55 +124,46 @@ class SpacyPreprocessor:
         return entity_hints
 
     def _merge_entities(self, hints: List[EntityHint]) -> List[EntityHint]:
-        seen = set()
-        merged: List[EntityHint] = []
-
-        for ent in sorted(hints, key=lambda e: (e.start_char, -(e.end_char - e.start_char))):
-            key = (ent.start_char, ent.end_char, ent.label)
-            if key in seen or ent.label not in ALLOWED_LABELS:
-                continue
-            merged.append(ent)
-            seen.add(key)
-
-        return merged
+        return merge_hints(hints, self.labels)
 
     def _redact_text(self, text: str, entities: List[EntityHint]) -> str:
-        if not entities:
-            return text
+        return redact_text(text, entities)
 
-        redacted_parts: List[str] = []
-        cursor = 0
-        last_end = 0
-
-        for ent in sorted(entities, key=lambda e: (e.start_char, -(e.end_char - e.start_char))):
-            if ent.start_char < last_end:
-                continue
-
-            redacted_parts.append(text[cursor:ent.start_char])
-            redacted_parts.append(f"[{ent.label}]")
-            cursor = ent.end_char
-            last_end = ent.end_char
-
-        redacted_parts.append(text[cursor:])
-        return "".join(redacted_parts)
-
-    def __call__(self, text: str) -> PreprocessResult:
-        doc = self.nlp(text)
-
-        tokens = self._tokens_to_info(doc)
-        sentences = self._sentences_to_info(doc)
+    def _process_doc(self, doc: spacy.language.Doc, profile: Optional[Profile] = None) -> PreprocessResult:
+        clock = StageClock(profile)
+        text = doc.text
         ner_entities = self._entities_to_hints(doc) if self.use_ner_hints else []
+        clock.lap("postprocess.hints", ents_in=len(doc.ents) if profile is not None else 0, ents_out=len(ner_entities))
 
         merged_entities = self._merge_entities(ner_entities)
+        clock.lap("postprocess.merge", ents_in=len(ner_entities), ents_out=len(merged_entities))
 
         redacted_text = self._redact_text(text, merged_entities)
+        clock.lap("postprocess.redact", ents_in=len(merged_entities), ents_out=len(merged_entities))
 
         meta = {
             "use_ner_hints": self.use_ner_hints,
-            "num_tokens": len(tokens),
-            "num_sentences": len(sentences),
+            "redact_only": self.redact_only,
+            "num_tokens": len(doc),
             "num_entities": len(merged_entities),
         }
+        if self.labels != ALLOWED_LABELS:
+            meta["labels"] = sorted(self.labels)
+        if PLAN_META_KEY in self.nlp.meta:
+            meta["pipeline_plan"] = self.nlp.meta[PLAN_META_KEY]
+        if "windowed" in doc.user_data:  # see labeling.pipes.windowed
+            meta["windowed"] = doc.user_data["windowed"]
+
+        if self.redact_only:
+            tokens: Sequence[TokenInfo] = []
+            sentences: Sequence[SentenceInfo] = []
+        else:
+            tokens = LazySequence(partial(self._tokens_to_info, doc, text))
+            sentences = LazySequence(partial(self._sentences_to_info, doc))
+            meta["num_sentences"] = sum(1 for _ in self._sents(doc))
+            clock.lap("postprocess.views")
+        if profile is not None:
+            meta["profile"] = profile
 
         return PreprocessResult(
             raw_text=text,
@@ -230,3 +173,19 @@ class SpacyPreprocessor:
             redacted_text=redacted_text,
             meta=meta,
         )
+
+    def __call__(self, text: str) -> PreprocessResult:
+        if self.profile:
+            return self._process_doc(*next(profile_pipeline(self.nlp, [text], batch_size=1)))
+        return self._process_doc(self.nlp(text))
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64) -> Iterator[PreprocessResult]:
+        """
+        Process a stream of texts with `nlp.pipe`, yielding results lazily and in input order.
+        """
+        if self.profile:
+            for doc, profile in profile_pipeline(self.nlp, texts, batch_size):
+                yield self._process_doc(doc, profile)
+            return
+        for doc in self.nlp.pipe(texts, batch_size=batch_size):
+            yield self._process_doc(doc)
@@ -0,0 +1,172 @@
+"""
+Per-stage profiling of the anonymization pipeline.
+
+A profile maps stage names (the tokenizer, every enabled pipe, and the
+post-processing phases of the preprocessors) to counters: `calls`, wall-clock
+`seconds`, `tokens` and the number of entities before (`ents_in`) and after
+(`ents_out`) the stage. Profiles are plain dicts so they travel in
+`PreprocessResult.meta["profile"]`, through worker processes and into a JSON
+report, and are combined by summing.
+
+Recording costs one `perf_counter` call per stage and document (plus counting
+`doc.ents` around each pipe), so profiling can stay enabled on sampled
+production traffic.
+
+This module does not import spaCy.
+"""
+
+import json
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Profile = Dict[str, Dict[str, float]]
+
+STAGE_FIELDS = ("calls", "seconds", "tokens", "ents_in", "ents_out")
+
+TOKENIZER_STAGE = "tokenizer"
+
+
+def record(
+        profile: Profile,
+        stage: str,
+        seconds: float,
+        *,
+        calls: int = 1,
+        tokens: int = 0,
+        ents_in: int = 0,
+        ents_out: int = 0,
+) -> None:
+    stats = profile.get(stage)
+    if stats is None:
+        stats = profile[stage] = dict.fromkeys(STAGE_FIELDS, 0)
+    stats["calls"] += calls
+    stats["seconds"] += seconds
+    stats["tokens"] += tokens
+    stats["ents_in"] += ents_in
+    stats["ents_out"] += ents_out
+
+
+def add_profile(total: Profile, profile: Profile) -> Profile:
+    """Add the counters of `profile` to `total` (in place) and return `total`."""
+    for stage, stats in profile.items():
+        record(total, stage, stats["seconds"], **{field: stats[field] for field in STAGE_FIELDS if field != "seconds"})
+    return total
+
+
+def merge_profiles(profiles: Iterable[Profile]) -> Profile:
+    total: Profile = {}
+    for profile in profiles:
+        add_profile(total, profile)
+    return total
+
+
+class StageClock:
+    """
+    Attribute the time between consecutive `lap` calls to named stages of `profile`.
+
+    With `profile=None` every call is a no-op, so callers need no separate code path.
+    """
+
+    __slots__ = ("profile", "_last")
+
+    def __init__(self, profile: Optional[Profile]) -> None:
+        self.profile = profile
+        self._last = time.perf_counter() if profile is not None else 0.0
+
+    def lap(self, stage: str, *, tokens: int = 0, ents_in: int = 0, ents_out: int = 0) -> None:
+        if self.profile is None:
+            return
+        now = time.perf_counter()
+        record(self.profile, stage, now - self._last, tokens=tokens, ents_in=ents_in, ents_out=ents_out)
+        self._last = now
+
+
+def _share(seconds: float, tokens: int, total_tokens: int, count: int) -> float:
+    # Batched components cannot be timed per document; split their time by token count.
+    if total_tokens:
+        return seconds * tokens / total_tokens
+    return seconds / count
+
+
+def profile_pipeline(nlp, texts: Iterable[str], batch_size: int) -> Iterator[Tuple[object, Profile]]:
+    """
+    Run `texts` through `nlp` like `nlp.pipe`, yielding `(doc, profile)` per document.
+
+    Each enabled pipe processes a whole batch at once (via its `pipe` method when it has
+    one); its time is assigned to the batch's documents in proportion to their token
+    counts, while call and entity counts are exact per document.
+    """
+    iterator = iter(texts)
+    while batch := list(islice(iterator, batch_size)):
+        profiles: List[Profile] = [{} for _ in batch]
+
+        start = time.perf_counter()
+        docs = [nlp.make_doc(text) for text in batch]
+        elapsed = time.perf_counter() - start
+        lengths = [len(doc) for doc in docs]
+        total_tokens = sum(lengths)
+        for profile, tokens in zip(profiles, lengths):
+            record(profile, TOKENIZER_STAGE, _share(elapsed, tokens, total_tokens, len(docs)), tokens=tokens)
+
+        for name, proc in nlp.pipeline:
+            ents_in = [len(doc.ents) for doc in docs]
+            start = time.perf_counter()
+            if hasattr(proc, "pipe"):
+                docs = list(proc.pipe(docs, batch_size=batch_size))
+            else:
+                docs = [proc(doc) for doc in docs]
+            elapsed = time.perf_counter() - start
+            for profile, doc, tokens, before in zip(profiles, docs, lengths, ents_in):
+                record(
+                    profile,
+                    name,
+                    _share(elapsed, tokens, total_tokens, len(docs)),
+                    tokens=tokens,
+                    ents_in=before,
+                    ents_out=len(doc.ents),
+                )
+
+        yield from zip(docs, profiles)
+
+
+def build_report(profile: Profile, *, documents: int, wall_seconds: Optional[float] = None, **extra) -> dict:
+    """
+    Turn an (aggregated) profile into a JSON-serialisable report with derived rates.
+
+    Stage `seconds` are summed over documents and, with several workers, over processes,
+    so their total can exceed `wall_seconds`.
+    """
+    total = sum(stats["seconds"] for stats in profile.values())
+    stages = {}
+    for stage, stats in profile.items():
+        seconds = stats["seconds"]
+        stages[stage] = {
+            **stats,
+            "share": seconds / total if total else 0.0,
+            "tokens_per_second": stats["tokens"] / seconds if seconds and stats["tokens"] else None,
+        }
+    report = {**extra, "documents": documents, "profiled_seconds": total, "stages": stages}
+    if wall_seconds is not None:
+        report["wall_seconds"] = wall_seconds
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'stage':<22} {'calls':>7} {'seconds':>9} {'share':>6} {'tokens/s':>11} {'ents in':>8} {'ents out':>8}"]
+    for stage, stats in report["stages"].items():
+        rate = stats["tokens_per_second"]
+        lines.append(
+            f"{stage:<22} {stats['calls']:>7} {stats['seconds']:>9.3f} {stats['share']:>6.1%} "
+            f"{f'{rate:,.0f}' if rate else '-':>11} {stats['ents_in']:>8} {stats['ents_out']:>8}"
+        )
+    footer = f"{report['documents']} documents, {report['profiled_seconds']:.3f} s profiled"
+    if "wall_seconds" in report:
+        footer += f", {report['wall_seconds']:.3f} s wall"
+    lines.append(footer)
+    return "\n".join(lines)
+
+
+def write_report(report: dict, path: Path) -> None:
+    Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
@@ -0,0 +1,178 @@
+"""
+Record-stream input/output: JSONL and CSV exports with one record per row.
+
+`redact_records` feeds the selected text fields of every row through the
+preprocessor's `pipe` as separate documents and yields each row with those
+fields replaced by their redacted text; all other fields are passed through
+untouched. Rows are read, processed and written one batch at a time, so memory
+does not depend on the file size, and entity offsets are relative to the
+field they were found in.
+
+Fields are top-level keys (CSV columns). In JSONL a dotted name ("turn.text")
+selects a nested value. Without a selection every string field is anonymized.
+"""
+
+import csv
+import json
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from labeling.defaults import DEFAULT_BATCH_SIZE
+from labeling.profiling import Profile, add_profile
+
+RECORD_FORMATS = ("jsonl", "csv")
+FORMATS = ("text",) + RECORD_FORMATS
+ENTITIES_FIELD = "entities"
+
+_SUFFIXES = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+Record = Dict[str, object]
+# Path of a field inside a record: one key, or several for nested JSON values.
+FieldPath = Tuple[str, ...]
+
+
+def detect_format(path: Path) -> str:
+    """Guess the input format from the file extension ("text" for anything else and stdin)."""
+    return _SUFFIXES.get(path.suffix.lower(), "text")
+
+
+def parse_fields(value: str) -> List[str]:
+    return [field.strip() for field in value.split(",") if field.strip()]
+
+
+def _iter_jsonl(stream: TextIO) -> Iterator[Record]:
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise ValueError(f"Line {number}: invalid JSON ({exc})") from exc
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: expected a JSON object, got {type(record).__name__}")
+        yield record
+
+
+def read_records(stream: TextIO, fmt: str) -> Tuple[Optional[List[str]], Iterator[Record]]:
+    """
+    Return the column names (CSV only, read up front for the writer) and a lazy iterator over the rows.
+
+    Args:
+        stream: Open text stream (file or stdin).
+        fmt: "jsonl" or "csv".
+    """
+    if fmt == "jsonl":
+        return None, _iter_jsonl(stream)
+    if fmt == "csv":
+        # Dialogue turns can be long; the csv module's default field limit is 128 KiB.
+        csv.field_size_limit(2**31 - 1)
+        reader = csv.DictReader(stream)
+        return list(reader.fieldnames or []), iter(reader)
+    raise ValueError(f"Unknown record format: {fmt!r} (expected one of {RECORD_FORMATS})")
+
+
+class RecordWriter:
+    """Write rows in the format they were read in; CSV needs the column names up front."""
+
+    def __init__(self, stream: TextIO, fmt: str, fieldnames: Optional[Sequence[str]] = None) -> None:
+        if fmt not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {fmt!r} (expected one of {RECORD_FORMATS})")
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = csv.DictWriter(stream, fieldnames=list(fieldnames or [])) if fmt == "csv" else None
+        if self._csv is not None:
+            self._csv.writeheader()
+
+    def write(self, record: Record) -> None:
+        if self._csv is not None:
+            row = dict(record)
+            if isinstance(row.get(ENTITIES_FIELD), list):
+                row[ENTITIES_FIELD] = json.dumps(row[ENTITIES_FIELD], ensure_ascii=False)
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False))
+            self.stream.write("\n")
+
+
+def _field_paths(record: Record, fields: Optional[Sequence[str]]) -> List[FieldPath]:
+    if fields is None:
+        return [(key,) for key, value in record.items() if isinstance(value, str) and key != ENTITIES_FIELD]
+    return [tuple(field.split(".")) for field in fields]
+
+
+def _get(record: Record, path: FieldPath) -> object:
+    value: object = record
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _set(record: Record, path: FieldPath, value: str) -> None:
+    target = record
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+
+
+def redact_records(
+        preprocessor,
+        records: Iterable[Record],
+        fields: Optional[Sequence[str]] = None,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        with_entities: bool = False,
+        profile: Optional[Profile] = None,
+) -> Iterator[Record]:
+    """
+    Yield `records` in order with their selected fields redacted.
+
+    Args:
+        preprocessor: Any preprocessor with `pipe`.
+        records: Rows as dicts (e.g. from `read_records`); they are updated in place.
+        fields: Fields to anonymize (dotted for nested JSON values); default: every string field.
+            Missing fields and values that are not strings are left as they are.
+        batch_size: Number of field values handed to `preprocessor.pipe` per batch.
+        with_entities: Add an `entities` field listing `{"field", "start", "end", "label"}`
+            for every entity (offsets into the original field value).
+        profile: Sum the `meta["profile"]` of every field value into this dict, if given.
+    """
+    # Rows waiting for their results, with the fields whose texts are in flight.
+    pending: Deque[Tuple[Record, List[FieldPath]]] = deque()
+
+    def texts() -> Iterator[str]:
+        for record in records:
+            paths = [path for path in _field_paths(record, fields) if isinstance(_get(record, path), str)]
+            pending.append((record, paths))
+            if not paths:
+                # An empty document keeps the row in step with the results instead of
+                # holding back every following row.
+                yield ""
+            for path in paths:
+                yield _get(record, path)
+
+    def finish(record: Record, paths: List[FieldPath], results: list) -> Record:
+        entities = []
+        for path, result in zip(paths, results):
+            _set(record, path, result.redacted_text)
+            entities.extend(
+                {"field": ".".join(path), "start": ent.start_char, "end": ent.end_char, "label": ent.label}
+                for ent in result.entities
+            )
+        if with_entities:
+            record[ENTITIES_FIELD] = entities
+        return record
+
+    collected: list = []
+    for result in preprocessor.pipe(texts(), batch_size=batch_size):
+        if profile is not None and "profile" in result.meta:
+            add_profile(profile, result.meta["profile"])
+        collected.append(result)
+        record, paths = pending[0]
+        if len(collected) < max(1, len(paths)):
+            continue
+        pending.popleft()
+        yield finish(record, paths, collected if paths else [])
+        collected = []
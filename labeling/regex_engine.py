@@ -0,0 +1,583 @@
+"""
+Model-free anonymization engine for structured identifiers.
+
+`RegexPreprocessor` never imports spaCy. `TOKEN_RE` scans the raw text for
+tokens, and the token patterns of `labeling.pipes.rule_patterns` are matched
+on them the way the Matcher matches them in the rule stage of a blank `pl`
+pipeline (`pii_matcher` restricted to `REGEX_LABELS`):
+
+- every token predicate (REGEX search, LOWER, IS_PUNCT, LIKE_NUM, IS_TITLE)
+  runs once per distinct token text and is kept as one bit of a mask;
+- a pattern yields every token range it matches; the digit-sequence shapes
+  give theirs as `first <= end <= last` per start, as in
+  `labeling.pipes.sequences`;
+- each rule group is resolved longest first, then earliest, a tie on one
+  extent going to the valid match, then to the higher `LABEL_PRIORITY`, and
+  the rule patterns overwrite the single-word school keywords before them
+  (the pipeline decides ties in the EntityRuler's set order instead, which
+  depends on spaCy's string hashes and every other match, so entities at
+  tied extents can differ);
+- `EMAIL_RE`/`PHONE_RE` hits are contracted to whole tokens and override what
+  they overlap, and spans are filtered by the same `VALIDATORS`.
+
+Token edges limit the parity with the pipeline. `TOKEN_RE` follows spaCy's
+`pl` tokenizer where the rule patterns depend on it: "." and "-" split
+between digits while "/", ":" and "," do not, "+" stays on a number, e-mail
+addresses, URLs and abbreviations like "m.in" keep their inner dots, and a
+unit after a number ("5m", "8GB") is a token of its own. It does not
+reproduce spaCy's special cases (emoticons such as ":(" or "):", bracketed
+placeholders like "[name].[name]"), units after a word ending in a digit
+("Lu8in"), nor every affix and infix rule for rare symbols. In such texts a
+token predicate sees a longer or shorter token than in spaCy and spans can
+differ; `tests/test_regex_engine.py` pins the known cases and compares the
+output with the blank pipeline where the token edges agree, outside tied
+extents.
+"""
+
+import heapq
+import json
+import re
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import compress
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+
+from labeling.pipes.rule_patterns import (
+    BANK_PREFIX_TOKEN,
+    EMAIL_RE,
+    NUMBER_TOKEN,
+    PHONE_CODE_TOKEN,
+    PHONE_HYBRID_TOKEN,
+    PHONE_RE,
+    PHONE_TOKEN,
+    PUNCT_TOKEN,
+    VALIDATORS,
+    _keyword_patterns,
+    _patterns,
+    number_run_pattern,
+    phone_hybrid_pattern,
+    phone_pattern,
+    prefixed_number_run_pattern,
+)
+from labeling.pipes.validators import validate_batch
+from labeling.profiling import StageClock
+from labeling.results import EntityHint, PreprocessResult, validate_labels
+from labeling.spans import LABEL_PRIORITY, merge_hints, redact_text, remove_overlapping, select_non_overlapping
+
+ENGINE_NAME = "regex"
+
+CONTACT_LABELS = frozenset({"email", "phone"})
+REGEX_LABELS = frozenset(entry["label"] for entry in _patterns()) | CONTACT_LABELS
+
+# Characters split off a token unless one of the `_JOIN` rules keeps them inside.
+_SPLIT = r",;:!?()\[\]{}\"'„”“‘’‚«»…%\-–—~./+*#<>$&`°_"
+_UNITS = "km|m|dm|cm|mm|ha|nm|kg|g|mg|t|kb|KB|MB|GB|TB|gb|tb|T|G|M|K"
+_PART = rf"[^\s{_SPLIT}]+"
+# What may follow a unit split off a number: closing punctuation, then whitespace or the end.
+_TAIL = r"""[,;:!?)\]}"'”’»….%]*(?:\s|$)"""
+_JOIN = (
+    r"(?<=[^\W_])\.(?=[^\W\d_A-ZĄĆĘŁŃÓŚŹŻ])"  # "m.in", "o.o": a dot before a lower-case letter
+    r"|(?<=\d)[:,!](?=\d)|(?<=\d)/(?=\w)|(?<=[^\W_])/(?=\d)"  # "10:30", "4,5", "5/7", "8b/42"
+    r"|(?<=[^\W\d_])['+](?=[^\W\d_])"  # inside words ("McDonald's")
+    r"|(?<=[^\W_])[_*#$<&%]+(?=[^\W_])"  # inside identifiers and masked words ("MG_RAK", "k***a")
+)
+TOKEN_RE = re.compile(
+    rf"""
+    [\w.%+-]+@[\w-]+(?:\.[\w-]+)+  # e-mail address
+  | (?:https?://|www\.)\S*[\w/]  # URL
+  | \d+(?=(?:{_UNITS}){_TAIL})  # number before a unit
+  | (?:\+(?=\d))?{_PART}(?:(?:{_JOIN}){_PART})*
+  | (?<=\S\ )\s+ | (?<!\S)\s+ | (?<=\S)[^\S\ ]\s*  # whitespace but a single space after a token
+  | \S
+    """,
+    re.VERBOSE,
+)
+# Distinct token texts whose predicate masks are remembered (the cache is emptied when it is full).
+CACHE_SIZE = 100_000
+
+# spaCy's Polish number words (`spacy.lang.pl.lex_attrs`), read by LIKE_NUM.
+_NUM_WORDS = frozenset({
+    "zero", "jeden", "dwa", "trzy", "cztery", "pięć", "sześć", "siedem", "osiem", "dziewięć",
+    "dziesięć", "jedenaście", "dwanaście", "trzynaście", "czternaście", "pietnaście", "szesnaście",
+    "siedemnaście", "osiemnaście", "dziewiętnaście", "dwadzieścia", "trzydzieści", "czterdzieści",
+    "pięćdziesiąt", "szcześćdziesiąt", "siedemdziesiąt", "osiemdziesiąt", "dziewięćdziesiąt", "sto",
+    "dwieście", "trzysta", "czterysta", "pięćset", "sześćset", "siedemset", "osiemset", "dziewięćset",
+    "tysiąc", "milion", "miliard", "bilion", "biliard", "trylion", "tryliard", "kwadrylion",
+})
+
+# Digit-sequence shapes, recognised by their exact patterns (see `labeling.pipes.sequences`).
+NUMBER_RUN = "number-run"
+PREFIXED_NUMBER_RUN = "prefixed-number-run"
+PHONE = "phone"
+PHONE_HYBRID = "phone-hybrid"
+_SHAPES = {
+    NUMBER_RUN: number_run_pattern,
+    PREFIXED_NUMBER_RUN: prefixed_number_run_pattern,
+    PHONE: phone_pattern,
+    PHONE_HYBRID: phone_hybrid_pattern,
+}
+
+# (token start, token end, label)
+Candidate = Tuple[int, int, str]
+# (predicate bit, operator); "+" is compiled as the token followed by the token with "*".
+Element = Tuple[int, Optional[str]]
+
+
+def _candidate_bounds(candidate: Candidate) -> Candidate:
+    return candidate
+
+
+def is_punct(text: str) -> bool:
+    return all(unicodedata.category(char).startswith("P") for char in text)
+
+
+def like_num(text: str) -> bool:
+    """spaCy's Polish LIKE_NUM: digits (ignoring "," and "."), a simple fraction or a number word."""
+    text = text.replace(",", "").replace(".", "")
+    if text.isdigit():
+        return True
+    if text.count("/") == 1:
+        num, denom = text.split("/")
+        if num.isdigit() and denom.isdigit():
+            return True
+    return text.lower() in _NUM_WORDS
+
+
+def contract(starts: List[int], ends: List[int], start_char: int, end_char: int) -> Optional[Tuple[int, int]]:
+    """Token range `[first, last)` inside the characters, like `Doc.char_span(alignment_mode="contract")`."""
+    if not starts or end_char <= start_char:
+        return None
+    first = bisect_right(starts, start_char) - 1
+    last = bisect_right(starts, end_char - 1) - 1
+    if first < 0 or last < 0:
+        return None
+    if starts[first] < start_char:
+        first += 1
+    if end_char < ends[last]:
+        last -= 1
+    if last < first:
+        return None
+    return first, last + 1
+
+
+def _predicate(spec: dict) -> Union[FrozenSet[str], Callable[[str], object]]:
+    """Compile one token spec into a test of the token text, or the set of lower forms it accepts."""
+    attrs = {key: value for key, value in spec.items() if key != "OP"}
+    if len(attrs) != 1:
+        raise ValueError(f"Regex engine supports exactly one attribute per token, got {sorted(attrs)}")
+    key, value = next(iter(attrs.items()))
+
+    if key == "TEXT" and isinstance(value, dict) and list(value) == ["REGEX"]:
+        return re.compile(value["REGEX"]).search
+    if key == "TEXT" and isinstance(value, str):
+        return value.__eq__
+    if key == "LOWER" and isinstance(value, str):
+        return frozenset({value})
+    if key == "LOWER" and isinstance(value, dict) and list(value) == ["IN"]:
+        return frozenset(value["IN"])
+    if key == "IS_PUNCT" and value is True:
+        return is_punct
+    if key == "LIKE_NUM" and value is True:
+        return like_num
+    if key == "IS_TITLE" and value is True:
+        return str.istitle
+    raise ValueError(f"Token attribute not supported by the regex engine: {key}={value!r}")
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """
+    One token pattern over predicate bits.
+
+    A match starts with a token having one of the `lead` bits and needs tokens with all
+    the `required` bits. Digit-sequence patterns carry their `shape` and are matched by
+    `_ranges` instead of `elements`.
+    """
+
+    label: str
+    elements: Tuple[Element, ...]
+    lead: int
+    required: int
+    shape: Optional[str] = None
+
+
+class _Doc:
+    """Tokens of one text with their predicate masks."""
+
+    def __init__(self, text: str, starts: List[int], ends: List[int], masks: List[int]) -> None:
+        self.text = text
+        self.starts, self.ends, self.masks = starts, ends, masks
+        # Bits some token of the document has.
+        self.present = 0
+        for mask in set(self.masks):
+            self.present |= mask
+        self._positions: Dict[int, List[int]] = {}
+        self._run_ends: Dict[int, Dict[int, int]] = {}
+
+    def span_text(self, start: int, end: int) -> str:
+        return self.text[self.starts[start]:self.ends[end - 1]]
+
+    def has(self, i: int, bit: int) -> bool:
+        return i < len(self.masks) and bool(self.masks[i] & bit)
+
+    def positions(self, bits: int) -> List[int]:
+        """Indices of the tokens having any of `bits`, in order."""
+        positions = self._positions.get(bits)
+        if positions is None:
+            positions = self._positions[bits] = list(compress(range(len(self.masks)), map(bits.__and__, self.masks)))
+        return positions
+
+    def run_ends(self, bit: int) -> Dict[int, int]:
+        """For every token with `bit`, where the run of such tokens starting there ends."""
+        ends = self._run_ends.get(bit)
+        if ends is None:
+            ends = self._run_ends[bit] = {}
+            for i in reversed(self.positions(bit)):
+                ends[i] = ends.get(i + 1, i + 1)
+        return ends
+
+    def run_before(self, i: int, bit: int) -> Iterator[int]:
+        """The tokens with `bit` right before token `i`, nearest first."""
+        i -= 1
+        while i >= 0 and self.masks[i] & bit:
+            yield i
+            i -= 1
+
+
+class RegexPreprocessor:
+    """
+    Drop-in replacement for `SpacyPreprocessor` limited to the rule-based labels (`REGEX_LABELS`).
+
+    Results never carry tokens or sentences; `meta["engine"]` is `"regex"`.
+
+    Args:
+        labels: Restrict output to these labels (default: all of REGEX_LABELS).
+        profile: Time the tokenizer, matching and post-processing phases per document and
+            store the counters in `meta["profile"]` (see `labeling.profiling`).
+    """
+
+    def __init__(self, labels: Optional[Iterable[str]] = None, profile: bool = False) -> None:
+        self.labels = validate_labels(labels) if labels is not None else REGEX_LABELS
+        unsupported = self.labels - REGEX_LABELS
+        if unsupported:
+            raise ValueError(
+                f"Labels not supported by the regex engine: {', '.join(sorted(unsupported))} "
+                f"(supported: {', '.join(sorted(REGEX_LABELS))})"
+            )
+        self.profile = profile
+        self._bits: Dict[str, int] = {}
+        # Tests of the token text, and the bits of the LOWER predicates per lower form.
+        self._predicates: List[Tuple[int, Callable[[str], object]]] = []
+        self._lower_bits: Dict[str, int] = {}
+        # All rule patterns are kept regardless of `labels` so matches shadow each other as in the
+        # pipeline. Of the keywords only those with a supported label matter: the rule patterns
+        # overwrite the others or they are dropped with the labels.
+        self.keywords = [
+            self._compile(entry) for entry in _keyword_patterns() if entry["label"] in REGEX_LABELS
+        ]
+        self.rules = [self._compile(entry) for entry in _patterns()]
+        punct, like, number, prefix, hybrid, code = (
+            self._bit(token)
+            for token in (PUNCT_TOKEN, PHONE_TOKEN, NUMBER_TOKEN, BANK_PREFIX_TOKEN, PHONE_HYBRID_TOKEN,
+                          PHONE_CODE_TOKEN)
+        )
+        self._shape_bits = {"punct": punct, "like": like, "number": number, "prefix": prefix,
+                            "hybrid": hybrid, "code": code}
+        self._masks: Dict[str, int] = {}
+
+    def _bit(self, spec: dict) -> int:
+        key = json.dumps({k: v for k, v in spec.items() if k != "OP"}, sort_keys=True)
+        bit = self._bits.get(key)
+        if bit is None:
+            bit = self._bits[key] = 1 << len(self._bits)
+            test = _predicate(spec)
+            if isinstance(test, frozenset):
+                for word in test:
+                    self._lower_bits[word] = self._lower_bits.get(word, 0) | bit
+            else:
+                self._predicates.append((bit, test))
+        return bit
+
+    def _compile(self, entry: dict) -> CompiledRule:
+        pattern = entry["pattern"]
+        shape = next((kind for kind, build in _SHAPES.items() if pattern == build()), None)
+        elements: List[Element] = []
+        for spec in pattern:
+            bit = self._bit(spec)
+            op = spec.get("OP")
+            if op == "+":
+                elements += [(bit, None), (bit, "*")]
+            elif op in (None, "?", "*"):
+                elements.append((bit, op))
+            else:
+                raise ValueError(f"Operator not supported by the regex engine: {op!r}")
+        lead = 0
+        for bit, op in elements:
+            lead |= bit
+            if op is None:
+                break
+        required = 0
+        for bit, op in elements:
+            if op is None:
+                required |= bit
+        return CompiledRule(label=entry["label"], elements=tuple(elements), lead=lead, required=required, shape=shape)
+
+    def _mask(self, text: str) -> int:
+        """Bits of the predicates token `text` satisfies."""
+        mask = self._lower_bits.get(text.lower(), 0)
+        for bit, test in self._predicates:
+            if test(text):
+                mask |= bit
+        if len(self._masks) >= CACHE_SIZE:
+            self._masks.clear()
+        self._masks[text] = mask
+        return mask
+
+    def tokenize(self, text: str) -> _Doc:
+        """Split `text` with `TOKEN_RE` and look up the predicate mask of every token."""
+        starts: List[int] = []
+        ends: List[int] = []
+        masks: List[int] = []
+        known = self._masks
+        for match in TOKEN_RE.finditer(text):
+            start, end = match.span()
+            starts.append(start)
+            ends.append(end)
+            word = match.group()
+            mask = known.get(word)
+            masks.append(self._mask(word) if mask is None else mask)
+        return _Doc(text, starts, ends, masks)
+
+    # --- Matching --------------------------------------------------------------
+
+    @staticmethod
+    def _ends(elements: Tuple[Element, ...], masks: List[int], start: int) -> List[int]:
+        """Every end of a match of `elements` starting at token `start`."""
+        final = len(elements)
+
+        def closure(states):
+            # Optional elements may be skipped.
+            stack = list(states)
+            while stack:
+                k = stack.pop()
+                if k < final and elements[k][1] is not None and k + 1 not in states:
+                    states.add(k + 1)
+                    stack.append(k + 1)
+            return states
+
+        ends = []
+        states = closure({0})
+        i = start
+        while states and i < len(masks):
+            mask = masks[i]
+            following = set()
+            for k in states:
+                if k < final and mask & elements[k][0]:
+                    following.add(k if elements[k][1] == "*" else k + 1)
+            states = closure(following)
+            i += 1
+            if final in states:
+                ends.append(i)
+        return ends
+
+    def _ranges(self, doc: _Doc, shape: str) -> Dict[int, Tuple[int, int]]:
+        """`start -> (first, last)` of a digit-sequence shape: its matches are [start, end) for first <= end <= last."""
+        bits = self._shape_bits
+        punct, number = bits["punct"], bits["number"]
+        punct_ends = doc.run_ends(punct)
+        ranges: Dict[int, Tuple[int, int]] = {}
+        if shape in (NUMBER_RUN, PREFIXED_NUMBER_RUN):
+            number_ends = doc.run_ends(number)
+            for start, end in number_ends.items():
+                ranges[start] = (start + 1, end)
+            if shape == PREFIXED_NUMBER_RUN:
+                for start in doc.positions(bits["prefix"]):
+                    if not doc.has(start, number) and doc.has(start + 1, number):
+                        ranges[start] = (start + 2, number_ends[start + 1])
+        elif shape == PHONE:
+            # Punctuation, an optional code, punctuation; then LIKE_NUM, punctuation and hybrid runs.
+            like, code = bits["like"], bits["code"]
+            like_ends, hybrid_ends = doc.run_ends(like), doc.run_ends(bits["hybrid"])
+            for number_start in doc.positions(like):
+                last = like_ends[number_start]
+                last = punct_ends.get(last, last)
+                last = hybrid_ends.get(last, last)
+                # The starts leading to it: the number itself and the punctuation and code before it.
+                starts = [number_start, *doc.run_before(number_start, punct)]
+                before_code = starts[-1] - 1
+                if doc.has(before_code, code) and before_code >= 0:
+                    starts += [before_code, *doc.run_before(before_code, punct)]
+                for start in starts:
+                    ranges[start] = (number_start + 1, last)
+        else:
+            for hybrid_at in doc.positions(bits["hybrid"]):
+                last = punct_ends.get(hybrid_at + 1, hybrid_at + 1)
+                for start in (hybrid_at, *doc.run_before(hybrid_at, punct)):
+                    ranges[start] = (hybrid_at + 1, last)
+        return ranges
+
+    def _select(self, doc: _Doc, rules: List[CompiledRule]) -> List[Candidate]:
+        """Resolve the matches of one rule group longest first, then earliest (see `labeling.pipes.sequences`)."""
+        heap: List[Tuple[int, int, int, int, str]] = []
+        ranges: List[Dict[int, Tuple[int, int]]] = []
+        range_labels: List[str] = []
+        for rule in rules:
+            if rule.required & doc.present != rule.required:
+                continue
+            if rule.shape is not None:
+                found = self._ranges(doc, rule.shape)
+                index = len(ranges)
+                ranges.append(found)
+                range_labels.append(rule.label)
+                for start, (first, last) in found.items():
+                    # A start is only needed once the one before it is taken: until then that one
+                    # matches a longer span ending wherever this one can.
+                    before = found.get(start - 1)
+                    if before is None or before[0] > first or before[1] < last:
+                        heap.append((start - last, start, last, index, rule.label))
+                continue
+            if len(rule.elements) == 1:
+                heap.extend((-1, start, start + 1, -1, rule.label) for start in doc.positions(rule.lead))
+                continue
+            for start in doc.positions(rule.lead):
+                heap.extend((start - end, start, end, -1, rule.label)
+                            for end in self._ends(rule.elements, doc.masks, start))
+        if not heap:
+            return []
+        heapq.heapify(heap)
+
+        starts: List[int] = []
+        ends: List[int] = []
+        n = len(doc.masks)
+
+        def current_end(entry) -> Optional[int]:
+            """Where the entry's longest match not overlapping the selection ends now (None: no match left)."""
+            _, start, end, index, _ = entry
+            i = bisect_right(starts, start)
+            if i > 0 and ends[i - 1] > start:
+                return None
+            limit = starts[i] if i < len(starts) else n
+            if index < 0:
+                return end if end <= limit else None
+            first, last = ranges[index][start]
+            end = min(last, limit)
+            return end if end >= first else None
+
+        selected: List[Candidate] = []
+        while heap:
+            entry = heapq.heappop(heap)
+            end = current_end(entry)
+            if end != entry[2]:
+                if end is not None:
+                    heapq.heappush(heap, (entry[1] - end, entry[1], end, entry[3], entry[4]))
+                continue
+            tied = [entry]
+            while heap and heap[0][:2] == entry[:2]:
+                other = heapq.heappop(heap)
+                other_end = current_end(other)
+                if other_end == other[2]:
+                    tied.append(other)
+                elif other_end is not None:
+                    heapq.heappush(heap, (other[1] - other_end, other[1], other_end, other[3], other[4]))
+            start = entry[1]
+            label = entry[4] if len(tied) == 1 else self._best_of_tied(doc, start, end, [e[4] for e in tied])
+            selected.append((start, end, label))
+            i = bisect_right(starts, start)
+            starts.insert(i, start)
+            ends.insert(i, end)
+            # Starts right after the selection lost the match that shadowed them.
+            for index, found in enumerate(ranges):
+                if end in found:
+                    next_end = current_end((0, end, 0, index, ""))
+                    if next_end is not None:
+                        heapq.heappush(heap, (end - next_end, end, next_end, index, range_labels[index]))
+        return selected
+
+    @staticmethod
+    def _best_of_tied(doc: _Doc, start: int, end: int, labels: List[str]) -> str:
+        """Label of the match that wins among matches with the same extent: valid first, then label priority."""
+        ranked = sorted(range(len(labels)), key=lambda p: (-LABEL_PRIORITY.get(labels[p], 0), p))
+        text = doc.span_text(start, end)
+        for p in ranked:
+            validator = VALIDATORS.get(labels[p])
+            if validator is None or validator(text):
+                return labels[p]
+        return labels[ranked[0]]
+
+    def _contacts(self, doc: _Doc) -> List[Candidate]:
+        """Email and phone hits on the raw text, contracted to whole tokens, as character spans."""
+        text = doc.text
+        # Most texts have no "@", and looking for one is much cheaper than running EMAIL_RE.
+        found = [(match.span(), "email") for match in EMAIL_RE.finditer(text)] if "@" in text else []
+        phones = list(PHONE_RE.finditer(text))
+        valid = validate_batch(["phone"] * len(phones), [match.group() for match in phones])
+        found.extend((match.span(), "phone") for match, ok in zip(phones, valid) if ok)
+        spans = []
+        for (start, end), label in found:
+            tokens = contract(doc.starts, doc.ends, start, end)
+            if tokens is not None:
+                spans.append((doc.starts[tokens[0]], doc.ends[tokens[1] - 1], label))
+        return spans
+
+    def find_entities(self, text: str, clock: Optional[StageClock] = None) -> List[EntityHint]:
+        """Detect rule-based entities in `text` (unfiltered by `labels`, unmerged)."""
+        clock = clock or StageClock(None)
+        doc = self.tokenize(text)
+        clock.lap("regex.tokenizer", tokens=len(doc.masks))
+
+        ents: List[Candidate] = []
+        matched = 0
+        for rules in (self.keywords, self.rules):
+            selected = self._select(doc, rules)
+            matched += len(selected)
+            ents = remove_overlapping(ents, selected, bounds=_candidate_bounds) + selected
+        ents = [(doc.starts[start], doc.ends[end - 1], label) for start, end, label in ents]
+        clock.lap("regex.rules", ents_out=matched)
+
+        contacts = select_non_overlapping(self._contacts(doc), bounds=_candidate_bounds)
+        ents = remove_overlapping(ents, contacts, bounds=_candidate_bounds) + contacts
+        clock.lap("regex.contacts", ents_out=len(contacts))
+
+        checked = [p for p, (_, _, label) in enumerate(ents) if label in VALIDATORS]
+        valid = validate_batch([ents[p][2] for p in checked], [text[ents[p][0]:ents[p][1]] for p in checked])
+        rejected = {p for p, ok in zip(checked, valid) if not ok}
+        hints = [
+            EntityHint(text=text[start:end], label=label, start_char=start, end_char=end)
+            for p, (start, end, label) in enumerate(ents)
+            if p not in rejected
+        ]
+        clock.lap("regex.validation", ents_in=len(ents), ents_out=len(hints))
+        return hints
+
+    def __call__(self, text: str) -> PreprocessResult:
+        profile = {} if self.profile else None
+        clock = StageClock(profile)
+        hints = self.find_entities(text, clock)
+        entities = merge_hints(hints, self.labels)
+        clock.lap("postprocess.merge", ents_in=len(hints), ents_out=len(entities))
+        redacted_text = redact_text(text, entities)
+        clock.lap("postprocess.redact", ents_in=len(entities), ents_out=len(entities))
+
+        meta = {
+            "engine": ENGINE_NAME,
+            "redact_only": True,
+            "num_entities": len(entities),
+        }
+        if self.labels != REGEX_LABELS:
+            meta["labels"] = sorted(self.labels)
+        if profile is not None:
+            meta["profile"] = profile
+        return PreprocessResult(
+            raw_text=text,
+            tokens=[],
+            sentences=[],
+            entities=entities,
+            redacted_text=redacted_text,
+            meta=meta,
+        )
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64) -> Iterator[PreprocessResult]:
+        """Process a stream of texts lazily; `batch_size` is accepted for interface compatibility."""
+        for text in texts:
+            yield self(text)
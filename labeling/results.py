@@ -0,0 +1,141 @@
+"""
+Result types produced by the preprocessors.
+
+Kept free of spaCy imports so they can be shared by lightweight code paths.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+ALLOWED_LABELS = {
+    "name",
+    "surname",
+    "age",
+    "date-of-birth",
+    "date",
+    "sex",
+    "religion",
+    "political-view",
+    "ethnicity",
+    "sexual-orientation",
+    "health",
+    "relative",
+    "city",
+    "address",
+    "email",
+    "phone",
+    "pesel",
+    "document-number",
+    "company",
+    "school-name",
+    "job-title",
+    "bank-account",
+    "credit-card-number",
+    "username",
+    "secret",
+}
+
+
+def validate_labels(labels: Iterable[str]) -> frozenset:
+    requested = frozenset(labels)
+    unknown = requested - ALLOWED_LABELS
+    if unknown:
+        raise ValueError(
+            f"Unknown labels: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(ALLOWED_LABELS))}"
+        )
+    if not requested:
+        raise ValueError("At least one label must be requested")
+    return requested
+
+
+@dataclass(slots=True)
+class TokenInfo:
+    idx: int  # token index in doc
+    text: str
+    lemma: str
+    pos: str  # coarse POS tag
+    tag: str  # detailed tag
+    dep: str  # dependency relation
+    head: int  # index of head token
+    is_stop: bool
+    is_punct: bool
+    whitespace: str  # trailing whitespace
+
+
+@dataclass
+class SentenceInfo:
+    sent_id: int
+    text: str
+    start_char: int
+    end_char: int
+    token_indices: Sequence[int]  # indices of tokens belonging to this sentence (a range)
+
+
+@dataclass
+class EntityHint:
+    text: str
+    label: str
+    start_char: int
+    end_char: int
+    def __hash__(self):
+        return hash((self.text, self.label, self.start_char, self.end_char))
+
+
+class LazySequence(Sequence):
+    """
+    Read-only sequence built by `factory` on first access.
+
+    Used for the token/sentence views of a PreprocessResult so that callers who only
+    need the redacted text never pay for materialising them. Until then the view keeps
+    the underlying spaCy Doc alive.
+    """
+
+    __slots__ = ("_factory", "_items")
+
+    def __init__(self, factory: Callable[[], Sequence]) -> None:
+        self._factory: Optional[Callable[[], Sequence]] = factory
+        self._items: Optional[Sequence] = None
+
+    def materialize(self) -> Sequence:
+        if self._items is None:
+            self._items = self._factory()
+            self._factory = None
+        return self._items
+
+    def __getitem__(self, index):
+        return self.materialize()[index]
+
+    def __len__(self) -> int:
+        return len(self.materialize())
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazySequence):
+            other = other.materialize()
+        return self.materialize() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
+
+    def __reduce__(self):
+        # Pickle (e.g. across worker processes) as the materialised sequence itself.
+        return _materialized, (self.materialize(),)
+
+
+def _materialized(items: Sequence) -> Sequence:
+    return items
+
+
+@dataclass
+class PreprocessResult:
+    raw_text: str
+    tokens: Sequence[TokenInfo]  # a TokenTable in full mode; its rows expose the TokenInfo fields
+    sentences: Sequence[SentenceInfo]
+    entities: List[EntityHint]
+    redacted_text: str
+    meta: Dict[str, Any]
@@ -0,0 +1,283 @@
+"""
+Long-lived HTTP anonymization service with request micro-batching.
+
+The pipeline is built once at startup. Handler threads never call it
+directly: they hand their texts to a `MicroBatcher`, whose single worker
+thread coalesces concurrent requests into one `pipe` call (up to `max_batch`
+texts). Requests that queued while the previous batch ran are always taken
+along; waiting up to `max_wait` seconds for more only happens when the previous
+batch held several requests, so a lone client never pays for the wait.
+
+The request queue is bounded: when `max_queue` requests are waiting, new ones
+are rejected with 503 and `Retry-After` instead of piling up.
+
+Endpoints:
+    POST /anonymize  {"text": "..."} or {"texts": ["...", ...]}, optional "entities": true
+                     -> {"redacted_text": ..., "entities": [...]} or {"results": [...]}
+    GET  /health     -> {"status": "ok", "engine": ..., "queue": ..., "batches": ..., ...}
+
+This module only uses the standard library; the pipeline itself is whatever
+`SpacyPreprocessor`/`RegexPreprocessor` the service was started with.
+"""
+
+import concurrent.futures
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from labeling.results import PreprocessResult
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_WAIT = 0.002
+DEFAULT_MAX_QUEUE = 1024
+DEFAULT_REQUEST_TIMEOUT = 60.0
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class Overloaded(Exception):
+    """Raised by `MicroBatcher.submit` when the request queue is full."""
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """
+    Coalesce texts submitted from many threads into batched `preprocessor.pipe` calls.
+
+    Args:
+        preprocessor: Object with `pipe(texts, batch_size)` yielding `PreprocessResult`s in order.
+        max_batch: Stop collecting once a batch holds this many texts.
+        max_wait: Seconds to wait for more requests after the first one of a batch, used
+            only while requests are arriving concurrently (the last batch held several).
+        max_queue: Requests allowed to wait; further submits raise `Overloaded`.
+    """
+
+    def __init__(self, preprocessor, max_batch: int, max_wait: float, max_queue: int = DEFAULT_MAX_QUEUE) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.preprocessor = preprocessor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue(maxsize=max_queue)
+        self.batches = 0
+        self.texts = 0
+        self.rejected = 0
+        self._last_batch_requests = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> "Future[List[PreprocessResult]]":
+        request = _Request(texts)
+        try:
+            self._queue.put_nowait(request)
+        except queue.Full:
+            self.rejected += 1
+            raise Overloaded(f"{self._queue.maxsize} requests already waiting") from None
+        return request.future
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self, first: _Request) -> Tuple[List[_Request], bool]:
+        """Gather requests for one batch; the flag is True when `close` was requested meanwhile."""
+        batch = [first]
+        size = len(first.texts)
+        wait = self.max_wait if self._last_batch_requests > 1 else 0.0
+        deadline = time.monotonic() + wait
+        while size < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            size += len(request.texts)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+            self._last_batch_requests = len(batch)
+            texts = [text for request in batch for text in request.texts]
+            try:
+                results = list(self.preprocessor.pipe(texts, batch_size=len(texts)))
+            except Exception as exc:  # Report pipeline errors to every waiting request.
+                for request in batch:
+                    request.future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            start = 0
+            for request in batch:
+                request.future.set_result(results[start:start + len(request.texts)])
+                start += len(request.texts)
+
+    def close(self) -> None:
+        """Finish the queued requests and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def _result_json(result: PreprocessResult, with_entities: bool) -> dict:
+    data = {"redacted_text": result.redacted_text}
+    if with_entities:
+        data["entities"] = [asdict(ent) for ent in result.entities]
+    return data
+
+
+class AnonymizationHandler(BaseHTTPRequestHandler):
+    server: "AnonymizationServer"
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle's algorithm the body would wait for a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: HTTPStatus, data: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str, headers: Optional[dict] = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._error(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+            return
+        self._send_json(HTTPStatus.OK, self.server.health())
+
+    def do_POST(self) -> None:
+        if self.path != "/anonymize":
+            self._error(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            single = "text" in payload
+            texts = [payload["text"]] if single else payload["texts"]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self._error(
+                HTTPStatus.BAD_REQUEST, 'Expected a JSON object with "text" (string) or "texts" (list of strings)'
+            )
+            return
+
+        try:
+            future = self.server.batcher.submit(texts)
+        except Overloaded as exc:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, f"Overloaded: {exc}", {"Retry-After": "1"})
+            return
+        try:
+            results = future.result(timeout=self.server.request_timeout)
+        except concurrent.futures.TimeoutError:
+            self._error(HTTPStatus.GATEWAY_TIMEOUT, "Timed out waiting for the pipeline")
+            return
+        except Exception as exc:
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(exc).__name__}: {exc}")
+            return
+
+        with_entities = bool(payload.get("entities"))
+        if single:
+            self._send_json(HTTPStatus.OK, _result_json(results[0], with_entities))
+        else:
+            self._send_json(HTTPStatus.OK, {"results": [_result_json(result, with_entities) for result in results]})
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class AnonymizationServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Listen backlog; the default of 5 resets connections from bursts of concurrent clients.
+    request_queue_size = 256
+
+    def __init__(
+            self,
+            address: Tuple[str, int],
+            batcher: MicroBatcher,
+            *,
+            engine: str,
+            request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+            verbose: bool = False,
+    ) -> None:
+        super().__init__(address, AnonymizationHandler)
+        self.batcher = batcher
+        self.engine = engine
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+        self.started = time.time()
+
+    def health(self) -> dict:
+        batcher = self.batcher
+        health = {
+            "status": "ok",
+            "engine": self.engine,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "queue": batcher.pending,
+            "max_batch": batcher.max_batch,
+            "max_wait_ms": batcher.max_wait * 1000,
+            "batches": batcher.batches,
+            "texts": batcher.texts,
+            "mean_batch_size": batcher.texts / batcher.batches if batcher.batches else 0.0,
+            "rejected": batcher.rejected,
+        }
+        cache = getattr(batcher.preprocessor, "cache", None)
+        if cache is not None:
+            health["cache"] = asdict(cache.stats)
+        return health
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.batcher.close()
+
+
+def serve(
+        preprocessor,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_batch: int,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        engine: str,
+        verbose: bool = False,
+) -> None:
+    """Serve `preprocessor` over HTTP until interrupted."""
+    batcher = MicroBatcher(preprocessor, max_batch=max_batch, max_wait=max_wait, max_queue=max_queue)
+    with AnonymizationServer((host, port), batcher, engine=engine, verbose=verbose) as server:
+        bound_host, bound_port = server.server_address[:2]
+        print(f"Serving on http://{bound_host}:{bound_port} (engine: {engine})", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,101 @@
+"""
+On-disk snapshots of the fully configured pipeline.
+
+A snapshot is the output of `nlp.to_disk` for the model plus all rule-based
+components, stored next to a fingerprint of everything it was built from: the
+sources in `labeling/pipes`, the pipeline assembly code, the model package
+version and the spaCy version. A snapshot is only reused while its fingerprint
+matches the current sources.
+
+A snapshot does not make startup faster: the model is loaded the same way,
+and `pii_matcher` stores its rule groups as JSON and compiles them again on
+load, since spaCy's matchers are only serialisable as their patterns
+(`python -m benchmarks.cold_start --blank`).
+
+This module deliberately avoids importing spaCy so it stays cheap to import.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib import metadata
+from pathlib import Path
+from typing import Optional
+
+SNAPSHOT_DIR_ENV = "LABELING_SNAPSHOT_DIR"
+FINGERPRINT_FILE = "labeling_fingerprint.json"
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+_PATTERN_SOURCES = (_PACKAGE_DIR / "pipes", _PACKAGE_DIR / "anonymizer.py")
+
+
+def default_snapshot_dir() -> Path:
+    env = os.environ.get(SNAPSHOT_DIR_ENV)
+    if env:
+        return Path(env)
+    return Path.home() / ".cache" / "labeling" / "snapshots"
+
+
+def snapshot_path(model: str, root: Optional[Path] = None) -> Path:
+    # Models may be given as paths; keep only the last component as directory name.
+    return (root or default_snapshot_dir()) / Path(model).name
+
+
+def _source_files(sources=_PATTERN_SOURCES):
+    for source in sources:
+        if source.is_dir():
+            yield from sorted(source.glob("*.py"))
+        else:
+            yield source
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _model_version(model: str) -> str:
+    path = Path(model)
+    if path.is_dir():
+        meta = path / "meta.json"
+        return meta.read_text(encoding="utf-8") if meta.exists() else ""
+    return _package_version(model)
+
+
+def pipeline_fingerprint(model: str) -> str:
+    """
+    Hash the pattern sources, model version and spaCy version that a pipeline is built from.
+    """
+    digest = hashlib.sha256()
+    for path in _source_files():
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    digest.update(f"{model}\0{_model_version(model)}\0{_package_version('spacy')}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_fingerprint(path: Path) -> Optional[str]:
+    try:
+        return json.loads((path / FINGERPRINT_FILE).read_text(encoding="utf-8"))["fingerprint"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_snapshot(nlp, path: Path, fingerprint: str) -> None:
+    """
+    Write `nlp` to `path` atomically: build in a temporary sibling directory and swap it in.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    try:
+        nlp.to_disk(tmp)
+        (tmp / FINGERPRINT_FILE).write_text(json.dumps({"fingerprint": fingerprint}), encoding="utf-8")
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
@@ -0,0 +1,180 @@
+"""
+Sorted-interval arbitration of overlapping entity spans.
+
+Every stage that has to decide between overlapping spans (the contact regex
+pass, the rule matcher, entity merging and redaction) goes through the helpers
+here. Spans are ordered once by `arbitration_key` (earliest start, then longest,
+then highest label priority) and resolved with sweeps over that order, so the
+cost is O(n log n) instead of comparing every span with every other one.
+
+The helpers are agnostic of the span type: `bounds` maps an item to
+`(start, end, label)`, with `hint_bounds` for `EntityHint` (character offsets)
+and `span_bounds` for spaCy `Span` objects (token offsets).
+"""
+
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Callable, Collection, Iterable, List, Tuple, TypeVar
+
+from labeling.results import EntityHint
+
+T = TypeVar("T")
+Bounds = Callable[[T], Tuple[int, int, str]]
+
+# Tie-break for spans with identical extent: validated, structured identifiers win over
+# keyword and NER-derived labels, and fixed formats (dates) over the catch-all phone
+# pattern. A 26-digit account can pass the Luhn check too, so bank accounts come before
+# cards. Labels not listed have priority 0.
+LABEL_PRIORITY = {
+    "pesel": 100,
+    "bank-account": 95,
+    "credit-card-number": 90,
+    "document-number": 85,
+    "email": 80,
+    "date-of-birth": 75,
+    "date": 70,
+    "phone": 65,
+    "secret": 60,
+    "username": 55,
+    "address": 50,
+    "age": 40,
+    "school-name": 30,
+    "company": 20,
+    "name": 15,
+    "surname": 15,
+    "city": 10,
+}
+
+
+def hint_bounds(ent: EntityHint) -> Tuple[int, int, str]:
+    return ent.start_char, ent.end_char, ent.label
+
+
+def span_bounds(span) -> Tuple[int, int, str]:
+    return span.start, span.end, span.label_
+
+
+def arbitration_key(start: int, end: int, label: str) -> Tuple[int, int, int]:
+    return start, start - end, -LABEL_PRIORITY.get(label, 0)
+
+
+def sort_spans(items: Iterable[T], bounds: Bounds = hint_bounds) -> List[T]:
+    """Return `items` in arbitration order (stable for spans with equal keys)."""
+    return sorted(items, key=lambda item: arbitration_key(*bounds(item)))
+
+
+def select_non_overlapping(items: Iterable[T], bounds: Bounds = hint_bounds, presorted: bool = False) -> List[T]:
+    """
+    Greedily keep spans in arbitration order, skipping any that overlap one already kept.
+
+    Pass `presorted=True` for input already in arbitration order (e.g. the output of
+    `sort_spans`) to skip the sort.
+    """
+    if not presorted:
+        items = sort_spans(items, bounds)
+
+    selected: List[T] = []
+    last_end = None
+    for item in items:
+        start, end, _ = bounds(item)
+        if last_end is not None and start < last_end:
+            continue
+        selected.append(item)
+        last_end = end
+    return selected
+
+
+def select_longest_first(items: Iterable[T], bounds: Bounds = hint_bounds) -> List[T]:
+    """
+    Keep the longest spans first (earlier start, then label priority on ties), skipping any
+    that overlap one already kept; this is how an EntityRuler resolves its own matches.
+
+    The result is in arbitration order.
+    """
+    ranked = sorted(items, key=lambda item: _longest_first_key(*bounds(item)))
+    starts: List[int] = []
+    ends: List[int] = []
+    selected: List[Tuple[Tuple[int, int, int], T]] = []
+    for item in ranked:
+        start, end, label = bounds(item)
+        i = bisect_right(starts, start)
+        if i > 0 and ends[i - 1] > start:
+            continue
+        if i < len(starts) and starts[i] < end:
+            continue
+        starts.insert(i, start)
+        ends.insert(i, end)
+        selected.append((arbitration_key(start, end, label), item))
+    selected.sort(key=itemgetter(0))
+    return [item for _, item in selected]
+
+
+def _longest_first_key(start: int, end: int, label: str) -> Tuple[int, int, int]:
+    return start - end, start, -LABEL_PRIORITY.get(label, 0)
+
+
+def remove_overlapping(items: Iterable[T], blockers: Iterable[T], bounds: Bounds = hint_bounds) -> List[T]:
+    """
+    Return `items` (in their original order) without those overlapping any of `blockers`.
+    """
+    intervals = sorted(bounds(blocker)[:2] for blocker in blockers)
+    if not intervals:
+        return list(items)
+
+    # Union of the blockers as disjoint, sorted intervals.
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in intervals:
+        if starts and start < ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+
+    kept: List[T] = []
+    for item in items:
+        start, end, _ = bounds(item)
+        i = bisect_right(starts, start) - 1
+        if i >= 0 and ends[i] > start:
+            continue
+        if i + 1 < len(starts) and starts[i + 1] < end:
+            continue
+        kept.append(item)
+    return kept
+
+
+def merge_hints(hints: Iterable[EntityHint], labels: Collection[str]) -> List[EntityHint]:
+    """Drop exact duplicates and labels outside `labels`; the result is in arbitration order."""
+    seen = set()
+    merged: List[EntityHint] = []
+
+    for ent in sort_spans(hints):
+        key = (ent.start_char, ent.end_char, ent.label)
+        if key in seen or ent.label not in labels:
+            continue
+        merged.append(ent)
+        seen.add(key)
+
+    return merged
+
+
+def redact_text(text: str, entities: List[EntityHint]) -> str:
+    """
+    Replace `entities` with their labels; of overlapping ones, the first in arbitration order is kept.
+
+    `entities` may come in any order. Output of `merge_hints` is already sorted, which
+    the sort detects in linear time.
+    """
+    if not entities:
+        return text
+
+    redacted_parts: List[str] = []
+    cursor = 0
+
+    for ent in select_non_overlapping(entities):
+        redacted_parts.append(text[cursor:ent.start_char])
+        redacted_parts.append(f"[{ent.label}]")
+        cursor = ent.end_char
+
+    redacted_parts.append(text[cursor:])
+    return "".join(redacted_parts)
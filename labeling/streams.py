@@ -0,0 +1,70 @@
+"""
+Incremental text input/output helpers used by the streaming CLI mode.
+
+Records are yielded together with the separator that followed them in the
+source, so writing `redacted + separator` reproduces the original layout.
+"""
+
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager, Iterator, List, TextIO, Tuple
+
+STDIO_PATH = "-"
+SPLIT_MODES = ("line", "paragraph")
+
+
+def open_input(path: Path) -> ContextManager[TextIO]:
+    if str(path) == STDIO_PATH:
+        return nullcontext(sys.stdin)
+    return path.open("r", encoding="utf-8", newline="")
+
+
+def open_output(path: Path) -> ContextManager[TextIO]:
+    if str(path) == STDIO_PATH:
+        return nullcontext(sys.stdout)
+    return path.open("w", encoding="utf-8", newline="")
+
+
+def _split_trailing_newline(text: str) -> Tuple[str, str]:
+    body = text.rstrip("\r\n")
+    return body, text[len(body):]
+
+
+def _iter_lines(stream: TextIO) -> Iterator[Tuple[str, str]]:
+    for line in stream:
+        yield _split_trailing_newline(line)
+
+
+def _iter_paragraphs(stream: TextIO) -> Iterator[Tuple[str, str]]:
+    body: List[str] = []
+    blank: List[str] = []
+
+    for line in stream:
+        if line.strip():
+            if blank:
+                text, newline = _split_trailing_newline("".join(body))
+                yield text, newline + "".join(blank)
+                body, blank = [], []
+            body.append(line)
+        else:
+            blank.append(line)
+
+    if body or blank:
+        text, newline = _split_trailing_newline("".join(body))
+        yield text, newline + "".join(blank)
+
+
+def iter_records(stream: TextIO, split: str = "line") -> Iterator[Tuple[str, str]]:
+    """
+    Yield `(text, separator)` pairs from a text stream without reading it whole.
+
+    Args:
+        stream: Open text stream (file or stdin).
+        split: "line" for one record per line, "paragraph" for blocks separated by blank lines.
+    """
+    if split == "line":
+        return _iter_lines(stream)
+    if split == "paragraph":
+        return _iter_paragraphs(stream)
+    raise ValueError(f"Unknown split mode: {split!r} (expected one of {SPLIT_MODES})")
@@ -0,0 +1,266 @@
+"""
+Columnar, array-backed storage for per-token analysis results.
+
+A `TokenTable` keeps one compact `array` column per attribute instead of one
+Python object per token. Lemma, POS, tag and dependency labels are stored as
+ids into a shared string table, token text is sliced lazily from the document
+text, and the boolean attributes are packed into a single flags byte. Rows are
+exposed through `TokenRow` views that offer the same attributes as `TokenInfo`.
+"""
+
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from labeling.results import TokenInfo
+
+IS_STOP_FLAG = 1
+IS_PUNCT_FLAG = 2
+SPACE_FLAG = 4
+
+_MAGIC = b"LTT1"
+_HEADER = struct.Struct("<4sIII")
+_ID_COLUMNS = ("lemma", "pos", "tag", "dep")
+_COLUMNS = ("start", "length", *_ID_COLUMNS, "head", "flags")
+_TYPECODES = {name: "I" for name in _COLUMNS} | {"flags": "B"}
+
+
+class TokenRow:
+    """Lightweight view of one row of a TokenTable with TokenInfo-compatible attributes."""
+
+    __slots__ = ("_table", "idx")
+
+    def __init__(self, table: "TokenTable", idx: int) -> None:
+        self._table = table
+        self.idx = idx
+
+    @property
+    def text(self) -> str:
+        start = self._table.start[self.idx]
+        return self._table.text[start:start + self._table.length[self.idx]]
+
+    @property
+    def lemma(self) -> str:
+        return self._table.strings[self._table.lemma[self.idx]]
+
+    @property
+    def pos(self) -> str:
+        return self._table.strings[self._table.pos[self.idx]]
+
+    @property
+    def tag(self) -> str:
+        return self._table.strings[self._table.tag[self.idx]]
+
+    @property
+    def dep(self) -> str:
+        return self._table.strings[self._table.dep[self.idx]]
+
+    @property
+    def head(self) -> int:
+        return self._table.head[self.idx]
+
+    @property
+    def is_stop(self) -> bool:
+        return bool(self._table.flags[self.idx] & IS_STOP_FLAG)
+
+    @property
+    def is_punct(self) -> bool:
+        return bool(self._table.flags[self.idx] & IS_PUNCT_FLAG)
+
+    @property
+    def whitespace(self) -> str:
+        return " " if self._table.flags[self.idx] & SPACE_FLAG else ""
+
+    def to_info(self) -> TokenInfo:
+        return TokenInfo(
+            idx=self.idx,
+            text=self.text,
+            lemma=self.lemma,
+            pos=self.pos,
+            tag=self.tag,
+            dep=self.dep,
+            head=self.head,
+            is_stop=self.is_stop,
+            is_punct=self.is_punct,
+            whitespace=self.whitespace,
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TokenRow, TokenInfo)):
+            return self.to_info() == (other.to_info() if isinstance(other, TokenRow) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_info()).replace("TokenInfo", "TokenRow", 1)
+
+
+class TokenTable(Sequence):
+    """
+    Array-backed token store for one document.
+
+    Args:
+        text: The document text the token offsets refer to.
+        strings: String table that the lemma/pos/tag/dep columns index into.
+        columns: One `array` per entry of `_COLUMNS`.
+    """
+
+    def __init__(self, text: str, strings: List[str], columns: Dict[str, array]) -> None:
+        self.text = text
+        self.strings = strings
+        for name in _COLUMNS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_doc(cls, doc, text: Optional[str] = None) -> "TokenTable":
+        """
+        Build the table from a spaCy Doc with one vectorised `Doc.to_array` call.
+
+        Pass the document `text` when it is already at hand: `doc.text` builds a new copy.
+        """
+        # Imported here so tables can be merged and deserialised without spaCy/NumPy installed.
+        import numpy
+        from spacy.attrs import DEP, HEAD, IDX, IS_PUNCT, IS_STOP, LEMMA, LENGTH, POS, SPACY, TAG
+
+        data = doc.to_array([IDX, LENGTH, LEMMA, POS, TAG, DEP, HEAD, IS_STOP, IS_PUNCT, SPACY])
+        if text is None:
+            text = doc.text
+        if not len(data):
+            return cls.empty(text)
+
+        hashes, ids = numpy.unique(data[:, 2:6], return_inverse=True)
+        ids = ids.reshape(-1, 4).astype(numpy.uint32)
+        strings = [doc.vocab.strings[int(value)] if value else "" for value in hashes]
+        # HEAD is stored by spaCy as an offset relative to the token.
+        heads = (numpy.arange(len(data), dtype=numpy.int64) + data[:, 6].astype(numpy.int64)).astype(numpy.uint32)
+        flags = (
+            data[:, 7].astype(numpy.uint8) * IS_STOP_FLAG
+            | data[:, 8].astype(numpy.uint8) * IS_PUNCT_FLAG
+            | data[:, 9].astype(numpy.uint8) * SPACE_FLAG
+        )
+
+        values = {
+            "start": data[:, 0].astype(numpy.uint32),
+            "length": data[:, 1].astype(numpy.uint32),
+            "head": heads,
+            "flags": flags,
+        }
+        for offset, name in enumerate(_ID_COLUMNS):
+            values[name] = ids[:, offset]
+        columns = {
+            name: array(_TYPECODES[name], numpy.ascontiguousarray(values[name]).tobytes())
+            for name in _COLUMNS
+        }
+        return cls(text, strings, columns)
+
+    @classmethod
+    def empty(cls, text: str = "") -> "TokenTable":
+        return cls(text, [], {name: array(_TYPECODES[name]) for name in _COLUMNS})
+
+    @classmethod
+    def concat(cls, text: str, parts: Iterable[Tuple[int, "TokenTable"]]) -> "TokenTable":
+        """
+        Concatenate tables built on consecutive chunks of `text`.
+
+        Args:
+            text: The full document text.
+            parts: `(char_offset, table)` pairs in document order.
+        """
+        merged = cls.empty(text)
+        index: Dict[str, int] = {}
+        for char_offset, table in parts:
+            token_offset = len(merged)
+            remap = [index.setdefault(value, len(index)) for value in table.strings]
+            merged.start.extend(value + char_offset for value in table.start)
+            merged.length.extend(table.length)
+            for name in _ID_COLUMNS:
+                getattr(merged, name).extend(remap[value] for value in getattr(table, name))
+            merged.head.extend(value + token_offset for value in table.head)
+            merged.flags.extend(table.flags)
+        merged.strings = list(index)
+        return merged
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns (the string table and text are shared, not counted)."""
+        return sum(getattr(self, name).itemsize * len(getattr(self, name)) for name in _COLUMNS)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TokenRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return TokenRow(self, index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TokenTable):
+            return self.to_bytes() == other.to_bytes()
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(row == item for row, item in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TokenTable({len(self)} tokens, {len(self.strings)} strings)"
+
+    def __reduce__(self):
+        return TokenTable.from_bytes, (self.to_bytes(),)
+
+    def to_bytes(self) -> bytes:
+        """Serialise the table (including the document text) into one little-endian binary blob."""
+        encoded = [value.encode("utf-8") for value in self.strings]
+        text = self.text.encode("utf-8")
+        chunks = [
+            _HEADER.pack(_MAGIC, len(self), len(encoded), len(text)),
+            _to_le(array("I", (len(value) for value in encoded))),
+            b"".join(encoded),
+            text,
+        ]
+        chunks.extend(_to_le(getattr(self, name)) for name in _COLUMNS)
+        return b"".join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TokenTable":
+        magic, num_tokens, num_strings, text_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a serialised TokenTable")
+        view = memoryview(data)
+        offset = _HEADER.size
+
+        lengths, offset = _read_column(view, offset, "I", num_strings)
+        strings = []
+        for length in lengths:
+            strings.append(bytes(view[offset:offset + length]).decode("utf-8"))
+            offset += length
+        text = bytes(view[offset:offset + text_len]).decode("utf-8")
+        offset += text_len
+
+        columns = {}
+        for name in _COLUMNS:
+            columns[name], offset = _read_column(view, offset, _TYPECODES[name], num_tokens)
+        return cls(text, strings, columns)
+
+
+def _to_le(column: array) -> bytes:
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(view: memoryview, offset: int, typecode: str, count: int) -> Tuple[array, int]:
+    column = array(typecode)
+    end = offset + column.itemsize * count
+    column.frombytes(view[offset:end])
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column, end
@@ -0,0 +1,25 @@
+"""
+Shared fixtures: documents for tests that run without a trained spaCy model.
+
+The pipelines the tests run on (`blank_pipeline()`, `legacy_pipeline()` and
+`stand_in_pipeline()`) live in `tests.stand_in`, the generated documents in
+`tests.corpus`.
+"""
+
+import random
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from .corpus import number_dense
+
+TEST_DATA = Path(__file__).resolve().parent.parent / "labeling" / "test_data.txt"
+
+
+@pytest.fixture(scope="session")
+def documents() -> List[str]:
+    """`labeling/test_data.txt` plus seeded number-dense legal text (amounts, IBANs, cards, PESELs, phones)."""
+    texts = [line for line in TEST_DATA.read_text(encoding="utf-8").splitlines() if line.strip()]
+    rng = random.Random(0)
+    return texts + [number_dense(rng, 3) for _ in range(600)]
@@ -0,0 +1,221 @@
+"""
+Seeded synthetic Polish corpora with planted PII, shared by the tests and the benchmarks.
+
+Documents are built from conversational (chat/e-mail) and legal-style (court
+and administrative letters) sentence templates. Every label of
+`ALLOWED_LABELS` is planted by at least one template; structured identifiers
+are valid (PESEL, IBAN and card checksums), so validators accept them. The
+same seed always yields the same text, and planted spans are returned
+alongside it for recall checks. `number_dense` builds table-like legal text
+(amounts, dates, IBANs, cards, phones and case numbers) for the digit rules.
+"""
+
+import random
+import string
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+from labeling.results import ALLOWED_LABELS
+
+NAMES = ["Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Agnieszka", "Michał", "Magdalena", "Paweł", "Ewa"]
+SURNAMES = ["Kowalski", "Nowak", "Wiśniewska", "Wójcik", "Kamińska", "Lewandowski", "Zielińska", "Szymański"]
+CITIES = ["Warszawa", "Kraków", "Łódź", "Wrocław", "Poznań", "Gdańsk", "Lublin", "Białystok"]
+STREETS = ["Długa", "Polna", "Lipowa", "Mickiewicza", "Kościuszki", "Ogrodowa", "Słoneczna"]
+COMPANIES = ["Budex", "Transpol", "Agromax", "Infotech", "Drewbud", "Medicor"]
+SCHOOLS = ["Liceum Ogólnokształcące nr 5", "Technikum Mechaniczne nr 2", "Uniwersytet Jagielloński",
+           "Politechnika Gdańska", "Szkoła Podstawowa nr 12"]
+MONTHS = ["stycznia", "lutego", "marca", "kwietnia", "maja", "czerwca",
+          "lipca", "sierpnia", "września", "października", "listopada", "grudnia"]
+SEX = ["mężczyzna", "kobieta"]
+RELIGIONS = ["katolik", "katoliczka", "prawosławny", "muzułmanin", "protestant", "buddysta"]
+RELATIVES = ["matka", "ojciec", "brat", "siostra", "babcia", "dziadek", "żona", "mąż", "syn", "córka"]
+POLITICAL = ["liberał", "konserwatysta", "socjalista", "anarchista", "centrowy"]
+ETHNICITIES = ["Polak", "Polka", "Ukrainiec", "Białorusin", "Niemka"]
+ORIENTATIONS = ["gej", "lesbijka", "biseksualny", "heteroseksualna"]
+HEALTH = ["depresja", "astma", "grypa", "infekcja", "gorączka"]
+PHONE_FORMATS = ["+48 {} {} {}", "{} {} {}", "{}-{}-{}", "({}) {}-{}"]
+JOBS = ["kierownik", "nauczycielka", "lekarz", "prawnik", "magazynier", "inżynier"]
+
+CONVERSATIONAL = [
+    "Cześć, tu {name} {surname}, mój numer to {phone}, pisz też na {email}.",
+    "Mam {age} lat, jestem {sex}, z wyznania {religion}, a politycznie raczej {political-view}.",
+    "Moja {relative} mieszka w mieście {city} przy {address}, wpadnij kiedyś.",
+    "Od tygodnia męczy mnie {health}, więc jutro nie przyjdę do pracy.",
+    "Pracuję jako {job-title} w firmie {company}, a wcześniej uczyłem się w {school-name}.",
+    "Podaję dane do konta w aplikacji: login: {username} hasło: {secret}",
+    "Jestem {ethnicity}, jestem {sexual-orientation} i nie mam nic do ukrycia.",
+    "Spotkanie przesunęliśmy na {date}, daj znać, czy pasuje.",
+    "No dobra, to widzimy się wieczorem, wezmę ze sobą dokumenty i coś do jedzenia.",
+    "Haha, dokładnie tak było, wszyscy się śmiali jeszcze przez godzinę.",
+]
+
+LEGAL = [
+    "Wnioskodawca {name} {surname}, PESEL {pesel}, urodzony {date-of-birth}, legitymujący się dowodem "
+    "osobistym nr {document-number}, zamieszkały {address} w miejscowości {city}.",
+    "W dniu {date} strony zawarły umowę, a należność zostanie przelana na rachunek bankowy {bank-account}.",
+    "Płatność kartą nr {credit-card-number} została zaksięgowana na rzecz spółki {company}.",
+    "Pełnomocnik wskazał adres do doręczeń {email} oraz numer telefonu {phone}.",
+    "Świadek, {job-title} z wykształcenia, absolwent {school-name}, zeznał, że jest {sex} w wieku {age} lat.",
+    "Zgodnie z art 12 ust 7 ustawy Prawo budowlane inwestor jest obowiązany zawiadomić właściwy organ "
+    "nadzoru budowlanego o zamierzonym terminie rozpoczęcia robót co najmniej na 7 dni przed ich rozpoczęciem.",
+    "Na podstawie art 59a ust 1 pkt 2 ustawy organ przeprowadzi obowiązkową kontrolę budowy w terminie 21 dni.",
+    "Sąd ustalił, że {relative} wnioskodawcy, {religion}, deklarujący się jako {political-view}, "
+    "cierpi na {health} i jest {ethnicity}.",
+    "Uczestnik postępowania, {sexual-orientation}, podał dane dostępowe: login: {username} hasło: {secret}",
+    "Od decyzji przysługuje odwołanie do organu wyższego stopnia w terminie 14 dni od dnia jej doręczenia.",
+]
+
+STYLES = {"conversational": CONVERSATIONAL, "legal": LEGAL}
+
+
+def digits(rng: random.Random, count: int) -> str:
+    return "".join(rng.choice(string.digits) for _ in range(count))
+
+
+def pesel(rng: random.Random) -> str:
+    year, month, day = rng.randint(1940, 1999), rng.randint(1, 12), rng.randint(1, 28)
+    number = f"{year % 100:02d}{month:02d}{day:02d}{digits(rng, 4)}"
+    weights = [1, 3, 7, 9, 1, 3, 7, 9, 1, 3]
+    checksum = sum(w * int(d) for w, d in zip(weights, number))
+    return number + str((10 - checksum % 10) % 10)
+
+
+def iban(rng: random.Random) -> str:
+    bban = digits(rng, 24)
+    # ISO 13616: move "PL00" to the end, letters as numbers (P=25, L=21), check = 98 - mod 97.
+    check = 98 - int(bban + "252100") % 97
+    number = f"PL{check:02d}{bban}"
+    return " ".join(number[i:i + 4] for i in range(0, len(number), 4))
+
+
+def card(rng: random.Random) -> str:
+    body = "4" + digits(rng, 14)
+    total = 0
+    for i, d in enumerate(reversed(body)):
+        n = int(d) * (2 if i % 2 == 0 else 1)
+        total += n - 9 if n > 9 else n
+    number = body + str((10 - total % 10) % 10)
+    return " ".join(number[i:i + 4] for i in range(0, 16, 4))
+
+
+def _ascii(value: str) -> str:
+    return value.lower().translate(str.maketrans("ąćęłńóśźż", "acelnoszz"))
+
+
+GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "name": lambda rng: rng.choice(NAMES),
+    "surname": lambda rng: rng.choice(SURNAMES),
+    "age": lambda rng: str(rng.randint(18, 90)),
+    "date-of-birth": lambda rng: f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(1940, 2005)}",
+    "date": lambda rng: f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(2000, 2025)} r.",
+    "sex": lambda rng: rng.choice(SEX),
+    "religion": lambda rng: rng.choice(RELIGIONS),
+    "political-view": lambda rng: rng.choice(POLITICAL),
+    "ethnicity": lambda rng: rng.choice(ETHNICITIES),
+    "sexual-orientation": lambda rng: rng.choice(ORIENTATIONS),
+    "health": lambda rng: rng.choice(HEALTH),
+    "relative": lambda rng: rng.choice(RELATIVES),
+    "city": lambda rng: rng.choice(CITIES),
+    "address": lambda rng: f"ul. {rng.choice(STREETS)} {rng.randint(1, 120)}/{rng.randint(1, 40)} "
+                           f"{digits(rng, 2)}-{digits(rng, 3)}",
+    "email": lambda rng: f"{_ascii(rng.choice(NAMES))}.{_ascii(rng.choice(SURNAMES))}{rng.randint(1, 99)}@example.pl",
+    "phone": lambda rng: rng.choice(PHONE_FORMATS).format(rng.randint(500, 899), digits(rng, 3), digits(rng, 3)),
+    "pesel": pesel,
+    "document-number": lambda rng: "".join(rng.choice(string.ascii_uppercase) for _ in range(3)) + digits(rng, 6),
+    "company": lambda rng: f"{rng.choice(COMPANIES)} sp. z o.o.",
+    "school-name": lambda rng: rng.choice(SCHOOLS),
+    "job-title": lambda rng: rng.choice(JOBS),
+    "bank-account": iban,
+    "credit-card-number": card,
+    "username": lambda rng: f"{_ascii(rng.choice(NAMES))}_{rng.randint(1, 999)}",
+    "secret": lambda rng: "".join(rng.choice(string.ascii_letters + string.digits + "!#$%") for _ in range(12)),
+}
+
+
+@dataclass
+class Document:
+    text: str
+    # Planted PII as (start_char, end_char, label).
+    spans: List[Tuple[int, int, str]] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    name: str
+    style: str
+    doc_chars: int
+    docs: int = 1
+
+
+CORPORA = {
+    spec.name: spec
+    for spec in (
+        CorpusSpec("conversational-1kb", "conversational", 1_000),
+        CorpusSpec("legal-1kb", "legal", 1_000),
+        CorpusSpec("conversational-100kb", "conversational", 100_000),
+        CorpusSpec("legal-100kb", "legal", 100_000),
+        CorpusSpec("legal-2mb", "legal", 2_000_000),
+        CorpusSpec("small-docs", "conversational", 300, docs=2_000),
+    )
+}
+
+
+def _fill(template: str, rng: random.Random, parts: List[str], spans: List[Tuple[int, int, str]], offset: int) -> int:
+    """Append `template` with its placeholders filled to `parts`; return the new offset."""
+    rest = template
+    while "{" in rest:
+        before, _, tail = rest.partition("{")
+        label, _, rest = tail.partition("}")
+        value = GENERATORS[label](rng)
+        parts.append(before)
+        offset += len(before)
+        spans.append((offset, offset + len(value), label))
+        parts.append(value)
+        offset += len(value)
+    parts.append(rest)
+    return offset + len(rest)
+
+
+def generate_document(style: str, chars: int, rng: random.Random) -> Document:
+    """Generate one document of at least `chars` characters; paragraphs break every few sentences."""
+    templates = STYLES[style]
+    parts: List[str] = []
+    spans: List[Tuple[int, int, str]] = []
+    offset = 0
+    sentence = 0
+    while offset < chars:
+        if sentence:
+            separator = "\n\n" if sentence % 6 == 0 else " "
+            parts.append(separator)
+            offset += len(separator)
+        offset = _fill(rng.choice(templates), rng, parts, spans, offset)
+        sentence += 1
+    return Document("".join(parts), spans)
+
+
+def generate_corpus(spec: CorpusSpec, seed: int = 0) -> List[Document]:
+    rng = random.Random(f"{spec.name}:{seed}")
+    return [generate_document(spec.style, spec.doc_chars, rng) for _ in range(spec.docs)]
+
+
+_ROWS = [
+    "Poz. {n}/{year} z dnia {day}.{month:02d}.{year} r. kwota {amount},{cents:02d} zł, {count} szt. x {price} zł",
+    "konto {iban} , karta {card} , tel. {phone} ({code}) {phone}",
+    "sygn. akt II K {n}/{short} , PESEL {pesel} , nr {long} - {long} - {n}",
+    "{n} {n} {n} {amount} {amount} {amount} {n}-{n}-{n} {day} {month_name} {year} r.",
+]
+
+
+def number_dense(rng: random.Random, rows: int) -> str:
+    """`rows` table rows of amounts, dates, IBANs, cards, PESELs and phones, joined into one document."""
+    lines = []
+    for _ in range(rows):
+        lines.append(rng.choice(_ROWS).format(
+            n=rng.randint(1, 999), year=rng.randint(1990, 2025), short=rng.randint(10, 25),
+            day=rng.randint(1, 28), month=rng.randint(1, 12), month_name=rng.choice(MONTHS),
+            amount=f"{rng.randint(1, 999)} {rng.randint(0, 999):03d}", cents=rng.randint(0, 99),
+            count=rng.randint(1, 50), price=rng.randint(1, 9999), iban=iban(rng), card=card(rng),
+            phone=f"{digits(rng, 3)} {digits(rng, 3)} {digits(rng, 3)}", code=digits(rng, 2),
+            pesel=pesel(rng), long=digits(rng, rng.randint(4, 12)),
+        ))
+    return " ".join(lines)
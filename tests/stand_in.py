@@ -0,0 +1,92 @@
+"""
+A stand-in for the trained pipeline, for tests and benchmarks that run without the model.
+
+`stand_in_pipeline()` is a blank Polish pipeline with a `sentencizer` and
+stand-ins for the statistical components the rule stage reads from:
+`stub_tagger` gives every token its lower-cased text as lemma and NUM
+(number-like tokens) or NOUN as POS, and `ner` assigns nothing. `pii_matcher`
+is then added `after="ner"` exactly as on a real model. Timings and memory
+cover what the preprocessor does with the Doc, not what the model would cost.
+
+`blank_pipeline()` stops before the rule stage, and `legacy_pipeline()` adds
+the per-group EntityRuler chain `pii_matcher` replaced. `legacy_rules_pipeline()`
+and `rules_pipeline()` run only the rule-based group (the one with the REGEX
+predicates) on the tokenizer output, the chain's way and `pii_matcher`'s way.
+"""
+
+from typing import Optional
+
+import spacy
+from spacy.language import Language
+
+from labeling.defaults import DEFAULT_MAX_LEN
+from labeling.pipes.age import add_age_entity_ruler
+from labeling.pipes.keywords import add_keyword_entity_ruler
+from labeling.pipes.matcher import MATCHER_NAME, RULES_GROUP, add_pii_matcher, default_rule_groups
+from labeling.pipes.relative import add_relative_entity_ruler
+from labeling.pipes.religion import add_religion_entity_ruler
+from labeling.pipes.rule_entities import add_rule_entity_ruler
+from labeling.pipes.rule_patterns import _patterns
+from labeling.pipes.sex import add_sex_entity_ruler
+
+
+@Language.component("stub_tagger", assigns=["token.pos", "token.lemma"])
+def stub_tagger(doc):
+    for token in doc:
+        token.pos_ = "NUM" if token.like_num else "NOUN"
+        token.lemma_ = token.lower_
+    return doc
+
+
+@Language.component("stub_ner", assigns=["doc.ents"])
+def stub_ner(doc):
+    return doc
+
+
+def blank_pipeline() -> spacy.Language:
+    nlp = spacy.blank("pl")
+    nlp.add_pipe("stub_tagger")
+    nlp.add_pipe("stub_ner", name="ner")
+    return nlp
+
+
+def legacy_pipeline(nlp: Optional[spacy.Language] = None) -> spacy.Language:
+    """The per-group EntityRuler chain `pii_matcher` replaced, in its original component order."""
+    nlp = blank_pipeline() if nlp is None else nlp
+    for add in (
+        add_rule_entity_ruler,
+        add_keyword_entity_ruler,
+        add_sex_entity_ruler,
+        add_religion_entity_ruler,
+        add_relative_entity_ruler,
+        add_age_entity_ruler,
+    ):
+        nlp = add(nlp)
+    return nlp
+
+
+def stand_in_pipeline() -> spacy.Language:
+    nlp = spacy.blank("pl")
+    nlp.max_length = DEFAULT_MAX_LEN
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("stub_tagger")
+    nlp.add_pipe("stub_ner", name="ner")
+    return add_pii_matcher(nlp)
+
+
+def legacy_rules_pipeline() -> spacy.Language:
+    """The EntityRuler chain of `add_rule_entity_ruler` alone, on a blank pipeline."""
+    nlp = spacy.blank("pl")
+    ruler = nlp.add_pipe("entity_ruler", name="rule_entity_ruler", config={"overwrite_ents": True})
+    ruler.add_patterns(_patterns())
+    nlp.add_pipe("regex_contact_entities")
+    nlp.add_pipe("filter_rule_spans")
+    return nlp
+
+
+def rules_pipeline(regex_flags: bool = True) -> spacy.Language:
+    """`pii_matcher` with only the rule-based group, on a blank pipeline."""
+    nlp = spacy.blank("pl")
+    matcher = nlp.add_pipe(MATCHER_NAME, config={"regex_flags": regex_flags})
+    matcher.set_groups({RULES_GROUP: default_rule_groups()[RULES_GROUP]})
+    return nlp
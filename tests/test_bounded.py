@@ -0,0 +1,29 @@
+"""The memory-bounded mode takes the shared pipeline options, profiling included."""
+
+import io
+import json
+
+from labeling.anonymizer import anonymize_file
+from labeling.cli import main
+from labeling.regex_engine import RegexPreprocessor
+
+TEXT = "Proszę dzwonić pod numer 600 700 800 po godzinie 16.\n\n" * 2000
+MAX_MEMORY = 4 << 30
+
+
+def test_profiled_file_run(tmp_path):
+    src = tmp_path / "in.txt"
+    src.write_text(TEXT, encoding="utf-8")
+    dst = io.StringIO()
+    stats = anonymize_file(src, dst, max_memory=MAX_MEMORY, engine="regex", profile=True, verbose=False)
+    assert dst.getvalue() == RegexPreprocessor()(TEXT).redacted_text
+    assert stats["profile"]
+    assert sum(stage["calls"] for stage in stats["profile"].values()) >= stats["chunks"]
+
+
+def test_cli_writes_the_profile_report(tmp_path):
+    src, out, report = tmp_path / "in.txt", tmp_path / "out.txt", tmp_path / "profile.json"
+    src.write_text(TEXT, encoding="utf-8")
+    assert main([str(src), "-o", str(out), "--engine", "regex", "--max-memory", "4G",
+                 "--profile-output", str(report), "--quiet"]) == 0
+    assert json.loads(report.read_text())["documents"] >= 1
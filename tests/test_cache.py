@@ -0,0 +1,117 @@
+"""`ResultCache` returns what the pipeline returned, keys on the configuration and evicts by LRU."""
+
+from itertools import count
+
+import pytest
+
+from labeling import cache as cache_module
+from labeling.cache import CachedPreprocessor, ResultCache, result_fingerprint
+from labeling.regex_engine import RegexPreprocessor
+
+FINGERPRINT = result_fingerprint(engine="regex", model="", labels=None, use_ner_hints=False)
+
+
+def _spans(result):
+    return [(ent.start_char, ent.end_char, ent.label, ent.text) for ent in result.entities]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing `time.time()` in the cache, so LRU order never depends on clock resolution."""
+    ticks = count(1)
+    monkeypatch.setattr(cache_module.time, "time", lambda: float(next(ticks)))
+
+
+def test_hit_returns_the_same_result(tmp_path, documents):
+    texts = documents[:30] + documents[:5] + ["", "Tel. 501 234 567"]
+    preprocessor = RegexPreprocessor()
+    expected = [preprocessor(text) for text in texts]
+    cached = CachedPreprocessor(preprocessor, ResultCache(tmp_path / "results.sqlite", FINGERPRINT))
+    for _ in range(2):  # misses, then hits
+        results = list(cached.pipe(texts, batch_size=8))
+        assert [_spans(result) for result in results] == [_spans(result) for result in expected]
+        assert [result.redacted_text for result in results] == [result.redacted_text for result in expected]
+    stats = cached.cache.stats
+    assert stats.misses == 32  # the repeated documents already hit in the first pass
+    assert stats.hits == 5 + len(texts)
+    assert all(result.meta["cached"] for result in results)
+    assert _spans(cached(texts[0])) == _spans(expected[0])
+    cached.close()
+
+
+def test_hit_survives_reopening(tmp_path):
+    text = "Przelew na konto PL61109010140000071219812874, tel. 501 234 567."
+    cache = ResultCache(tmp_path / "results.sqlite", FINGERPRINT)
+    expected = CachedPreprocessor(RegexPreprocessor(), cache)(text)
+    cache.close()
+    reopened = ResultCache(tmp_path / "results.sqlite", FINGERPRINT)
+    result = reopened.get_many([text])[0]
+    assert result is not None and result.raw_text == text
+    assert _spans(result) == _spans(expected)
+    assert result.redacted_text == expected.redacted_text
+    reopened.close()
+
+
+@pytest.mark.parametrize("changed", [
+    {"engine": "spacy", "model": "blank:pl"},
+    {"labels": ["email"]},
+    {"use_ner_hints": True},
+    {"dedup": True},
+    {"lemmatizer": False},
+    {"windowed": True},
+])
+def test_new_fingerprint_misses(tmp_path, changed):
+    options = {"engine": "regex", "model": "", "labels": None, "use_ner_hints": False, **changed}
+    fingerprint = result_fingerprint(**options)
+    assert fingerprint != FINGERPRINT
+    assert result_fingerprint(**options) == fingerprint
+
+    text = "Tel. 501 234 567"
+    path = tmp_path / "results.sqlite"
+    old = ResultCache(path, FINGERPRINT)
+    old.put_many([(text, RegexPreprocessor()(text))])
+    new = ResultCache(path, fingerprint)
+    assert new.get_many([text]) == [None]
+    assert old.get_many([text])[0] is not None
+    assert len(new) == 1  # one shared database
+    old.close()
+    new.close()
+
+
+def test_fingerprint_ignores_label_order():
+    forward = result_fingerprint(engine="regex", model="", labels=["email", "phone"], use_ner_hints=False)
+    backward = result_fingerprint(engine="regex", model="", labels=["phone", "email"], use_ner_hints=False)
+    assert forward == backward
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    preprocessor = RegexPreprocessor()
+    texts = [f"Dokument {i}, e-mail jan{i}@example.com." for i in range(4)]
+    results = [preprocessor(text) for text in texts]
+
+    probe = ResultCache(tmp_path / "probe.sqlite", FINGERPRINT)
+    probe.put_many([(texts[0], results[0])])
+    entry = probe.size_bytes()
+    probe.close()
+
+    # Three entries fit; the fourth pushes the database over the bound.
+    cache = ResultCache(tmp_path / "results.sqlite", FINGERPRINT, max_bytes=int(entry * 3.5))
+    for text, result in zip(texts[:3], results[:3]):
+        cache.put_many([(text, result)])
+    assert cache.get_many([texts[0]])[0] is not None  # now more recent than texts[1] and texts[2]
+    cache.put_many([(texts[3], results[3])])
+
+    assert cache.stats.evicted == 1
+    assert cache.size_bytes() <= cache.max_bytes
+    found = cache.get_many(texts)
+    assert [result is not None for result in found] == [True, False, True, True]
+    cache.close()
+
+
+def test_oversized_results_are_not_stored(tmp_path):
+    text = "Tel. 501 234 567"
+    cache = ResultCache(tmp_path / "results.sqlite", FINGERPRINT, max_bytes=16)
+    cache.put_many([(text, RegexPreprocessor()(text))])
+    assert len(cache) == 0
+    assert cache.get_many([text]) == [None]
+    cache.close()
@@ -0,0 +1,51 @@
+"""Shards are cut only at sentence boundaries and blank lines, so entities on a cut come out whole."""
+
+import pytest
+
+from labeling.chunking import split_text
+from labeling.parallel import MIN_SHARD_CHARS, ParallelPreprocessor
+from labeling.regex_engine import RegexPreprocessor
+
+FILLER = "Sprawa dotyczy umowy zawartej w zeszłym miesiącu. "
+
+
+def _around(entity: str, before: str, after: str, cut: int) -> tuple:
+    """A text with `entity` straddling character `cut`, and the entity's span."""
+    pad = cut - len(entity) // 2 - len(before)
+    prefix = (FILLER * (pad // len(FILLER) + 1))[-pad:] + before
+    text = prefix + entity + after + FILLER * 3
+    return text, (len(prefix), len(prefix) + len(entity))
+
+
+@pytest.mark.parametrize("before, entity, after", [
+    ("Proszę dzwonić pod numer ", "600 700 800", " po godzinie 16. "),
+    ("Pełnomocnikiem jest ", "Jan Kowalski", " z Krakowa. "),
+    ("Adres: ", "ul. Długa 5, 00-950 Warszawa", ", piętro 2. "),
+])
+def test_no_cut_inside_an_entity(before, entity, after):
+    max_chars = 500
+    text, (start, end) = _around(entity, before, after, max_chars)
+    assert start < max_chars < end
+    chunks = split_text(text, max_chars)
+    assert len(chunks) > 1
+    assert "".join(chunk for _, chunk in chunks) == text
+    assert all(not start < offset < end for offset, _ in chunks)
+
+
+def test_cut_at_blank_line_without_sentence_end():
+    text = "lista numerów 600 700 800 601 701 801\n\n" + "i kolejne 602 702 802 " * 30
+    chunks = split_text(text, 100)
+    assert chunks[1][0] == text.index("\n\n") + 2
+
+
+def test_sharded_document_has_the_same_entities():
+    text, (start, end) = _around("600 700 800", "Proszę dzwonić pod numer ", " po godzinie 16. ", MIN_SHARD_CHARS)
+    text *= 3
+    expected = RegexPreprocessor()(text)
+    with ParallelPreprocessor(2, model="", max_length=len(text), engine="regex") as parallel:
+        result = parallel(text)
+    assert result.meta["num_chunks"] > 1
+    assert [(e.start_char, e.end_char, e.label) for e in result.entities] == [
+        (e.start_char, e.end_char, e.label) for e in expected.entities
+    ]
+    assert result.redacted_text == expected.redacted_text
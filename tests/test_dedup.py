@@ -0,0 +1,93 @@
+"""
+Sentence dedup gives the plain run's output; the splitter and the whitespace map it relies on.
+
+The documents avoid digit runs that several rules match with the same extent (a PESEL is also
+a phone candidate): the EntityRuler order `pii_matcher` reproduces decides those ties by token
+position, so moving a sentence can change the winner with or without dedup.
+"""
+
+import random
+
+import pytest
+
+from labeling.chunking import split_sentences
+from labeling.dedup import MIN_REPEAT_CHARS, DedupPreprocessor, _WhitespaceMap, normalize_sentence
+from labeling.preprocessor import SpacyPreprocessor
+from labeling.regex_engine import RegexPreprocessor
+
+from .stand_in import stand_in_pipeline
+
+INSTRUCTION = (
+    "Od niniejszej decyzji przysługuje odwołanie do Wojewody za pośrednictwem organu, który ją wydał, "
+    "a pytania można kierować na adres kancelaria@urzad.gov.pl; w imieniu wnioskodawcy może działać jego syn, "
+    "katolik, albo inna osoba z pełnomocnictwem."
+)
+NOTICES = [
+    "Wnioskodawca mieszka przy ul. Długiej 5 w Krakowie i jest katolikiem.",
+    "Pismo z dnia 12. 03. 2021 r. wpłynęło do sekretariatu; kontakt: jan.nowak@example.com.",
+    "Syn wnioskodawcy, kobieta w wieku 45 lat, złożyła wniosek w terminie.",
+]
+
+
+def _wrapped(sentence: str, rng: random.Random) -> str:
+    """`sentence` with some of its spaces turned into line breaks or runs of spaces."""
+    return "".join(rng.choice([" ", "\n", "  ", " \n "]) if char == " " and rng.random() < 0.3 else char
+                   for char in sentence)
+
+
+def _document(seed: int) -> str:
+    rng = random.Random(seed)
+    return "\n\n".join(f"{rng.choice(NOTICES)} {_wrapped(INSTRUCTION, rng)}" for _ in range(12))
+
+
+def _entities(result):
+    return [(e.start_char, e.end_char, e.label, e.text) for e in result.entities]
+
+
+@pytest.mark.parametrize("make", [RegexPreprocessor, lambda: SpacyPreprocessor(stand_in_pipeline())],
+                         ids=["regex", "spacy"])
+@pytest.mark.parametrize("seed", range(3))
+def test_same_output_as_the_plain_run(make, seed):
+    text = _document(seed)
+    plain = make()
+    expected = plain(text)
+    result = DedupPreprocessor(plain)(text)
+    assert result.meta["dedup"]["ratio"] > 0.5
+    assert _entities(result) == _entities(expected)
+    assert result.redacted_text == expected.redacted_text
+
+
+def test_short_repeats_are_processed_again():
+    text = "Dziękuję! " * 20
+    assert len(normalize_sentence("Dziękuję!")) < MIN_REPEAT_CHARS
+    assert "dedup" not in DedupPreprocessor(RegexPreprocessor())(text).meta
+
+
+@pytest.mark.parametrize("text, sentences", [
+    ("Jan kupił samochód. Kot ma Alę! Czy na pewno? Tak.",
+     ["Jan kupił samochód.", "Kot ma Alę!", "Czy na pewno?", "Tak."]),
+    ("Mieszka przy ul. Długiej 125. Pracuje w Gdańsku.", ["Mieszka przy ul. Długiej 125.", "Pracuje w Gdańsku."]),
+    ("Zob. art. 5 ust. 2 ustawy. Dalej.", ["Zob. art. 5 ust. 2 ustawy.", "Dalej."]),
+    ("Wniosek J. Kowalskiego wpłynął. Rozpatrzono go.", ["Wniosek J. Kowalskiego wpłynął.", "Rozpatrzono go."]),
+    ("Dnia 12. 03. 2021 r. wydano decyzję. Koniec.", ["Dnia 12. 03. 2021 r. wydano decyzję.", "Koniec."]),
+    ("Lista bez kropki\n\nnastępny akapit", ["Lista bez kropki", "następny akapit"]),
+    ("Zdanie złamane\nw środku. Drugie zdanie.", ["Zdanie złamane\nw środku.", "Drugie zdanie."]),
+    ("Cytat „Koniec.” Następne.", ["Cytat „Koniec.”", "Następne."]),
+    ("  \n  ", []),
+])
+def test_split_sentences(text, sentences):
+    spans = split_sentences(text)
+    assert [text[start:end] for start, end in spans] == sentences
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_whitespace_map_round_trip(seed):
+    rng = random.Random(seed)
+    sentence = "".join(rng.choice(["a", "b", " ", "\n", "\t", "  "]) for _ in range(60))
+    normalized = normalize_sentence(sentence)
+    mapping = _WhitespaceMap(sentence)
+    for pos, char in enumerate(normalized):
+        original = mapping.to_original(pos)
+        assert mapping.to_normalized(original) == pos
+        if not char.isspace():
+            assert sentence[original] == char
@@ -0,0 +1,86 @@
+import io
+
+import pytest
+
+from labeling.delta import DELTA_FORMATS, apply_delta, read_delta, redaction_delta, write_delta
+from labeling.results import EntityHint
+from labeling.spans import redact_text
+
+TEXT = "Jan Kowalski, tel. 600 700 800, mieszka w Krakowie; żółw"
+ENTITIES = [
+    EntityHint(text="Jan Kowalski", label="name", start_char=0, end_char=12),
+    EntityHint(text="600 700 800", label="phone", start_char=19, end_char=30),
+    EntityHint(text="Krakowie", label="city", start_char=42, end_char=50),
+]
+REDACTED = redact_text(TEXT, ENTITIES)
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _round_trip(edits, length, fmt):
+    buffer = io.BytesIO()
+    write_delta(buffer, edits, length, fmt)
+    buffer.seek(0)
+    return read_delta(buffer)
+
+
+@pytest.mark.parametrize("fmt", DELTA_FORMATS)
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, len(TEXT) - 1, len(TEXT), 1 << 20])
+def test_apply_delta_rebuilds_the_redacted_text(fmt, size):
+    length, edits = _round_trip(redaction_delta(ENTITIES), len(TEXT), fmt)
+    assert length == len(TEXT)
+    assert "".join(apply_delta(_chunks(TEXT, size), edits, length)) == REDACTED
+
+
+@pytest.mark.parametrize("fmt", DELTA_FORMATS)
+def test_round_trip_keeps_the_edits(fmt):
+    edits = redaction_delta(ENTITIES) + [(52, 56, "zwierzę")]
+    length, decoded = _round_trip(edits, len(TEXT), fmt)
+    assert (length, list(decoded)) == (len(TEXT), edits)
+
+
+def test_edits_spanning_several_chunks():
+    # With 4-character chunks every edit starts in one chunk and ends several chunks later.
+    chunks = _chunks(TEXT, 4)
+    assert all(end - start > 4 and start // 4 != (end - 1) // 4 for start, end, _ in redaction_delta(ENTITIES))
+    assert "".join(apply_delta(chunks, redaction_delta(ENTITIES), len(TEXT))) == REDACTED
+
+
+def test_edits_at_both_ends():
+    edits = [(0, 3, "name"), (len(TEXT) - 4, len(TEXT), "animal")]
+    redacted = "[name]" + TEXT[3:-4] + "[animal]"
+    for size in (1, 3, len(TEXT)):
+        assert "".join(apply_delta(_chunks(TEXT, size), edits, len(TEXT))) == redacted
+
+
+@pytest.mark.parametrize("fmt", DELTA_FORMATS)
+@pytest.mark.parametrize("chunks", [[], [""], ["", ""]])
+def test_empty_text(fmt, chunks):
+    length, edits = _round_trip([], 0, fmt)
+    assert length == 0
+    assert "".join(apply_delta(chunks, edits, length)) == ""
+
+
+@pytest.mark.parametrize("original", [TEXT[:-1], TEXT + " ", ""])
+@pytest.mark.parametrize("fmt", DELTA_FORMATS)
+def test_wrong_length_original_is_rejected(original, fmt):
+    length, edits = _round_trip(redaction_delta(ENTITIES), len(TEXT), fmt)
+    with pytest.raises(ValueError):
+        "".join(apply_delta(_chunks(original, 3), edits, length))
+
+
+def test_edits_past_the_end_are_rejected():
+    with pytest.raises(ValueError, match="past the end"):
+        "".join(apply_delta(_chunks(TEXT[:40], 3), redaction_delta(ENTITIES)))
+
+
+def test_unsorted_edits_are_rejected():
+    with pytest.raises(ValueError, match="not sorted"):
+        "".join(apply_delta([TEXT], list(reversed(redaction_delta(ENTITIES)))))
+
+
+def test_read_delta_rejects_other_input():
+    with pytest.raises(ValueError):
+        read_delta(io.BytesIO(b'{"not": "a delta"}\n'))
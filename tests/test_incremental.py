@@ -0,0 +1,53 @@
+"""`update_result` after random edits gives the entities and redacted text of a full run."""
+
+import random
+
+import pytest
+
+from labeling.incremental import update_result
+from labeling.regex_engine import RegexPreprocessor
+
+SNIPPETS = [
+    "Mój PESEL to 90010112345, proszę dzwonić pod 501 234 567.",
+    "Pismo przesłano na adres jan.kowalski@example.com dnia 12.03.2021 r.",
+    "Rachunek: PL61 1090 1014 0000 0712 1981 2874.",
+    "hasło: Qwerty123!",
+    "ul. ",
+    " 2874",
+    "\n\n",
+]
+
+
+def _edit(text: str, rng: random.Random) -> str:
+    """Insert a snippet, delete a stretch or replace a word at a random position."""
+    pos = rng.randrange(len(text) + 1)
+    kind = rng.choice(["insert", "delete", "replace"])
+    if kind == "insert":
+        return text[:pos] + rng.choice(SNIPPETS) + text[pos:]
+    if kind == "delete":
+        return text[:pos] + text[pos + rng.randint(1, 200):]
+    end = text.find(" ", pos + 1)
+    return text[:pos] + rng.choice(["wniosek", "Kowalski", "600", "@"]) + text[end if end >= 0 else len(text):]
+
+
+def _spans(result):
+    return [(ent.start_char, ent.end_char, ent.label, ent.text) for ent in result.entities]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_a_full_run(documents, seed):
+    rng = random.Random(seed)
+    preprocessor = RegexPreprocessor()
+    text = "\n".join(rng.sample(documents, 60))
+    result = preprocessor(text)
+    full_runs = 0
+    for _ in range(30):
+        # Every update starts from the previous incremental result, as repeated saves in an editor would.
+        edited = _edit(text, rng) if rng.random() < 0.7 else _edit(_edit(text, rng), rng)
+        result = update_result(preprocessor, result, edited, margin=64)
+        expected = preprocessor(edited)
+        assert _spans(result) == _spans(expected)
+        assert result.redacted_text == expected.redacted_text
+        full_runs += result.meta["incremental"]["full_run"]
+        text = edited
+    assert full_runs == 0  # the windows were compared, not a fallback to a full run
@@ -0,0 +1,59 @@
+"""
+Without a lemmatizer, the religion, sex and age rules match inflected forms; the relative rules keep
+matching lemmas, since "mamy" ("we have" far more often) is only told apart from the genitive of "mama" by it.
+"""
+
+from pathlib import Path
+
+import pytest
+import spacy
+
+from labeling.anonymizer import build_pipeline
+from labeling.defaults import DEFAULT_MODEL
+from labeling.pipes.matcher import add_pii_matcher
+from labeling.plan import apply_plan, disable_lemmatizer, plan_pipeline
+
+from .stand_in import blank_pipeline
+
+CORPUS = Path(__file__).resolve().parent.parent / "output_broclaw.txt"
+
+
+def _with_lemmatizer():
+    nlp = blank_pipeline()
+    nlp.add_pipe("lemmatizer", after="stub_tagger")
+    return add_pii_matcher(nlp)
+
+
+def test_relative_rules_read_lemmas():
+    matcher = add_pii_matcher(blank_pipeline(), lemmatizer=False).get_pipe("pii_matcher")
+    assert "token.lemma" in matcher.requirements(["relative"])[1]
+    assert "token.lemma" not in matcher.requirements(["religion", "sex"])[1]
+    # The relative rules run after the age rules and can overwrite their matches.
+    assert "token.lemma" in matcher.requirements(["age"])[1]
+
+
+def test_lemmatizer_kept_for_relative():
+    nlp = _with_lemmatizer()
+    assert disable_lemmatizer(nlp) == []
+    assert "lemmatizer" in apply_plan(nlp, plan_pipeline(nlp, ["relative"])).pipe_names
+
+
+def test_lemmatizer_dropped_without_relative():
+    nlp = _with_lemmatizer()
+    disable_lemmatizer(nlp)
+    nlp = apply_plan(nlp, plan_pipeline(nlp, ["religion", "sex"]))
+    assert "lemmatizer" not in nlp.pipe_names
+
+
+@pytest.mark.skipif(not spacy.util.is_package(DEFAULT_MODEL), reason=f"{DEFAULT_MODEL} is not installed")
+def test_same_entities_as_with_the_lemmatizer():
+    texts = [line for line in CORPUS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    results = []
+    for lemmatizer in (True, False):
+        nlp = build_pipeline(use_snapshot=False, lemmatizer=lemmatizer)
+        results.append([
+            [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents] for doc in nlp.pipe(texts)
+        ])
+    expected, got = results
+    mismatches = [(text, a, b) for text, a, b in zip(texts, expected, got) if a != b]
+    assert not mismatches[:5]
@@ -0,0 +1,45 @@
+"""
+`pii_matcher` against the EntityRuler chain it replaced (`add_*_entity_ruler`).
+
+Every span is compared, including those where several patterns of one ruler
+matched the same tokens (`test_rule_ties.py` has examples).
+"""
+
+import pytest
+
+from labeling.pipes.matcher import add_pii_matcher
+from labeling.pipes.rule_patterns import RULE_SOURCE
+
+from .stand_in import blank_pipeline, legacy_pipeline
+
+
+def _entities(doc):
+    # Whether a span comes from the rule patterns (the preprocessor reads it for dates), not which id field says so.
+    return {(ent.start_char, ent.end_char, ent.label_, RULE_SOURCE in (ent.id_, ent.kb_id_)) for ent in doc.ents}
+
+
+@pytest.fixture(scope="module")
+def outputs(documents):
+    legacy = legacy_pipeline()
+    matcher = add_pii_matcher(blank_pipeline())
+    pairs = []
+    for legacy_doc, doc in zip(legacy.pipe(documents), matcher.pipe(documents)):
+        pairs.append((_entities(legacy_doc), _entities(doc)))
+    return pairs
+
+
+def test_same_entities(outputs, documents):
+    mismatches = [
+        (documents[index], legacy ^ new) for index, (legacy, new) in enumerate(outputs) if legacy != new
+    ]
+    assert not mismatches[:5]
+
+
+@pytest.mark.parametrize("text", [
+    "karta 4111 1111 1111 1112 zablokowana",  # fails Luhn; 16 digits is no bank account or phone
+    "PESEL 12345678901 podany",  # wrong PESEL checksum
+    "konto PL61 1090 1014 0000 0712 1981 2874 11",  # 28 digits
+])
+def test_invalid_rule_spans_are_dropped(text):
+    doc = add_pii_matcher(blank_pipeline())(text)
+    assert [(ent.text, ent.label_) for ent in doc.ents] == []
@@ -0,0 +1,37 @@
+"""Forked pools share one process-wide `gc.freeze`: it is lifted only when the last live pool closes."""
+
+import gc
+import multiprocessing
+
+import pytest
+
+from labeling.parallel import ParallelPreprocessor
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="forked pools need the 'fork' start method"
+)
+
+
+def _pool() -> ParallelPreprocessor:
+    return ParallelPreprocessor(1, model="", max_length=1000, engine="regex", fork=True)
+
+
+def test_unfreeze_waits_for_the_last_pool():
+    first, second = _pool(), _pool()
+    assert first(" tel. 600 700 800").entities
+    first.close()
+    assert gc.get_freeze_count() > 0
+    assert second("tel. 600 700 800").entities
+    second.close()
+    assert gc.get_freeze_count() == 0
+
+
+def test_keys_are_not_reused():
+    # `id()` of a collected pool can come back for the next one; its workers may still be looking up the key.
+    keys = []
+    for _ in range(3):
+        pool = _pool()
+        keys.append(pool._fork_key)
+        pool.close()
+        del pool
+    assert len(set(keys)) == 3
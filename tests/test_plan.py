@@ -0,0 +1,76 @@
+"""`plan_pipeline` keeps exactly the components the requested labels need."""
+
+import pytest
+import spacy
+
+from labeling.pipes.matcher import MATCHER_NAME, add_pii_matcher
+from labeling.plan import apply_plan, plan_pipeline
+
+from .stand_in import stand_in_pipeline
+
+LISTENER = {"@architectures": "spacy.Tok2VecListener.v1", "width": 96, "upstream": "*"}
+
+
+def _transition(state_type: str) -> dict:
+    return {
+        "@architectures": "spacy.TransitionBasedParser.v2", "state_type": state_type, "extra_state_tokens": False,
+        "hidden_width": 64, "maxout_pieces": 2, "use_upper": True, "tok2vec": LISTENER,
+    }
+
+
+@pytest.fixture(scope="module")
+def model_shaped():
+    """The component layout of pl_core_news_md (untrained; planning only reads the metadata)."""
+    nlp = spacy.blank("pl")
+    nlp.add_pipe("tok2vec")
+    nlp.add_pipe("morphologizer", config={"model": {"@architectures": "spacy.Tagger.v2", "tok2vec": LISTENER}})
+    nlp.add_pipe("parser", config={"model": _transition("parser")})
+    nlp.add_pipe("lemmatizer", config={"mode": "rule"})
+    nlp.add_pipe("tagger", config={"model": {"@architectures": "spacy.Tagger.v2", "tok2vec": LISTENER}})
+    nlp.add_pipe("attribute_ruler")
+    nlp.add_pipe("ner", config={"model": _transition("ner")})
+    return add_pii_matcher(nlp)
+
+
+@pytest.mark.parametrize("labels, enabled", [
+    # Regex rules on the token text need nothing from the model.
+    (["email", "phone", "pesel"], [MATCHER_NAME]),
+    # NER labels keep the NER and the tok2vec it listens to, and every rule group, since any
+    # of them can overwrite an NER span; the attribute_ruler declares no outputs and stays
+    # with the statistical components.
+    (["name"], ["tok2vec", "morphologizer", "lemmatizer", "attribute_ruler", "ner", MATCHER_NAME]),
+    # Relative rules read lemmas; the rule lemmatizer reads POS from the morphologizer.
+    (["relative"], ["tok2vec", "morphologizer", "lemmatizer", "attribute_ruler", MATCHER_NAME]),
+    # Age spans are shrunk to their numeral by POS, and the later groups (relative rules
+    # included) can still overwrite them.
+    (["age"], ["tok2vec", "morphologizer", "lemmatizer", "attribute_ruler", MATCHER_NAME]),
+])
+def test_kept_components(model_shaped, labels, enabled):
+    plan = plan_pipeline(model_shaped, labels)
+    assert plan.enabled == enabled
+    assert plan.disabled == [name for name in model_shaped.pipe_names if name not in enabled]
+    assert set(plan.reasons) == set(enabled)
+
+
+def test_union_of_labels_keeps_the_union(model_shaped):
+    separate = set()
+    for label in ("email", "name", "relative"):
+        separate |= set(plan_pipeline(model_shaped, [label]).enabled)
+    assert set(plan_pipeline(model_shaped, ["email", "name", "relative"]).enabled) == separate
+
+
+def test_plan_rejects_unknown_labels(model_shaped):
+    with pytest.raises(ValueError):
+        plan_pipeline(model_shaped, ["no-such-label"])
+
+
+@pytest.mark.parametrize("labels", [["email", "phone"], ["relative", "sex"], ["age"], ["bank-account", "religion"]])
+def test_pruned_pipeline_finds_the_same_entities(documents, labels):
+    texts = documents[:150]
+    full = stand_in_pipeline()
+    pruned = apply_plan(stand_in_pipeline(), plan_pipeline(stand_in_pipeline(), labels))
+    assert len(pruned.pipe_names) < len(full.pipe_names) or "stub_tagger" in pruned.pipe_names
+    for expected, doc in zip(full.pipe(texts), pruned.pipe(texts)):
+        want = [(ent.start_char, ent.end_char, ent.label_) for ent in expected.ents if ent.label_ in labels]
+        got = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents if ent.label_ in labels]
+        assert got == want
@@ -0,0 +1,110 @@
+"""Record streams (JSONL/CSV rows) through the CLI and `anonymize_records`."""
+
+import copy
+import csv
+import json
+
+from labeling.anonymizer import anonymize, anonymize_records
+from labeling.cli import main
+from labeling.records import ENTITIES_FIELD
+
+ROWS = [{"id": i, "text": f"Proszę dzwonić pod numer 600 700 80{i % 10}."} for i in range(20)]
+
+
+def test_cli_writes_the_profile_report(tmp_path):
+    src, out, report = tmp_path / "in.jsonl", tmp_path / "out.jsonl", tmp_path / "profile.json"
+    src.write_text("".join(json.dumps(row) + "\n" for row in ROWS), encoding="utf-8")
+    assert main([str(src), "-o", str(out), "--engine", "regex", "--profile-output", str(report), "--quiet"]) == 0
+    assert json.loads(report.read_text())["documents"] == len(ROWS)
+
+
+def _redacted(text):
+    return anonymize(text, engine="regex")
+
+
+def test_selected_fields_are_redacted_and_the_rest_passed_through():
+    rows = [
+        {
+            "id": i,
+            "turn": {"speaker": "Jan 600 700 800", "text": f"Pisz na jan{i}@example.com.", "n": i},
+            "note": "Tel. 501 234 567",
+            "tags": ["600 700 800"],
+        }
+        for i in range(12)
+    ]
+    rows[3]["turn"] = None  # a nested path that does not resolve
+    rows[5]["turn"]["text"] = 42  # not a string
+    del rows[7]["note"]  # a missing field
+    originals = copy.deepcopy(rows)
+
+    results = list(anonymize_records(rows, fields=["turn.text", "note"], engine="regex", batch_size=5))
+
+    assert [row["id"] for row in results] == list(range(12))
+    for original, row in zip(originals, results):
+        expected = copy.deepcopy(original)
+        if isinstance(original["turn"], dict) and isinstance(original["turn"]["text"], str):
+            expected["turn"]["text"] = _redacted(original["turn"]["text"])
+        if "note" in original:
+            expected["note"] = _redacted(original["note"])
+        assert row == expected
+    assert results[0]["turn"]["speaker"] == "Jan 600 700 800"
+    assert results[0]["note"] == "Tel. [phone]"
+
+
+def test_every_string_field_by_default():
+    rows = [{"a": "Tel. 501 234 567", "b": 501234567, "c": {"d": "jan@example.com"}, ENTITIES_FIELD: "x@y.pl"}]
+    (row,) = anonymize_records(copy.deepcopy(rows), engine="regex")
+    assert row == {"a": "Tel. [phone]", "b": 501234567, "c": {"d": "jan@example.com"}, ENTITIES_FIELD: "x@y.pl"}
+
+
+def test_entities_point_into_the_original_field_values():
+    rows = [{"id": 1, "turn": {"text": "Tel. 501 234 567"}, "note": "Pisz: jan@example.com"}, {"id": 2, "note": 7}]
+    originals = copy.deepcopy(rows)
+    results = list(anonymize_records(rows, fields=["turn.text", "note"], with_entities=True, engine="regex"))
+    assert results[1][ENTITIES_FIELD] == []
+    entities = results[0][ENTITIES_FIELD]
+    assert [(ent["field"], ent["label"]) for ent in entities] == [("turn.text", "phone"), ("note", "email")]
+    values = {"turn.text": originals[0]["turn"]["text"], "note": originals[0]["note"]}
+    assert [values[ent["field"]][ent["start"]:ent["end"]] for ent in entities] == ["501 234 567", "jan@example.com"]
+
+
+def test_rows_without_selected_fields_keep_their_place():
+    rows = [{"id": i, "text": "Tel. 501 234 567"} if i % 3 else {"id": i} for i in range(10)]
+    results = list(anonymize_records(rows, fields=["text"], engine="regex", batch_size=2))
+    assert [row["id"] for row in results] == list(range(10))
+    assert all(row.get("text", "Tel. [phone]") == "Tel. [phone]" for row in results)
+
+
+def test_cli_csv_redacts_the_selected_columns(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    rows = [
+        {"id": "1", "text": "Tel. 501 234 567", "author": "jan@example.com"},
+        {"id": "2", "text": "", "author": "ola@example.com"},
+        {"id": "3", "text": "Pisz: ola@example.com, tel. 600 700 800", "author": ""},
+    ]
+    with src.open("w", encoding="utf-8", newline="") as stream:
+        writer = csv.DictWriter(stream, fieldnames=["id", "text", "author"])
+        writer.writeheader()
+        writer.writerows(rows)
+    args = [str(src), "-o", str(out), "--engine", "regex", "--fields", "text", "--entities", "--quiet"]
+    assert main(args) == 0
+
+    with out.open(encoding="utf-8", newline="") as stream:
+        reader = csv.DictReader(stream)
+        assert reader.fieldnames == ["id", "text", "author", ENTITIES_FIELD]
+        written = list(reader)
+    assert [row["id"] for row in written] == ["1", "2", "3"]
+    assert [row["author"] for row in written] == [row["author"] for row in rows]
+    assert [row["text"] for row in written] == [_redacted(row["text"]) for row in rows]
+    entities = [json.loads(row[ENTITIES_FIELD]) for row in written]
+    assert [[ent["label"] for ent in row] for row in entities] == [["phone"], [], ["email", "phone"]]
+    assert all(ent["field"] == "text" for row in entities for ent in row)
+
+
+def test_cli_jsonl_nested_fields(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    rows = [{"id": i, "turn": {"text": "Tel. 501 234 567", "raw": "Tel. 501 234 567"}} for i in range(3)]
+    src.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    assert main([str(src), "-o", str(out), "--engine", "regex", "--fields", "turn.text", "--quiet"]) == 0
+    written = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert written == [{"id": i, "turn": {"text": "Tel. [phone]", "raw": "Tel. 501 234 567"}} for i in range(3)]
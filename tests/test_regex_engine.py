@@ -0,0 +1,123 @@
+"""
+`RegexPreprocessor` against the rule stage it replaces: a blank `pl` pipeline
+with `pii_matcher` restricted to `REGEX_LABELS`, wrapped in `SpacyPreprocessor`.
+
+The engine finds tokens with `TOKEN_RE` instead of spaCy's tokenizer, so the
+output is compared where the token edges agree and the known differences are
+pinned below. Entities at extents where several rule patterns match the same
+tokens are left out: the pipeline decides those in the EntityRuler's order.
+"""
+
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+import spacy
+
+from labeling.pipes.matcher import MATCHER_NAME, default_rule_groups
+from labeling.preprocessor import SpacyPreprocessor
+from labeling.regex_engine import REGEX_LABELS, RegexPreprocessor
+
+from .stand_in import legacy_rules_pipeline
+
+TOKENIZER_CASES = [
+    "",
+    "   ",
+    "  dwie spacje na początku",
+    "tab\tpo\n\nliniach  i na końcu  ",
+    "tel.: +48 (22) 123-45-67, fax 22/123 45 67.",
+    "e-mail: jan.kowalski@example.com; www.example.pl/a?b=1",
+    "ul. Długa 5/7, 00-950 Warszawa, ok. godz. 10:30",
+    "data ur. 01.02.1990 r. (PESEL 90020112345)",
+    "PL61 1090 1014 0000 0712 1981 2874 „cytat” i ‘apostrof’ …",
+    "m.in. 5m, 8 GB, 4,5 kg, Sp.k., MG_RAK_P121, k***a, McDonald's",
+]
+
+# Texts whose tokens differ from spaCy's: (text, our tokens, spaCy's tokens).
+TOKEN_DIFFERENCES = [
+    # Special cases: spaCy keeps emoticons whole.
+    ("Co robić? :(", ["Co", "robić", "?", ":", "("], ["Co", "robić", "?", ":("]),
+    # A unit is only split off a token that is a number.
+    ("Lu8in", ["Lu8in"], ["Lu8", "in"]),
+    # spaCy splits "(" off a token only before a letter.
+    ("len(2352-1734)", ["len", "(", "2352", "-", "1734", ")"], ["len(2352", "-", "1734", ")"]),
+]
+
+
+def _spacy_pipeline() -> SpacyPreprocessor:
+    nlp = spacy.blank("pl")
+    matcher = nlp.add_pipe(MATCHER_NAME)
+    matcher.set_groups(default_rule_groups())
+    matcher.restrict_labels(REGEX_LABELS)
+    return SpacyPreprocessor(nlp, redact_only=True, labels=REGEX_LABELS)
+
+
+def _ents(result):
+    return sorted((e.start_char, e.end_char, e.label) for e in result.entities)
+
+
+def _tied_extents(ruler, doc):
+    """Character extents at which patterns with different keys matched the same tokens."""
+    keys = defaultdict(set)
+    for match_id, start, end in ruler.match(doc):
+        keys[start, end].add(match_id)
+    return [(doc[s:e].start_char, doc[s:e].end_char) for (s, e), ids in keys.items() if len(ids) > 1]
+
+
+def _spans(engine: RegexPreprocessor, text: str):
+    doc = engine.tokenize(text)
+    return list(zip(doc.starts, doc.ends))
+
+
+@pytest.mark.parametrize("text", TOKENIZER_CASES)
+def test_tokens_match_spacy(text):
+    assert _spans(RegexPreprocessor(), text) == [
+        (token.idx, token.idx + len(token)) for token in spacy.blank("pl").make_doc(text)
+    ]
+
+
+@pytest.mark.parametrize("text,ours,theirs", TOKEN_DIFFERENCES)
+def test_known_token_differences(text, ours, theirs):
+    assert [text[start:end] for start, end in _spans(RegexPreprocessor(), text)] == ours
+    assert [token.text for token in spacy.blank("pl").make_doc(text)] == theirs
+
+
+def test_same_output_where_tokens_agree(documents):
+    engine = RegexPreprocessor()
+    reference = _spacy_pipeline()
+    ruler = legacy_rules_pipeline().get_pipe("rule_entity_ruler")
+    agreeing = 0
+    mismatches = []
+    for text, doc, theirs in zip(documents, reference.nlp.tokenizer.pipe(documents), reference.pipe(documents)):
+        if _spans(engine, text) != [(token.idx, token.idx + len(token)) for token in doc]:
+            continue
+        agreeing += 1
+        tied = _tied_extents(ruler, doc)
+
+        def untied(result):
+            return [ent for ent in _ents(result) if not any(ent[0] < end and start < ent[1] for start, end in tied)]
+
+        ours = engine(text)
+        if untied(ours) != untied(theirs):
+            mismatches.append((text, untied(theirs), untied(ours)))
+    assert not mismatches[:5]
+    # Token edges differ only in a few percent of the documents (emoticons, placeholders, rare symbols).
+    assert agreeing >= 0.9 * len(documents)
+
+
+def test_startup_without_spacy():
+    # A fresh interpreter: neither importing nor building the engine may pull in spaCy.
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "from labeling.regex_engine import RegexPreprocessor\n"
+        "RegexPreprocessor()('tel. 600 700 800')\n"
+        "print(time.perf_counter() - start, 'spacy' in sys.modules)\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout
+    elapsed, imported = output.split()
+    assert imported == "False"
+    assert float(elapsed) < 1.0
@@ -0,0 +1,33 @@
+"""
+The rules group of `pii_matcher`, with and without lexeme flags, against the EntityRuler chain it replaced.
+
+Three pipelines over the whole `documents` fixture take minutes, so the test
+runs on a seeded sample; `python -m benchmarks.regex_flags` compares the full
+corpus (and exits with status 1 on any difference).
+"""
+
+import random
+
+from labeling.pipes.rule_patterns import RULE_SOURCE
+
+from .stand_in import legacy_rules_pipeline, rules_pipeline
+
+SAMPLE_SIZE = 800
+
+
+def _entities(doc):
+    return {(ent.start_char, ent.end_char, ent.label_, RULE_SOURCE in (ent.id_, ent.kb_id_)) for ent in doc.ents}
+
+
+def test_same_entities_as_the_entity_ruler(documents):
+    sample = random.Random(0).sample(documents, min(SAMPLE_SIZE, len(documents)))
+    baseline = legacy_rules_pipeline()
+    regex, flags = rules_pipeline(regex_flags=False), rules_pipeline(regex_flags=True)
+    mismatches = []
+    for text, ruler_doc, regex_doc, flags_doc in zip(
+            sample, baseline.pipe(sample), regex.pipe(sample), flags.pipe(sample)):
+        expected = _entities(ruler_doc)
+        diff = (expected ^ _entities(regex_doc)) | (expected ^ _entities(flags_doc))
+        if diff:
+            mismatches.append((text, diff))
+    assert not mismatches[:5]
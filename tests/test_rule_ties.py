@@ -0,0 +1,42 @@
+"""
+Matches with exactly the same extent: `pii_matcher` decides them as the EntityRuler chain did.
+
+The chain kept whichever tied match its set iteration order put first and
+dropped it when it failed validation, so in these cases the entity is lost
+(see `labeling.pipes.matcher`).
+"""
+
+import pytest
+
+from labeling.pipes.matcher import add_pii_matcher
+
+from .stand_in import blank_pipeline, legacy_pipeline
+
+CASES = [
+    # text, the entities of both
+    ("Mój PESEL 95121755917 i dowód", []),
+    ("podałem nr dowodu RD2380 na stronie", []),
+    ("karta 4111 1111 1111 1111 ok", []),
+    ("tel. +A8 884 716 861 dzwonił", []),
+    ("mail wil<torbuchholz@example.com dzisiaj", []),
+    (
+        "konto PL30 9672 6230 5771 5492 4038 4431 , karta",
+        [("PL30 9672 6230 5771 5492 4038 4431", "credit-card-number")],
+    ),
+]
+
+
+def _entities(nlp, text):
+    return [(ent.text, ent.label_) for ent in nlp(text).ents]
+
+
+@pytest.fixture(scope="module")
+def legacy():
+    return legacy_pipeline()
+
+
+@pytest.mark.parametrize("sequence_rules", [True, False])
+@pytest.mark.parametrize("text, entities", CASES)
+def test_tied_matches(legacy, text, entities, sequence_rules):
+    assert _entities(legacy, text) == entities
+    assert _entities(add_pii_matcher(blank_pipeline(), sequence_rules=sequence_rules), text) == entities
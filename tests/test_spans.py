@@ -0,0 +1,37 @@
+import pytest
+
+from labeling.delta import redaction_delta
+from labeling.results import EntityHint
+from labeling.spans import redact_text, sort_spans
+
+TEXT = "Jan Kowalski mieszka w Krakowie"
+NAME = EntityHint(text="Jan", label="name", start_char=0, end_char=3)
+SURNAME = EntityHint(text="Kowalski", label="surname", start_char=4, end_char=12)
+CITY = EntityHint(text="Krakowie", label="city", start_char=23, end_char=31)
+# Overlaps SURNAME; the longer span wins.
+FULL_NAME = EntityHint(text="Jan Kowalski", label="name", start_char=0, end_char=12)
+
+
+@pytest.mark.parametrize("entities", [
+    [NAME, SURNAME, CITY],
+    [CITY, NAME, SURNAME],
+    [SURNAME, CITY, NAME],
+])
+def test_redact_text_accepts_any_order(entities):
+    assert redact_text(TEXT, entities) == "[name] [surname] mieszka w [city]"
+
+
+def test_redact_text_resolves_overlaps_regardless_of_order():
+    assert redact_text(TEXT, [CITY, SURNAME, FULL_NAME]) == "[name] mieszka w [city]"
+
+
+def test_redaction_delta_is_sorted():
+    assert redaction_delta([CITY, SURNAME, FULL_NAME]) == [(0, 12, "name"), (23, 31, "city")]
+
+
+def test_sort_spans_orders_by_start_then_length_then_priority():
+    card = EntityHint(text="4111", label="credit-card-number", start_char=0, end_char=4)
+    account = EntityHint(text="4111", label="bank-account", start_char=0, end_char=4)
+    longer = EntityHint(text="4111 1", label="phone", start_char=0, end_char=6)
+    later = EntityHint(text="1", label="pesel", start_char=5, end_char=6)
+    assert sort_spans([later, card, account, longer]) == [longer, account, card, later]
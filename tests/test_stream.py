@@ -0,0 +1,42 @@
+"""`anonymize_stream` yields, in input order, what separate `anonymize` calls return."""
+
+import pytest
+
+from labeling.anonymizer import anonymize, anonymize_stream
+
+from .stand_in import stand_in_pipeline
+
+
+def _spans(result):
+    return [(ent.start_char, ent.end_char, ent.label, ent.text) for ent in result.entities]
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return stand_in_pipeline()
+
+
+@pytest.mark.parametrize("engine", ["regex", "spacy"])
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_stream_equals_separate_calls(documents, nlp, engine, batch_size):
+    texts = documents[:40] + ["", "   ", "Tel. 501 234 567"] + documents[-40:]
+    options = {"engine": engine, "nlp": nlp if engine == "spacy" else None, "verbose": False}
+    expected = [anonymize(text, return_full=True, **options) for text in texts]
+    results = list(anonymize_stream(iter(texts), batch_size=batch_size, return_full=True, **options))
+    assert [result.raw_text for result in results] == texts
+    assert [_spans(result) for result in results] == [_spans(result) for result in expected]
+    assert [result.redacted_text for result in results] == [result.redacted_text for result in expected]
+
+
+def test_stream_is_lazy():
+    consumed = []
+
+    def texts():
+        for i in range(100):
+            consumed.append(i)
+            yield f"Dokument {i}, e-mail jan{i}@example.com."
+
+    stream = anonymize_stream(texts(), batch_size=10, engine="regex")
+    assert next(stream) == "Dokument 0, e-mail [email]."
+    assert len(consumed) < 100
+    stream.close()
@@ -0,0 +1,80 @@
+"""`TokenTable` rows equal the `TokenInfo` of every token and survive serialisation."""
+
+import pickle
+
+import pytest
+from spacy.tokens import Doc
+
+from labeling.results import TokenInfo
+from labeling.token_table import TokenTable
+
+from .stand_in import stand_in_pipeline
+
+TEXT = "Pan Łukasz Żółć, PESEL 44051401359, mieszka w Gdańsku.\n\nDziękuję!"
+
+
+def _infos(doc):
+    return [
+        TokenInfo(
+            idx=token.i, text=token.text, lemma=token.lemma_, pos=token.pos_, tag=token.tag_, dep=token.dep_,
+            head=token.head.i, is_stop=token.is_stop, is_punct=token.is_punct, whitespace=token.whitespace_,
+        )
+        for token in doc
+    ]
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return stand_in_pipeline()
+
+
+@pytest.fixture
+def parsed(nlp):
+    """A Doc with tags, dependencies and non-trivial heads set, as a parser would leave it."""
+    doc = nlp.make_doc("Jan Żółć kupił dom.")
+    return Doc(
+        nlp.vocab,
+        words=[token.text for token in doc],
+        spaces=[bool(token.whitespace_) for token in doc],
+        heads=[2, 0, 2, 2, 2],
+        deps=["nsubj", "flat", "ROOT", "obj", "punct"],
+        tags=["SUBST", "SUBST", "PRAET", "SUBST", "INTERP"],
+        pos=["PROPN", "PROPN", "VERB", "NOUN", "PUNCT"],
+        lemmas=["Jan", "Żółć", "kupić", "dom", "."],
+    )
+
+
+def test_rows_match_token_info(nlp, parsed):
+    for doc in (nlp(TEXT), parsed):
+        table = TokenTable.from_doc(doc)
+        assert len(table) == len(doc)
+        assert [row.to_info() for row in table] == _infos(doc)
+        assert table == _infos(doc)
+
+
+@pytest.mark.parametrize("text", [TEXT, "", "Żółć"])
+def test_bytes_round_trip(nlp, text):
+    table = TokenTable.from_doc(nlp(text))
+    restored = TokenTable.from_bytes(table.to_bytes())
+    assert restored == table
+    assert restored.text == text
+    assert [row.to_info() for row in restored] == [row.to_info() for row in table]
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def test_round_trip_of_a_parsed_doc(parsed):
+    table = TokenTable.from_doc(parsed)
+    assert TokenTable.from_bytes(table.to_bytes()) == _infos(parsed)
+
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        TokenTable.from_bytes(b"XXXX" + bytes(12))
+
+
+def test_concat_matches_the_whole_document(nlp):
+    first, second = "Jan Żółć mieszka w Gdańsku. ", "Anna Nowak pracuje w Krakowie."
+    whole = TokenTable.from_doc(nlp(first + second))
+    merged = TokenTable.concat(first + second, [(0, TokenTable.from_doc(nlp(first))),
+                                                (len(first), TokenTable.from_doc(nlp(second)))])
+    assert [row.to_info() for row in merged] == [row.to_info() for row in whole]
@@ -0,0 +1,57 @@
+"""`validate_batch` gives the scalar validators' answers on both of its paths."""
+
+import random
+
+import pytest
+
+from labeling.pipes.rule_patterns import VALIDATORS
+from labeling.pipes.validators import validate_batch
+
+CASES = {
+    "pesel": ["44051401359", "44051401358", "4405140135", "440514013591", "44 05 14 01 359", "44O514O1359",
+              "9001011234S", "abcdefghijk", "", "4", "٤٤٠٥١٤٠١٣٥٩"],
+    "credit-card-number": ["4111 1111 1111 1111", "4111 1111 1111 1112", "4111-1111-1111-1111", "4111111111111",
+                           "411111111111", "4lll llll llll llll", "0000000000000", "", "7", "xxxx xxxx xxxx xxxx"],
+    "bank-account": ["PL61 1090 1014 0000 0712 1981 2874", "pl61109010140000071219812874",
+                     "61 1090 1014 0000 0712 1981 2874", "PL61 1090 1014 0000 0712 1981 287",
+                     "-PL61-1090-1014-0000-0712-1981-2874", "PL6l 1090 1014 OOOO 0712 1981 2874", "PL", "", "1"],
+    "phone": ["501 234 567", "+48 501 234 567", "(22) 123 45 67", "123456", "1234567", "1234567890", "5O1 234 567",
+              "", "+", "---", "٥٠١٢٣٤٥٦٧"],
+    "email": ["jan@example.com", ""],
+}
+
+
+def _candidates():
+    return [(label, text) for label, texts in CASES.items() for text in texts]
+
+
+def _expected(labels, texts):
+    return [VALIDATORS[label](text) if label in VALIDATORS else True for label, text in zip(labels, texts)]
+
+
+@pytest.mark.parametrize("vector_min", [0, 10**9], ids=["numpy", "scalar"])
+def test_known_candidates(vector_min):
+    labels, texts = zip(*_candidates())
+    assert validate_batch(labels, texts, vector_min=vector_min) == _expected(labels, texts)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_candidates(seed):
+    rng = random.Random(seed)
+    alphabet = "0123456789" * 4 + " -+()oOlIBSZPLpx٣"
+    labels = [rng.choice(list(CASES)) for _ in range(500)]
+    texts = [
+        rng.choice(CASES[label]) if rng.random() < 0.3
+        else "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 34)))
+        for label in labels
+    ]
+    assert validate_batch(labels, texts, vector_min=0) == _expected(labels, texts)
+
+
+def test_ascii_batch_mixed_with_non_ascii():
+    labels, texts = ["pesel"] * 40 + ["phone"], ["44051401359"] * 40 + ["٥٠١٢٣٤٥٦٧"]
+    assert validate_batch(labels, texts) == _expected(labels, texts)
+
+
+def test_empty_batch():
+    assert validate_batch([], [], vector_min=0) == []
@@ -0,0 +1,124 @@
+"""`windowed_model` finds, inside its windows, what the statistical components find on the whole document."""
+
+import pytest
+import spacy
+from spacy.language import Language
+from spacy.tokens import Span
+
+from labeling.anonymizer import anonymize
+from labeling.pipes.matcher import MATCHER_NAME, add_pii_matcher
+from labeling.pipes.windowed import WINDOW_STATS_KEY, WINDOWED_NAME, add_windowed_model, candidate_windows
+
+from .stand_in import blank_pipeline
+
+FILLER = " ".join(["i", "potem", "jeszcze", "raz", "o", "tym", "mówiono", "długo"] * 8)
+TEXTS = [
+    "Kowalski przyszedł rano.",
+    f"Wczoraj pan Jan Kowalski był w urzędzie, {FILLER}, a potem pojechał na ul. Długą w Gdańsku.",
+    f"{FILLER}. Mieszka przy ul. Polnej, {FILLER} i pracuje w Fabryce Mebli Nowak, {FILLER}.",
+    f"{FILLER} tylko małe litery {FILLER}",
+    f"Moja matka ma 54 lata, {FILLER}, ojciec ma 60 lat i jest katolikiem.",
+    "",
+]
+
+
+@Language.component("context_ner", assigns=["doc.ents"])
+def context_ner(doc):
+    """Label runs of capitalised words by the word before them, as a model reads its context."""
+    ents = []
+    i = 0
+    while i < len(doc):
+        if not (doc[i].is_alpha and doc[i].is_title and not doc[i].is_stop):
+            i += 1
+            continue
+        end = i
+        while end < len(doc) and doc[end].is_alpha and doc[end].is_title and not doc[end].is_stop:
+            end += 1
+        before = doc[i - 1].lower_.rstrip(".") if i else ""
+        label = "persName" if before in ("pan", "pani") else "placeName" if before in ("ul", "w") else "orgName"
+        ents.append(Span(doc, i, end, label=label))
+        i = end
+    doc.ents = ents
+    return doc
+
+
+def _pipeline() -> spacy.Language:
+    nlp = spacy.blank("pl")
+    nlp.add_pipe("stub_tagger")
+    nlp.add_pipe("context_ner", name="ner")
+    return add_pii_matcher(nlp)
+
+
+@pytest.fixture(scope="module")
+def pipelines():
+    full, windowed = _pipeline(), _pipeline()
+    add_windowed_model(windowed)
+    return full, windowed
+
+
+@pytest.fixture(scope="module")
+def texts(documents):
+    return TEXTS + documents[:150]
+
+
+def _ents(doc):
+    return [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+
+
+def test_statistical_components_move_behind_the_window(pipelines):
+    _, windowed = pipelines
+    assert windowed.pipe_names == [WINDOWED_NAME, MATCHER_NAME]
+    assert [name for name, _ in windowed.get_pipe(WINDOWED_NAME).components] == ["stub_tagger", "ner"]
+
+
+def test_same_entities_and_attributes_inside_the_windows(pipelines, texts):
+    full, windowed = pipelines
+    component = windowed.get_pipe(WINDOWED_NAME)
+    with full.select_pipes(disable=[MATCHER_NAME]), windowed.select_pipes(disable=[MATCHER_NAME]):
+        for expected, doc in zip(full.pipe(texts, batch_size=16), windowed.pipe(texts, batch_size=16)):
+            windows = candidate_windows(expected, component.anchors, component.context)
+            assert doc.user_data[WINDOW_STATS_KEY]["windows"] == len(windows)
+            inside = [any(start <= i < end for start, end in windows) for i in range(len(doc))]
+            # Every entity of the context-reading stand-in starts on a cue, so all of them are in a window.
+            assert _ents(doc) == _ents(expected)
+            for i, (want, got) in enumerate(zip(expected, doc)):
+                if inside[i]:
+                    assert (got.pos_, got.lemma_) == (want.pos_, want.lemma_)
+                else:
+                    assert (got.pos_, got.lemma_) == ("X", want.lower_)
+
+
+def test_windows_skip_text_without_cues(pipelines):
+    _, windowed = pipelines
+    stats = windowed(TEXTS[3]).user_data[WINDOW_STATS_KEY]
+    assert stats == {"windows": 0, "chars": len(TEXTS[3]), "model_chars": 0}
+    stats = windowed(TEXTS[2]).user_data[WINDOW_STATS_KEY]
+    assert stats["windows"] == 2  # "Mieszka przy ul. Polnej" and "Fabryce Mebli Nowak"
+    assert stats["model_chars"] < stats["chars"]
+
+
+def test_same_anonymization_as_the_full_pipeline(pipelines, texts):
+    full, windowed = pipelines
+    for text in texts:
+        expected = anonymize(text, nlp=full, return_full=True)
+        result = anonymize(text, nlp=windowed, return_full=True)
+        assert [(ent.start_char, ent.end_char, ent.label) for ent in result.entities] == [
+            (ent.start_char, ent.end_char, ent.label) for ent in expected.entities
+        ]
+        assert result.redacted_text == expected.redacted_text
+
+
+def test_no_window_component_without_statistical_components():
+    nlp = spacy.blank("pl")
+    nlp.add_pipe(MATCHER_NAME)
+    assert add_windowed_model(nlp) is None
+    assert nlp.pipe_names == [MATCHER_NAME]
+
+
+def test_parser_is_disabled():
+    nlp = blank_pipeline()
+    nlp.add_pipe("parser", before="ner")
+    nlp = add_pii_matcher(nlp)
+    add_windowed_model(nlp)
+    assert "parser" in nlp.disabled
+    assert [name for name, _ in nlp.get_pipe(WINDOWED_NAME).components] == ["stub_tagger", "ner"]